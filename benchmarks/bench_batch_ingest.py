@@ -0,0 +1,112 @@
+"""
+Benchmark of per-trade vs batched trade ingestion.
+
+Replays synthetic USDT-quoted trades through the large order path (PriceConverter -> OrderAggregator) and the
+taker path (TakerOrderTracker), once the way the websocket callbacks used to do it (one asyncio task per trade)
+and once in batches (one task per batch, one USD multiplier lookup per symbol, add_trades/process_trades).
+Reports wall time per trade.
+
+Usage: python benchmarks/bench_batch_ingest.py [num_trades] [batch_size]
+"""
+import asyncio
+import logging
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.monitor.large_orders.core.order_aggregator import OrderAggregator
+from src.monitor.large_orders.src.base import TradeEvent
+from src.monitor.large_orders.src.price_converter import PriceConverter
+from src.monitor.taker_orders.src.tracker import TakerOrderTracker
+
+SYMBOLS = ["BTCUSDT", "ETHUSDT", "BNBUSDT", "SOLUSDT"]
+
+
+def generate_trades(num_trades: int):
+    rng = random.Random(42)
+    start_ms = 1_700_000_000_000
+    trades = []
+    for i in range(num_trades):
+        price = rng.uniform(10, 50_000)
+        quantity = rng.lognormvariate(0, 1)
+        trades.append(TradeEvent(
+            exchange="binance",
+            symbol=rng.choice(SYMBOLS),
+            side="BUY" if rng.random() < 0.5 else "SELL",
+            order_type="MARKET",
+            price=price,
+            quantity=quantity,
+            amount=price * quantity,
+            trade_time=start_ms + i // 20,
+            is_taker=True,
+            trade_id=str(i),
+            raw_data={},
+        ))
+    return trades
+
+
+def make_components():
+    aggregator = OrderAggregator(window_minutes=5, threshold_usd=float("inf"), bucket_seconds=0)
+    tracker = TakerOrderTracker(
+        symbols=SYMBOLS,
+        single_thresholds={symbol: float("inf") for symbol in SYMBOLS},
+        cumulative_config={
+            "window_size": 60,
+            "threshold_usd": float("inf"),
+            "min_order_count": 5,
+            "directions": ["BUY", "SELL"],
+        },
+        cooldown_config={"single_order": 300, "cumulative": 300},
+    )
+    return PriceConverter(http_client=object()), aggregator, tracker
+
+
+async def per_trade(trades) -> float:
+    converter, aggregator, tracker = make_components()
+
+    async def handle(trade):
+        usd_value = await converter.convert_to_usd(trade.symbol, trade.price, trade.quantity)
+        await aggregator.add_trade(trade.symbol, trade, usd_value)
+        await tracker.process_trade(trade)
+
+    start = time.perf_counter()
+    tasks = [asyncio.create_task(handle(trade)) for trade in trades]
+    await asyncio.gather(*tasks)
+    return time.perf_counter() - start
+
+
+async def batched(trades, batch_size: int) -> float:
+    converter, aggregator, tracker = make_components()
+
+    async def handle(batch):
+        usd_values = await converter.convert_trades_to_usd(batch)
+        await aggregator.add_trades([
+            (trade.symbol, trade, usd_value) for trade, usd_value in zip(batch, usd_values)
+        ])
+        await tracker.process_trades(batch)
+
+    start = time.perf_counter()
+    tasks = [
+        asyncio.create_task(handle(trades[i:i + batch_size]))
+        for i in range(0, len(trades), batch_size)
+    ]
+    await asyncio.gather(*tasks)
+    return time.perf_counter() - start
+
+
+def main(num_trades: int = 200_000, batch_size: int = 500):
+    logging.disable(logging.CRITICAL)
+    trades = generate_trades(num_trades)
+
+    single = asyncio.run(per_trade(trades))
+    batch = asyncio.run(batched(trades, batch_size))
+    print(f"per-trade tasks : {single / num_trades * 1e6:8.2f} us/trade  ({num_trades / single:,.0f} trades/s)")
+    print(f"batches of {batch_size:<5}: {batch / num_trades * 1e6:8.2f} us/trade  ({num_trades / batch:,.0f} trades/s)")
+    print(f"speedup: {single / batch:.1f}x")
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:3]])
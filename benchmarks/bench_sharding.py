@@ -0,0 +1,120 @@
+"""
+Synthetic benchmark of the sharded alert mode (ALERT_WORKER_PROCESSES).
+
+Evaluates one CEX cycle for 10k in-memory users (5 alerts each, JSON-decoded on load like alerts.json) with
+1..N worker processes, each polling only its crc32 shard of the users against the same broadcast ticker feed.
+The reported cycle time is that of the slowest shard; speedup is only meaningful with as many free cores as workers.
+
+Usage: python benchmarks/bench_sharding.py [num_users] [max_workers]
+"""
+import json
+import logging
+import multiprocessing
+import os
+import sys
+import time
+from unittest.mock import Mock, patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.environ.setdefault("LOCATION", "global")
+
+SYMBOLS = [f"COIN{i}USDT" for i in range(200)]
+
+
+def _make_alerts(user_id: int) -> str:
+    alerts = {}
+    for n in range(5):
+        symbol = SYMBOLS[(user_id * 7 + n) % len(SYMBOLS)]
+        alerts.setdefault(f"{symbol[:-4]}/USDT", []).append(
+            {
+                "type": "s",
+                "indicator": "PRICE",
+                "comparison": ["ABOVE", "BELOW", "PCTCHG", "24HRCHG"][n % 4],
+                "target": 0.05 if n % 4 in (2, 3) else 1_000_000,
+                "entry": 100.0,
+                "trigger": {"cooldown_seconds": 3600, "last_triggered": 0},
+            }
+        )
+    return json.dumps(alerts, indent=2)
+
+
+class _MemoryConfiguration:
+    def __init__(self, serialized: str):
+        self.serialized = serialized
+
+    def alerts_version(self):
+        return 0
+
+    def load_alerts(self):
+        return json.loads(self.serialized)
+
+    def load_config(self):
+        return {"channels": []}
+
+    def update_alerts(self, data):
+        self.serialized = json.dumps(data, indent=2)
+
+
+def _tickers() -> dict:
+    from src.models import BinancePriceResponse
+
+    tickers = {}
+    for symbol in SYMBOLS:
+        ticker = BinancePriceResponse(
+            {"symbol": symbol, "lastPrice": "100.0", "priceChangePercent": "1.0"}
+        )
+        tickers[(symbol, "1m")] = ticker
+        tickers[(symbol, "1d")] = ticker
+    return tickers
+
+
+def _run_shard(index: int, count: int, num_users: int) -> tuple[float, int]:
+    from src.alert_processes.base import get_shard
+    from src.alert_processes.cex import CEXAlertProcess
+
+    logging.disable(logging.CRITICAL)
+    users = [str(100_000_000 + i) for i in range(num_users)]
+    configurations = {
+        user: _MemoryConfiguration(_make_alerts(i))
+        for i, user in enumerate(users)
+        if get_shard(user, count) == index
+    }
+    process = CEXAlertProcess(
+        telegram_bot=Mock(), http_client=Mock(), shard=(index, count)
+    )
+    tickers = _tickers()
+
+    with patch("src.alert_processes.cex.get_whitelist", return_value=users), patch(
+        "src.alert_processes.cex.LocalUserConfiguration",
+        side_effect=configurations.get,
+    ), patch("src.alert_processes.cex.USE_MONGO_DB", False):
+        start = time.perf_counter()
+        process.poll_cycle(tickers=tickers)
+        return time.perf_counter() - start, len(configurations)
+
+
+def main(num_users: int = 10_000, max_workers: int = os.cpu_count() or 1) -> None:
+    ctx = multiprocessing.get_context("spawn")
+    baseline = None
+    print(f"{num_users} users, 5 alerts each, {os.cpu_count()} cores")
+    workers = 1
+    while workers <= max_workers:
+        with ctx.Pool(workers) as pool:
+            results = pool.starmap(
+                _run_shard, [(i, workers, num_users) for i in range(workers)]
+            )
+
+        # The cycle completes when the slowest shard does
+        elapsed = max(cycle for cycle, _ in results)
+        shard_sizes = [size for _, size in results]
+        baseline = baseline or elapsed
+        print(
+            f"workers={workers:<3} cycle={elapsed:7.3f}s "
+            f"users/s={num_users / elapsed:10.0f} speedup={baseline / elapsed:5.2f}x "
+            f"shards={min(shard_sizes)}..{max(shard_sizes)} users"
+        )
+        workers *= 2
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:3]])
@@ -0,0 +1,117 @@
+"""
+Replay benchmark of SlidingWindowAggregator against the previous list-rebuilding implementation.
+
+Replays synthetic BTCUSDT trades at a steady rate through add_trade(), querying get_5min_total() for both sides
+every 100 ms of trade time like LargeOrderMonitor._run() did, and reports CPU time per trade.
+The previous implementation is O(window) per trade, so by default it only replays a prefix of the trades.
+
+Usage: python benchmarks/bench_sliding_window.py [num_trades] [legacy_trades] [trades_per_second]
+"""
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+from threading import Lock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.monitor.large_orders.aggregator import SlidingWindowAggregator
+
+
+class LegacySlidingWindowAggregator:
+    """The list-based aggregator as it was before the running-sum rewrite"""
+
+    def __init__(self, window_size_seconds: int = 300):
+        self.window_size_ms = window_size_seconds * 1000
+        self.data = defaultdict(list)
+        self.lock = Lock()
+
+    def add_trade(self, trade: dict):
+        with self.lock:
+            symbol = trade['symbol']
+            self.data[symbol].append({
+                'amount': trade['amount'],
+                'side': trade['side'],
+                'timestamp': trade['trade_time'],
+                'trade_id': trade.get('trade_id', 0)
+            })
+            self._prune_old_trades(symbol, trade['trade_time'])
+
+    def _prune_old_trades(self, symbol: str, current_time_ms: int):
+        cutoff_time = current_time_ms - self.window_size_ms
+        self.data[symbol] = [t for t in self.data[symbol] if t['timestamp'] > cutoff_time]
+
+    def get_5min_total(self, symbol: str, side: str, current_time_ms: int) -> float:
+        with self.lock:
+            if symbol not in self.data:
+                return 0.0
+            self._prune_old_trades(symbol, current_time_ms)
+            cutoff_time = current_time_ms - self.window_size_ms
+            return sum(
+                t['amount'] for t in self.data[symbol]
+                if t['side'] == side and t['timestamp'] > cutoff_time
+            )
+
+
+def generate_trades(num_trades: int, trades_per_second: int):
+    rng = random.Random(42)
+    start_ms = 1_700_000_000_000
+    interval_ms = 1000 / trades_per_second
+    for i in range(num_trades):
+        yield {
+            'symbol': 'BTCUSDT',
+            'amount': rng.lognormvariate(8, 2),
+            'side': 'BUY' if rng.random() < 0.5 else 'SELL',
+            'trade_time': start_ms + int(i * interval_ms),
+            'trade_id': i,
+        }
+
+
+def replay(aggregator, trades) -> tuple[float, int, float]:
+    """Returns (cpu seconds, trades replayed, last BUY total)"""
+    next_check = None
+    count = 0
+    buy_total = 0.0
+    start = time.process_time()
+    for trade in trades:
+        aggregator.add_trade(trade)
+        count += 1
+        now = trade['trade_time']
+        if next_check is None or now >= next_check:
+            buy_total = aggregator.get_5min_total('BTCUSDT', 'BUY', now)
+            aggregator.get_5min_total('BTCUSDT', 'SELL', now)
+            next_check = now + 100
+    return time.process_time() - start, count, buy_total
+
+
+def main(num_trades: int = 1_000_000, legacy_trades: int = 50_000, trades_per_second: int = 50):
+    window_trades = 300 * trades_per_second
+    print(f"{trades_per_second} trades/s, ~{window_trades} trades in the 5 minute window")
+
+    cpu, count, new_total = replay(
+        SlidingWindowAggregator(300), generate_trades(num_trades, trades_per_second)
+    )
+    new_per_trade = cpu / count * 1e6
+    print(f"running-sum buffer: {count:>9} trades  cpu={cpu:8.2f}s  {new_per_trade:8.2f} us/trade")
+
+    legacy_count = min(legacy_trades, num_trades)
+    cpu, count, legacy_total = replay(
+        LegacySlidingWindowAggregator(300), generate_trades(legacy_count, trades_per_second)
+    )
+    legacy_per_trade = cpu / count * 1e6
+    print(
+        f"legacy list       : {count:>9} trades  cpu={cpu:8.2f}s  {legacy_per_trade:8.2f} us/trade"
+        f"  (~{legacy_per_trade * num_trades / 1e6:.0f}s extrapolated to {num_trades} trades)"
+    )
+
+    # Both implementations must agree on the window total
+    _, _, check_total = replay(
+        SlidingWindowAggregator(300), generate_trades(legacy_count, trades_per_second)
+    )
+    assert abs(check_total - legacy_total) <= 1e-6 * max(1.0, legacy_total), (check_total, legacy_total)
+    print(f"speedup: {legacy_per_trade / new_per_trade:.0f}x per trade")
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:4]])
@@ -0,0 +1,101 @@
+"""
+Benchmark of trade persistence in the legacy large order monitor.
+
+Writes the same synthetic trades (Binance-like prices, quantities and consecutive trade ids) with:
+  - jsonl: the previous FileStorage.save_trade, one open/append/close of <date>/<symbol>.jsonl per trade
+  - archive: FileStorage backed by TradeArchive, buffered and flushed as compressed columnar segments
+    by the background StorageWriter thread
+Reports trades per second written (until close() returns), trades per second the caller spends in
+save_trade (enqueue only), bytes on disk per trade, and trades per second replayed.
+
+Usage: python benchmarks/bench_trade_archive.py [num_trades]
+"""
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.monitor.large_orders.storage import FileStorage
+
+SYMBOLS = ["BTCUSDT", "ETHUSDT", "BNBUSDT"]
+
+
+def generate_trades(num_trades: int):
+    rng = random.Random(42)
+    start_ms = 1_700_000_000_000
+    prices = {"BTCUSDT": 37_000.0, "ETHUSDT": 2_000.0, "BNBUSDT": 250.0}
+    trades = []
+    for i in range(num_trades):
+        symbol = rng.choice(SYMBOLS)
+        prices[symbol] = round(prices[symbol] * (1 + rng.gauss(0, 0.0001)), 2)
+        quantity = round(rng.lognormvariate(-3, 1.5), 5)
+        trades.append({
+            "exchange": "binance",
+            "symbol": symbol,
+            "side": "BUY" if rng.random() < 0.5 else "SELL",
+            "order_type": "MARKET",
+            "price": prices[symbol],
+            "quantity": quantity,
+            "amount": prices[symbol] * quantity,
+            "trade_time": start_ms + i * 5,
+            "is_taker": True,
+            "trade_id": 3_000_000_000 + i,
+        })
+    return trades
+
+
+def legacy_save_trade(base_path: Path, trade: dict):
+    date_path = base_path / datetime.fromtimestamp(trade["trade_time"] / 1000).strftime("%Y-%m-%d")
+    date_path.mkdir(parents=True, exist_ok=True)
+    with open(date_path / f"{trade['symbol']}.jsonl", "a", encoding="utf-8") as f:
+        json.dump(trade, f, ensure_ascii=False)
+        f.write("\n")
+
+
+def disk_usage(base_path: Path) -> int:
+    return sum(path.stat().st_size for path in base_path.rglob("*") if path.is_file())
+
+
+def main(num_trades: int = 200_000):
+    trades = generate_trades(num_trades)
+    start_ms, end_ms = trades[0]["trade_time"], trades[-1]["trade_time"]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        jsonl_path = Path(tmp) / "jsonl"
+        started = time.perf_counter()
+        for trade in trades:
+            legacy_save_trade(jsonl_path, trade)
+        jsonl_elapsed = time.perf_counter() - started
+        jsonl_bytes = disk_usage(jsonl_path)
+
+        storage = FileStorage(str(Path(tmp) / "archive"), queue_size=num_trades)
+        started = time.perf_counter()
+        for trade in trades:
+            storage.save_trade(trade)
+        enqueue_elapsed = time.perf_counter() - started
+        storage.close()
+        assert storage.writer.get_stats()["trades_dropped"] == 0
+        archive_elapsed = time.perf_counter() - started
+        archive_bytes = disk_usage(storage.base_path)
+
+        started = time.perf_counter()
+        replayed = sum(len(storage.get_trades(symbol, start_ms, end_ms)) for symbol in SYMBOLS)
+        replay_elapsed = time.perf_counter() - started
+        assert replayed == num_trades
+
+    print(f"{num_trades} trades")
+    print(f"jsonl:   {num_trades / jsonl_elapsed:>12,.0f} trades/s  {jsonl_bytes / num_trades:6.1f} bytes/trade")
+    print(f"archive: {num_trades / archive_elapsed:>12,.0f} trades/s  {archive_bytes / num_trades:6.1f} bytes/trade")
+    print(f"enqueue: {num_trades / enqueue_elapsed:>12,.0f} trades/s  (time spent in save_trade)")
+    print(f"speedup: {jsonl_elapsed / archive_elapsed:.1f}x write, {jsonl_bytes / archive_bytes:.1f}x smaller")
+    print(f"replay:  {num_trades / replay_elapsed:>12,.0f} trades/s")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,126 @@
+"""
+Benchmark of Binance @trade message decoding on the websocket hot path.
+
+Decodes a capture of raw websocket messages (one JSON message per line) into TradeEvents:
+  - legacy: json.loads + float() + a dict-backed dataclass that keeps the decoded message as raw_data
+  - TradeDecoder with every installed backend (json, orjson, msgspec), raw_data off
+Reports messages per second, plus the memory blocks and bytes still allocated per message when the
+decoded events are retained (measured on a sample with sys.getallocatedblocks and tracemalloc).
+
+Without a capture file, 1M synthetic messages in Binance's format are generated.
+
+Usage: python benchmarks/bench_trade_decode.py [capture_file | num_messages]
+"""
+import gc
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import Dict
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.monitor.large_orders.exchanges.trade_decoder import (
+    BACKEND_JSON, BACKEND_MSGSPEC, BACKEND_ORJSON, TradeDecoder, msgspec, orjson
+)
+
+SYMBOLS = ["BTCUSDT", "ETHUSDT", "BNBUSDT", "SOLUSDT", "XRPUSDT", "DOGEUSDT"]
+SAMPLE_SIZE = 100_000
+
+
+@dataclass
+class LegacyTradeEvent:
+    exchange: str
+    symbol: str
+    side: str
+    order_type: str
+    price: float
+    quantity: float
+    amount: float
+    trade_time: int
+    is_taker: bool
+    trade_id: str
+    raw_data: Dict
+
+
+def legacy_decode(message):
+    data = json.loads(message)
+    if data.get("e") != "trade":
+        return data
+    price = float(data.get("p", 0))
+    quantity = float(data.get("q", 0))
+    return LegacyTradeEvent(
+        exchange="binance",
+        symbol=data.get("s", ""),
+        side="SELL" if data.get("m", False) else "BUY",
+        order_type="MARKET",
+        price=price,
+        quantity=quantity,
+        amount=price * quantity,
+        trade_time=data.get("T", 0),
+        is_taker=True,
+        trade_id=str(data.get("t", "")),
+        raw_data=data,
+    )
+
+
+def generate_capture(num_messages: int):
+    rng = random.Random(42)
+    start_ms = 1_700_000_000_000
+    messages = []
+    for i in range(num_messages):
+        symbol = rng.choice(SYMBOLS)
+        messages.append(json.dumps({
+            "e": "trade", "E": start_ms + i, "s": symbol, "t": 3_000_000_000 + i,
+            "p": f"{rng.uniform(0.1, 60_000):.8f}", "q": f"{rng.lognormvariate(0, 1):.8f}",
+            "T": start_ms + i, "m": rng.random() < 0.5, "M": True,
+        }, separators=(",", ":")).encode())
+    return messages
+
+
+def load_capture(path: str):
+    with open(path, "rb") as capture:
+        return [line.rstrip(b"\n") for line in capture if line.strip()]
+
+
+def measure(decode, messages):
+    start = time.perf_counter()
+    for message in messages:
+        decode(message)
+    elapsed = time.perf_counter() - start
+
+    sample = messages[:SAMPLE_SIZE]
+    gc.collect()
+    blocks_before = sys.getallocatedblocks()
+    tracemalloc.start()
+    retained = [decode(message) for message in sample]
+    retained_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    blocks = sys.getallocatedblocks() - blocks_before
+    del retained
+    return len(messages) / elapsed, blocks / len(sample), retained_bytes / len(sample)
+
+
+def main(source: str = "1000000"):
+    messages = load_capture(source) if os.path.exists(source) else generate_capture(int(source))
+
+    decoders = [("legacy json+dict", legacy_decode), ("decoder json", TradeDecoder(BACKEND_JSON).decode)]
+    if orjson is not None:
+        decoders.append(("decoder orjson", TradeDecoder(BACKEND_ORJSON).decode))
+    if msgspec is not None:
+        decoders.append(("decoder msgspec", TradeDecoder(BACKEND_MSGSPEC).decode))
+
+    print(f"{len(messages):,} messages")
+    baseline = None
+    for label, decode in decoders:
+        rate, blocks, nbytes = measure(decode, messages)
+        baseline = baseline or rate
+        print(f"{label:<17}: {rate:>10,.0f} msg/s ({rate / baseline:4.1f}x)  "
+              f"{blocks:5.1f} blocks/msg  {nbytes:6.0f} bytes/msg retained")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:2])
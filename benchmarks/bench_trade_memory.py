@@ -0,0 +1,101 @@
+"""
+Memory benchmark of the per-trade window records.
+
+Fills a window (5 minutes by default) with synthetic trades using the previous per-trade objects (the dict records of
+SlidingWindowAggregator / CumulativeMonitor and the WindowEntry dataclass of OrderAggregator) and with
+TradeRingBuffer / TradeBucketBuffer (1 second buckets), and reports the bytes retained per trade as
+measured by tracemalloc.
+
+Usage: python benchmarks/bench_trade_memory.py [num_trades]
+"""
+import os
+import random
+import sys
+import tracemalloc
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.monitor.common.trade_buffer import TradeRingBuffer, TradeBucketBuffer, side_flag
+
+
+@dataclass
+class WindowEntry:
+    """The per-trade record OrderAggregator kept before TradeRingBuffer"""
+    trade_event: object
+    usd_value: float
+    timestamp: datetime
+    buy_volume: float = 0.0
+    sell_volume: float = 0.0
+
+
+def generate_trades(num_trades: int):
+    rng = random.Random(42)
+    start_ms = 1_700_000_000_000
+    return [
+        (start_ms + i * 20, rng.lognormvariate(8, 2), 'BUY' if rng.random() < 0.5 else 'SELL')
+        for i in range(num_trades)
+    ]
+
+
+def fill_dicts(trades):
+    window = deque()
+    for ts, amount, side in trades:
+        window.append({'amount': amount, 'side': side, 'timestamp': ts, 'trade_id': ts})
+    return window
+
+
+def fill_window_entries(trades):
+    window = deque()
+    for ts, amount, side in trades:
+        window.append(WindowEntry(
+            trade_event=None,
+            usd_value=amount,
+            timestamp=datetime.fromtimestamp(ts / 1000),
+            buy_volume=amount if side == 'BUY' else 0.0,
+            sell_volume=amount if side == 'SELL' else 0.0,
+        ))
+    return window
+
+
+def fill_buffer(trades):
+    buffer = TradeRingBuffer()
+    for ts, amount, side in trades:
+        buffer.append(ts, amount, side_flag(side))
+    return buffer
+
+
+def fill_buckets(trades):
+    buffer = TradeBucketBuffer(bucket_width=1_000)
+    for ts, amount, side in trades:
+        buffer.append(ts, amount, side_flag(side))
+    return buffer
+
+
+def measure(fill, trades) -> float:
+    """Returns the bytes retained per trade by the structure built by fill()"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    window = fill(trades)
+    retained = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del window
+    return retained / len(trades)
+
+
+def main(num_trades: int = 15_000):
+    trades = generate_trades(num_trades)
+    print(f"{num_trades} trades in the window (50 trades/s, {num_trades / 50 / 60:.0f} minutes)")
+    for name, fill in (
+        ("dict records     ", fill_dicts),
+        ("WindowEntry      ", fill_window_entries),
+        ("TradeRingBuffer  ", fill_buffer),
+        ("TradeBucketBuffer", fill_buckets),
+    ):
+        print(f"{name}: {measure(fill, trades):8.1f} bytes/trade")
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:2]])
@@ -0,0 +1,82 @@
+"""
+Benchmark of PriceConverter USD conversion for stablecoin-quoted pairs.
+
+Converts the same synthetic USDT/BUSD/USDC-quoted trades three ways:
+  - parse per trade: the old convert_to_usd body (normalize + extract currencies + await on every call)
+  - convert_to_usd:  async path backed by the memoized symbol-strategy table
+  - sync fast path:  convert_to_usd_sync, a dict lookup and a multiply with no await
+Reports wall time per conversion.
+
+Usage: python benchmarks/bench_usd_conversion.py [num_conversions]
+"""
+import asyncio
+import logging
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.monitor.large_orders.src.price_converter import PriceConverter
+
+SYMBOLS = ["BTCUSDT", "ETHUSDT", "BNBUSDT", "SOLUSDT", "ETHBUSD", "ADAUSDC"]
+
+
+def generate_trades(num_conversions: int):
+    rng = random.Random(42)
+    return [
+        (rng.choice(SYMBOLS), rng.uniform(10, 50_000), rng.lognormvariate(0, 1))
+        for _ in range(num_conversions)
+    ]
+
+
+async def parse_per_trade(converter: PriceConverter, trades) -> float:
+    async def convert(symbol, price, quantity):
+        if not isinstance(symbol, str) or not isinstance(price, (int, float)) \
+                or not isinstance(quantity, (int, float)):
+            raise TypeError(symbol)
+        _, quote_coin = converter._extract_currencies(converter._normalize_symbol(symbol))
+        if converter._is_stable_coin(quote_coin):
+            return price * quantity
+        return price * quantity * converter._get_usdt_usd_rate()
+
+    start = time.perf_counter()
+    for symbol, price, quantity in trades:
+        await convert(symbol, price, quantity)
+    return time.perf_counter() - start
+
+
+async def memoized_async(converter: PriceConverter, trades) -> float:
+    start = time.perf_counter()
+    for symbol, price, quantity in trades:
+        await converter.convert_to_usd(symbol, price, quantity)
+    return time.perf_counter() - start
+
+
+def sync_fast_path(converter: PriceConverter, trades) -> float:
+    convert = converter.convert_to_usd_sync
+    start = time.perf_counter()
+    for symbol, price, quantity in trades:
+        convert(symbol, price, quantity)
+    return time.perf_counter() - start
+
+
+def main(num_conversions: int = 1_000_000):
+    logging.disable(logging.CRITICAL)
+    trades = generate_trades(num_conversions)
+    converter = PriceConverter(http_client=object())
+
+    results = [
+        ("parse per trade", asyncio.run(parse_per_trade(converter, trades))),
+        ("convert_to_usd", asyncio.run(memoized_async(converter, trades))),
+        ("sync fast path", sync_fast_path(converter, trades)),
+    ]
+    baseline = results[0][1]
+    for label, elapsed in results:
+        print(f"{label:<16}: {elapsed / num_conversions * 1e9:8.1f} ns/conversion  "
+              f"({baseline / elapsed:4.1f}x)")
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:2]])
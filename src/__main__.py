@@ -6,7 +6,9 @@ import asyncio
 from .alert_processes import CEXAlertProcess, TechnicalAlertProcess
 from .alert_processes.large_order import LargeOrderMonitorProcess
 from .alert_processes.taker_order import TakerOrderAlertProcess
+from .alert_processes.sharding import ShardedAlertProcess
 from .config import (
+    ALERT_WORKER_PROCESSES,
     LARGE_ORDER_MONITOR_ENABLED,
     LARGE_ORDER_THRESHOLD_USDT,
     LARGE_ORDER_TIME_WINDOW_MINUTES,
@@ -19,6 +21,7 @@ from .telegram import TelegramBot
 from .user_configuration import get_whitelist
 from .utils import handle_env
 from .indicators import TaapiioProcess
+from .http_client import get_http_client
 from .logger import logger
 from .setup import do_setup
 
@@ -32,14 +35,21 @@ if __name__ == "__main__":
         logger.info("Waiting for initialization ...")
         sleep(5)
 
+    # One pooled keep-alive HTTP client shared by every REST caller
+    http_client = get_http_client()
+
     taapiio_process = None
     if getenv("TAAPIIO_APIKEY"):
         # Create global Taapi.io process for the aggregator and telegram bot to sync calls
-        taapiio_process = TaapiioProcess(taapiio_apikey=getenv("TAAPIIO_APIKEY"))
+        taapiio_process = TaapiioProcess(
+            taapiio_apikey=getenv("TAAPIIO_APIKEY"), http_client=http_client
+        )
 
     # Create the Telegram bot to listen to commands and send messages
     telegram_bot = TelegramBot(
-        bot_token=getenv("TELEGRAM_BOT_TOKEN"), taapiio_process=taapiio_process
+        bot_token=getenv("TELEGRAM_BOT_TOKEN"),
+        taapiio_process=taapiio_process,
+        http_client=http_client,
     )
 
     # Run the TG bot in a daemon thread
@@ -72,19 +82,33 @@ if __name__ == "__main__":
     else:
         logger.info("Taker Order Monitor is disabled")
 
-    # Run the CEXAlertProcess in a daemon thread
-    threading.Thread(
-        target=CEXAlertProcess(telegram_bot=telegram_bot).run, daemon=True
-    ).start()
-
     if taapiio_process:
         # Run the Taapi.io process in a daemon thread
         threading.Thread(target=taapiio_process.run, daemon=True).start()
 
-        # Run the TechnicalAlertProcess in a daemon thread
+    if ALERT_WORKER_PROCESSES > 0:
+        # Shard CEX and technical alert evaluation across worker processes
         threading.Thread(
-            target=TechnicalAlertProcess(telegram_bot=telegram_bot).run, daemon=True
+            target=ShardedAlertProcess(
+                telegram_bot=telegram_bot,
+                num_workers=ALERT_WORKER_PROCESSES,
+                http_client=http_client,
+                with_technical=taapiio_process is not None,
+            ).run,
+            daemon=True,
         ).start()
+    else:
+        # Run the CEXAlertProcess in a daemon thread
+        threading.Thread(
+            target=CEXAlertProcess(telegram_bot=telegram_bot, http_client=http_client).run,
+            daemon=True,
+        ).start()
+
+        if taapiio_process:
+            # Run the TechnicalAlertProcess in a daemon thread
+            threading.Thread(
+                target=TechnicalAlertProcess(telegram_bot=telegram_bot).run, daemon=True
+            ).start()
 
     # Keep the main thread alive to listen to interrupt
     logger.info("Bot started - use Ctrl+C to stop the bot.")
@@ -1,8 +1,20 @@
+import time
 from abc import ABC, abstractmethod
+from zlib import crc32
 
 from ..telegram import TelegramBot
 
 
+def get_shard(tg_user_id: str, num_shards: int) -> int:
+    """
+    Stable shard index of a user - crc32 rather than hash() so every process agrees on the assignment
+
+    :param tg_user_id: The Telegram user ID
+    :param num_shards: The total number of shards
+    """
+    return crc32(str(tg_user_id).encode()) % num_shards
+
+
 class BaseAlertProcess(ABC):
     """
     This base class is to be served as a template for creating alert handlers.
@@ -12,8 +24,44 @@ class BaseAlertProcess(ABC):
     This functionality allows standardized creation of new alert types/assets when needed by facilitating polymorphism.
     """
 
-    def __init__(self, telegram_bot: TelegramBot):
+    def __init__(self, telegram_bot: TelegramBot, shard: tuple[int, int] = None):
+        """
+        :param telegram_bot: The Telegram bot instance (or any object exposing send_message)
+        :param shard: (shard index, number of shards) to only poll a slice of the users, None polls everyone
+        """
         self.telegram_bot = telegram_bot
+        self.shard = shard
+
+    @staticmethod
+    def fire_trigger(alert: dict, now: int = None) -> tuple[bool, bool]:
+        """
+        Applies a satisfied alert condition to the alert's trigger state.
+
+        The trigger is only touched when the alert actually fires: while the cooldown suppresses the post
+        nothing changes, so nothing needs to be persisted and the cooldown runs from the last real post.
+
+        :param alert: An alert data dictionary whose condition is satisfied (updated in place when it fires)
+        :param now: The current unix time in seconds
+
+        :return: Tuple:
+                 (Boolean) True if the alert fires - the trigger changed and the database must be updated
+                 (Boolean) True if the alert has no cooldown and must be removed
+        """
+        now = int(time.time()) if now is None else now
+        cooldown = alert.get("trigger", {}).get("cooldown_seconds")
+        last_trigger = alert.get("trigger", {}).get("last_triggered", 0)
+        if now <= last_trigger + (cooldown or 0):
+            return False, False
+
+        alert["trigger"] = {"cooldown_seconds": cooldown, "last_triggered": now}
+        return True, not cooldown
+
+    def get_shard_users(self, users: list[str]) -> list[str]:
+        """Filters the whitelist down to the users assigned to this process' shard"""
+        if self.shard is None:
+            return users
+        index, count = self.shard
+        return [user for user in users if get_shard(user, count) == index]
 
     @abstractmethod
     def poll_user_alerts(self, tg_user_id: str) -> None:
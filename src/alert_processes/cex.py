@@ -13,38 +13,69 @@ from ..utils import get_binance_price_url
 from .base import BaseAlertProcess
 from ..telegram import TelegramBot
 from ..models import BinancePriceResponse
+from ..http_client import HTTPClient, RetryPolicy, get_http_client
 
-import requests
 from ratelimit import limits, sleep_and_retry
 
 
 class CEXAlertProcess(BaseAlertProcess):
-    def __init__(self, telegram_bot: TelegramBot):
+    def __init__(
+        self,
+        telegram_bot: TelegramBot,
+        http_client: HTTPClient = None,
+        retry_policy: RetryPolicy = None,
+        shard: tuple[int, int] = None,
+    ):
         """
         :param telegram_bot: The Telegram bot instance
+        :param http_client: Shared pooled HTTP client (defaults to the process-wide client)
+        :param retry_policy: Backoff applied to symbols whose price requests fail
+        :param shard: (shard index, number of shards) when running as a sharded worker
         """
-        super().__init__(telegram_bot)
+        super().__init__(telegram_bot, shard=shard)
         self.polling = False  # Temporary variable to manage alerts
+        self.http_client = http_client if http_client is not None else get_http_client()
+        self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+
+        # Tickers fetched during the current polling cycle, shared across users: {(symbol, window): response}
+        self._cycle_tickers = {}
+        # Tickers already found stale this cycle (e.g. by the parent in sharded mode), not requested again
+        self._cycle_stale = set()
+        # Symbols whose last request failed: {symbol: {"failures": int, "retry_at": monotonic seconds}}
+        self._symbol_failures = {}
+        # What each user's last evaluation depended on: {user_id: {"version", "inputs", "wake_at"}}
+        self._user_snapshots = {}
+        # Tickers each user's configured alerts need, by alerts version: {user_id: (version, keys)}
+        self._configured_keys = {}
+        self.last_cycle_seconds = 0.0
+        self.last_cycle_skipped_users = 0
 
         self.endpoint = get_binance_price_url()
 
-    def poll_user_alerts(self, tg_user_id: str) -> None:
+    def poll_user_alerts(self, tg_user_id: str) -> bool:
         """
-        1. Load the user's configuration
-        2. poll all alerts and create posts
-        3. Remove alert conditions
-        4. Send alerts if found
+        1. Skip the user if neither their alerts nor the market data they depend on changed
+        2. Load the user's configuration
+        3. poll all alerts and create posts
+        4. Remove alert conditions
+        5. Send alerts if found
 
         :param tg_user_id: The Telegram user ID from the database
+
+        :return: False if the user was skipped without evaluating their alerts
         """
         configuration = (
             LocalUserConfiguration(tg_user_id)
             if not USE_MONGO_DB
             else MongoDBUserConfiguration(tg_user_id)
         )
+        alerts_version = configuration.alerts_version()
+        if self._is_unchanged(tg_user_id, alerts_version):
+            return False
+
         alerts_database = configuration.load_alerts()
-        config = configuration.load_config()
 
+        wake_at = float("inf")  # Earliest cooldown expiry that could change the outcome without new data
         do_update = False  # If any changes are made, update the database
         post_queue = []
         for pair in alerts_database.copy().keys():
@@ -52,26 +83,29 @@ class CEXAlertProcess(BaseAlertProcess):
             remove_queue = []
             for alert in alerts_database[pair]:
                 if alert["type"] == "s":
-                    condition, value, post_string = self.get_simple_indicator(
-                        pair, alert
-                    )
+                    try:
+                        condition, value, post_string = self.get_simple_indicator(
+                            pair, alert
+                        )
+                    except ConnectionAbortedError as exc:
+                        # The pair is stale for this cycle, its alerts are evaluated again once it recovers
+                        logger.debug(exc)
+                        continue
 
                     if condition:  # If there is a simple alert condition satisfied
-                        cooldown = alert.get("trigger", {}).get("cooldown_seconds")
-                        last_trigger = alert.get("trigger", {}).get("last_triggered", 0)
-                        if int(time.time()) > last_trigger + (cooldown or 0):
+                        fired, remove = self.fire_trigger(alert)
+                        if fired:
                             post_queue.append((post_string, pair))
-
-                        current_time = int(time.time())
-                        alert["trigger"] = {
-                            "cooldown_seconds": cooldown,
-                            "last_triggered": current_time,
-                        }
-                        if not alert["trigger"]["cooldown_seconds"]:
+                            do_update = True  # Since the alert needs to be updated in the database, signal do_update
+                        if remove:
                             # If the alert has no cooldown setting, remove it
                             remove_queue.append(alert)
-
-                        do_update = True  # Since the alert needs to be updated in the database, signal do_update
+                        elif alert.get("trigger", {}).get("cooldown_seconds"):
+                            wake_at = min(
+                                wake_at,
+                                alert["trigger"].get("last_triggered", 0)
+                                + alert["trigger"]["cooldown_seconds"],
+                            )
 
             for item in remove_queue:
                 alerts_database[pair].remove(item)
@@ -80,9 +114,20 @@ class CEXAlertProcess(BaseAlertProcess):
 
         if do_update:
             configuration.update_alerts(alerts_database)
+            alerts_version = configuration.alerts_version()
+
+        self._user_snapshots[tg_user_id] = {
+            "version": alerts_version,
+            "inputs": {
+                key: self._get_input_value(key)
+                for key in self._get_input_keys(alerts_database)
+            },
+            "wake_at": wake_at,
+        }
 
         if len(post_queue) > 0:
             self.polling = False
+            config = configuration.load_config()
             for post, pair in post_queue:
                 logger.info(post)
                 status = self.tg_alert(
@@ -97,11 +142,90 @@ class CEXAlertProcess(BaseAlertProcess):
             self.polling = True
             logger.info(f"Bot polling for next alert...")
 
+        return True
+
+    @staticmethod
+    def _get_input_keys(alerts_database: dict) -> set:
+        """
+        The (symbol, window) tickers the simple alerts of a user are evaluated against
+
+        :param alerts_database: The user's alerts as returned by load_alerts()
+        """
+        keys = set()
+        for pair, alerts in alerts_database.items():
+            symbol = pair.replace("/", "")
+            for alert in alerts:
+                if alert["type"] != "s":
+                    continue
+                keys.add((symbol, BINANCE_TIMEFRAMES[0]))
+                if alert["comparison"] == "24HRCHG":
+                    keys.add((symbol, "1d"))
+        return keys
+
+    def _get_input_value(self, key: tuple):
+        """Return the (price, % change) of a ticker for this cycle, or None if the symbol is stale"""
+        try:
+            ticker = self.get_ticker(*key)
+        except ConnectionAbortedError:
+            return None
+        return ticker.lastPrice, ticker.priceChangePercent
+
+    def _is_unchanged(self, tg_user_id: str, alerts_version) -> bool:
+        """
+        True if re-evaluating the user's alerts cannot produce a different outcome than last cycle:
+        same alerts version, no cooldown expired since, and every ticker input is identical
+        (a stale ticker counts as unchanged, since its alerts would be skipped anyway).
+        """
+        snapshot = self._user_snapshots.get(tg_user_id)
+        if (
+            snapshot is None
+            or alerts_version is None
+            or snapshot["version"] != alerts_version
+            or time.time() >= snapshot["wake_at"]
+        ):
+            return False
+
+        for key, previous in snapshot["inputs"].items():
+            current = self._get_input_value(key)
+            if current is not None and current != previous:
+                return False
+        return True
+
     @sleep_and_retry
     @limits(calls=1, period=CEX_POLLING_PERIOD)
     def poll_all_alerts(self) -> None:
-        for user in get_whitelist():
-            self.poll_user_alerts(tg_user_id=user)
+        self.poll_cycle()
+
+    def poll_cycle(self, tickers: dict = None, stale: set = None) -> None:
+        """
+        One evaluation pass over the users of this process
+
+        :param tickers: Tickers already fetched for this cycle {(symbol, window): BinancePriceResponse},
+                        as broadcast by the parent in sharded mode. Missing tickers are fetched directly.
+        :param stale: (symbol, window) keys the parent failed to fetch this cycle - treated as stale
+                      instead of being requested again by every worker
+        """
+        cycle_start = time.monotonic()
+        self._cycle_tickers = dict(tickers) if tickers else {}
+        self._cycle_stale = set(stale) if stale else set()
+        skipped = 0
+        whitelist = self.get_shard_users(get_whitelist())
+        for user in whitelist:
+            try:
+                if not self.poll_user_alerts(tg_user_id=user):
+                    skipped += 1
+            except Exception as exc:
+                self._user_snapshots.pop(user, None)
+                logger.error(
+                    f"Failed to poll CEX alerts for user {user}", exc_info=exc
+                )
+
+        # Forget users removed from the whitelist
+        for user in set(self._user_snapshots) - set(whitelist):
+            self._user_snapshots.pop(user)
+
+        self.last_cycle_skipped_users = skipped
+        self.last_cycle_seconds = time.monotonic() - cycle_start
 
     def get_simple_indicator(
         self, pair: str, alert: dict, pair_price: float = None
@@ -161,55 +285,22 @@ class CEXAlertProcess(BaseAlertProcess):
 
         return False, pair_price, ""
 
-    def get_latest_price(
-        self,
-        token_pair: str,
-        retry_delay: int = 2,
-        maximum_retries: int = 5,
-        _try: int = 1,
-    ) -> float:
+    def get_latest_price(self, token_pair: str) -> float:
         """
-        Make a request to Binance API and return the response
+        Return the latest price of the token pair from the Binance API
 
         :param token_pair: token pair without the slash (e.g. BTCUSDT)
-        :param _try: The current try for recursive retries
-        :param retry_delay: seconds delay between retries
-        :param maximum_retries: Maximum number of retries
 
         :return float: price of the token pair
         """
-        url = self.endpoint.format(token_pair, BINANCE_TIMEFRAMES[0])
-        try:
-
-            response = requests.get(url)
-            response.raise_for_status()
+        return self.get_ticker(token_pair, BINANCE_TIMEFRAMES[0]).lastPrice
 
-            return BinancePriceResponse(response.json()).lastPrice
-        except Exception as err:
-            if _try == maximum_retries:
-                raise ConnectionAbortedError(
-                    f"Binance request ({url}) failed after {_try} retries - Error: {err}"
-                )
-            else:
-                time.sleep(retry_delay)
-                return self.get_latest_price(token_pair, _try=_try + 1)
-
-    def get_pct_change(
-        self,
-        token_pair: str,
-        window: str,
-        retry_delay: int = 2,
-        maximum_retries: int = 5,
-        _try: int = 1,
-    ) -> float:
+    def get_pct_change(self, token_pair: str, window: str) -> float:
         """
-        Make a request to Binance API and return the 24 hour % change for a token pair
+        Return the % change of a token pair over the window from the Binance API
 
         :param token_pair: token pair without the slash (e.g. BTCUSDT)
         :param window: The time window for the price change (e.g. 1d for 1 day)
-        :param _try: The current try for recursive retries
-        :param retry_delay: seconds delay between retries
-        :param maximum_retries: Maxiumum number of retries
 
         :return float: The percent change of the token pair (expressed as a percentage, i.e. -3.8 for -3.8%)
         """
@@ -217,20 +308,118 @@ class CEXAlertProcess(BaseAlertProcess):
             f"Invalid window ({window}) for Binance API. "
             f"Must be one of {BINANCE_TIMEFRAMES}"
         )
+        return self.get_ticker(token_pair, window).priceChangePercent
+
+    def get_ticker(self, token_pair: str, window: str) -> BinancePriceResponse:
+        """
+        Make a single request to the Binance API, at most once per (pair, window) per polling cycle.
+
+        Failures never sleep or retry inline: the symbol is marked stale and skipped until its
+        jittered backoff (self.retry_policy) expires, so one bad pair cannot stall the other alerts.
+
+        :param token_pair: token pair without the slash (e.g. BTCUSDT)
+        :param window: The ticker window (one of BINANCE_TIMEFRAMES)
+
+        :raises ConnectionAbortedError: If the request failed or the symbol is still backing off
+        """
+        key = (token_pair, window)
+        if key in self._cycle_tickers:
+            return self._cycle_tickers[key]
+        if key in self._cycle_stale:
+            raise ConnectionAbortedError(
+                f"{token_pair} ({window}) is stale for this cycle - skipped"
+            )
+
+        failure = self._symbol_failures.get(token_pair)
+        if failure is not None and time.monotonic() < failure["retry_at"]:
+            raise ConnectionAbortedError(
+                f"{token_pair} is stale after {failure['failures']} failed requests - skipped until backoff expires"
+            )
+
         url = self.endpoint.format(token_pair, window)
         try:
-            response = requests.get(url)
+            response = self.http_client.get(url)
             response.raise_for_status()
-
-            return BinancePriceResponse(response.json()).priceChangePercent
+            ticker = BinancePriceResponse(response.json())
         except Exception as err:
-            if _try == maximum_retries:
-                raise ConnectionAbortedError(
-                    f"Binance request ({url}) failed after {_try} retries - Error: {err}"
-                )
-            else:
-                time.sleep(retry_delay)
-                return self.get_pct_change(token_pair, window, _try=_try + 1)
+            failures = failure["failures"] + 1 if failure is not None else 1
+            delay = self.retry_policy.get_delay(failures)
+            self._symbol_failures[token_pair] = {
+                "failures": failures,
+                "retry_at": time.monotonic() + delay,
+            }
+            logger.warn(
+                f"Binance request ({url}) failed ({failures} consecutive) - "
+                f"{token_pair} marked stale for {delay:.1f}s - Error: {err}"
+            )
+            raise ConnectionAbortedError(
+                f"Binance request ({url}) failed - Error: {err}"
+            ) from err
+
+        if failure is not None:
+            logger.info(f"{token_pair} recovered after {failure['failures']} failed requests")
+            self._symbol_failures.pop(token_pair, None)
+        self._cycle_tickers[key] = ticker
+        return ticker
+
+    def fetch_tickers(self, keys) -> dict:
+        """
+        Fetch a set of tickers as a fresh cycle, e.g. for the feed broadcast to sharded workers
+
+        :param keys: Iterable of (symbol, window)
+
+        :return: {(symbol, window): BinancePriceResponse} for every key that is not stale
+        """
+        self._cycle_tickers = {}
+        self._cycle_stale = set()
+        for key in keys:
+            try:
+                self.get_ticker(*key)
+            except ConnectionAbortedError:
+                continue
+        return dict(self._cycle_tickers)
+
+    def get_required_keys(self) -> set:
+        """The (symbol, window) tickers the users of this process were last evaluated against"""
+        keys = set()
+        for snapshot in self._user_snapshots.values():
+            keys.update(snapshot["inputs"])
+        return keys
+
+    def get_configured_keys(self) -> set:
+        """
+        The (symbol, window) tickers the current alerts of the users of this process depend on,
+        read from their configurations (a user's alerts are only reloaded when their version changed).
+        Unlike get_required_keys() this covers users that were never evaluated and newly added alerts.
+        """
+        keys = set()
+        users = self.get_shard_users(get_whitelist())
+        for user in users:
+            configuration = (
+                LocalUserConfiguration(user)
+                if not USE_MONGO_DB
+                else MongoDBUserConfiguration(user)
+            )
+            version = configuration.alerts_version()
+            cached = self._configured_keys.get(user)
+            if cached is None or version is None or cached[0] != version:
+                cached = (version, self._get_input_keys(configuration.load_alerts()))
+                self._configured_keys[user] = cached
+            keys.update(cached[1])
+
+        # Forget users removed from the whitelist
+        for user in set(self._configured_keys) - set(users):
+            self._configured_keys.pop(user)
+        return keys
+
+    def get_stale_symbols(self) -> list[str]:
+        """Return the symbols currently skipped because of failed requests"""
+        now = time.monotonic()
+        return [
+            symbol
+            for symbol, failure in self._symbol_failures.items()
+            if now < failure["retry_at"]
+        ]
 
     def tg_alert(self, post: str, channel_ids: list[str], pair: str = None) -> tuple:
         """
@@ -7,11 +7,18 @@ import logging
 from typing import List, Optional, Dict
 from datetime import datetime
 
-from ..monitor.large_orders.exchanges.binance import create_binance_client
+from ..monitor.large_orders.exchanges.stream_hub import TradeStreamHub, get_trade_stream_hub
 from ..monitor.large_orders.core.order_aggregator import OrderAggregator
+from ..monitor.large_orders.core.time_window_manager import TimeWindowManager
 from ..monitor.large_orders.core.threshold_engine import ThresholdEngine, ThresholdEvent
 from ..monitor.large_orders.core.alert_dispatcher import AlertDispatcher, LargeOrderAlert
 from ..monitor.large_orders.src.price_converter import PriceConverter
+from ..monitor.common.ingestion_queue import IngestionQueue
+from ..config import (
+    LARGE_ORDER_INGESTION_QUEUE_SIZE,
+    LARGE_ORDER_INGESTION_OVERFLOW_POLICY,
+    LARGE_ORDER_INGESTION_BATCH_SIZE,
+)
 from .base import BaseAlertProcess
 
 logger = logging.getLogger(__name__)
@@ -22,7 +29,7 @@ class LargeOrderMonitorProcess(BaseAlertProcess):
     大额订单监控进程
     
     整合：
-    1. 币安WebSocket客户端
+    1. 共享交易流中枢（币安WebSocket）
     2. 订单聚合器
     3. 阈值引擎
     4. 告警调度器
@@ -36,7 +43,11 @@ class LargeOrderMonitorProcess(BaseAlertProcess):
         threshold_usd: float = 2_000_000,
         window_minutes: int = 5,
         cooldown_minutes: int = 5,
-        rate_limit_per_minute: int = 12
+        rate_limit_per_minute: int = 12,
+        queue_size: int = LARGE_ORDER_INGESTION_QUEUE_SIZE,
+        overflow_policy: str = LARGE_ORDER_INGESTION_OVERFLOW_POLICY,
+        batch_size: int = LARGE_ORDER_INGESTION_BATCH_SIZE,
+        stream_hub: Optional[TradeStreamHub] = None
     ):
         super().__init__(telegram_bot)
         
@@ -48,9 +59,10 @@ class LargeOrderMonitorProcess(BaseAlertProcess):
             "BCHUSDT", "FILUSDT", "TRXUSDT", "XLMUSDT", "VETUSDT"
         ]
         
-        # 核心组件
-        self.binance_client = None
-        self.order_aggregator = OrderAggregator(
+        # 核心组件（交易流与其他监控共用一个连接）
+        self.stream_hub = stream_hub or get_trade_stream_hub()
+        # 各时间窗口共用一份交易存储，活跃窗口负责阈值检查，可在运行中切换窗口
+        self.window_manager = TimeWindowManager(
             window_minutes=window_minutes,
             threshold_usd=threshold_usd
         )
@@ -64,6 +76,11 @@ class LargeOrderMonitorProcess(BaseAlertProcess):
         )
         self.price_converter = PriceConverter()
         
+        # 有界接入队列：WebSocket读取写入，单个消费者按顺序批量处理
+        self.ingestion_queue = IngestionQueue(maxsize=queue_size, policy=overflow_policy)
+        self.batch_size = batch_size
+        self._consumer_task: Optional[asyncio.Task] = None
+        
         # 状态
         self.running = False
         self.connected = False
@@ -83,13 +100,21 @@ class LargeOrderMonitorProcess(BaseAlertProcess):
     async def initialize(self) -> None:
         """初始化组件"""
         try:
-            # 创建币安客户端
-            self.binance_client = create_binance_client(self.symbols)
+            # 停止后重新启用时换一个新的接入队列
+            if self.ingestion_queue.closed:
+                self.ingestion_queue = IngestionQueue(
+                    maxsize=self.ingestion_queue.maxsize,
+                    policy=self.ingestion_queue.policy
+                )
             
-            # 设置事件回调
-            self.binance_client.set_trade_callback(self.on_trade_received)
-            self.binance_client.set_state_callback(self.on_state_changed)
-            self.binance_client.set_error_callback(self.on_error_occurred)
+            # 订阅共享交易流（回调调度到本进程的事件循环，交易写入接入队列，由消费者协程处理）
+            self.stream_hub.subscribe(
+                "large_order",
+                self.symbols,
+                self.on_trades_received,
+                loop=asyncio.get_running_loop(),
+                state_callback=self.on_state_changed
+            )
             
             # 设置阈值引擎回调
             self.threshold_engine.set_alert_callback(self.on_threshold_breach)
@@ -97,6 +122,13 @@ class LargeOrderMonitorProcess(BaseAlertProcess):
             # 启动告警队列处理器
             await self.alert_dispatcher.start_queue_processor()
             
+            # 启动汇率后台刷新
+            self.price_converter.start_refresh()
+            
+            # 启动交易消费者
+            if self._consumer_task is None or self._consumer_task.done():
+                self._consumer_task = asyncio.create_task(self._consume_trades())
+            
             logger.info("大额订单监控进程初始化完成")
             
         except Exception as e:
@@ -113,9 +145,8 @@ class LargeOrderMonitorProcess(BaseAlertProcess):
             # 初始化组件
             await self.initialize()
             
-            # 启动币安WebSocket客户端
-            await self.binance_client.start()
-            self.connected = True
+            # 启动共享交易流（已由其他监控启动时无操作）
+            self.stream_hub.start()
             
             logger.info("大额订单监控进程运行中...")
             
@@ -147,9 +178,17 @@ class LargeOrderMonitorProcess(BaseAlertProcess):
         self.running = False
         self.connected = False
         
-        # 停止币安客户端
-        if self.binance_client:
-            await self.binance_client.stop()
+        # 注销交易流订阅（最后一个消费者注销时关闭连接）
+        self.stream_hub.unsubscribe("large_order")
+        
+        # 关闭接入队列，消费者处理完剩余交易后退出
+        self.ingestion_queue.close()
+        if self._consumer_task:
+            try:
+                await asyncio.wait_for(self._consumer_task, timeout=5)
+            except (asyncio.TimeoutError, asyncio.CancelledError):
+                self._consumer_task.cancel()
+            self._consumer_task = None
         
         # 停止告警队列处理器
         await self.alert_dispatcher.stop_queue_processor()
@@ -161,34 +200,46 @@ class LargeOrderMonitorProcess(BaseAlertProcess):
         logger.info("大额订单监控进程已停止")
     
     def on_trade_received(self, trade_event) -> None:
-        """处理接收到的交易（同步包装）"""
-        asyncio.create_task(self._on_trade_received_async(trade_event))
+        """处理接收到的交易（写入接入队列，不为每笔交易创建任务）"""
+        self.ingestion_queue.put_nowait(trade_event)
+    
+    def on_trades_received(self, trades) -> None:
+        """处理接收到的一批交易（写入接入队列）"""
+        for trade_event in trades:
+            self.ingestion_queue.put_nowait(trade_event)
     
-    async def _on_trade_received_async(self, trade_event) -> None:
-        """处理接收到的交易（异步实现）"""
+    async def _consume_trades(self) -> None:
+        """单个消费者：按入队顺序批量取出交易并处理，队列关闭且取空后退出"""
+        while True:
+            trades = await self.ingestion_queue.get_batch(self.batch_size)
+            if not trades:
+                break
+            await self._on_trades_received_async(trades)
+    
+    async def _on_trades_received_async(self, trades) -> None:
+        """处理接收到的一批交易（异步实现）"""
         try:
-            # 转换交易为USD
-            usd_value = await self.price_converter.convert_to_usd(
-                trade_event.symbol,
-                trade_event.price,
-                trade_event.quantity
-            )
+            # 每个交易对一次换算系数查询
+            usd_values = await self.price_converter.convert_trades_to_usd(trades)
+            batch = [
+                (trade.symbol, trade, usd_value)
+                for trade, usd_value in zip(trades, usd_values)
+                if usd_value > 0
+            ]
             
-            if usd_value > 0:
-                # 添加到聚合器
-                await self.order_aggregator.add_trade(
-                    trade_event.symbol,
-                    trade_event,
-                    usd_value
-                )
-                
-                self.stats["trades_processed"] += 1
+            # 整批添加到聚合器
+            breaches = await self.order_aggregator.add_trades(batch)
+            self.stats["trades_processed"] += len(batch)
+            
+            for breach in breaches:
+                await self.threshold_engine.check_aggregation(breach["symbol"], breach)
                 
         except Exception as e:
-            logger.error(f"处理交易失败: {e}", exc_info=True)
+            logger.error(f"批量处理交易失败: {e}", exc_info=True)
     
-    def on_state_changed(self, state: str) -> None:
-        """处理状态变更"""
+    def on_state_changed(self, state) -> None:
+        """处理状态变更（ConnectionState或其字符串值）"""
+        state = getattr(state, "value", state)
         logger.info(f"状态变更: {state}")
         self.connected = state == "connected"
     
@@ -240,8 +291,9 @@ class LargeOrderMonitorProcess(BaseAlertProcess):
                 "last_alert_time": self.stats["last_alert_time"].isoformat() if self.stats["last_alert_time"] else None
             },
             "components": {
-                "binance_client": self.binance_client.get_stats() if self.binance_client else {},
+                "stream_hub": self.stream_hub.get_stats(),
                 "order_aggregator": self.order_aggregator.get_stats(),
+                "ingestion_queue": self.ingestion_queue.get_stats(),
                 "threshold_engine": self.threshold_engine.get_stats(),
                 "alert_dispatcher": self.alert_dispatcher.get_stats()
             }
@@ -267,9 +319,18 @@ class LargeOrderMonitorProcess(BaseAlertProcess):
             await self.stop()
             logger.info("大额订单监控已禁用")
     
+    @property
+    def order_aggregator(self) -> OrderAggregator:
+        """活跃时间窗口的聚合器"""
+        return self.window_manager.get_active_aggregator()
+
+    def update_window(self, new_window_minutes: int) -> bool:
+        """切换时间窗口（已接收的交易立即计入新窗口）"""
+        return self.window_manager.update_window_size(new_window_minutes)
+
     def update_threshold(self, new_threshold: float) -> None:
         """更新阈值"""
-        self.order_aggregator.update_threshold(new_threshold)
+        self.window_manager.update_threshold(new_threshold)
         self.threshold_engine.update_threshold(new_threshold)
         logger.info(f"阈值已更新: ${new_threshold:,.0f}")
     
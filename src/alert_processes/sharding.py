@@ -0,0 +1,247 @@
+"""
+Optional multi-process mode for the CEX and technical alert processes.
+
+Users are sharded by a stable hash of their Telegram user ID across N worker processes, each running its
+own CEXAlertProcess and TechnicalAlertProcess slice. The parent process stays the single owner of the network
+feeds and of the Telegram bot:
+
+- Each CEX cycle the parent fetches the union of tickers the workers reported needing once, and broadcasts them
+  to every worker through a pipe, together with the keys that failed so workers skip them instead of retrying. Each technical cycle it loads the TA aggregate once and broadcasts it the same way.
+  Every pipe is fed by its own sender thread, so a slow worker only falls behind (its stale feed is replaced by
+  the newer one) instead of stalling the other shards.
+- Workers never talk to Telegram - their sends are put on a queue and delivered by a single thread in the parent.
+"""
+import multiprocessing
+import queue
+import threading
+import time
+from datetime import datetime
+
+from ..logger import logger
+from ..config import *
+from ..http_client import HTTPClient
+from ..indicators import TAAggregateClient
+from ..telegram import TelegramBot
+from .cex import CEXAlertProcess
+from .technical import TechnicalAlertProcess
+
+
+class QueuedMessageSender:
+    """
+    Stands in for the TelegramBot inside worker processes: send_message() enqueues the message
+    for the parent's delivery thread instead of calling the Telegram API.
+    """
+
+    def __init__(self, outbox):
+        """
+        :param outbox: The multiprocessing queue drained by the parent process
+        """
+        self.outbox = outbox
+
+    def send_message(self, chat_id, text, **kwargs) -> None:
+        self.outbox.put(("send", {"chat_id": chat_id, "text": text, **kwargs}))
+
+
+def _worker_main(
+    index: int, count: int, feed_conn, outbox, with_technical: bool
+) -> None:
+    """
+    Entrypoint of a worker process - evaluates its shard of users each time the parent broadcasts a feed
+
+    :param index: The shard index of this worker
+    :param count: The total number of shards
+    :param feed_conn: Receiving end of the feed pipe
+    :param outbox: Queue for messages and ticker requests back to the parent
+    :param with_technical: Whether to run the technical alerts slice
+    """
+    sender = QueuedMessageSender(outbox)
+    cex = CEXAlertProcess(telegram_bot=sender, shard=(index, count))
+    technical = (
+        TechnicalAlertProcess(telegram_bot=sender, shard=(index, count))
+        if with_technical
+        else None
+    )
+    logger.info(f"Alert worker {index + 1}/{count} started")
+
+    while True:
+        try:
+            kind, payload = feed_conn.recv()
+        except (EOFError, KeyboardInterrupt):
+            return
+
+        try:
+            if kind == "cex":
+                cex.poll_cycle(tickers=payload["tickers"], stale=payload["stale"])
+                outbox.put(("keys", index, cex.get_required_keys()))
+            elif kind == "technical" and technical is not None:
+                technical.poll_cycle(aggregate=payload)
+            elif kind == "stop":
+                return
+        except Exception as exc:
+            logger.exception(
+                f"Alert worker {index + 1}/{count} failed a {kind} cycle", exc_info=exc
+            )
+
+
+class ShardedAlertProcess:
+    """
+    Parent side of the sharded mode: owns the workers, the shared feeds and the Telegram delivery.
+
+    Replaces the CEXAlertProcess and TechnicalAlertProcess threads when ALERT_WORKER_PROCESSES > 0.
+    """
+
+    def __init__(
+        self,
+        telegram_bot: TelegramBot,
+        num_workers: int = ALERT_WORKER_PROCESSES,
+        http_client: HTTPClient = None,
+        with_technical: bool = False,
+    ):
+        """
+        :param telegram_bot: The Telegram bot that delivers every alert
+        :param num_workers: The number of worker processes (shards)
+        :param http_client: Shared pooled HTTP client for the ticker feed
+        :param with_technical: Whether to run technical alerts (requires the Taapi.io process)
+        """
+        self.telegram_bot = telegram_bot
+        self.num_workers = num_workers
+        self.with_technical = with_technical
+
+        # Fetches the ticker feed, reusing the per-symbol backoff of the CEX process
+        self.ticker_fetcher = CEXAlertProcess(
+            telegram_bot=telegram_bot, http_client=http_client
+        )
+        self.ta_agg_cli = TAAggregateClient() if with_technical else None
+
+        self._ctx = multiprocessing.get_context("spawn")
+        self._outbox = self._ctx.Queue()
+        self._workers = [None] * num_workers
+        self._feed_conns = [None] * num_workers
+        # Latest undelivered feed per worker, drained by one sender thread per worker
+        self._feed_queues = [queue.Queue(maxsize=1) for _ in range(num_workers)]
+        self._feed_senders = [None] * num_workers
+        self.feeds_replaced = 0  # Feeds dropped because the worker had not taken the previous one yet
+        self._required_keys = {}  # {worker index: set of (symbol, window)}
+
+    def _start_worker(self, index: int) -> None:
+        receiver, sender = self._ctx.Pipe(duplex=False)
+        worker = self._ctx.Process(
+            target=_worker_main,
+            args=(index, self.num_workers, receiver, self._outbox, self.with_technical),
+            name=f"alert-worker-{index}",
+            daemon=True,
+        )
+        worker.start()
+        receiver.close()
+        self._workers[index] = worker
+        self._feed_conns[index] = sender
+
+        if self._feed_senders[index] is None:
+            self._feed_senders[index] = threading.Thread(
+                target=self._send_feeds, args=(index,), name=f"alert-feed-{index}", daemon=True
+            )
+            self._feed_senders[index].start()
+
+    def _ensure_workers(self) -> None:
+        """(Re)start any worker that is not running"""
+        for index, worker in enumerate(self._workers):
+            if worker is None or not worker.is_alive():
+                if worker is not None:
+                    logger.warning(
+                        f"Alert worker {index + 1}/{self.num_workers} exited ({worker.exitcode}) - restarting"
+                    )
+                self._start_worker(index)
+
+    def _broadcast(self, kind: str, payload) -> None:
+        """Hands a feed to every worker's sender thread without blocking"""
+        for feed_queue in self._feed_queues:
+            while True:
+                try:
+                    feed_queue.put_nowait((kind, payload))
+                    break
+                except queue.Full:
+                    # The worker has not taken the previous feed yet - replace it with this newer one
+                    try:
+                        feed_queue.get_nowait()
+                        self.feeds_replaced += 1
+                    except queue.Empty:
+                        pass
+
+    def _send_feeds(self, index: int) -> None:
+        """Sender thread of one worker: a blocking pipe send here only delays this worker"""
+        while True:
+            kind, payload = self._feed_queues[index].get()
+            try:
+                self._feed_conns[index].send((kind, payload))
+            except (BrokenPipeError, OSError):
+                logger.warning(
+                    f"Could not send {kind} feed to alert worker {index + 1}/{self.num_workers}"
+                )
+
+    def _deliver_messages(self) -> None:
+        """Single delivery thread: drains the worker outbox into Telegram"""
+        while True:
+            try:
+                message = self._outbox.get()
+            except (EOFError, OSError):
+                return
+
+            if message[0] == "send":
+                try:
+                    self.telegram_bot.send_message(**message[1])
+                except Exception as exc:
+                    logger.warning(
+                        f"Failed to deliver alert to {message[1].get('chat_id')}: {exc}"
+                    )
+            elif message[0] == "keys":
+                self._required_keys[message[1]] = message[2]
+
+    def get_required_keys(self) -> set:
+        """Union of the tickers requested by all workers"""
+        keys = set()
+        for worker_keys in list(self._required_keys.values()):
+            keys.update(worker_keys)
+        return keys
+
+    def get_feed_keys(self) -> set:
+        """
+        Tickers to fetch for a CEX cycle: whatever the workers last reported. Workers only reload the alerts
+        of users whose version changed, and fetch a newly added ticker directly for the one cycle before
+        it is reported. Until every worker has reported, the users' configured alerts are read here instead,
+        so the first cycle is still served from a single fetch.
+        """
+        if len(self._required_keys) >= self.num_workers:
+            return self.get_required_keys()
+        return self.ticker_fetcher.get_configured_keys() | self.get_required_keys()
+
+    def run(self) -> None:
+        logger.warn(
+            f"{type(self).__name__} started with {self.num_workers} workers at {datetime.utcnow()} UTC+0"
+        )
+        threading.Thread(target=self._deliver_messages, daemon=True).start()
+
+        next_cex = next_technical = time.monotonic()
+        while True:
+            try:
+                self._ensure_workers()
+                now = time.monotonic()
+                if now >= next_cex:
+                    next_cex = now + CEX_POLLING_PERIOD
+                    keys = self.get_feed_keys()
+                    tickers = self.ticker_fetcher.fetch_tickers(keys)
+                    self._broadcast("cex", {"tickers": tickers, "stale": keys - set(tickers)})
+                if self.with_technical and now >= next_technical:
+                    next_technical = now + TECHNICAL_POLLING_PERIOD
+                    self._broadcast("technical", self.ta_agg_cli.load_agg())
+
+                next_due = min(next_cex, next_technical) if self.with_technical else next_cex
+                time.sleep(max(0.0, next_due - time.monotonic()))
+            except KeyboardInterrupt:
+                self._broadcast("stop", None)
+                return
+            except Exception as exc:
+                logger.critical(
+                    "An error has occurred in the sharded alert process. Trying again in 15 seconds...",
+                    exc_info=exc,
+                )
+                time.sleep(15)
@@ -12,8 +12,7 @@ from ..monitor.taker_orders.src.tracker import TakerOrderTracker
 from ..monitor.taker_orders.src.models import TakerAlert
 from ..monitor.taker_orders.core.single_monitor import SingleOrderMonitor
 from ..monitor.taker_orders.core.cumulative_monitor import CumulativeMonitor
-from ..monitor.large_orders.exchanges.binance import BinanceWebSocketClient
-from ..monitor.large_orders.src.base import TradeEvent
+from ..monitor.large_orders.exchanges.stream_hub import get_trade_stream_hub
 from ..config import (
     TAKER_ORDER_MONITOR_ENABLED,
     TAKER_ORDER_MONITORED_SYMBOLS,
@@ -69,13 +68,8 @@ class TakerOrderAlertProcess(BaseAlertProcess):
         # 设置回调
         self.tracker.set_alert_callback(self._handle_alert)
         
-        # 初始化 WebSocket 客户端（复用现有的 Binance 客户端）
-        self.ws_client = BinanceWebSocketClient(
-            symbols=TAKER_ORDER_MONITORED_SYMBOLS
-        )
-        
-        # 设置交易事件回调
-        self.ws_client.set_trade_callback(self._on_trade_event)
+        # 共享交易流中枢（与大额订单监控共用一个 Binance 连接）
+        self.stream_hub = get_trade_stream_hub()
         
         # 告警历史
         self.alert_history = []
@@ -163,9 +157,14 @@ class TakerOrderAlertProcess(BaseAlertProcess):
                 self.event_loop = asyncio.get_running_loop()
                 logger.debug("Event loop reference captured")
             
-            # 启动 WebSocket 客户端
-            await self.ws_client.start()
-            logger.info("Taker order WebSocket client started")
+            # 订阅共享交易流（批量回调在中枢线程中调用，自行调度到本事件循环）
+            self.stream_hub.subscribe(
+                "taker_order",
+                TAKER_ORDER_MONITORED_SYMBOLS,
+                self._on_trade_batch
+            )
+            self.stream_hub.start()
+            logger.info("Taker order subscribed to the shared trade stream")
             
             # 保持运行
             while True:
@@ -175,39 +174,38 @@ class TakerOrderAlertProcess(BaseAlertProcess):
         except Exception as e:
             logger.error(f"Error in async run: {e}", exc_info=True)
         finally:
-            # 停止 WebSocket 客户端
-            await self.ws_client.stop()
+            # 注销交易流订阅
+            self.stream_hub.unsubscribe("taker_order")
     
-    def _on_trade_event(self, trade: TradeEvent) -> None:
+    def _on_trade_batch(self, trades: list) -> None:
         """
-        处理交易事件（同步回调，线程安全）
+        处理一批交易事件（同步回调，线程安全，每批调度一次协程）
         
         Args:
-            trade: 交易事件
+            trades: 交易事件列表
         """
         try:
             if self.event_loop and self.event_loop.is_running():
-                # 使用线程安全的方式调度协程到事件循环
                 asyncio.run_coroutine_threadsafe(
-                    self._process_trade_async(trade),
+                    self._process_trades_async(trades),
                     self.event_loop
                 )
             else:
-                logger.warning("Event loop not running, cannot process trade")
+                logger.warning("Event loop not running, cannot process trades")
         except Exception as e:
-            logger.error(f"Error processing trade: {e}", exc_info=True)
+            logger.error(f"Error processing trades: {e}", exc_info=True)
     
-    async def _process_trade_async(self, trade: TradeEvent) -> None:
+    async def _process_trades_async(self, trades: list) -> None:
         """
-        异步处理交易事件
+        异步批量处理交易事件
         
         Args:
-            trade: 交易事件
+            trades: 交易事件列表
         """
         try:
-            await self.tracker.process_trade(trade)
+            await self.tracker.process_trades(trades)
         except Exception as e:
-            logger.error(f"Error in async trade processing: {e}", exc_info=True)
+            logger.error(f"Error in async batch processing: {e}", exc_info=True)
     
     async def _handle_alert(self, alert: TakerAlert) -> None:
         """
@@ -244,6 +242,7 @@ class TakerOrderAlertProcess(BaseAlertProcess):
         """获取统计信息"""
         return {
             "tracker_stats": self.tracker.get_stats(),
+            "stream_hub": self.stream_hub.get_stats(),
             "alert_history_size": len(self.alert_history),
             "enabled": TAKER_ORDER_MONITOR_ENABLED,
             "symbols": TAKER_ORDER_MONITORED_SYMBOLS
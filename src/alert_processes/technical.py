@@ -16,11 +16,16 @@ from ..telegram import TelegramBot
 
 
 class TechnicalAlertProcess(BaseAlertProcess):
-    def __init__(self, telegram_bot: TelegramBot):
-        super().__init__(telegram_bot)
+    def __init__(self, telegram_bot: TelegramBot, shard: tuple[int, int] = None):
+        """
+        :param telegram_bot: The Telegram bot instance
+        :param shard: (shard index, number of shards) when running as a sharded worker
+        """
+        super().__init__(telegram_bot, shard=shard)
         self.polling = False  # Temporary variable to manage alerts
         self.ta_db = TADatabaseClient().fetch_ref()
         self.ta_agg_cli = TAAggregateClient()
+        self._cycle_aggregate = None  # The TA aggregate loaded once per polling cycle
 
     def poll_user_alerts(self, tg_user_id: str) -> None:
         """
@@ -51,22 +56,14 @@ class TechnicalAlertProcess(BaseAlertProcess):
                     )
 
                     if condition:  # If there is a technical alert condition satisfied
-                        cooldown = alert.get("trigger", {}).get("cooldown_seconds")
-                        last_trigger = alert.get("trigger", {}).get("last_triggered", 0)
-                        if int(time.time()) > last_trigger + (cooldown or 0):
+                        fired, remove = self.fire_trigger(alert)
+                        if fired:
                             post_queue.append((post_string, pair))
-
-                        current_time = int(time.time())
-                        alert["trigger"] = {
-                            "cooldown_seconds": cooldown,
-                            "last_triggered": current_time,
-                        }
-                        if not alert["trigger"]["cooldown_seconds"]:
+                            do_update = True  # Since the alert needs to be updated in the database, signal do_update
+                        if remove:
                             # If the alert has no cooldown setting, remove it
                             remove_queue.append(alert)
 
-                        do_update = True  # Since the alert needs to be updated in the database, signal do_update
-
             for item in remove_queue:
                 alerts_database[pair].remove(item)
                 if len(alerts_database[pair]) == 0:
@@ -97,7 +94,18 @@ class TechnicalAlertProcess(BaseAlertProcess):
         2. Fetch all pair prices
         3. Log individual user failures
         """
-        for user in get_whitelist():
+        self.poll_cycle()
+
+    def poll_cycle(self, aggregate: dict = None) -> None:
+        """
+        One evaluation pass over the users of this process
+
+        :param aggregate: The TA aggregate broadcast by the parent in sharded mode, loaded from disk if None
+        """
+        self._cycle_aggregate = (
+            aggregate if aggregate is not None else self.ta_agg_cli.load_agg()
+        )
+        for user in self.get_shard_users(get_whitelist()):
             self.poll_user_alerts(tg_user_id=user)
 
     def get_technical_indicator(
@@ -118,7 +126,9 @@ class TechnicalAlertProcess(BaseAlertProcess):
         """
         null_output = False, 0, ""
 
-        aggregate = self.ta_agg_cli.load_agg()
+        aggregate = self._cycle_aggregate
+        if aggregate is None:
+            aggregate = self.ta_agg_cli.load_agg()
         if aggregate == {}:
             logger.warn(
                 "Attempted to load the aggregate in get_technical_indicator() but it was empty"
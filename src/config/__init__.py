@@ -8,6 +8,7 @@ TECHNICAL_POLLING_PERIOD = 5  # Delay for the technical alert handler check tech
 OUTPUT_VALUE_PRECISION = 3
 SIMPLE_INDICATORS = ["PRICE"]
 SIMPLE_INDICATOR_COMPARISONS = ["ABOVE", "BELOW", "PCTCHG", "24HRCHG"]
+ALERT_WORKER_PROCESSES = 0  # Shard CEX/technical alert evaluation across this many processes (0 = single process threads)
 
 """Telegram Handler Configuration"""
 MAX_ALERTS_PER_USER = (
@@ -21,6 +22,25 @@ BINANCE_PRICE_URL_US = (
     "https://api.binance.us/api/v3/ticker?symbol={}&windowSize={}"  # (e.x. BTCUSDT, 1d
 )
 BINANCE_TIMEFRAMES = ["1m", "5m", "15m", "30m", "1h", "2h", "4h", "12h", "1d", "7d"]
+BINANCE_WS_BASE_URL = "wss://stream.binance.com:9443"
+BINANCE_WS_STREAMS_PER_CONNECTION = 200  # Trade streams per combined-stream connection (Binance allows up to 1024)
+BINANCE_WS_STREAM_TYPE = "trade"  # "trade" (every fill) or "aggTrade" (same-price fills of one taker order merged)
+BINANCE_WS_REDUNDANT = False  # Keep a hot standby connection per shard (zero-gap failover, double bandwidth)
+BINANCE_REST_BASE_URL = "https://api.binance.com"
+BINANCE_BACKFILL_ENABLED = True  # Fetch trades missed while a websocket connection was down over REST
+BINANCE_BACKFILL_PAGE_LIMIT = 1000  # Trades per REST page (Binance maximum is 1000)
+BINANCE_BACKFILL_MAX_TRADES = 20_000  # Most recent trades backfilled per gap; older missing trades are skipped
+BINANCE_BACKFILL_WEIGHT_PER_MINUTE = 1200  # Request weight per minute for backfill (IP limit is 6000, shared with other REST calls)
+
+"""HTTP CLIENT CONFIG"""
+HTTP_CONNECT_TIMEOUT = 3.05  # Seconds allowed to establish the TCP+TLS connection
+HTTP_READ_TIMEOUT = 10  # Seconds allowed between bytes of the response before giving up
+HTTP_POOL_MAXSIZE = 10  # Keep-alive connections kept open per host
+HTTP_USER_AGENT = "Telegram-Crypto-Alerts/1.0"
+HTTP_RETRY_BASE_DELAY = 2  # Backoff (in seconds) after the first failure of a symbol, doubled per consecutive failure
+HTTP_RETRY_MAX_DELAY = 300  # Upper bound (in seconds) of the retry backoff
+CIRCUIT_BREAKER_FAILURE_THRESHOLD = 5  # Consecutive failures on a host before its circuit opens
+CIRCUIT_BREAKER_RESET_SECONDS = 30  # Seconds an open circuit waits before letting a trial request through
 
 """SWAP DATA CONFIG"""
 SWAP_POLLING_DELAY = 30  # Swap polling delay (in seconds) to handle rate limits.
@@ -32,6 +52,9 @@ LARGE_ORDER_TIME_WINDOW_MINUTES = 5  # Time window in minutes
 LARGE_ORDER_COOLDOWN_MINUTES = 10  # Cooldown period in minutes
 LARGE_ORDER_MONITORED_SYMBOLS = ["BTCUSDT", "ETHUSDT", "BNBUSDT"]  # Symbols to monitor
 LARGE_ORDER_DATA_PATH = "data/large_orders"  # Data storage path
+LARGE_ORDER_INGESTION_QUEUE_SIZE = 50_000  # Max trades buffered between the websocket reader and the pipeline
+LARGE_ORDER_INGESTION_OVERFLOW_POLICY = "coalesce"  # "drop_newest", "drop_oldest" or "coalesce" when the queue is full
+LARGE_ORDER_INGESTION_BATCH_SIZE = 500  # Max trades the pipeline takes from the queue at once
 
 """TAKER ORDER MONITOR CONFIG"""
 TAKER_ORDER_MONITOR_ENABLED = True  # Enable/disable taker order monitoring
@@ -62,6 +85,12 @@ TAKER_MAX_WINDOW_MINUTES = 1440  # 最大窗口 (24小时)
 # 性能相关
 TAKER_CLEANUP_INTERVAL_SECONDS = 300  # 清理间隔 (5分钟)
 TAKER_MAX_RETENTION_MINUTES = 1440  # 数据保留最大时间 (24小时)
+# 多窗口共享存储的预热保留时长（分钟）：切换到更宽的窗口时可立即看到这段历史。
+# 0表示只保留已注册的最大窗口，内存随最大窗口而非保留上限增长
+TAKER_WINDOW_WARMUP_MINUTES = 0
+# 窗口分桶预聚合宽度（秒），0表示逐笔精确存储。
+# 开启后内存与 窗口长度/桶宽度 成正比；窗口累计最多多算左边界所在一个桶内已过期的交易
+TAKER_WINDOW_BUCKET_SECONDS = 0
 
 # 完整配置结构
 TAKER_ORDER_CONFIG = {
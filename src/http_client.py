@@ -0,0 +1,372 @@
+"""
+Shared HTTP client layer for every REST integration of the bot (Binance, taapi.io, Telegram).
+
+Each host gets one pooled keep-alive session, so consecutive calls reuse the open TCP+TLS connection
+instead of paying the handshake again, and every request carries connect/read timeouts so that a hung
+endpoint can never freeze a polling thread.
+"""
+import asyncio
+import random
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import aiohttp
+import requests
+from requests.adapters import HTTPAdapter
+
+from .config import (
+    HTTP_CONNECT_TIMEOUT,
+    HTTP_READ_TIMEOUT,
+    HTTP_POOL_MAXSIZE,
+    HTTP_USER_AGENT,
+    HTTP_RETRY_BASE_DELAY,
+    HTTP_RETRY_MAX_DELAY,
+    CIRCUIT_BREAKER_FAILURE_THRESHOLD,
+    CIRCUIT_BREAKER_RESET_SECONDS,
+)
+
+
+class CircuitOpenError(requests.ConnectionError):
+    """Raised without touching the network when the circuit of a host is open"""
+
+
+class RetryPolicy:
+    """
+    Jittered exponential backoff.
+
+    The delay after the n-th consecutive failure is drawn uniformly from [d/2, d] where
+    d = min(max_delay, base_delay * multiplier ** (n - 1)), so callers that fail together
+    do not retry in lockstep.
+    """
+
+    def __init__(
+        self,
+        base_delay: float = HTTP_RETRY_BASE_DELAY,
+        max_delay: float = HTTP_RETRY_MAX_DELAY,
+        multiplier: float = 2.0,
+    ):
+        """
+        :param base_delay: Backoff in seconds after the first failure
+        :param max_delay: Upper bound of the backoff in seconds
+        :param multiplier: Growth factor of the backoff per consecutive failure
+        """
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.multiplier = multiplier
+
+    def get_delay(self, failures: int) -> float:
+        """
+        :param failures: Number of consecutive failures so far (>= 1)
+        :return: Seconds to wait before the next attempt
+        """
+        delay = min(
+            self.max_delay, self.base_delay * self.multiplier ** max(0, failures - 1)
+        )
+        return delay / 2 + random.uniform(0, delay / 2)
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker for a single host.
+
+    CLOSED: requests flow. After failure_threshold consecutive failures the circuit OPENS and
+    requests are refused until reset_timeout has elapsed, then a single trial request is let through
+    (HALF-OPEN); its outcome closes or re-opens the circuit.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: int = CIRCUIT_BREAKER_FAILURE_THRESHOLD,
+        reset_timeout: float = CIRCUIT_BREAKER_RESET_SECONDS,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = 0.0
+        self.state = self.CLOSED
+        self._lock = threading.Lock()
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and (
+                time.monotonic() - self.opened_at >= self.reset_timeout
+            ):
+                self.state = self.HALF_OPEN
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.state = self.CLOSED
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if (
+                self.state == self.HALF_OPEN
+                or self.failures >= self.failure_threshold
+            ):
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+
+class HTTPClient:
+    """
+    Thread-safe synchronous client that keeps one keep-alive ``requests.Session`` per host.
+
+    A single instance should be created by the entrypoint and injected into every caller
+    (alert processes, the Taapi.io process and the Telegram bot).
+    """
+
+    def __init__(
+        self,
+        connect_timeout: float = HTTP_CONNECT_TIMEOUT,
+        read_timeout: float = HTTP_READ_TIMEOUT,
+        pool_maxsize: int = HTTP_POOL_MAXSIZE,
+        user_agent: str = HTTP_USER_AGENT,
+        failure_threshold: int = CIRCUIT_BREAKER_FAILURE_THRESHOLD,
+        reset_timeout: float = CIRCUIT_BREAKER_RESET_SECONDS,
+    ):
+        """
+        :param connect_timeout: Seconds allowed to establish a connection
+        :param read_timeout: Seconds allowed between bytes of the response
+        :param pool_maxsize: Number of keep-alive connections kept open per host
+        :param user_agent: The User-Agent header sent with every request
+        :param failure_threshold: Consecutive failures on a host before its circuit opens
+        :param reset_timeout: Seconds an open circuit waits before a trial request
+        """
+        self.timeout = (connect_timeout, read_timeout)
+        self.pool_maxsize = pool_maxsize
+        self.user_agent = user_agent
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self._sessions: Dict[str, requests.Session] = {}
+        self._adapters: Dict[str, HTTPAdapter] = {}
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    @staticmethod
+    def _host_key(url: str) -> str:
+        parts = urlsplit(url)
+        return f"{parts.scheme}://{parts.netloc}"
+
+    def session_for(self, url: str) -> requests.Session:
+        """Returns the pooled session for the host of the url, creating it on first use"""
+        host = self._host_key(url)
+        session = self._sessions.get(host)
+        if session is not None:
+            return session
+
+        with self._lock:
+            if host not in self._sessions:
+                adapter = HTTPAdapter(
+                    pool_connections=1, pool_maxsize=self.pool_maxsize, max_retries=0
+                )
+                session = requests.Session()
+                session.headers["User-Agent"] = self.user_agent
+                session.mount(host, adapter)
+                self._adapters[host] = adapter
+                self._breakers[host] = CircuitBreaker(
+                    self.failure_threshold, self.reset_timeout
+                )
+                self._stats[host] = {"requests": 0, "errors": 0, "rejected": 0}
+                self._sessions[host] = session
+            return self._sessions[host]
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        Sends a request through the pooled session of the host.
+
+        The configured (connect, read) timeout is applied unless the caller overrides it.
+        Connection errors, timeouts and 5xx responses count against the circuit breaker of the host;
+        while it is open the request fails immediately with CircuitOpenError.
+        """
+        session = self.session_for(url)
+        host = self._host_key(url)
+        breaker = self._breakers[host]
+        if not breaker.allow_request():
+            self._count(host, "rejected")
+            raise CircuitOpenError(f"Circuit open for {host} - request not sent")
+
+        kwargs.setdefault("timeout", self.timeout)
+        self._count(host, "requests")
+        try:
+            response = session.request(method, url, **kwargs)
+        except requests.RequestException:
+            self._count(host, "errors")
+            breaker.record_failure()
+            raise
+
+        if response.status_code >= 500:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        return response
+
+    def _count(self, host: str, key: str) -> None:
+        """Increments a per-host counter under the client lock (requests run on many threads)"""
+        with self._lock:
+            self._stats[host][key] += 1
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def get_stats(self) -> dict:
+        """
+        Connection reuse metrics per host.
+
+        :return: {host: {requests, errors, rejected, circuit, connections_opened, connections_reused}}
+        """
+        output = {}
+        for host, adapter in list(self._adapters.items()):
+            opened = 0
+            pools = adapter.poolmanager.pools
+            for key in list(pools.keys()):
+                pool = pools.get(key)
+                if pool is not None:
+                    opened += pool.num_connections
+            with self._lock:
+                stats = self._stats[host].copy()
+            output[host] = {
+                **stats,
+                "circuit": self._breakers[host].state,
+                "connections_opened": opened,
+                "connections_reused": max(0, stats["requests"] - opened),
+            }
+        return output
+
+    def close(self) -> None:
+        """Closes every pooled session"""
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+            self._adapters.clear()
+
+
+class AsyncHTTPClient:
+    """
+    aiohttp counterpart of HTTPClient for the asyncio monitors.
+
+    aiohttp sessions are bound to the event loop that created them, so one keep-alive
+    session is kept per running loop and shared by every coroutine on that loop.
+    """
+
+    def __init__(
+        self,
+        connect_timeout: float = HTTP_CONNECT_TIMEOUT,
+        read_timeout: float = HTTP_READ_TIMEOUT,
+        pool_maxsize: int = HTTP_POOL_MAXSIZE,
+        user_agent: str = HTTP_USER_AGENT,
+    ):
+        self.timeout = aiohttp.ClientTimeout(
+            connect=connect_timeout, sock_read=read_timeout
+        )
+        self.pool_maxsize = pool_maxsize
+        self.user_agent = user_agent
+
+        self._sessions: Dict[asyncio.AbstractEventLoop, aiohttp.ClientSession] = {}
+        self._stats = {
+            "requests": 0,
+            "errors": 0,
+            "connections_opened": 0,
+            "connections_reused": 0,
+        }
+
+    def _trace_config(self) -> aiohttp.TraceConfig:
+        async def on_create(session, ctx, params):
+            self._stats["connections_opened"] += 1
+
+        async def on_reuse(session, ctx, params):
+            self._stats["connections_reused"] += 1
+
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_connection_create_end.append(on_create)
+        trace_config.on_connection_reuseconn.append(on_reuse)
+        return trace_config
+
+    def _prune_sessions(self) -> None:
+        """
+        Drops the sessions of event loops that have been closed.
+
+        Their connections died with the loop and the session can no longer be awaited to close,
+        so only the references are released.
+        """
+        for loop in [loop for loop, session in self._sessions.items() if loop.is_closed() or session.closed]:
+            session = self._sessions.pop(loop)
+            if not session.closed:
+                session.detach()
+
+    def get_session(self) -> aiohttp.ClientSession:
+        """Returns the keep-alive session of the running event loop, creating it on first use"""
+        loop = asyncio.get_running_loop()
+        session = self._sessions.get(loop)
+        if session is None or session.closed:
+            self._prune_sessions()
+            session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit_per_host=self.pool_maxsize),
+                timeout=self.timeout,
+                headers={"User-Agent": self.user_agent},
+                trace_configs=[self._trace_config()],
+            )
+            self._sessions[loop] = session
+        return session
+
+    async def get_json(self, url: str, params: Optional[dict] = None, headers: Optional[dict] = None):
+        """GETs the url and returns the decoded JSON body, raising on HTTP errors"""
+        self._stats["requests"] += 1
+        try:
+            async with self.get_session().get(url, params=params, headers=headers) as resp:
+                resp.raise_for_status()
+                return await resp.json()
+        except Exception:
+            self._stats["errors"] += 1
+            raise
+
+    def get_stats(self) -> dict:
+        return self._stats.copy()
+
+    async def close(self) -> None:
+        """Closes the session of the running event loop"""
+        session = self._sessions.pop(asyncio.get_running_loop(), None)
+        if session is not None and not session.closed:
+            await session.close()
+
+
+# Process-wide instances
+_http_client: Optional[HTTPClient] = None
+_async_http_client: Optional[AsyncHTTPClient] = None
+
+
+def get_http_client() -> HTTPClient:
+    """Returns the process-wide HTTPClient"""
+    global _http_client
+
+    if _http_client is None:
+        _http_client = HTTPClient()
+
+    return _http_client
+
+
+def get_async_http_client() -> AsyncHTTPClient:
+    """Returns the process-wide AsyncHTTPClient"""
+    global _async_http_client
+
+    if _async_http_client is None:
+        _async_http_client = AsyncHTTPClient()
+
+    return _async_http_client
@@ -29,8 +29,8 @@ from .user_configuration import (
 from .config import *
 from .logger import logger
 from .utils import get_ratelimits
+from .http_client import HTTPClient, get_http_client
 
-import requests
 from ratelimit import limits, sleep_and_retry
 
 
@@ -251,7 +251,12 @@ class TAAggregateClient:
 class TaapiioProcess:
     """Taapi.io process should be run in a separate thread to allow for sleeping between API calls"""
 
-    def __init__(self, taapiio_apikey: str, telegram_bot_token: str = None):
+    def __init__(
+        self,
+        taapiio_apikey: str,
+        telegram_bot_token: str = None,
+        http_client: HTTPClient = None,
+    ):
         self.apikey = taapiio_apikey
         self.last_call = 0  # Implemented instead of the ratelimit package solution to solve the buffer issue
         self.ta_db = (
@@ -259,6 +264,7 @@ class TaapiioProcess:
         )  # TA DB is static and can be loaded once
         self.agg_cli = TAAggregateClient()
         self.tg_bot_token = telegram_bot_token  # Can be left blank, but the process wont be able to report errors
+        self.http_client = http_client if http_client is not None else get_http_client()
 
     @sleep_and_retry
     @limits(
@@ -273,12 +279,12 @@ class TaapiioProcess:
         Free API key limit is 1 call every 15 seconds, we use +1 to add a safety buffer
         """
         if r_type == "GET":
-            return requests.get(
+            return self.http_client.get(
                 endpoint.format(api_key=self.apikey), params=params
             ).json()
         elif r_type == "POST":
             logger.info(f"Sending bulk query to API: {params}")
-            return requests.post(endpoint, json=params).json()
+            return self.http_client.post(endpoint, json=params).json()
 
     def mainloop(self):
         """
@@ -370,7 +376,7 @@ class TaapiioProcess:
             )
 
             if admin:
-                requests.post(
+                self.http_client.post(
                     url=f"https://api.telegram.org/bot{self.tg_bot_token}/sendMessage",
                     params={"chat_id": user, "text": message},
                 )
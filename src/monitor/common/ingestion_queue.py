@@ -0,0 +1,198 @@
+"""
+有界交易接入队列
+位于交易流回调和处理管道之间：生产者非阻塞写入（队列满时按溢出策略处理），单个消费者按顺序批量取出
+"""
+import asyncio
+import time
+from collections import deque
+from dataclasses import replace
+from typing import Any, Callable, Deque, Dict, Hashable, List
+
+POLICY_DROP_NEWEST = "drop_newest"
+POLICY_DROP_OLDEST = "drop_oldest"
+POLICY_COALESCE = "coalesce"
+OVERFLOW_POLICIES = (POLICY_DROP_NEWEST, POLICY_DROP_OLDEST, POLICY_COALESCE)
+
+
+def trade_key(trade) -> Hashable:
+    """合并键：同一交易对、同一方向的交易可以合并"""
+    return trade.symbol, trade.side
+
+
+def coalesce_trades(older, newer):
+    """
+    合并两笔同交易对同方向的交易
+
+    数量和金额相加，价格取成交量加权均价，时间和ID取较新的一笔。
+
+    Args:
+        older: 队列中已有的交易
+        newer: 新到达的交易
+
+    Returns:
+        合并后的交易（TradeEvent）
+    """
+    quantity = older.quantity + newer.quantity
+    amount = older.amount + newer.amount
+    return replace(
+        newer,
+        quantity=quantity,
+        amount=amount,
+        price=amount / quantity if quantity else newer.price,
+        trade_time=max(older.trade_time, newer.trade_time),
+    )
+
+
+class IngestionQueue:
+    """
+    有界接入队列
+
+    溢出策略：
+    1. drop_newest：拒绝新到达的一笔，保留已排队的数据
+    2. drop_oldest：丢弃最旧的一笔，保证最新数据
+    3. coalesce：并入队列中同交易对同方向的最近一笔（保留成交量），无可合并项时丢弃最旧的一笔
+
+    指标：当前/最大深度、写入/丢弃/合并笔数、出队时的排队延迟
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 50_000,
+        policy: str = POLICY_COALESCE,
+        key: Callable[[Any], Hashable] = trade_key,
+        merge: Callable[[Any, Any], Any] = coalesce_trades,
+    ):
+        """
+        初始化接入队列
+
+        Args:
+            maxsize: 最大排队笔数
+            policy: 溢出策略（drop_newest / drop_oldest / coalesce）
+            key: coalesce策略下的合并键函数
+            merge: coalesce策略下的合并函数 (较旧, 较新) -> 合并结果
+        """
+        if maxsize <= 0:
+            raise ValueError(f"Invalid queue size: {maxsize}")
+        if policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Invalid overflow policy: {policy}")
+
+        self.maxsize = maxsize
+        self.policy = policy
+        self._key = key
+        self._merge = merge
+
+        # 条目为 [入队时间, 数据, 合并键]，合并时原地替换数据
+        self._entries: Deque[list] = deque()
+        self._latest_by_key: Dict[Hashable, list] = {}
+        self._not_empty = asyncio.Event()
+        self._closed = False
+
+        self.stats = {
+            "enqueued": 0,
+            "dequeued": 0,
+            "dropped": 0,
+            "coalesced": 0,
+            "max_depth": 0,
+            "last_lag_seconds": 0.0,
+            "max_lag_seconds": 0.0,
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def _push(self, item) -> None:
+        """入队（调用方保证有空位）"""
+        entry = [time.monotonic(), item, None]
+        if self.policy == POLICY_COALESCE:
+            entry[2] = self._key(item)
+            self._latest_by_key[entry[2]] = entry
+        self._entries.append(entry)
+        self.stats["enqueued"] += 1
+        depth = len(self._entries)
+        if depth > self.stats["max_depth"]:
+            self.stats["max_depth"] = depth
+        self._not_empty.set()
+
+    def _pop(self) -> list:
+        """出队最旧的一个条目"""
+        entry = self._entries.popleft()
+        if entry[2] is not None and self._latest_by_key.get(entry[2]) is entry:
+            del self._latest_by_key[entry[2]]
+        if not self._entries:
+            self._not_empty.clear()
+        return entry
+
+    def put_nowait(self, item) -> bool:
+        """
+        非阻塞写入，队列满时按溢出策略处理（被丢弃的笔数计入dropped）
+
+        Returns:
+            bool: 是否作为新条目写入（合并或被拒绝时返回False）
+        """
+        if self._closed:
+            return False
+        if len(self._entries) < self.maxsize:
+            self._push(item)
+            return True
+
+        if self.policy == POLICY_COALESCE:
+            entry = self._latest_by_key.get(self._key(item))
+            if entry is not None:
+                entry[1] = self._merge(entry[1], item)
+                self.stats["coalesced"] += 1
+                return False
+
+        if self.policy == POLICY_DROP_NEWEST:
+            self.stats["dropped"] += 1
+            return False
+
+        self._pop()
+        self.stats["dropped"] += 1
+        self._push(item)
+        return True
+
+    async def get_batch(self, max_items: int = 500) -> List:
+        """
+        按入队顺序取出最多max_items条，队列为空时等待
+
+        Returns:
+            List: 数据列表；队列已关闭且为空时返回空列表
+        """
+        while not self._entries:
+            if self._closed:
+                return []
+            await self._not_empty.wait()
+
+        now = time.monotonic()
+        count = min(max_items, len(self._entries))
+        batch = []
+        oldest_enqueued_at = self._entries[0][0]
+        for _ in range(count):
+            batch.append(self._pop()[1])
+
+        lag = now - oldest_enqueued_at
+        self.stats["dequeued"] += count
+        self.stats["last_lag_seconds"] = lag
+        if lag > self.stats["max_lag_seconds"]:
+            self.stats["max_lag_seconds"] = lag
+        return batch
+
+    def close(self) -> None:
+        """关闭队列：拒绝新写入，唤醒等待中的消费者"""
+        self._closed = True
+        self._not_empty.set()
+
+    def get_stats(self) -> Dict:
+        """获取队列指标"""
+        lag = time.monotonic() - self._entries[0][0] if self._entries else 0.0
+        return {
+            **self.stats,
+            "depth": len(self._entries),
+            "maxsize": self.maxsize,
+            "policy": self.policy,
+            "oldest_lag_seconds": lag,
+        }
@@ -0,0 +1,48 @@
+"""
+轻量速率计
+计数由调用方用普通整数累加，速率只在tick()时按一次单调时钟读数结算，热路径上没有时钟调用
+"""
+import time
+from typing import Optional
+
+
+class RateMeter:
+    """
+    每秒速率计
+
+    调用方维护一个单调递增的计数（如已接收的交易笔数），在每个批次或读取统计时调用tick(total)；
+    距上次结算超过window秒时，用这段时间内的计数增量计算速率，否则返回上次结算的速率。
+    长时间未tick时，速率为整段空闲时间内的平均值
+    """
+
+    def __init__(self, window: float = 1.0):
+        """
+        初始化速率计
+
+        Args:
+            window: 结算窗口（秒）
+        """
+        self.window = window
+        self.rate = 0.0
+        self._window_start = time.monotonic()
+        self._window_total = 0
+
+    def tick(self, total: int, now: Optional[float] = None) -> float:
+        """
+        按当前计数结算速率
+
+        Args:
+            total: 单调递增的计数
+            now: 单调时钟读数，为空时读取time.monotonic()
+
+        Returns:
+            float: 最近一个完整窗口的每秒速率
+        """
+        if now is None:
+            now = time.monotonic()
+        elapsed = now - self._window_start
+        if elapsed >= self.window:
+            self.rate = (total - self._window_total) / elapsed
+            self._window_start = now
+            self._window_total = total
+        return self.rate
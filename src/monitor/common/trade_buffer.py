@@ -0,0 +1,369 @@
+"""
+紧凑的列式交易环形缓冲区 - 用于滑动窗口聚合
+逐笔模式每笔交易只占用 8(时间戳) + 8(USD金额) + 1(方向) 字节，替代每笔交易一个dict/dataclass对象；
+分桶模式按固定时间宽度预聚合，内存只与 窗口长度 / 桶宽度 成正比
+"""
+import sys
+from array import array
+from typing import Iterator, Optional, Tuple
+
+SIDE_BUY = 0
+SIDE_SELL = 1
+_SIDE_FLAGS = {"BUY": SIDE_BUY, "SELL": SIDE_SELL}
+
+
+def side_flag(side: str) -> int:
+    """
+    将方向字符串转换为缓冲区使用的uint8标记
+
+    Args:
+        side: "BUY" 或 "SELL"
+
+    Returns:
+        int: SIDE_BUY 或 SIDE_SELL
+    """
+    return _SIDE_FLAGS[side]
+
+
+class _ColumnRing:
+    """
+    列式环形存储基类
+
+    子类通过 _COLUMNS 声明 (属性名, array类型码) 列表，基类负责
+    按2倍扩容、数据量降到1/4以下时缩容，以及按方向维护滚动累计金额和笔数。
+    """
+
+    __slots__ = ("_capacity", "_min_capacity", "_head", "_size", "_totals", "_counts")
+    _COLUMNS: Tuple[Tuple[str, str], ...] = ()
+
+    def __init__(self, initial_capacity: int = 64):
+        """
+        初始化缓冲区
+
+        Args:
+            initial_capacity: 初始容量（也是缩容的下限）
+        """
+        self._min_capacity = max(1, initial_capacity)
+        self._capacity = self._min_capacity
+        self._allocate()
+        self._head = 0
+        self._size = 0
+        self._totals = [0.0, 0.0]
+        self._counts = [0, 0]
+
+    def _allocate(self) -> None:
+        """按当前容量分配空的列数组"""
+        for name, typecode in self._COLUMNS:
+            setattr(self, name, array(typecode, bytes(array(typecode).itemsize * self._capacity)))
+
+    def __len__(self) -> int:
+        """窗口内交易笔数"""
+        return self._counts[SIDE_BUY] + self._counts[SIDE_SELL]
+
+    def _resize(self, capacity: int) -> None:
+        """按时间顺序把数据复制到新容量的数组中"""
+        head, size, old_capacity = self._head, self._size, self._capacity
+        end = head + size
+        for name, typecode in self._COLUMNS:
+            old = getattr(self, name)
+            if end <= old_capacity:
+                ordered = old[head:end]
+            else:
+                ordered = old[head:] + old[:end - old_capacity]
+            ordered.frombytes(bytes(old.itemsize * (capacity - size)))
+            setattr(self, name, ordered)
+        self._capacity = capacity
+        self._head = 0
+
+    def _push_slot(self) -> int:
+        """在队尾占用一个槽位（必要时扩容），返回其下标"""
+        if self._size == self._capacity:
+            self._resize(self._capacity * 2)
+        index = (self._head + self._size) % self._capacity
+        self._size += 1
+        return index
+
+    def _after_expire(self, removed: int) -> None:
+        """过期后归零空方向的累计并按需缩容"""
+        if not removed:
+            return
+        # 方向为空时归零，避免浮点减法误差累积
+        for side in (SIDE_BUY, SIDE_SELL):
+            if self._counts[side] == 0:
+                self._totals[side] = 0.0
+        capacity = self._capacity
+        if capacity > self._min_capacity and self._size < capacity // 4:
+            self._resize(max(self._min_capacity, capacity // 2))
+
+    def total(self, side: Optional[int] = None) -> float:
+        """
+        获取窗口内累计USD金额
+
+        Args:
+            side: SIDE_BUY / SIDE_SELL，None表示两个方向合计
+        """
+        if side is None:
+            return max(0.0, self._totals[SIDE_BUY]) + max(0.0, self._totals[SIDE_SELL])
+        return max(0.0, self._totals[side])
+
+    def count(self, side: Optional[int] = None) -> int:
+        """
+        获取窗口内交易笔数
+
+        Args:
+            side: SIDE_BUY / SIDE_SELL，None表示两个方向合计
+        """
+        if side is None:
+            return len(self)
+        return self._counts[side]
+
+    def clear(self) -> None:
+        """清空缓冲区并释放多余容量"""
+        self._head = 0
+        self._size = 0
+        self._totals = [0.0, 0.0]
+        self._counts = [0, 0]
+        if self._capacity != self._min_capacity:
+            self._capacity = self._min_capacity
+            self._allocate()
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    @property
+    def nbytes(self) -> int:
+        """列数组实际占用的字节数（按容量计）"""
+        return sum(getattr(self, name).itemsize for name, _ in self._COLUMNS) * self._capacity
+
+    def memory_usage(self) -> int:
+        """缓冲区对象及其列数组占用的总字节数（含Python对象头）"""
+        return sys.getsizeof(self) + sum(sys.getsizeof(getattr(self, name)) for name, _ in self._COLUMNS)
+
+
+class TradeRingBuffer(_ColumnRing):
+    """
+    交易环形缓冲区（逐笔精确）
+
+    功能：
+    1. 以 array('d') 存储时间戳和USD金额，以 array('B') 存储方向标记
+    2. 容量不足时按2倍扩容，数据量降到1/4以下时缩容
+    3. 按方向维护滚动累计金额和笔数，查询为O(1)
+    4. 从队首过期数据并扣减累计，均摊O(1)
+
+    要求交易按时间戳（大致）递增追加，与交易所推送顺序一致。
+    """
+
+    __slots__ = ("_timestamps", "_amounts", "_sides")
+    _COLUMNS = (("_timestamps", "d"), ("_amounts", "d"), ("_sides", "B"))
+
+    def append(self, timestamp: float, amount: float, side: int) -> None:
+        """
+        追加一笔交易
+
+        Args:
+            timestamp: 交易时间戳（单位由调用方决定，与expire的cutoff一致即可）
+            amount: USD金额
+            side: SIDE_BUY 或 SIDE_SELL
+        """
+        index = self._push_slot()
+        self._timestamps[index] = timestamp
+        self._amounts[index] = amount
+        self._sides[index] = side
+        self._totals[side] += amount
+        self._counts[side] += 1
+
+    def expire(self, cutoff: float) -> int:
+        """
+        移除时间戳 <= cutoff 的交易并扣减累计
+
+        Args:
+            cutoff: 截止时间戳
+
+        Returns:
+            int: 移除的交易笔数
+        """
+        timestamps, amounts, sides = self._timestamps, self._amounts, self._sides
+        totals, counts = self._totals, self._counts
+        capacity = self._capacity
+        head, size = self._head, self._size
+        removed = 0
+
+        while size and timestamps[head] <= cutoff:
+            side = sides[head]
+            totals[side] -= amounts[head]
+            counts[side] -= 1
+            head += 1
+            if head == capacity:
+                head = 0
+            size -= 1
+            removed += 1
+
+        self._head, self._size = head, size
+        self._after_expire(removed)
+        return removed
+
+    def oldest_timestamp(self) -> Optional[float]:
+        """最早一笔交易的时间戳，为空时返回None"""
+        return self._timestamps[self._head] if self._size else None
+
+    def newest_timestamp(self) -> Optional[float]:
+        """最新一笔交易的时间戳，为空时返回None"""
+        if not self._size:
+            return None
+        return self._timestamps[(self._head + self._size - 1) % self._capacity]
+
+    def __iter__(self) -> Iterator[Tuple[float, float, int]]:
+        """按时间顺序遍历 (时间戳, USD金额, 方向)"""
+        for offset in range(self._size):
+            index = (self._head + offset) % self._capacity
+            yield self._timestamps[index], self._amounts[index], self._sides[index]
+
+
+class TradeBucketBuffer(_ColumnRing):
+    """
+    分桶预聚合缓冲区（近似）
+
+    把交易按 bucket_width 对齐到桶 [start, start + bucket_width)，每个桶只保存
+    起始时间、买/卖USD金额和买/卖笔数（共32字节）。窗口累计在新桶加入、旧桶过期时增减，
+    内存与 窗口长度 / bucket_width 成正比，而与交易笔数无关。
+
+    误差界：一个桶只有在其中所有交易都已过期（start + bucket_width <= cutoff）时才被移除，
+    因此窗口内的交易永远不会被漏算；多算的部分最多是窗口左边界所在那一个桶里已过期的交易，
+    即有效窗口长度介于 [window, window + bucket_width) 之间。金额和笔数的上偏误差均不超过单个桶的量。
+
+    迟到的乱序交易并入最新的桶，不会回填旧桶。
+    """
+
+    __slots__ = (
+        "_bucket_width", "_newest",
+        "_starts", "_buy_amounts", "_sell_amounts", "_buy_counts", "_sell_counts",
+    )
+    _COLUMNS = (
+        ("_starts", "d"), ("_buy_amounts", "d"), ("_sell_amounts", "d"),
+        ("_buy_counts", "I"), ("_sell_counts", "I"),
+    )
+
+    def __init__(self, bucket_width: float, initial_capacity: int = 64):
+        """
+        初始化分桶缓冲区
+
+        Args:
+            bucket_width: 桶宽度（与时间戳单位相同，例如毫秒时间戳传 seconds * 1000）
+            initial_capacity: 初始桶数容量（也是缩容的下限）
+        """
+        if bucket_width <= 0:
+            raise ValueError(f"Invalid bucket width: {bucket_width}")
+        self._bucket_width = bucket_width
+        self._newest = None
+        super().__init__(initial_capacity)
+
+    def append(self, timestamp: float, amount: float, side: int) -> None:
+        """
+        把一笔交易计入对应的桶
+
+        Args:
+            timestamp: 交易时间戳（与bucket_width单位相同）
+            amount: USD金额
+            side: SIDE_BUY 或 SIDE_SELL
+        """
+        start = timestamp - timestamp % self._bucket_width
+        if self._size:
+            index = (self._head + self._size - 1) % self._capacity
+            if start > self._starts[index]:
+                index = self._new_bucket(start)
+        else:
+            index = self._new_bucket(start)
+
+        if side == SIDE_BUY:
+            self._buy_amounts[index] += amount
+            self._buy_counts[index] += 1
+        else:
+            self._sell_amounts[index] += amount
+            self._sell_counts[index] += 1
+        self._totals[side] += amount
+        self._counts[side] += 1
+        if self._newest is None or timestamp > self._newest:
+            self._newest = timestamp
+
+    def _new_bucket(self, start: float) -> int:
+        """在队尾开一个空桶"""
+        index = self._push_slot()
+        self._starts[index] = start
+        self._buy_amounts[index] = 0.0
+        self._sell_amounts[index] = 0.0
+        self._buy_counts[index] = 0
+        self._sell_counts[index] = 0
+        return index
+
+    def expire(self, cutoff: float) -> int:
+        """
+        移除所有交易都已过期（桶结束时间 <= cutoff）的桶并扣减累计
+
+        Args:
+            cutoff: 截止时间戳
+
+        Returns:
+            int: 移除的交易笔数
+        """
+        starts = self._starts
+        totals, counts = self._totals, self._counts
+        capacity = self._capacity
+        head, size = self._head, self._size
+        last_start = cutoff - self._bucket_width
+        removed = 0
+
+        while size and starts[head] <= last_start:
+            totals[SIDE_BUY] -= self._buy_amounts[head]
+            totals[SIDE_SELL] -= self._sell_amounts[head]
+            counts[SIDE_BUY] -= self._buy_counts[head]
+            counts[SIDE_SELL] -= self._sell_counts[head]
+            removed += self._buy_counts[head] + self._sell_counts[head]
+            head += 1
+            if head == capacity:
+                head = 0
+            size -= 1
+
+        expired_buckets = self._size - size
+        self._head, self._size = head, size
+        if not size:
+            self._newest = None
+        self._after_expire(expired_buckets)
+        return removed
+
+    def oldest_timestamp(self) -> Optional[float]:
+        """最早一个桶的起始时间，为空时返回None"""
+        return self._starts[self._head] if self._size else None
+
+    def newest_timestamp(self) -> Optional[float]:
+        """最新一笔交易的时间戳，为空时返回None"""
+        return self._newest
+
+    def clear(self) -> None:
+        """清空缓冲区并释放多余容量"""
+        super().clear()
+        self._newest = None
+
+    @property
+    def bucket_width(self) -> float:
+        return self._bucket_width
+
+    @property
+    def buckets(self) -> int:
+        """当前保存的桶数"""
+        return self._size
+
+
+def make_trade_buffer(bucket_width: Optional[float] = None) -> _ColumnRing:
+    """
+    创建窗口缓冲区
+
+    Args:
+        bucket_width: 桶宽度（与时间戳单位相同），为空或0时逐笔精确存储
+
+    Returns:
+        TradeBucketBuffer 或 TradeRingBuffer
+    """
+    if bucket_width:
+        return TradeBucketBuffer(bucket_width)
+    return TradeRingBuffer()
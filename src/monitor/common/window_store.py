@@ -0,0 +1,279 @@
+"""
+多窗口共享交易存储
+每个交易对只保存一份按时间排序的交易，多个时间窗口各自维护游标和滚动累计，
+交易只写入一次即计入所有窗口；新增窗口只增加一个游标，且可从已保存的历史立即得到完整累计
+"""
+import sys
+from typing import Dict, List, Optional
+
+from .trade_buffer import TradeRingBuffer, SIDE_BUY, SIDE_SELL
+
+
+class _WindowCursor:
+    """单个窗口的游标：窗口内第一笔交易的序号及按方向的累计"""
+
+    __slots__ = ("width", "seq", "totals", "counts")
+
+    def __init__(self, width: float, seq: int, totals: List[float], counts: List[int]):
+        self.width = width
+        self.seq = seq
+        self.totals = totals
+        self.counts = counts
+
+
+class MultiWindowBuffer(TradeRingBuffer):
+    """
+    多窗口交易缓冲区
+
+    功能：
+    1. 继承 TradeRingBuffer 的列式存储，保存最大已注册窗口（及可选的预热时长）内的全部交易
+    2. 每个窗口一个游标，追加交易时所有窗口累计同时增加
+    3. 推进时间时各窗口游标独立前移并扣减累计，均摊O(1)
+    4. 超出保留时间的交易从队首移除，落后的游标同步前移
+    """
+
+    __slots__ = ("_retention", "_head_seq", "_windows")
+
+    def __init__(self, retention: float = 0, initial_capacity: int = 64):
+        """
+        初始化多窗口缓冲区
+
+        Args:
+            retention: 预热保留时长（与时间戳单位相同），实际保留 max(retention, 最大已注册窗口)；
+                0表示只保留最大窗口，注册更宽的窗口时只能立即看到这段历史
+            initial_capacity: 初始容量
+        """
+        super().__init__(initial_capacity)
+        self._retention = retention
+        self._head_seq = 0
+        self._windows: Dict[float, _WindowCursor] = {}
+
+    def _index(self, seq: int) -> int:
+        """序号 → 数组下标"""
+        return (self._head + seq - self._head_seq) % self._capacity
+
+    def add_window(self, width: float) -> _WindowCursor:
+        """
+        注册窗口（已存在则直接返回），用已保存的历史初始化累计
+
+        Args:
+            width: 窗口宽度（与时间戳单位相同）
+
+        Returns:
+            _WindowCursor: 窗口游标
+        """
+        cursor = self._windows.get(width)
+        if cursor is None:
+            cursor = _WindowCursor(width, self._head_seq, list(self._totals), list(self._counts))
+            self._windows[width] = cursor
+            newest = self.newest_timestamp()
+            if newest is not None:
+                self._advance_cursor(cursor, newest - width)
+        return cursor
+
+    def remove_window(self, width: float) -> None:
+        """注销窗口"""
+        self._windows.pop(width, None)
+
+    def _advance_cursor(self, cursor: _WindowCursor, cutoff: float, end_seq: Optional[int] = None) -> int:
+        """把游标移过时间戳 <= cutoff 的交易（最多到end_seq），返回移出的笔数"""
+        if end_seq is None:
+            end_seq = self._head_seq + self._size
+        timestamps, amounts, sides = self._timestamps, self._amounts, self._sides
+        totals, counts = cursor.totals, cursor.counts
+        seq = cursor.seq
+        index = self._index(seq)
+        while seq < end_seq and timestamps[index] <= cutoff:
+            side = sides[index]
+            totals[side] -= amounts[index]
+            counts[side] -= 1
+            seq += 1
+            index += 1
+            if index == self._capacity:
+                index = 0
+        removed = seq - cursor.seq
+        cursor.seq = seq
+        if removed:
+            for side in (SIDE_BUY, SIDE_SELL):
+                if counts[side] == 0:
+                    totals[side] = 0.0
+        return removed
+
+    def append(self, timestamp: float, amount: float, side: int) -> None:
+        """
+        追加一笔交易，计入所有窗口，并移除超出保留时间的交易
+
+        Args:
+            timestamp: 交易时间戳
+            amount: USD金额
+            side: SIDE_BUY 或 SIDE_SELL
+        """
+        super().append(timestamp, amount, side)
+        for cursor in self._windows.values():
+            cursor.totals[side] += amount
+            cursor.counts[side] += 1
+        self.expire(timestamp - self.retention)
+
+    def expire(self, cutoff: float) -> int:
+        """
+        移除时间戳 <= cutoff 的已保存交易，落后于此的窗口游标同步前移
+
+        Args:
+            cutoff: 截止时间戳
+
+        Returns:
+            int: 从存储中移除的交易笔数
+        """
+        if not self._size or self._timestamps[self._head] > cutoff:
+            return 0
+        end_seq = self._head_seq + self._size
+        for cursor in self._windows.values():
+            self._advance_cursor(cursor, cutoff, end_seq)
+        removed = super().expire(cutoff)
+        self._head_seq += removed
+        return removed
+
+    def advance(self, now: float) -> None:
+        """
+        推进所有窗口到当前时间
+
+        Args:
+            now: 当前时间戳
+        """
+        for cursor in self._windows.values():
+            self._advance_cursor(cursor, now - cursor.width)
+
+    def window_oldest_timestamp(self, cursor: _WindowCursor) -> Optional[float]:
+        """窗口内最早一笔交易的时间戳"""
+        if cursor.seq >= self._head_seq + self._size:
+            return None
+        return self._timestamps[self._index(cursor.seq)]
+
+    def reset_window(self, cursor: _WindowCursor) -> None:
+        """清空窗口：游标移到队尾，不影响其他窗口和存储"""
+        cursor.seq = self._head_seq + self._size
+        cursor.totals = [0.0, 0.0]
+        cursor.counts = [0, 0]
+
+    def clear(self) -> None:
+        """清空存储及所有窗口累计"""
+        self._head_seq += self._size
+        super().clear()
+        for cursor in self._windows.values():
+            self.reset_window(cursor)
+
+    @property
+    def retention(self) -> float:
+        """实际保留时长：预热保留时长与最大已注册窗口中的较大者"""
+        return max(self._retention, max(self._windows, default=0))
+
+    @property
+    def window_count(self) -> int:
+        return len(self._windows)
+
+
+class WindowView:
+    """
+    共享缓冲区上单个窗口的视图
+
+    提供与 TradeRingBuffer 相同的接口（append/expire/total/count/oldest_timestamp/...），
+    可直接放入 OrderAggregator.trade_windows 使用。
+    """
+
+    __slots__ = ("_buffer", "_cursor")
+
+    def __init__(self, buffer: MultiWindowBuffer, cursor: _WindowCursor):
+        self._buffer = buffer
+        self._cursor = cursor
+
+    def __len__(self) -> int:
+        return self._cursor.counts[SIDE_BUY] + self._cursor.counts[SIDE_SELL]
+
+    def append(self, timestamp: float, amount: float, side: int) -> None:
+        """写入共享缓冲区（计入所有窗口）"""
+        self._buffer.append(timestamp, amount, side)
+
+    def expire(self, cutoff: float) -> int:
+        """
+        推进时间到 cutoff + 窗口宽度（所有窗口一起推进）
+
+        Returns:
+            int: 本窗口移出的交易笔数
+        """
+        before = len(self)
+        self._buffer.advance(cutoff + self._cursor.width)
+        return before - len(self)
+
+    def total(self, side: Optional[int] = None) -> float:
+        """获取窗口内累计USD金额"""
+        totals = self._cursor.totals
+        if side is None:
+            return max(0.0, totals[SIDE_BUY]) + max(0.0, totals[SIDE_SELL])
+        return max(0.0, totals[side])
+
+    def count(self, side: Optional[int] = None) -> int:
+        """获取窗口内交易笔数"""
+        if side is None:
+            return len(self)
+        return self._cursor.counts[side]
+
+    def oldest_timestamp(self) -> Optional[float]:
+        """窗口内最早一笔交易的时间戳"""
+        return self._buffer.window_oldest_timestamp(self._cursor)
+
+    def newest_timestamp(self) -> Optional[float]:
+        """窗口内最新一笔交易的时间戳"""
+        return self._buffer.newest_timestamp() if len(self) else None
+
+    def clear(self) -> None:
+        """只清空本窗口"""
+        self._buffer.reset_window(self._cursor)
+
+    def memory_usage(self) -> int:
+        """视图自身占用的字节数（共享存储由 SharedTradeStore.memory_usage 统计）"""
+        return sys.getsizeof(self) + sys.getsizeof(self._cursor)
+
+
+class SharedTradeStore:
+    """
+    按交易对组织的多窗口共享交易存储
+
+    每个交易对一个 MultiWindowBuffer，所有窗口共用；窗口通过 view() 获取。
+    """
+
+    def __init__(self, retention: float = 0):
+        """
+        初始化共享存储
+
+        Args:
+            retention: 预热保留时长（与时间戳单位相同），0表示每个交易对只保留最大已注册窗口内的交易
+        """
+        self.retention = retention
+        self.buffers: Dict[str, MultiWindowBuffer] = {}
+
+    def view(self, symbol: str, width: float) -> WindowView:
+        """
+        获取交易对在指定窗口宽度上的视图（不存在则创建）
+
+        Args:
+            symbol: 交易对
+            width: 窗口宽度（与时间戳单位相同）
+        """
+        buffer = self.buffers.get(symbol)
+        if buffer is None:
+            buffer = self.buffers[symbol] = MultiWindowBuffer(self.retention)
+        return WindowView(buffer, buffer.add_window(width))
+
+    def remove_window(self, width: float) -> None:
+        """在所有交易对上注销窗口"""
+        for buffer in self.buffers.values():
+            buffer.remove_window(width)
+
+    def symbols(self) -> List[str]:
+        return list(self.buffers.keys())
+
+    def memory_usage(self) -> int:
+        """共享存储占用的总字节数"""
+        return sys.getsizeof(self.buffers) + sum(
+            buffer.memory_usage() for buffer in self.buffers.values()
+        )
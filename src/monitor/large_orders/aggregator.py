@@ -1,16 +1,19 @@
 import time
-from collections import defaultdict
-from datetime import datetime
 from threading import Lock
 from typing import Dict, List, Optional
 
 from src.logger import logger
+from ..common.trade_buffer import TradeRingBuffer, side_flag, SIDE_BUY, SIDE_SELL
 
 
 class SlidingWindowAggregator:
     """
     Aggregates trade data using a sliding time window
     Tracks trade amounts within a specified time period (default: 5 minutes)
+
+    Trades are kept in one columnar TradeRingBuffer per symbol (17 bytes per trade) with running totals
+    per side, so adding a trade, expiring old trades and querying a window total are all amortized O(1).
+    Trades are expected to arrive in (roughly) increasing trade_time order, as delivered by the exchange stream.
     """
 
     def __init__(self, window_size_seconds: int = 300):
@@ -21,7 +24,7 @@ class SlidingWindowAggregator:
             window_size_seconds: Size of the sliding window in seconds (default: 300 = 5 minutes)
         """
         self.window_size_ms = window_size_seconds * 1000  # Convert to milliseconds
-        self.data = defaultdict(list)  # {symbol: [{amount, side, timestamp, trade_id}, ...]}
+        self.data: Dict[str, TradeRingBuffer] = {}  # {symbol: buffer of (timestamp, amount, side)}
         self.lock = Lock()  # Thread-safe lock
         self.stats = {
             'trades_received': 0,
@@ -29,7 +32,7 @@ class SlidingWindowAggregator:
             'window_calculations': 0,
         }
 
-    def add_trade(self, trade: dict):
+    def add_trade(self, trade: dict) -> float:
         """
         Add a new trade to the aggregator
 
@@ -40,45 +43,55 @@ class SlidingWindowAggregator:
                 - side: 'BUY' or 'SELL'
                 - trade_time: Trade timestamp in milliseconds
                 - trade_id: Unique trade identifier
+
+        Returns:
+            Total amount of the trade's symbol and side within the window, including this trade
         """
         with self.lock:
             symbol = trade['symbol']
-            trade_record = {
-                'amount': trade['amount'],
-                'side': trade['side'],
-                'timestamp': trade['trade_time'],
-                'trade_id': trade.get('trade_id', 0)
-            }
+            side = side_flag(trade['side'])
+            buffer = self.data.get(symbol)
+            if buffer is None:
+                buffer = self.data[symbol] = TradeRingBuffer()
 
             # Add trade to the symbol's data
-            self.data[symbol].append(trade_record)
+            buffer.append(trade['trade_time'], trade['amount'], side)
             self.stats['trades_received'] += 1
 
             # Prune old trades immediately to keep memory usage low
             self._prune_old_trades(symbol, trade['trade_time'])
 
+            return buffer.total(side)
+
     def _prune_old_trades(self, symbol: str, current_time_ms: int):
         """
-        Remove trades outside the sliding window
+        Remove trades outside the sliding window (caller must hold the lock)
 
         Args:
             symbol: Trading pair to prune
             current_time_ms: Current timestamp in milliseconds
         """
-        cutoff_time = current_time_ms - self.window_size_ms
-        trades = self.data[symbol]
+        buffer = self.data.get(symbol)
+        if buffer is None:
+            return
 
-        # Count trades before pruning
-        old_count = len(trades)
-
-        # Keep only trades within the window
-        self.data[symbol] = [t for t in trades if t['timestamp'] > cutoff_time]
+        pruned = buffer.expire(current_time_ms - self.window_size_ms)
 
         # Update stats
-        pruned = old_count - len(self.data[symbol])
         if pruned > 0:
             self.stats['trades_pruned'] += pruned
 
+    def prune_all(self, current_time_ms: int):
+        """
+        Expire old trades of every symbol, e.g. from a periodic timer for symbols that went quiet
+
+        Args:
+            current_time_ms: Current timestamp in milliseconds
+        """
+        with self.lock:
+            for symbol in list(self.data):
+                self._prune_old_trades(symbol, current_time_ms)
+
     def get_5min_total(self, symbol: str, side: str, current_time_ms: int) -> float:
         """
         Get total amount for a symbol and side within the time window
@@ -100,17 +113,14 @@ class SlidingWindowAggregator:
             # Prune old trades before calculation
             self._prune_old_trades(symbol, current_time_ms)
 
-            trades = self.data[symbol]
-            cutoff_time = current_time_ms - self.window_size_ms
+            return self.data[symbol].total(side_flag(side))
 
-            # Sum all trades of the specified side within the window
-            total = sum(
-                trade['amount']
-                for trade in trades
-                if trade['side'] == side and trade['timestamp'] > cutoff_time
-            )
-
-            return total
+    def _get_latest_trade_time(self, symbol: str) -> Optional[int]:
+        """Timestamp of the newest trade of a symbol, or None (caller must hold the lock)"""
+        buffer = self.data.get(symbol)
+        if buffer is None:
+            return None
+        return buffer.newest_timestamp()
 
     def get_latest_trade_age(self, symbol: str) -> int:
         """
@@ -123,10 +133,10 @@ class SlidingWindowAggregator:
             Age in seconds, or -1 if no trades
         """
         with self.lock:
-            if symbol not in self.data or not self.data[symbol]:
+            latest_time = self._get_latest_trade_time(symbol)
+            if latest_time is None:
                 return -1
 
-            latest_time = max(trade['timestamp'] for trade in self.data[symbol])
             current_time_ms = int(time.time() * 1000)
             age_ms = current_time_ms - latest_time
 
@@ -153,37 +163,24 @@ class SlidingWindowAggregator:
                     'newest_trade_age': -1
                 }
 
-            trades = self.data[symbol]
             current_time_ms = int(time.time() * 1000)
-            cutoff_time = current_time_ms - self.window_size_ms
 
             # Calculate totals within window
-            buy_amount = sum(
-                trade['amount']
-                for trade in trades
-                if trade['side'] == 'BUY' and trade['timestamp'] > cutoff_time
-            )
-
-            sell_amount = sum(
-                trade['amount']
-                for trade in trades
-                if trade['side'] == 'SELL' and trade['timestamp'] > cutoff_time
-            )
-
-            if trades:
-                oldest_trade = min(trades, key=lambda t: t['timestamp'])
-                newest_trade = max(trades, key=lambda t: t['timestamp'])
-                oldest_age = (current_time_ms - oldest_trade['timestamp']) / 1000
-                newest_age = (current_time_ms - newest_trade['timestamp']) / 1000
+            self._prune_old_trades(symbol, current_time_ms)
+            buffer = self.data[symbol]
+
+            if len(buffer):
+                oldest_age = (current_time_ms - buffer.oldest_timestamp()) / 1000
+                newest_age = (current_time_ms - buffer.newest_timestamp()) / 1000
             else:
                 oldest_age = -1
                 newest_age = -1
 
             return {
                 'symbol': symbol,
-                'total_trades': len(trades),
-                'buy_amount': buy_amount,
-                'sell_amount': sell_amount,
+                'total_trades': len(buffer),
+                'buy_amount': buffer.total(SIDE_BUY),
+                'sell_amount': buffer.total(SIDE_SELL),
                 'oldest_trade_age': oldest_age,
                 'newest_trade_age': newest_age
             }
@@ -213,6 +210,13 @@ class SlidingWindowAggregator:
                 'window_calculations': self.stats['window_calculations']
             }
 
+    def _clear_symbol(self, symbol: str) -> bool:
+        """Drop all data of a symbol (caller must hold the lock)"""
+        if symbol not in self.data:
+            return False
+        del self.data[symbol]
+        return True
+
     def clear_symbol(self, symbol: str):
         """
         Clear all data for a specific symbol
@@ -221,8 +225,7 @@ class SlidingWindowAggregator:
             symbol: Trading pair to clear
         """
         with self.lock:
-            if symbol in self.data:
-                del self.data[symbol]
+            if self._clear_symbol(symbol):
                 logger.info(f"Cleared data for symbol: {symbol}")
 
     def clear_all(self):
@@ -243,12 +246,12 @@ class SlidingWindowAggregator:
             expired_symbols = []
 
             for symbol in self.data:
-                latest_age = self.get_latest_trade_age(symbol)
-                if latest_age > max_age_seconds:
+                latest_time = self._get_latest_trade_time(symbol)
+                if latest_time is None or (current_time_ms - latest_time) / 1000 > max_age_seconds:
                     expired_symbols.append(symbol)
 
             for symbol in expired_symbols:
-                self.clear_symbol(symbol)
+                self._clear_symbol(symbol)
                 logger.info(f"Cleaned up expired symbol: {symbol}")
 
             return len(expired_symbols)
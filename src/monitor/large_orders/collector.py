@@ -9,6 +9,8 @@ import requests
 import websocket
 from src.logger import logger
 
+from .src.error_recovery import ErrorRecoveryManager
+
 
 class BinanceOrderBookCollector:
     """
@@ -32,7 +34,17 @@ class BinanceOrderBookCollector:
         self.thread = None
         self.reconnect_interval = 5  # seconds
         self.max_reconnect_attempts = 10
-        self.reconnect_attempts = 0
+        self.reconnect_attempts = 0  # consecutive reconnects, reset once a connection opens
+
+        # The _run loop is the only place that (re)connects; the recovery manager drives its backoff
+        self.recovery = ErrorRecoveryManager(
+            exchange_name="binance",
+            max_reconnect_attempts=self.max_reconnect_attempts,
+            base_backoff=self.reconnect_interval,
+            max_backoff=60
+        )
+        self._stop_event = threading.Event()
+        self._pending_attempt: Optional[int] = None
 
         # Statistics
         self.stats = {
@@ -51,7 +63,7 @@ class BinanceOrderBookCollector:
         try:
             data = json.loads(message)
 
-            if 'stream' in data and 'data' in data['stream']:
+            if 'stream' in data and 'data' in data:
                 trade_data = data['data']
 
                 # Parse trade information
@@ -70,16 +82,17 @@ class BinanceOrderBookCollector:
         self.stats['connection_errors'] += 1
 
     def _on_close(self, ws, close_status_code, close_msg):
-        """Handle WebSocket connection close"""
+        """Handle WebSocket connection close (the _run loop reconnects once run_forever returns)"""
         logger.warning("WebSocket connection closed")
-        if self.is_running:
-            logger.info("Attempting to reconnect...")
-            self._reconnect()
 
     def _on_open(self, ws):
         """Handle WebSocket connection open"""
         logger.info(f"WebSocket connected to Binance for symbols: {', '.join(self.symbols)}")
         self.reconnect_attempts = 0
+        if self._pending_attempt is not None:
+            self.recovery.complete_reconnect_attempt(self._pending_attempt, True)
+            self._pending_attempt = None
+        self.recovery.update_state("connected")
 
     def _parse_trade(self, data: dict) -> Optional[dict]:
         """
@@ -129,19 +142,26 @@ class BinanceOrderBookCollector:
             logger.error(f"Error parsing trade data: {e}")
             return None
 
-    def _reconnect(self):
-        """Attempt to reconnect with exponential backoff"""
+    def _reconnect(self) -> bool:
+        """
+        Wait out the backoff before the next connection attempt
+
+        Returns:
+            True to reconnect, False once the collector is stopped or the attempts are exhausted
+        """
         if self.reconnect_attempts >= self.max_reconnect_attempts:
             logger.error("Max reconnection attempts reached. Stopping collector.")
-            return
+            self.is_running = False
+            self.recovery.update_state("failed")
+            return False
 
         self.reconnect_attempts += 1
-        wait_time = min(60, self.reconnect_interval * (2 ** (self.reconnect_attempts - 1)))
+        self._pending_attempt = self.recovery.start_reconnect_attempt()
+        wait_time = self.recovery.get_backoff(self.reconnect_attempts)
         logger.info(f"Reconnecting in {wait_time} seconds (attempt {self.reconnect_attempts}/{self.max_reconnect_attempts})")
-        time.sleep(wait_time)
 
-        if self.is_running:
-            self.start()
+        # Returns early when stop() sets the event
+        return not self._stop_event.wait(wait_time)
 
     def start(self):
         """Start the WebSocket collector in a separate thread"""
@@ -150,15 +170,18 @@ class BinanceOrderBookCollector:
             return
 
         self.is_running = True
+        self.reconnect_attempts = 0
+        self._stop_event.clear()
         self.thread = threading.Thread(target=self._run, daemon=True)
         self.thread.start()
         logger.info("Binance order book collector started")
 
     def _run(self):
-        """Main WebSocket connection loop"""
+        """Main WebSocket connection loop: the single owner of the connection and of reconnects"""
         websocket_url = self._get_websocket_url()
 
-        while self.is_running and self.reconnect_attempts < self.max_reconnect_attempts:
+        while self.is_running:
+            self.recovery.update_state("connecting" if self._pending_attempt is None else "reconnecting")
             try:
                 self.ws = websocket.WebSocketApp(
                     websocket_url,
@@ -171,18 +194,24 @@ class BinanceOrderBookCollector:
                 # Run with 10 second timeout
                 self.ws.run_forever(ping_interval=10, ping_timeout=5)
 
-                if self.is_running:
-                    time.sleep(self.reconnect_interval)
-
             except Exception as e:
                 logger.error(f"WebSocket connection error: {e}")
-                if self.is_running:
-                    time.sleep(self.reconnect_interval)
+
+            # A reconnect attempt that never reached _on_open failed
+            if self._pending_attempt is not None:
+                self.recovery.complete_reconnect_attempt(self._pending_attempt, False)
+                self._pending_attempt = None
+
+            if not self.is_running or not self._reconnect():
+                break
+
+        self.recovery.update_state("closed")
 
     def stop(self):
         """Stop the WebSocket collector"""
         logger.info("Stopping Binance order book collector...")
         self.is_running = False
+        self._stop_event.set()
 
         if self.ws:
             self.ws.close()
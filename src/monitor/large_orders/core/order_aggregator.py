@@ -3,27 +3,17 @@
 负责5分钟滚动窗口的订单量统计
 """
 import asyncio
-from typing import Dict, List, Optional
-from datetime import datetime, timedelta
-from dataclasses import dataclass, field
-from collections import deque
+import time
+from typing import Dict, List, Optional, Tuple
+from datetime import datetime
 import logging
 
 from ..src.base import TradeEvent
+from ...common.trade_buffer import make_trade_buffer, side_flag, SIDE_BUY, SIDE_SELL
 
 logger = logging.getLogger(__name__)
 
 
-@dataclass
-class WindowEntry:
-    """窗口条目"""
-    trade_event: TradeEvent
-    usd_value: float
-    timestamp: datetime
-    buy_volume: float = 0.0
-    sell_volume: float = 0.0
-
-
 class OrderAggregator:
     """
     订单聚合器
@@ -39,8 +29,24 @@ class OrderAggregator:
     def __init__(
         self,
         window_minutes: int = None,
-        threshold_usd: float = 2_000_000
+        threshold_usd: float = 2_000_000,
+        bucket_seconds: int = None,
+        trade_store=None
     ):
+        """
+        初始化订单聚合器
+
+        Args:
+            window_minutes: 窗口大小（分钟），为空时读取配置
+            threshold_usd: USD阈值
+            bucket_seconds: 分桶预聚合宽度（秒），0为逐笔精确存储，为空时读取配置。
+                开启后窗口累计最多多算左边界所在一个桶内已过期的交易
+            trade_store: 可选的多窗口共享存储（SharedTradeStore，毫秒时间戳）。
+                提供时窗口为共享存储上的视图，交易只保存一份、逐笔精确存储，不能与bucket_seconds同时使用
+
+        Raises:
+            ValueError: 窗口大小不合法，或同时显式指定了trade_store和非0的bucket_seconds
+        """
         # 动态加载配置
         if window_minutes is None:
             try:
@@ -57,12 +63,33 @@ class OrderAggregator:
         self.threshold_usd = threshold_usd
         self.window_ms = window_minutes * 60 * 1000  # 转换为毫秒
 
+        if trade_store is not None:
+            # 共享存储逐笔保存，分桶不适用
+            if bucket_seconds:
+                raise ValueError("bucket_seconds cannot be used with a shared trade_store")
+            bucket_seconds = 0
+        elif bucket_seconds is None:
+            try:
+                from ....config import TAKER_WINDOW_BUCKET_SECONDS
+                bucket_seconds = TAKER_WINDOW_BUCKET_SECONDS
+            except ImportError:
+                bucket_seconds = 0
+        self.bucket_seconds = bucket_seconds
+
         # 自适应配置
         self.batch_size = self._calculate_batch_size()
         self.cleanup_interval = self._get_cleanup_interval()
 
-        # 交易对 → 窗口条目队列
-        self.trade_windows: Dict[str, deque] = {}
+        # 交易对 → 列式交易缓冲区（逐笔或分桶），或共享存储上的窗口视图
+        self.trade_store = trade_store
+        self.trade_windows: Dict = {}
+
+        # 交易对 → 已接收的最新交易所成交时间（毫秒），作为窗口的当前时间
+        self.latest_trade_time: Dict[str, float] = {}
+        if trade_store is not None:
+            # 共享存储中已有的历史立即计入本窗口，无需预热
+            for symbol in trade_store.symbols():
+                self.trade_windows[symbol] = trade_store.view(symbol, self.window_ms)
 
         # 统计信息
         self.stats = {
@@ -72,6 +99,7 @@ class OrderAggregator:
             "cleanup_count": 0,
             "total_trades": 0,
             "window_calculations": 0,
+            "late_trades_dropped": 0,
             "batch_processing_time": 0
         }
 
@@ -108,46 +136,107 @@ class OrderAggregator:
         else:
             return 60   # 1分钟
     
-    async def add_trade(self, symbol: str, trade_event: TradeEvent, usd_value: float) -> None:
+    async def add_trade(self, symbol: str, trade_event: TradeEvent, usd_value: float) -> Optional[Dict]:
         """
         添加交易到聚合器
         
+        窗口按交易所成交时间（trade_event.trade_time）推进，回放或延迟到达的数据同样按成交时间归窗；
+        成交时间早于当前窗口左边界的迟到交易直接丢弃。
+        
         Args:
             symbol: 交易对
             trade_event: 交易事件
             usd_value: USD价值
+            
+        Returns:
+            Dict: 突破阈值时返回聚合结果（可直接传给 ThresholdEngine.check_aggregation），否则None
         """
         try:
-            # 创建窗口条目
-            window_entry = WindowEntry(
-                trade_event=trade_event,
-                usd_value=usd_value,
-                timestamp=datetime.now(),
-                buy_volume=usd_value if trade_event.side == "BUY" else 0.0,
-                sell_volume=usd_value if trade_event.side == "SELL" else 0.0
-            )
-            
-            # 初始化交易对窗口
-            if symbol not in self.trade_windows:
-                self.trade_windows[symbol] = deque()
-            
-            # 添加到窗口
-            self.trade_windows[symbol].append(window_entry)
+            if not self._append_trade(symbol, trade_event, usd_value):
+                return None
             
             # 清理过期数据
             await self._cleanup_window(symbol)
             
             # 检查阈值
-            await self._check_threshold(symbol)
-            
-            self.stats["trades_processed"] += 1
+            return await self._check_threshold(symbol)
             
         except Exception as e:
             logger.error(f"添加交易失败: {e}", exc_info=True)
+            return None
     
-    async def _cleanup_window(self, symbol: str) -> None:
-        """清理过期数据"""
+    async def add_trades(self, batch: List[Tuple[str, TradeEvent, float]]) -> List[Dict]:
+        """
+        批量添加交易：逐笔写入窗口，每个交易对只清理和检查一次阈值
+        
+        Args:
+            batch: (交易对, 交易事件, USD价值) 列表，按到达顺序
+            
+        Returns:
+            List[Dict]: 本批次中突破阈值的交易对的聚合结果
+        """
+        touched = {}
+        for symbol, trade_event, usd_value in batch:
+            try:
+                if self._append_trade(symbol, trade_event, usd_value):
+                    touched[symbol] = None
+            except Exception as e:
+                logger.error(f"添加交易失败: {e}", exc_info=True)
+        
+        breaches = []
+        for symbol in touched:
+            await self._cleanup_window(symbol)
+            breach = await self._check_threshold(symbol)
+            if breach:
+                breaches.append(breach)
+        return breaches
+    
+    def _append_trade(self, symbol: str, trade_event: TradeEvent, usd_value: float) -> bool:
+        """
+        把一笔交易写入交易对窗口
+        
+        Returns:
+            bool: 是否写入（迟到到窗口之外的交易返回False）
+        """
+        trade_time = getattr(trade_event, "trade_time", None)
+        if trade_time is None:
+            trade_time = time.time() * 1000
+        
+        latest = self.latest_trade_time.get(symbol)
+        if latest is None or trade_time > latest:
+            self.latest_trade_time[symbol] = trade_time
+        elif trade_time <= latest - self.window_ms:
+            self.stats["late_trades_dropped"] += 1
+            return False
+        
+        # 初始化交易对窗口
+        window = self.trade_windows.get(symbol)
+        if window is None:
+            if self.trade_store is not None:
+                window = self.trade_store.view(symbol, self.window_ms)
+            else:
+                window = make_trade_buffer(self.bucket_seconds * 1000)
+            self.trade_windows[symbol] = window
+        
+        # 添加到窗口
+        window.append(trade_time, usd_value, side_flag(trade_event.side))
+        self.stats["trades_processed"] += 1
+        return True
+    
+    async def _cleanup_window(self, symbol: str, current_time_ms: Optional[float] = None) -> None:
+        """
+        清理过期数据
+        
+        Args:
+            symbol: 交易对
+            current_time_ms: 当前时间（毫秒），默认使用该交易对最新的成交时间
+        """
         try:
+            if current_time_ms is None:
+                current_time_ms = self.latest_trade_time.get(symbol)
+                if current_time_ms is None:
+                    return
+            
             if symbol not in self.trade_windows:
                 return
             
@@ -155,14 +244,8 @@ class OrderAggregator:
             if not window:
                 return
             
-            current_time = datetime.now()
-            cutoff_time = current_time - timedelta(minutes=self.window_minutes)
-            
             # 移除过期条目
-            removed_count = 0
-            while window and window[0].timestamp < cutoff_time:
-                window.popleft()
-                removed_count += 1
+            removed_count = window.expire(current_time_ms - self.window_ms)
             
             if removed_count > 0:
                 self.stats["cleanup_count"] += removed_count
@@ -186,10 +269,10 @@ class OrderAggregator:
             if not window:
                 return None
             
-            # 计算当前窗口总交易量
-            total_volume = sum(entry.usd_value for entry in window)
-            buy_volume = sum(entry.buy_volume for entry in window)
-            sell_volume = sum(entry.sell_volume for entry in window)
+            # 当前窗口总交易量（缓冲区维护的滚动累计）
+            buy_volume = window.total(SIDE_BUY)
+            sell_volume = window.total(SIDE_SELL)
+            total_volume = buy_volume + sell_volume
             
             # 检查是否突破阈值
             if total_volume >= self.threshold_usd:
@@ -201,9 +284,10 @@ class OrderAggregator:
                 else:
                     direction = "双向"
                 
-                # 创建告警信息
+                # 创建告警信息（字段与 ThresholdEngine.check_aggregation 的输入一致）
                 alert_info = {
                     "symbol": symbol,
+                    "threshold_breach": True,
                     "direction": direction,
                     "total_volume": total_volume,
                     "buy_volume": buy_volume,
@@ -211,7 +295,7 @@ class OrderAggregator:
                     "trade_count": len(window),
                     "window_minutes": self.window_minutes,
                     "threshold_usd": self.threshold_usd,
-                    "timestamp": datetime.now()
+                    "timestamp": datetime.fromtimestamp(self.latest_trade_time[symbol] / 1000)
                 }
                 
                 self.stats["alerts_triggered"] += 1
@@ -272,20 +356,17 @@ class OrderAggregator:
                 }
             
             # 计算总交易量
-            total_volume = sum(entry.usd_value for entry in window)
-            buy_volume = sum(entry.buy_volume for entry in window)
-            sell_volume = sum(entry.sell_volume for entry in window)
+            buy_volume = window.total(SIDE_BUY)
+            sell_volume = window.total(SIDE_SELL)
+            total_volume = buy_volume + sell_volume
             
             # 获取时间范围
-            oldest_trade = window[0].timestamp if window else None
-            newest_trade = window[-1].timestamp if window else None
+            oldest_trade = datetime.fromtimestamp(window.oldest_timestamp() / 1000)
+            newest_trade = datetime.fromtimestamp(window.newest_timestamp() / 1000)
             
             # 计算窗口覆盖率
-            if window:
-                time_span = (newest_trade - oldest_trade).total_seconds()
-                coverage = min(100.0, (time_span / (self.window_minutes * 60)) * 100)
-            else:
-                coverage = 0.0
+            time_span = (newest_trade - oldest_trade).total_seconds()
+            coverage = min(100.0, (time_span / (self.window_minutes * 60)) * 100)
             
             return {
                 "symbol": symbol,
@@ -295,7 +376,7 @@ class OrderAggregator:
                 "sell_volume": sell_volume,
                 "oldest_trade": oldest_trade,
                 "newest_trade": newest_trade,
-                "time_span_seconds": time_span if window else 0,
+                "time_span_seconds": time_span,
                 "window_coverage": coverage,
                 "window_minutes": self.window_minutes,
                 "threshold_usd": self.threshold_usd,
@@ -332,11 +413,16 @@ class OrderAggregator:
             "total_trades_in_windows": sum(len(window) for window in self.trade_windows.values())
         }
     
-    async def cleanup_all(self) -> None:
-        """清理所有窗口"""
+    async def cleanup_all(self, current_time_ms: Optional[float] = None) -> None:
+        """
+        清理所有窗口
+        
+        Args:
+            current_time_ms: 当前时间（毫秒），默认使用各交易对最新的成交时间
+        """
         try:
             for symbol in self.trade_windows.keys():
-                await self._cleanup_window(symbol)
+                await self._cleanup_window(symbol, current_time_ms)
             
             logger.info(f"清理所有窗口，共 {len(self.trade_windows)} 个交易对")
             
@@ -1,9 +1,12 @@
 """
 时间窗口管理器
 负责管理多时间窗口的吃单监控
+所有窗口共用一份按交易对组织的交易存储，交易只写入一次即计入所有窗口
 """
-from typing import Dict, Optional
+import sys
+from typing import Dict, List, Optional
 from .order_aggregator import OrderAggregator
+from ...common.window_store import SharedTradeStore
 import logging
 
 logger = logging.getLogger(__name__)
@@ -15,9 +18,29 @@ class TimeWindowManager:
     负责管理多时间窗口的吃单监控
     """
 
-    def __init__(self):
+    def __init__(
+        self,
+        window_minutes: Optional[int] = None,
+        threshold_usd: float = 2_000_000,
+        warmup_minutes: Optional[int] = None
+    ):
+        """
+        初始化时间窗口管理器
+
+        Args:
+            window_minutes: 初始活跃窗口（分钟），为空时读取配置
+            threshold_usd: 各窗口聚合器的USD阈值
+            warmup_minutes: 共享存储的预热保留时长（分钟），为空时读取配置；
+                0表示只保留已注册的最大窗口内的交易
+        """
+        self.threshold_usd = threshold_usd
+        if warmup_minutes is None:
+            warmup_minutes = self._load_warmup_minutes()
+        # 共享交易存储：最大已注册窗口（及预热时长）内的交易对所有窗口可见
+        self.trade_store = SharedTradeStore(warmup_minutes * 60 * 1000)
         self.windows: Dict[int, OrderAggregator] = {}
-        self.active_window = self._load_configured_window()
+        self.active_window = window_minutes or self._load_configured_window()
+        self._warn_if_bucketed()
         self._initialize_windows()
 
     def _load_configured_window(self) -> int:
@@ -28,11 +51,36 @@ class TimeWindowManager:
         except ImportError:
             return 60  # 默认1小时
 
+    def _load_warmup_minutes(self) -> int:
+        """加载共享存储的预热保留时长"""
+        try:
+            from ....config import TAKER_WINDOW_WARMUP_MINUTES
+            return TAKER_WINDOW_WARMUP_MINUTES
+        except ImportError:
+            return 0
+
+    def _warn_if_bucketed(self) -> None:
+        """共享存储逐笔保存，全局分桶设置对其不生效"""
+        try:
+            from ....config import TAKER_WINDOW_BUCKET_SECONDS
+        except ImportError:
+            return
+        if TAKER_WINDOW_BUCKET_SECONDS:
+            logger.warning("TAKER_WINDOW_BUCKET_SECONDS 不适用于多窗口共享存储，各窗口按逐笔精确存储")
+
+    def _create_aggregator(self, window_minutes: int) -> OrderAggregator:
+        """创建使用共享交易存储的聚合器"""
+        return OrderAggregator(
+            window_minutes=window_minutes,
+            threshold_usd=self.threshold_usd,
+            trade_store=self.trade_store
+        )
+
     def _initialize_windows(self):
         """初始化默认窗口"""
-        default_window = self._load_configured_window()
+        default_window = self.active_window
         if default_window not in self.windows:
-            self.windows[default_window] = OrderAggregator(window_minutes=default_window)
+            self.windows[default_window] = self._create_aggregator(default_window)
             logger.info(f"初始化时间窗口管理器，当前窗口：{default_window}分钟")
 
     def update_window_size(self, new_window_minutes: int) -> bool:
@@ -46,13 +94,14 @@ class TimeWindowManager:
 
         # 创建新的聚合器
         if new_window_minutes not in self.windows:
-            self.windows[new_window_minutes] = OrderAggregator(window_minutes=new_window_minutes)
+            self.windows[new_window_minutes] = self._create_aggregator(new_window_minutes)
             logger.info(f"创建新窗口：{new_window_minutes}分钟")
 
         # 清理旧的窗口 (如果不再需要)
         if old_window not in [5, 15, 60]:  # 保留常用窗口
             if old_window in self.windows:
                 del self.windows[old_window]
+                self.trade_store.remove_window(old_window * 60 * 1000)
                 logger.info(f"清理旧窗口：{old_window}分钟")
 
         logger.info(f"窗口更新完成：{old_window} → {new_window_minutes}分钟")
@@ -70,9 +119,42 @@ class TimeWindowManager:
         """获取当前活跃的聚合器"""
         if self.active_window not in self.windows:
             # 如果活跃窗口不存在，重新创建
-            self.windows[self.active_window] = OrderAggregator(window_minutes=self.active_window)
+            self.windows[self.active_window] = self._create_aggregator(self.active_window)
         return self.windows[self.active_window]
 
+    async def add_trade(self, symbol: str, trade_event, usd_value: float) -> None:
+        """
+        添加交易：写入共享存储一次，所有窗口同时计入，由活跃窗口检查阈值
+
+        Args:
+            symbol: 交易对
+            trade_event: 交易事件
+            usd_value: USD价值
+        """
+        await self.get_active_aggregator().add_trade(symbol, trade_event, usd_value)
+
+    async def add_trades(self, trades) -> List[Dict]:
+        """
+        批量添加交易：写入共享存储一次，由活跃窗口检查阈值
+
+        Args:
+            trades: (交易对, 交易事件, USD价值) 列表
+
+        Returns:
+            List[Dict]: 活跃窗口的阈值突破结果
+        """
+        return await self.get_active_aggregator().add_trades(trades)
+
+    async def reset_window(self, symbol: str) -> None:
+        """重置活跃窗口中某交易对的累计（不影响其他窗口和共享存储）"""
+        await self.get_active_aggregator().reset_window(symbol)
+
+    def update_threshold(self, new_threshold: float) -> None:
+        """更新所有窗口的阈值"""
+        self.threshold_usd = new_threshold
+        for aggregator in self.windows.values():
+            aggregator.update_threshold(new_threshold)
+
     def get_window_summary(self) -> Dict:
         """获取当前窗口摘要"""
         aggregator = self.get_active_aggregator()
@@ -88,12 +170,12 @@ class TimeWindowManager:
         }
 
     def _estimate_memory_usage(self) -> float:
-        """估算当前内存使用 (MB)"""
-        # 简化估算: 每1000个交易约占用1MB
-        total_trades = 0
+        """统计共享交易存储及各窗口视图实际占用的内存 (MB)"""
+        total_bytes = self.trade_store.memory_usage()
         for window in self.windows.values():
-            total_trades += sum(len(w) for w in window.trade_windows.values())
-        return total_trades / 1000
+            total_bytes += sys.getsizeof(window.trade_windows)
+            total_bytes += sum(w.memory_usage() for w in window.trade_windows.values())
+        return total_bytes / (1024 * 1024)
 
     def get_all_windows_info(self) -> Dict:
         """获取所有窗口信息"""
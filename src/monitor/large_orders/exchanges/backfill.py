@@ -0,0 +1,178 @@
+"""
+币安成交补齐
+WebSocket重连期间丢失的成交通过REST接口按ID分页拉取：
+@trade使用/api/v3/historicalTrades（id），@aggTrade使用/api/v3/aggTrades（a）
+"""
+import asyncio
+import logging
+import time
+from typing import Dict, List, Optional
+
+from ....http_client import AsyncHTTPClient, get_async_http_client
+from ..src.base import TradeEvent
+from .trade_decoder import STREAM_AGG_TRADE, STREAM_TRADE
+
+logger = logging.getLogger(__name__)
+
+HISTORICAL_TRADES_PATH = "/api/v3/historicalTrades"
+AGG_TRADES_PATH = "/api/v3/aggTrades"
+MAX_PAGE_LIMIT = 1000  # 两个接口单页最多1000条
+# 每次请求消耗的IP请求权重（币安按IP限制每分钟总权重，与其他REST调用共享）
+REQUEST_WEIGHTS = {HISTORICAL_TRADES_PATH: 25, AGG_TRADES_PATH: 4}
+
+
+class TradeBackfiller:
+    """
+    成交补齐器
+
+    1. 按ID区间分页：fromId起每页最多page_limit条，直到覆盖区间末尾或返回空页
+    2. 限速：按接口权重分配每分钟权重预算，相邻请求间隔 = 权重 * 60 / weight_per_minute 秒
+       （同一补齐器的所有交易对共享，historicalTrades每页权重25，aggTrades每页权重4）
+    3. 上限：单个缺口最多补齐max_trades条，超出时只补最近的部分（窗口累计只依赖近期成交）
+    """
+
+    def __init__(
+        self,
+        stream_type: str = STREAM_TRADE,
+        rest_url: str = None,
+        page_limit: int = None,
+        max_trades: int = None,
+        weight_per_minute: int = None,
+        api_key: Optional[str] = None,
+        http_client: Optional[AsyncHTTPClient] = None
+    ):
+        """
+        初始化成交补齐器
+
+        Args:
+            stream_type: 交易流类型（trade / aggTrade），决定补齐接口和ID字段
+            rest_url: REST服务地址（不含路径），为空时读取配置
+            page_limit: 单页条数，为空时读取配置（最大1000）
+            max_trades: 单个缺口最多补齐条数，为空时读取配置
+            weight_per_minute: 补齐每分钟最多消耗的请求权重，为空时读取配置
+            api_key: 可选的API Key（以X-MBX-APIKEY请求头发送）
+            http_client: 共享的keep-alive HTTP客户端，默认使用进程级实例
+        """
+        # 动态加载配置
+        try:
+            from ....config import (
+                BINANCE_REST_BASE_URL,
+                BINANCE_BACKFILL_PAGE_LIMIT,
+                BINANCE_BACKFILL_MAX_TRADES,
+                BINANCE_BACKFILL_WEIGHT_PER_MINUTE
+            )
+        except ImportError:
+            BINANCE_REST_BASE_URL = "https://api.binance.com"
+            BINANCE_BACKFILL_PAGE_LIMIT = MAX_PAGE_LIMIT
+            BINANCE_BACKFILL_MAX_TRADES = 20_000
+            BINANCE_BACKFILL_WEIGHT_PER_MINUTE = 1200
+
+        if stream_type not in (STREAM_TRADE, STREAM_AGG_TRADE):
+            raise ValueError(f"Invalid stream type: {stream_type}")
+
+        self.stream_type = stream_type
+        self.rest_url = (rest_url or BINANCE_REST_BASE_URL).rstrip("/")
+        self.page_limit = min(page_limit or BINANCE_BACKFILL_PAGE_LIMIT, MAX_PAGE_LIMIT)
+        self.max_trades = max_trades or BINANCE_BACKFILL_MAX_TRADES
+        self.weight_per_minute = weight_per_minute or BINANCE_BACKFILL_WEIGHT_PER_MINUTE
+        if self.weight_per_minute <= 0:
+            raise ValueError(f"weight_per_minute must be positive: {self.weight_per_minute}")
+        self.headers = {"X-MBX-APIKEY": api_key} if api_key else None
+        self.http_client = http_client or get_async_http_client()
+
+        if stream_type == STREAM_AGG_TRADE:
+            path = AGG_TRADES_PATH
+            self.id_key = "a"
+        else:
+            path = HISTORICAL_TRADES_PATH
+            self.id_key = "id"
+        self.url = self.rest_url + path
+        self.request_weight = REQUEST_WEIGHTS[path]
+        self.request_interval = self.request_weight * 60 / self.weight_per_minute
+
+        self._next_request_at = 0.0
+        self._rate_lock = asyncio.Lock()
+
+        self.stats = {
+            "requests": 0,
+            "weight_used": 0,
+            "trades_fetched": 0,
+            "trades_skipped": 0,
+            "errors": 0
+        }
+
+    async def fetch(self, symbol: str, first_id: int, last_id: int) -> List[TradeEvent]:
+        """
+        拉取ID区间[first_id, last_id]内的成交
+
+        Args:
+            symbol: 交易对
+            first_id: 缺口的第一个成交ID
+            last_id: 缺口的最后一个成交ID
+
+        Returns:
+            List[TradeEvent]: 按ID升序的成交；请求失败时返回已拉取的部分
+        """
+        if last_id - first_id + 1 > self.max_trades:
+            skipped = last_id - self.max_trades + 1 - first_id
+            self.stats["trades_skipped"] += skipped
+            logger.warning(f"{symbol} 缺口 {last_id - first_id + 1} 笔超过补齐上限，跳过最早的 {skipped} 笔")
+            first_id = last_id - self.max_trades + 1
+
+        trades: List[TradeEvent] = []
+        from_id = first_id
+        while from_id <= last_id:
+            try:
+                rows = await self._get_page(symbol, from_id, min(self.page_limit, last_id - from_id + 1))
+            except Exception as e:
+                self.stats["errors"] += 1
+                logger.error(f"{symbol} 补齐请求失败（fromId={from_id}）: {e}")
+                break
+            if not rows:
+                break
+
+            for row in rows:
+                if row[self.id_key] > last_id:
+                    break
+                trades.append(self._parse_row(symbol, row))
+            from_id = rows[-1][self.id_key] + 1
+
+        self.stats["trades_fetched"] += len(trades)
+        return trades
+
+    async def _get_page(self, symbol: str, from_id: int, limit: int) -> List[Dict]:
+        """按权重预算的间隔请求一页"""
+        async with self._rate_lock:
+            delay = self._next_request_at - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._next_request_at = time.monotonic() + self.request_interval
+
+        self.stats["requests"] += 1
+        self.stats["weight_used"] += self.request_weight
+        return await self.http_client.get_json(
+            self.url,
+            params={"symbol": symbol, "fromId": from_id, "limit": limit},
+            headers=self.headers
+        )
+
+    def _parse_row(self, symbol: str, row: Dict) -> TradeEvent:
+        """将REST成交记录转换为与WebSocket相同格式的TradeEvent"""
+        if self.stream_type == STREAM_AGG_TRADE:
+            price = float(row["p"])
+            quantity = float(row["q"])
+            return TradeEvent(
+                "binance", symbol, "SELL" if row["m"] else "BUY", "MARKET",
+                price, quantity, price * quantity, row["T"], True, str(row["a"]),
+                None, row.get("f"), row.get("l")
+            )
+        price = float(row["price"])
+        quantity = float(row["qty"])
+        return TradeEvent(
+            "binance", symbol, "SELL" if row["isBuyerMaker"] else "BUY", "MARKET",
+            price, quantity, price * quantity, row["time"], True, str(row["id"])
+        )
+
+    def get_stats(self) -> Dict:
+        """获取统计信息"""
+        return self.stats.copy()
@@ -1,11 +1,15 @@
 """
 币安WebSocket客户端实现
 实时获取交易数据并转换为标准化格式
+交易对按分片分配到多条组合流（/stream?streams=）连接，每个分片独立读取和重连；
+重连后按成交ID检测缺口，通过REST补齐丢失的成交并先于实时数据发射；
+冗余模式下每个分片保持两条相同订阅的连接，按成交ID去重
 """
 import asyncio
 import json
 import logging
-from typing import List, Callable, Optional
+import time
+from typing import Dict, List, Callable, Optional
 from datetime import datetime
 import websockets
 from websockets.exceptions import ConnectionClosed, InvalidURI, InvalidStatus
@@ -13,35 +17,322 @@ from websockets.exceptions import ConnectionClosed, InvalidURI, InvalidStatus
 from ..src.base import BaseExchangeCollector, ConnectionState, TradeEvent
 from ..src.error_recovery import ErrorRecoveryManager, ErrorSeverity
 from ..src.price_converter import PriceConverter
+from ...common.rate_meter import RateMeter
+from .backfill import TradeBackfiller
+from .trade_decoder import DECODE_ERRORS, STREAM_TYPES, TradeDecoder
 
 logger = logging.getLogger(__name__)
 
 
+class BinanceStreamShard:
+    """
+    组合流连接分片
+
+    一个分片对应一条WebSocket连接，交易流直接写在组合流URL中；
+    每个分片由一个监督任务负责读取和重连（显式的ConnectionState状态机），
+    连接断开时只有本分片按指数退避重连，重连URL包含分片当前的全部交易对
+    """
+
+    def __init__(
+        self,
+        client: "BinanceWebSocketClient",
+        shard_id: int,
+        symbols: List[str],
+        replica: int = 0
+    ):
+        """
+        初始化连接分片
+
+        Args:
+            client: 所属客户端（提供解码、消息处理和重连参数）
+            shard_id: 分片编号（冗余模式下同一分片的各副本编号相同）
+            symbols: 分片负责的交易对
+            replica: 副本编号
+        """
+        self.client = client
+        self.shard_id = shard_id
+        self.replica = replica
+        self.symbols: List[str] = list(symbols)
+        self.websocket = None
+        self.state = ConnectionState.DISCONNECTED
+        self.task: Optional[asyncio.Task] = None
+        self.reconnect_attempts = 0  # 连续重连次数，连接成功后清零
+
+        self.stats = {
+            "messages_received": 0,
+            "reconnects": 0
+        }
+
+    @property
+    def streams(self) -> List[str]:
+        """分片订阅的交易流名称"""
+        return [f"{symbol.lower()}@{self.client.stream_type}" for symbol in self.symbols]
+
+    @property
+    def url(self) -> str:
+        """组合流URL"""
+        return f"{self.client.base_url}/stream?streams={'/'.join(self.streams)}"
+
+    @property
+    def connected(self) -> bool:
+        return self.websocket is not None
+
+    async def connect(self) -> None:
+        """建立组合流连接（保活由websockets库的ping_interval负责）"""
+        url = self.url
+        if self.state != ConnectionState.RECONNECTING:
+            self._set_state(ConnectionState.CONNECTING)
+        try:
+            self.websocket = await websockets.connect(
+                url,
+                ping_interval=20,
+                ping_timeout=10,
+                close_timeout=5
+            )
+            self._set_state(ConnectionState.CONNECTED)
+            logger.debug(f"分片 {self.shard_id} 已连接，{len(self.symbols)} 个交易流")
+        except InvalidURI:
+            raise ValueError(f"无效的WebSocket URI: {url}")
+
+    def start(self) -> None:
+        """启动分片监督任务（已在运行时无操作，保证只有一个读取者）"""
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """停止监督任务并关闭连接"""
+        self._set_state(ConnectionState.CLOSED)
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self.task = None
+        await self.close()
+
+    async def close(self) -> None:
+        """关闭当前连接（监督任务随后进入重连）"""
+        websocket, self.websocket = self.websocket, None
+        if websocket is not None:
+            try:
+                await websocket.close()
+            except Exception as e:
+                logger.debug(f"分片 {self.shard_id} 关闭连接出错: {e}")
+
+    async def add_symbols(self, symbols: List[str]) -> None:
+        """
+        追加交易对（已连接时发送SUBSCRIBE，未连接时包含在下次重连的URL中）
+
+        Args:
+            symbols: 新交易对
+        """
+        self.symbols += symbols
+        await self._send("SUBSCRIBE", symbols)
+
+    async def remove_symbols(self, symbols: List[str]) -> None:
+        """
+        移除交易对（已连接时发送UNSUBSCRIBE）
+
+        Args:
+            symbols: 要移除的交易对
+        """
+        removed = set(symbols)
+        self.symbols = [symbol for symbol in self.symbols if symbol not in removed]
+        await self._send("UNSUBSCRIBE", symbols)
+
+    async def _send(self, method: str, symbols: List[str]) -> None:
+        """在当前连接上发送订阅变更（连接失效时由重连URL补齐）"""
+        if self.websocket is None:
+            return
+        try:
+            await self.websocket.send(json.dumps({
+                "method": method,
+                "params": [f"{symbol.lower()}@{self.client.stream_type}" for symbol in symbols],
+                "id": int(datetime.now().timestamp())
+            }))
+            logger.debug(f"分片 {self.shard_id} {method} {len(symbols)} 个交易流")
+        except Exception as e:
+            logger.warning(f"分片 {self.shard_id} 发送{method}失败，等待重连: {e}")
+
+    async def _run(self) -> None:
+        """
+        连接监督循环：分片唯一的读取者，按状态推进，不递归、不另起任务
+
+        CONNECTED：读取消息直到连接断开 → RECONNECTING
+        CONNECTING / RECONNECTING：按ErrorRecoveryManager的退避时间重连 → CONNECTED；
+            连续失败超过max_reconnect_attempts → FAILED
+        客户端停止时退出循环（stop()将状态置为CLOSED）
+        """
+        recovery = self.client.recovery
+        while self.client.connected:
+            if self.state == ConnectionState.CONNECTED:
+                await self._read()
+                await self.close()
+                if not self.client.connected:
+                    break
+                self._set_state(ConnectionState.RECONNECTING)
+                self.client._on_shard_disconnected(self)
+                continue
+
+            self.reconnect_attempts += 1
+            if self.reconnect_attempts > recovery.max_reconnect_attempts:
+                logger.critical(f"分片 {self.shard_id} 达到最大重连次数，停止重连")
+                self._set_state(ConnectionState.FAILED)
+                self.client._on_shard_failed(self)
+                break
+
+            attempt_num = recovery.start_reconnect_attempt()
+            await asyncio.sleep(recovery.get_backoff(self.reconnect_attempts))
+            try:
+                await self.connect()
+            except Exception as e:
+                recovery.complete_reconnect_attempt(attempt_num, False, e)
+                continue
+
+            recovery.complete_reconnect_attempt(attempt_num, True)
+            self.reconnect_attempts = 0
+            self.stats["reconnects"] += 1
+            logger.info(f"分片 {self.shard_id} 重连成功")
+            self.client._on_shard_connected(self)
+
+    async def _read(self) -> None:
+        """读取当前连接的消息，连接断开时返回"""
+        try:
+            async for message in self.websocket:
+                self.stats["messages_received"] += 1
+                await self.client._handle_message(message)
+            logger.warning(f"分片 {self.shard_id} 连接已关闭")
+        except ConnectionClosed:
+            logger.warning(f"分片 {self.shard_id} 连接已关闭")
+        except Exception as e:
+            logger.error(f"分片 {self.shard_id} 消息处理错误: {e}", exc_info=True)
+
+    def _set_state(self, state: ConnectionState) -> None:
+        """更新分片连接状态"""
+        if state != self.state:
+            logger.debug(f"分片 {self.shard_id}: {self.state.value} -> {state.value}")
+            self.state = state
+
+    def get_stats(self) -> Dict:
+        """获取分片统计信息"""
+        return {
+            "shard_id": self.shard_id,
+            "replica": self.replica,
+            "streams": len(self.symbols),
+            "state": self.state.value,
+            "connected": self.connected,
+            **self.stats
+        }
+
+
 class BinanceWebSocketClient(BaseExchangeCollector):
     """
     币安WebSocket客户端
     
     负责：
-    1. 建立WebSocket连接
-    2. 订阅交易流
+    1. 按分片建立组合流WebSocket连接（每条连接最多streams_per_connection个交易流）
+    2. 订阅交易流（变更时只有受影响的分片重新订阅）
     3. 解析交易数据
     4. 转换并发送TradeEvent
-    5. 错误处理和重连
+    5. 错误处理和分片独立重连
+    6. 重连后检测成交ID缺口并补齐
+    7. 冗余模式：每个分片两条连接，一条断开时另一条继续接收，成交按ID去重
     """
     
     def __init__(
         self,
         symbols: List[str],
         api_key: Optional[str] = None,
-        api_secret: Optional[str] = None
+        api_secret: Optional[str] = None,
+        batch_size: int = 500,
+        batch_interval: float = 0.05,
+        json_backend: Optional[str] = None,
+        keep_raw: bool = False,
+        streams_per_connection: int = None,
+        base_url: str = None,
+        stream_type: str = None,
+        backfiller: Optional[TradeBackfiller] = None,
+        redundant: bool = None
     ):
-        super().__init__("binance", symbols)
+        """
+        初始化币安WebSocket客户端
+        
+        Args:
+            symbols: 监控的交易对
+            api_key: API Key（可选）
+            api_secret: API Secret（可选）
+            batch_size: 设置批量回调时，单批最多交易笔数
+            batch_interval: 设置批量回调时，未满批的交易最长等待时间（秒）
+            json_backend: 消息解码后端（msgspec / orjson / json），默认选择已安装的最快后端
+            keep_raw: 是否在TradeEvent.raw_data中保留原始消息（调试用）
+            streams_per_connection: 每条组合流连接的交易流数量，为空时读取配置
+            base_url: WebSocket服务地址（不含路径），为空时读取配置
+            stream_type: 交易流类型，为空时读取配置。trade为逐笔成交；aggTrade将同一吃单
+                在同一价格的成交归集为一条消息，消息量显著减少，窗口累计金额不变
+            backfiller: 重连后补齐缺口的补齐器，为空时按配置（BINANCE_BACKFILL_ENABLED）创建
+            redundant: 是否为每个分片保持一条热备连接（带宽翻倍，断线期间不丢数据），为空时读取配置
+        """
+        super().__init__("binance", list(symbols))
+        
+        # 动态加载配置
+        if streams_per_connection is None:
+            try:
+                from ....config import BINANCE_WS_STREAMS_PER_CONNECTION
+                streams_per_connection = BINANCE_WS_STREAMS_PER_CONNECTION
+            except ImportError:
+                streams_per_connection = 200
+        if base_url is None:
+            try:
+                from ....config import BINANCE_WS_BASE_URL
+                base_url = BINANCE_WS_BASE_URL
+            except ImportError:
+                base_url = "wss://stream.binance.com:9443"
+        if stream_type is None:
+            try:
+                from ....config import BINANCE_WS_STREAM_TYPE
+                stream_type = BINANCE_WS_STREAM_TYPE
+            except ImportError:
+                stream_type = "trade"
+        if redundant is None:
+            try:
+                from ....config import BINANCE_WS_REDUNDANT
+                redundant = BINANCE_WS_REDUNDANT
+            except ImportError:
+                redundant = False
+        if stream_type not in STREAM_TYPES:
+            raise ValueError(f"Invalid stream type: {stream_type}")
+        if streams_per_connection < 1:
+            raise ValueError(f"streams_per_connection must be positive: {streams_per_connection}")
         
         # WebSocket配置
-        self.websocket_url = "wss://stream.binance.com:9443/ws"
-        self.websocket = None
+        self.base_url = base_url.rstrip("/")
+        self.stream_type = stream_type
+        self.streams_per_connection = streams_per_connection
+        self.replicas = 2 if redundant else 1
+        self.shards: List[BinanceStreamShard] = []
+        self._next_shard_id = 0
         self.connected = False
-        self.subscribed = False
+        self._create_shards(self.symbols)
+        
+        # 消息解码（组合流消息带{"stream", "data"}信封）
+        self.decoder = TradeDecoder(backend=json_backend, keep_raw=keep_raw, combined=True)
+        
+        # 缺口补齐：每个交易对最后一笔成交ID，重连后待检查缺口的交易对
+        if backfiller is None:
+            try:
+                from ....config import BINANCE_BACKFILL_ENABLED
+            except ImportError:
+                BINANCE_BACKFILL_ENABLED = False
+            if BINANCE_BACKFILL_ENABLED:
+                backfiller = TradeBackfiller(stream_type=stream_type, api_key=api_key)
+        self.backfiller = backfiller
+        # 每个交易对最后发射的成交ID同时用于冗余模式去重
+        self._last_trade_ids: Dict[str, str] = {}
+        self._resync_symbols = set()
+        # 进行中的补齐任务，以及补齐期间缓存的实时成交（最多backfiller.max_trades笔）
+        self._backfill_tasks: Dict[str, asyncio.Task] = {}
+        self._backfill_buffers: Dict[str, List[TradeEvent]] = {}
         
         # 错误恢复
         self.recovery = ErrorRecoveryManager(
@@ -51,54 +342,90 @@ class BinanceWebSocketClient(BaseExchangeCollector):
             max_backoff=300.0,
             critical_error_threshold=3
         )
+        self.recovery.set_admin_alert_callback(self._send_admin_alert)
+        self.recovery.set_state_change_callback(self._on_state_change)
+        self.recovery.set_recovery_callback(self._on_connection_recovered)
         
         # USD转换器
         self.price_converter = PriceConverter()
         
-        # 订阅的任务
-        self._tasks: List[asyncio.Task] = []
+        # 批量发射：待发射的交易及定时刷新任务
+        self.batch_size = batch_size
+        self.batch_interval = batch_interval
+        self._pending_trades: List[TradeEvent] = []
+        self._flush_task: Optional[asyncio.Task] = None
         
-        # 统计数据
+        # 统计数据：热路径只累加整数计数并保留最后一笔交易，stats字典在get_stats()时填充
+        self._trades_received = 0
+        self._last_trade: Optional[TradeEvent] = None
+        self._connected_at: Optional[float] = None
+        self.trade_meter = RateMeter()
         self.stats = {
             "trades_received": 0,
             "trades_per_second": 0.0,
             "last_trade_time": None,
-            "connection_uptime": 0.0
+            "connection_uptime": 0.0,
+            "gaps_detected": 0,
+            "trades_backfilled": 0,
+            "backfills_abandoned": 0,
+            "duplicates_dropped": 0
         }
         
-        logger.info(f"初始化币安WebSocket客户端，监控 {len(symbols)} 个交易对")
+        logger.info(
+            f"初始化币安WebSocket客户端，监控 {len(self.symbols)} 个交易对（@{stream_type}），"
+            f"{len(self.shards)} 条组合流连接"
+        )
+    
+    def _create_shards(self, symbols: List[str]) -> List[BinanceStreamShard]:
+        """
+        按streams_per_connection将交易对切分为新分片（冗余模式下每个分片创建两个副本）
+
+        Args:
+            symbols: 交易对
+
+        Returns:
+            List[BinanceStreamShard]: 创建的新分片
+        """
+        new_shards = []
+        for i in range(0, len(symbols), self.streams_per_connection):
+            for replica in range(self.replicas):
+                new_shards.append(BinanceStreamShard(
+                    self, self._next_shard_id, symbols[i:i + self.streams_per_connection], replica
+                ))
+            self._next_shard_id += 1
+        self.shards.extend(new_shards)
+        return new_shards
     
     async def start(self) -> None:
-        """启动WebSocket连接"""
+        """启动全部分片连接"""
         try:
             self._update_state(ConnectionState.CONNECTING)
             self.recovery.update_state("connecting")
             
-            # 建立WebSocket连接
-            await self._connect_websocket()
-            
-            # 订阅交易流
-            await self._subscribe_trades()
-            
-            # 启动消息处理任务
-            self._tasks = [
-                asyncio.create_task(self._message_handler()),
-                asyncio.create_task(self._ping_handler())
-            ]
-            
-            # 设置错误恢复回调
-            self.recovery.set_admin_alert_callback(self._send_admin_alert)
-            self.recovery.set_state_change_callback(self._on_state_change)
-            self.recovery.set_recovery_callback(self._on_connection_recovered)
+            # 建立所有分片的组合流连接
+            await asyncio.gather(*(shard.connect() for shard in self.shards))
             
+            # 启动分片读取任务
             self.connected = True
+            self._connected_at = time.monotonic()
+            for shard in self.shards:
+                shard.start()
+            if self.trade_batch_callback and (self._flush_task is None or self._flush_task.done()):
+                self._flush_task = asyncio.create_task(self._batch_flush_handler())
+            
             self._update_state(ConnectionState.CONNECTED)
             self.recovery.update_state("connected")
             
-            logger.info(f"币安WebSocket连接成功，订阅 {len(self.symbols)} 个交易对")
+            logger.info(
+                f"币安WebSocket连接成功，订阅 {len(self.symbols)} 个交易对，"
+                f"{len(self.shards)} 条组合流连接"
+            )
             
         except Exception as e:
             logger.error(f"启动WebSocket失败: {e}", exc_info=True)
+            self.connected = False
+            for shard in self.shards:
+                await shard.close()
             self._update_state(ConnectionState.FAILED)
             self.recovery.update_state("failed")
             self.recovery.record_error("startup_error", str(e), ErrorSeverity.CRITICAL)
@@ -112,14 +439,14 @@ class BinanceWebSocketClient(BaseExchangeCollector):
         self._update_state(ConnectionState.CLOSED)
         self.recovery.update_state("closed")
         
-        # 取消所有任务
-        for task in self._tasks:
-            task.cancel()
-        
-        # 关闭WebSocket连接
-        if self.websocket:
-            await self.websocket.close()
-            self.websocket = None
+        # 停止所有分片，取消进行中的补齐（已缓存的实时成交照常发射）
+        await asyncio.gather(*(shard.stop() for shard in self.shards))
+        for symbol in list(self._backfill_tasks):
+            await self._abandon_backfill(symbol)
+        if self._flush_task:
+            self._flush_task.cancel()
+            self._flush_task = None
+        self._flush_trades()
         
         # 关闭USD转换器
         if self.price_converter:
@@ -128,172 +455,251 @@ class BinanceWebSocketClient(BaseExchangeCollector):
         logger.info("币安WebSocket客户端已停止")
     
     async def reconnect(self) -> None:
-        """重新连接WebSocket"""
+        """重新连接：关闭所有分片连接，由各分片读取循环按退避独立重连"""
         logger.info("开始重新连接币安WebSocket...")
+        for shard in self.shards:
+            await shard.close()
+    
+    async def add_symbols(self, symbols: List[str]) -> None:
+        """
+        追加订阅交易对（只有接收新交易对的分片发送SUBSCRIBE或新建连接）
         
-        # 记录重连尝试
-        attempt_num = self.recovery.start_reconnect_attempt()
+        Args:
+            symbols: 交易对列表，已订阅的交易对被忽略
+        """
+        new_symbols = [symbol for symbol in dict.fromkeys(symbols) if symbol not in self.symbols]
+        if not new_symbols:
+            return
+        self.symbols = self.symbols + new_symbols
         
-        try:
-            # 关闭旧连接
-            if self.websocket:
-                await self.websocket.close()
-            
-            # 等待退避时间
-            backoff = min(
-                2.0 * (2 ** (attempt_num - 1)),
-                300.0
-            )
-            await asyncio.sleep(backoff)
-            
-            # 重新连接
-            await self.start()
-            
-            # 重连成功
-            self.recovery.complete_reconnect_attempt(attempt_num, True)
-            logger.info("币安WebSocket重连成功")
-            
-        except Exception as e:
-            # 重连失败
-            self.recovery.complete_reconnect_attempt(attempt_num, False, e)
-            logger.error(f"币安WebSocket重连失败: {e}")
-            
-            if self.recovery.should_continue_reconnecting():
-                # 继续重连
-                await self.reconnect()
+        # 先填满最后一个分片（及其副本），剩余的交易对创建新分片
+        remaining = new_symbols
+        if self.shards:
+            last_id = self.shards[-1].shard_id
+            free = self.streams_per_connection - len(self.shards[-1].symbols)
+            if free > 0:
+                for shard in self.shards:
+                    if shard.shard_id == last_id:
+                        await shard.add_symbols(remaining[:free])
+                remaining = remaining[free:]
+        new_shards = self._create_shards(remaining)
+        
+        if self.connected:
+            for shard in new_shards:
+                try:
+                    await shard.connect()
+                    self._on_shard_connected(shard)
+                except Exception as e:
+                    logger.error(f"分片 {shard.shard_id} 连接失败，进入重连: {e}")
+                shard.start()
+        
+        logger.info(f"追加订阅 {len(new_symbols)} 个交易对，新建 {len(new_shards)} 条连接")
+    
+    async def remove_symbols(self, symbols: List[str]) -> None:
+        """
+        取消订阅交易对（只有包含这些交易对的分片发送UNSUBSCRIBE，清空的分片关闭连接）
+        
+        Args:
+            symbols: 交易对列表，未订阅的交易对被忽略
+        """
+        removed = set(symbols) & set(self.symbols)
+        if not removed:
+            return
+        self.symbols = [symbol for symbol in self.symbols if symbol not in removed]
+        
+        for shard in list(self.shards):
+            affected = [symbol for symbol in shard.symbols if symbol in removed]
+            if not affected:
+                continue
+            if len(affected) == len(shard.symbols):
+                self.shards.remove(shard)
+                await shard.stop()
             else:
-                # 达到最大重连次数
-                self._update_state(ConnectionState.FAILED)
-                self.recovery.update_state("failed")
-                logger.critical("达到最大重连次数，停止重连")
+                await shard.remove_symbols(affected)
+        
+        logger.info(f"取消订阅 {len(removed)} 个交易对，剩余 {len(self.shards)} 条连接")
     
-    async def _connect_websocket(self) -> None:
-        """建立WebSocket连接"""
-        try:
-            self.websocket = await websockets.connect(
-                self.websocket_url,
-                ping_interval=20,
-                ping_timeout=10,
-                close_timeout=5
-            )
-            logger.debug("WebSocket连接已建立")
-        except InvalidURI:
-            raise ValueError(f"无效的WebSocket URI: {self.websocket_url}")
-        except Exception as e:
-            logger.error(f"WebSocket连接失败: {e}")
-            raise
+    def _on_shard_connected(self, shard: BinanceStreamShard) -> None:
+        """分片连接（恢复）后标记其交易对待检查缺口，所有分片均已连接时更新为CONNECTED"""
+        self._resync_symbols.update(
+            symbol for symbol in shard.symbols if symbol in self._last_trade_ids
+        )
+        if self.connected and self.state != ConnectionState.CONNECTED and self._streams_covered():
+            self._update_state(ConnectionState.CONNECTED)
+            self.recovery.update_state("connected")
     
-    async def _subscribe_trades(self) -> None:
-        """订阅交易流"""
-        try:
-            # 构建订阅消息
-            streams = [f"{symbol.lower()}@trade" for symbol in self.symbols]
-            
-            subscribe_msg = {
-                "method": "SUBSCRIBE",
-                "params": streams,
-                "id": int(datetime.now().timestamp())
-            }
-            
-            await self.websocket.send(json.dumps(subscribe_msg))
-            self.subscribed = True
-            
-            logger.debug(f"已订阅 {len(streams)} 个交易流")
-            
-        except Exception as e:
-            logger.error(f"订阅交易流失败: {e}")
-            raise
+    def _on_shard_disconnected(self, shard: BinanceStreamShard) -> None:
+        """分片断开且没有仍连接的副本时进入RECONNECTING（其他分片继续接收数据）"""
+        if self.state == ConnectionState.CONNECTED and not self._streams_covered():
+            self._update_state(ConnectionState.RECONNECTING)
+            self.recovery.update_state("reconnecting")
     
-    async def _message_handler(self) -> None:
-        """处理WebSocket消息"""
+    def _on_shard_failed(self, shard: BinanceStreamShard) -> None:
+        """分片达到最大重连次数"""
+        self._update_state(ConnectionState.FAILED)
+        self.recovery.update_state("failed")
+    
+    def _streams_covered(self) -> bool:
+        """每个分片是否至少有一个已连接的副本"""
+        connected_ids = {shard.shard_id for shard in self.shards if shard.connected}
+        return all(shard.shard_id in connected_ids for shard in self.shards)
+    
+    async def _handle_message(self, message) -> None:
+        """解码并处理一条分片消息"""
         try:
-            async for message in self.websocket:
-                try:
-                    data = json.loads(message)
-                    await self._process_message(data)
-                except json.JSONDecodeError as e:
-                    logger.error(f"JSON解析错误: {e}")
-                except Exception as e:
-                    logger.error(f"处理消息错误: {e}", exc_info=True)
-                    
-        except ConnectionClosed:
-            logger.warning("WebSocket连接已关闭")
-            if self.connected:
-                await self.reconnect()
+            await self._process_message(self.decoder.decode(message))
+        except DECODE_ERRORS as e:
+            logger.error(f"JSON解析错误: {e}")
         except Exception as e:
-            logger.error(f"消息处理错误: {e}", exc_info=True)
-            if self.connected:
-                await self.reconnect()
+            logger.error(f"处理消息错误: {e}", exc_info=True)
     
-    async def _process_message(self, data: dict) -> None:
-        """处理接收到的消息"""
+    async def _process_message(self, data) -> None:
+        """处理接收到的消息（解码器产出的TradeEvent，或其他消息的字典）"""
         try:
+            # 兼容未经解码器的原始交易字典
+            if isinstance(data, dict) and data.get("e") in STREAM_TYPES:
+                data = self._parse_trade(data)
+            
             # 交易事件
-            if data.get("e") == "trade":
-                trade = self._parse_trade(data)
-                if trade:
-                    self._emit_trade(trade)
-                    self._update_stats(trade)
+            if isinstance(data, TradeEvent):
+                trade = data
+                if self.replicas > 1 and not self._is_new_trade(trade):
+                    # 另一条副本连接已发射过这笔成交
+                    self.stats["duplicates_dropped"] += 1
+                    return
+                buffered = self._backfill_buffers.get(trade.symbol)
+                if buffered is not None:
+                    # 该交易对正在补齐：实时成交先缓存，补齐完成后按ID顺序发射
+                    self._last_trade_ids[trade.symbol] = trade.trade_id
+                    buffered.append(trade)
+                    if len(buffered) >= self.backfiller.max_trades:
+                        await self._abandon_backfill(trade.symbol)
+                    return
+                if self._resync_symbols and trade.symbol in self._resync_symbols:
+                    # 重连后该交易对的第一笔实时成交：有缺口时在独立任务中补齐
+                    if self._start_backfill(trade):
+                        return
+                self._last_trade_ids[trade.symbol] = trade.trade_id
+                await self._deliver_trade(trade)
             
             # 订阅响应
-            elif data.get("result") is None and data.get("id"):
+            elif data and data.get("result") is None and data.get("id"):
                 logger.debug("订阅成功")
             
         except Exception as e:
             logger.error(f"处理消息错误: {e}", exc_info=True)
     
+    def _is_new_trade(self, trade: TradeEvent) -> bool:
+        """
+        冗余模式去重：成交ID是否大于该交易对最后发射的成交ID
+        
+        同一交易对的成交ID单调递增，落后的副本连接无论落后多少笔，其重复成交都会被丢弃
+        """
+        last_id = self._last_trade_ids.get(trade.symbol)
+        return last_id is None or int(trade.trade_id) > int(last_id)
+    
+    async def _deliver_trade(self, trade: TradeEvent) -> None:
+        """按设置的方式发射一笔交易（批量回调或逐笔回调），每笔只计数一次"""
+        self._trades_received += 1
+        self._last_trade = trade
+        if self.trade_batch_callback:
+            self._pending_trades.append(trade)
+            if len(self._pending_trades) >= self.batch_size:
+                self._flush_trades()
+        elif self.trade_callback:
+            self.trade_callback(trade)
+    
+    def _start_backfill(self, trade: TradeEvent) -> bool:
+        """
+        比较重连前最后一笔与重连后第一笔成交ID，有缺口时启动该交易对的补齐任务
+        
+        补齐不在分片读取循环中等待：读取循环继续接收所有交易对，该交易对的实时成交
+        缓存到补齐完成，再与补齐的成交一起按ID顺序发射
+        
+        Args:
+            trade: 重连后该交易对的第一笔实时成交
+            
+        Returns:
+            bool: 是否已启动补齐（这笔成交已缓存）
+        """
+        self._resync_symbols.discard(trade.symbol)
+        last_id = self._last_trade_ids.get(trade.symbol)
+        if last_id is None or self.backfiller is None:
+            return False
+        
+        first_missing, live_id = int(last_id) + 1, int(trade.trade_id)
+        if live_id <= first_missing:
+            return False
+        
+        self.stats["gaps_detected"] += 1
+        logger.warning(f"{trade.symbol} 重连缺口：成交ID {first_missing} ~ {live_id - 1}，开始补齐")
+        self._last_trade_ids[trade.symbol] = trade.trade_id
+        self._backfill_buffers[trade.symbol] = [trade]
+        self._backfill_tasks[trade.symbol] = asyncio.create_task(
+            self._backfill_gap(trade.symbol, first_missing, live_id - 1)
+        )
+        return True
+    
+    async def _backfill_gap(self, symbol: str, first_id: int, last_id: int) -> None:
+        """
+        补齐任务：通过REST拉取缺失的成交，按ID顺序先于缓存的实时成交发射
+        
+        Args:
+            symbol: 交易对
+            first_id: 缺口的第一个成交ID
+            last_id: 缺口的最后一个成交ID
+        """
+        try:
+            missed = await self.backfiller.fetch(symbol, first_id, last_id)
+        except Exception as e:
+            logger.error(f"{symbol} 补齐失败: {e}", exc_info=True)
+            missed = []
+        
+        self._backfill_tasks.pop(symbol, None)
+        buffered = self._backfill_buffers.pop(symbol, [])
+        for missed_trade in missed:
+            await self._deliver_trade(missed_trade)
+        for live_trade in buffered:
+            await self._deliver_trade(live_trade)
+        self.stats["trades_backfilled"] += len(missed)
+        logger.info(f"{symbol} 已补齐 {len(missed)}/{last_id - first_id + 1} 笔成交")
+    
+    async def _abandon_backfill(self, symbol: str) -> None:
+        """取消交易对的补齐任务（缓存过多或停止时），直接发射已缓存的实时成交"""
+        task = self._backfill_tasks.pop(symbol, None)
+        if task is not None:
+            task.cancel()
+        buffered = self._backfill_buffers.pop(symbol, [])
+        for live_trade in buffered:
+            await self._deliver_trade(live_trade)
+        self.stats["backfills_abandoned"] += 1
+        logger.warning(f"{symbol} 放弃补齐，发射已缓存的 {len(buffered)} 笔实时成交")
+    
     def _parse_trade(self, data: dict) -> Optional[TradeEvent]:
         """解析交易数据"""
         try:
-            symbol = data.get("s", "")
-            price = float(data.get("p", 0))
-            quantity = float(data.get("q", 0))
-            trade_id = str(data.get("t", ""))
-            trade_time = data.get("T", 0)
-            is_buyer_maker = data.get("m", False)  # True = sell, False = buy
-            
-            # 判断主动单
-            is_taker = True  # 市场单都是taker
-            
-            # 计算交易额
-            amount = price * quantity
-            
-            # 创建TradeEvent
-            trade_event = TradeEvent(
-                exchange="binance",
-                symbol=symbol,
-                side="SELL" if is_buyer_maker else "BUY",
-                order_type="MARKET",
-                price=price,
-                quantity=quantity,
-                amount=amount,
-                trade_time=trade_time,
-                is_taker=is_taker,
-                trade_id=trade_id,
-                raw_data=data
-            )
-            
-            return trade_event
-            
+            return self.decoder.trade_from_dict(data)
         except Exception as e:
             logger.error(f"解析交易数据失败: {e}")
             return None
     
-    async def _ping_handler(self) -> None:
-        """定期发送ping"""
-        try:
-            while self.connected:
-                await asyncio.sleep(20)  # 每20秒ping一次
-                if self.websocket and self.connected:
-                    await self.websocket.ping()
-        except Exception as e:
-            logger.error(f"Ping错误: {e}")
+    def _flush_trades(self) -> None:
+        """发射所有待发射的交易（每批读一次时钟结算速率）"""
+        if self._pending_trades:
+            trades, self._pending_trades = self._pending_trades, []
+            self.trade_batch_callback(trades)
+            self.trade_meter.tick(self._trades_received)
     
-    def _update_stats(self, trade: TradeEvent) -> None:
-        """更新统计信息"""
-        self.stats["trades_received"] += 1
-        self.stats["last_trade_time"] = trade.trade_time
-        self.stats["connection_uptime"] = datetime.now().timestamp() - trade.trade_time / 1000
+    async def _batch_flush_handler(self) -> None:
+        """定期发射未满批的交易，保证单笔交易最多延迟batch_interval"""
+        while True:
+            try:
+                await asyncio.sleep(self.batch_interval)
+                self._flush_trades()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"批量发射错误: {e}", exc_info=True)
     
     def _send_admin_alert(self, message: str) -> None:
         """发送管理员告警"""
@@ -323,10 +729,22 @@ class BinanceWebSocketClient(BaseExchangeCollector):
         return symbol in self.get_supported_symbols()
     
     def get_stats(self) -> dict:
-        """获取统计信息"""
+        """获取统计信息（计数和速率在此时才写入stats字典）"""
+        now = time.monotonic()
+        self.stats["trades_received"] = self._trades_received
+        self.stats["trades_per_second"] = self.trade_meter.tick(self._trades_received, now)
+        self.stats["last_trade_time"] = self._last_trade.trade_time if self._last_trade else None
+        self.stats["connection_uptime"] = (
+            now - self._connected_at if self.connected and self._connected_at is not None else 0.0
+        )
         return {
             **super().get_stats(),
             **self.stats,
+            "shards": [shard.get_stats() for shard in self.shards],
+            "backfill": {
+                **(self.backfiller.get_stats() if self.backfiller else {}),
+                "running": len(self._backfill_tasks)
+            },
             "reconnection_stats": self.recovery.get_status_report()
         }
 
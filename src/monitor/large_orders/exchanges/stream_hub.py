@@ -0,0 +1,276 @@
+"""
+共享交易流中枢
+所有监控共用一个币安采集器（按交易对分片的组合流连接）：订阅各消费者交易对的并集，每条消息只解析一次，
+按消费者的交易对过滤后分发TradeEvent批次
+"""
+import asyncio
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional
+
+from ..src.base import BaseExchangeCollector, ConnectionState, TradeEvent
+from .binance import create_binance_client
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class TradeSubscription:
+    """交易流订阅"""
+    name: str
+    symbols: FrozenSet[str]
+    callback: Callable[[List[TradeEvent]], None]  # 收到只读的交易批次
+    loop: Optional[asyncio.AbstractEventLoop] = None  # 设置时回调调度到该事件循环执行，否则在中枢线程中直接调用
+    state_callback: Optional[Callable[[ConnectionState], None]] = None
+    covers_all: bool = False  # 是否订阅了中枢的全部交易对（无需过滤）
+    trades_delivered: int = 0
+
+
+class TradeStreamHub:
+    """
+    共享交易流中枢
+
+    1. 单个连接：在独立线程的事件循环中运行一个采集器，订阅所有消费者交易对的并集
+    2. 只解析一次：采集器按批次发射TradeEvent，中枢将同一批次分发给所有消费者
+    3. 按消费者过滤：每个消费者只收到自己订阅的交易对
+    4. 跨线程分发：消费者可指定自己的事件循环，回调通过call_soon_threadsafe调度
+    """
+
+    def __init__(
+        self,
+        client_factory: Callable[[List[str]], BaseExchangeCollector] = create_binance_client
+    ):
+        """
+        初始化交易流中枢
+
+        Args:
+            client_factory: 按交易对列表创建采集器的工厂函数
+        """
+        self._client_factory = client_factory
+        self._subscriptions: Dict[str, TradeSubscription] = {}
+        self._symbols: FrozenSet[str] = frozenset()
+        self._lock = threading.Lock()
+
+        self.client: Optional[BaseExchangeCollector] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stop_event: Optional[asyncio.Event] = None
+        self._stop_requested = False
+        self._thread: Optional[threading.Thread] = None
+
+        self.stats = {
+            "batches_received": 0,
+            "trades_received": 0,
+            "deliveries": 0,
+            "delivery_errors": 0,
+        }
+
+    @property
+    def symbols(self) -> List[str]:
+        """所有消费者交易对的并集"""
+        return sorted(self._symbols)
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def subscribe(
+        self,
+        name: str,
+        symbols: Iterable[str],
+        callback: Callable[[List[TradeEvent]], None],
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+        state_callback: Optional[Callable[[ConnectionState], None]] = None
+    ) -> TradeSubscription:
+        """
+        注册消费者（同名消费者被替换）
+
+        Args:
+            name: 消费者名称
+            symbols: 订阅的交易对
+            callback: 交易批次回调（批次只读，多个消费者共享同一列表）
+            loop: 回调所在的事件循环；为None时在中枢线程中直接调用，回调需自行保证线程安全
+            state_callback: 连接状态回调（同样调度到loop）
+
+        Returns:
+            TradeSubscription: 订阅对象
+        """
+        subscription = TradeSubscription(
+            name=name,
+            symbols=frozenset(symbol.upper() for symbol in symbols),
+            callback=callback,
+            loop=loop,
+            state_callback=state_callback
+        )
+        with self._lock:
+            self._subscriptions[name] = subscription
+            self._update_symbols()
+
+        # 运行中出现新交易对时追加订阅
+        if self._loop is not None and self.client is not None:
+            asyncio.run_coroutine_threadsafe(self.client.add_symbols(self.symbols), self._loop)
+
+        logger.info(f"交易流消费者 {name} 订阅 {len(subscription.symbols)} 个交易对")
+        return subscription
+
+    def unsubscribe(self, name: str) -> None:
+        """注销消费者，不再被任何消费者订阅的交易对取消订阅，最后一个消费者注销后关闭连接"""
+        with self._lock:
+            if self._subscriptions.pop(name, None) is None:
+                return
+            previous = self._symbols
+            self._update_symbols()
+            dropped = sorted(previous - self._symbols)
+            remaining = len(self._subscriptions)
+
+        logger.info(f"交易流消费者 {name} 已注销，剩余 {remaining} 个")
+        if remaining == 0:
+            self.stop()
+        elif dropped and self._loop is not None and self.client is not None:
+            asyncio.run_coroutine_threadsafe(self.client.remove_symbols(dropped), self._loop)
+
+    def _update_symbols(self) -> None:
+        """重新计算交易对并集（调用方持有锁）"""
+        self._symbols = frozenset().union(
+            *(subscription.symbols for subscription in self._subscriptions.values())
+        )
+        for subscription in self._subscriptions.values():
+            subscription.covers_all = subscription.symbols >= self._symbols
+
+    def start(self, timeout: float = 10.0) -> None:
+        """
+        在独立线程中启动共享连接（已启动时无操作）
+
+        stop()之后立即start()时，先等待正在退出的中枢线程结束再启动新线程
+
+        Args:
+            timeout: 等待正在退出的中枢线程的秒数
+        """
+        with self._lock:
+            stopping = self._thread if self._stop_requested and self.running else None
+        if stopping is not None and stopping is not threading.current_thread():
+            stopping.join(timeout)
+
+        with self._lock:
+            if self.running:
+                if self._stop_requested:
+                    logger.error("交易流中枢线程未能在超时内退出，无法重新启动")
+                return
+            self._stop_requested = False
+            self._thread = threading.Thread(
+                target=asyncio.run,
+                args=(self._run(),),
+                name="trade-stream-hub",
+                daemon=True
+            )
+            self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """
+        停止共享连接
+
+        Args:
+            timeout: 等待中枢线程退出的秒数，为None时不等待
+        """
+        self._stop_requested = True
+        loop, stop_event, thread = self._loop, self._stop_event, self._thread
+        if loop is not None and stop_event is not None:
+            try:
+                loop.call_soon_threadsafe(stop_event.set)
+            except RuntimeError:
+                # 事件循环已关闭
+                pass
+        if timeout is not None and thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+
+    async def _run(self) -> None:
+        """中枢线程主协程：启动采集器，直到stop()"""
+        self._stop_event = asyncio.Event()
+        self.client = self._client_factory(self.symbols)
+        self.client.set_trade_batch_callback(self._dispatch)
+        self.client.set_state_callback(self._dispatch_state)
+        self._loop = asyncio.get_running_loop()
+
+        try:
+            await self.client.start()
+            # 补订阅启动期间新增的交易对
+            await self.client.add_symbols(self.symbols)
+            if not self._stop_requested:
+                await self._stop_event.wait()
+        except Exception as e:
+            logger.error(f"交易流中枢运行失败: {e}", exc_info=True)
+        finally:
+            self._loop = None
+            await self.client.stop()
+            logger.info("交易流中枢已停止")
+
+    def _dispatch(self, trades: List[TradeEvent]) -> None:
+        """分发一个交易批次（在中枢线程中调用）"""
+        self.stats["batches_received"] += 1
+        self.stats["trades_received"] += len(trades)
+
+        with self._lock:
+            subscriptions = list(self._subscriptions.values())
+
+        for subscription in subscriptions:
+            if subscription.covers_all:
+                batch = trades
+            else:
+                batch = [trade for trade in trades if trade.symbol in subscription.symbols]
+                if not batch:
+                    continue
+            self._deliver(subscription, subscription.callback, batch)
+            subscription.trades_delivered += len(batch)
+
+    def _dispatch_state(self, state: ConnectionState) -> None:
+        """分发连接状态（在中枢线程中调用）"""
+        with self._lock:
+            subscriptions = list(self._subscriptions.values())
+        for subscription in subscriptions:
+            if subscription.state_callback:
+                self._deliver(subscription, subscription.state_callback, state)
+
+    def _deliver(self, subscription: TradeSubscription, callback: Callable, payload) -> None:
+        """调用消费者回调，单个消费者出错不影响其他消费者"""
+        try:
+            if subscription.loop is not None:
+                subscription.loop.call_soon_threadsafe(callback, payload)
+            else:
+                callback(payload)
+            self.stats["deliveries"] += 1
+        except Exception as e:
+            self.stats["delivery_errors"] += 1
+            logger.error(f"交易流分发到 {subscription.name} 失败: {e}", exc_info=True)
+
+    def get_stats(self) -> Dict:
+        """获取统计信息"""
+        with self._lock:
+            consumers = {
+                name: {
+                    "symbols": len(subscription.symbols),
+                    "trades_delivered": subscription.trades_delivered
+                }
+                for name, subscription in self._subscriptions.items()
+            }
+        return {
+            **self.stats,
+            "running": self.running,
+            "symbols": len(self._symbols),
+            "consumers": consumers,
+            "client": self.client.get_stats() if self.client else {}
+        }
+
+
+_trade_stream_hub: Optional[TradeStreamHub] = None
+_trade_stream_hub_lock = threading.Lock()
+
+
+def get_trade_stream_hub() -> TradeStreamHub:
+    """获取进程级共享交易流中枢"""
+    global _trade_stream_hub
+
+    with _trade_stream_hub_lock:
+        if _trade_stream_hub is None:
+            _trade_stream_hub = TradeStreamHub()
+
+    return _trade_stream_hub
@@ -0,0 +1,163 @@
+"""
+币安交易消息解码
+支持@trade（逐笔成交）和@aggTrade（同一吃单在同一价格的成交归集为一条）两种交易流
+按可用性选择解码后端：msgspec（类型化结构体，直接解码为数值） > orjson > 标准库json
+"""
+import json
+from typing import Any, Dict, Optional, Union
+
+from ..src.base import TradeEvent
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+BACKEND_MSGSPEC = "msgspec"
+BACKEND_ORJSON = "orjson"
+BACKEND_JSON = "json"
+
+STREAM_TRADE = "trade"
+STREAM_AGG_TRADE = "aggTrade"
+STREAM_TYPES = (STREAM_TRADE, STREAM_AGG_TRADE)
+
+if msgspec is not None:
+    DEFAULT_BACKEND = BACKEND_MSGSPEC
+elif orjson is not None:
+    DEFAULT_BACKEND = BACKEND_ORJSON
+else:
+    DEFAULT_BACKEND = BACKEND_JSON
+
+# 解码失败时可能抛出的异常（orjson.JSONDecodeError是json.JSONDecodeError的子类）
+DECODE_ERRORS = (ValueError,) + ((msgspec.DecodeError,) if msgspec is not None else ())
+
+if msgspec is not None:
+    class _BinanceMessage(msgspec.Struct):
+        """币安消息结构：交易字段按类型直接解码（价格、数量由字符串转为浮点数），其余字段忽略"""
+        e: str = ""
+        s: str = ""
+        p: float = 0.0
+        q: float = 0.0
+        t: int = 0
+        a: int = 0
+        f: int = 0
+        l: int = 0
+        T: int = 0
+        m: bool = False
+        result: Any = None
+        id: Optional[int] = None
+
+    class _CombinedMessage(msgspec.Struct):
+        """组合流消息结构：{"stream": "...", "data": {...}}，订阅响应没有data"""
+        stream: str = ""
+        data: Optional[_BinanceMessage] = None
+        result: Any = None
+        id: Optional[int] = None
+
+
+class TradeDecoder:
+    """
+    币安@trade / @aggTrade消息解码器
+
+    交易消息直接构造TradeEvent；其他消息（如订阅响应）返回解码后的字典。
+    组合流（/stream?streams=）外层的{"stream", "data"}信封会被自动拆开。
+    raw_data默认不保留，调试时通过keep_raw开启。
+    """
+
+    def __init__(self, backend: Optional[str] = None, keep_raw: bool = False, combined: bool = False):
+        """
+        初始化解码器
+
+        Args:
+            backend: 解码后端（msgspec / orjson / json），默认选择已安装的最快后端
+            keep_raw: 是否在TradeEvent.raw_data中保留原始消息字典
+            combined: 消息是否来自组合流（msgspec后端据此选择结构体，其他后端自动识别）
+        """
+        backend = backend or DEFAULT_BACKEND
+        if backend == BACKEND_MSGSPEC and msgspec is None:
+            raise ValueError("msgspec is not installed")
+        if backend == BACKEND_ORJSON and orjson is None:
+            raise ValueError("orjson is not installed")
+        if backend not in (BACKEND_MSGSPEC, BACKEND_ORJSON, BACKEND_JSON):
+            raise ValueError(f"Invalid JSON backend: {backend}")
+
+        self.backend = backend
+        self.keep_raw = keep_raw
+        self.combined = combined
+        self._loads = orjson.loads if orjson is not None and backend != BACKEND_JSON else json.loads
+        self._struct_decoder = None
+        if backend == BACKEND_MSGSPEC:
+            self._struct_decoder = msgspec.json.Decoder(
+                _CombinedMessage if combined else _BinanceMessage, strict=False
+            )
+
+    def decode(self, message: Union[str, bytes]) -> Union[TradeEvent, Dict]:
+        """
+        解码一条WebSocket消息
+
+        Args:
+            message: 原始消息
+
+        Returns:
+            交易消息返回TradeEvent，其他消息返回字典
+
+        Raises:
+            DECODE_ERRORS中的异常：消息不是合法JSON或字段类型不符
+        """
+        if self._struct_decoder is None:
+            data = self._loads(message)
+            if "data" in data:
+                data = data["data"]
+            if data.get("e") not in STREAM_TYPES:
+                return data
+            return self.trade_from_dict(data)
+
+        # msgspec后端：一次解码得到类型化字段
+        data = self._struct_decoder.decode(message)
+        if self.combined:
+            if data.data is None:
+                return {"stream": data.stream, "result": data.result, "id": data.id}
+            data = data.data
+        if data.e == STREAM_TRADE:
+            return TradeEvent(
+                "binance", data.s, "SELL" if data.m else "BUY", "MARKET",
+                data.p, data.q, data.p * data.q, data.T, True, str(data.t),
+                self._loads(message) if self.keep_raw else None
+            )
+        if data.e == STREAM_AGG_TRADE:
+            return TradeEvent(
+                "binance", data.s, "SELL" if data.m else "BUY", "MARKET",
+                data.p, data.q, data.p * data.q, data.T, True, str(data.a),
+                self._loads(message) if self.keep_raw else None, data.f, data.l
+            )
+        return {"e": data.e, "result": data.result, "id": data.id}
+
+    def trade_from_dict(self, data: Dict) -> TradeEvent:
+        """
+        由已解码的交易消息字典构造TradeEvent
+
+        Args:
+            data: 币安@trade或@aggTrade消息字典
+
+        Returns:
+            TradeEvent: 交易事件（m为True表示买方是挂单方，即主动卖出）。
+                @aggTrade的trade_id为归集成交ID（a），并带有首末成交ID（f、l）
+        """
+        price = float(data.get("p", 0))
+        quantity = float(data.get("q", 0))
+        if data.get("e") == STREAM_AGG_TRADE:
+            return TradeEvent(
+                "binance", data.get("s", ""), "SELL" if data.get("m", False) else "BUY", "MARKET",
+                price, quantity, price * quantity, data.get("T", 0), True, str(data.get("a", "")),
+                data if self.keep_raw else None, data.get("f"), data.get("l")
+            )
+        return TradeEvent(
+            "binance", data.get("s", ""), "SELL" if data.get("m", False) else "BUY", "MARKET",
+            price, quantity, price * quantity, data.get("T", 0), True, str(data.get("t", "")),
+            data if self.keep_raw else None
+        )
@@ -14,8 +14,14 @@ class LargeOrderMonitor:
     """
     Main controller for large order monitoring
     Orchestrates data collection, aggregation, detection, and notification
+
+    Thresholds are checked from the trade path: each incoming trade re-checks only its own (symbol, side).
+    Expiry can only lower a window total, so the background loop just prunes, cleans up and logs stats.
     """
 
+    # Seconds between maintenance passes of the background loop (pruning quiet symbols)
+    MAINTENANCE_INTERVAL_SECONDS = 5
+
     def __init__(
         self,
         telegram_bot,
@@ -23,7 +29,8 @@ class LargeOrderMonitor:
         threshold_usdt: float = 2_000_000,
         time_window_minutes: int = 5,
         cooldown_minutes: int = 10,
-        storage_path: str = "data/large_orders"
+        storage_path: str = "data/large_orders",
+        stream_hub=None
     ):
         """
         Initialize the monitor
@@ -35,6 +42,8 @@ class LargeOrderMonitor:
             time_window_minutes: Time window in minutes
             cooldown_minutes: Cooldown period in minutes
             storage_path: Path for data storage
+            stream_hub: Optional shared TradeStreamHub; when given, trades come from the hub's
+                connection instead of a dedicated BinanceOrderBookCollector
         """
         self.telegram_bot = telegram_bot
 
@@ -53,16 +62,19 @@ class LargeOrderMonitor:
             cooldown_minutes=cooldown_minutes
         )
 
+        self.storage_path = storage_path
         self.storage = FileStorage(storage_path)
 
         self.notifier = TelegramNotifier(telegram_bot)
 
         # Collector will be initialized when start() is called
         self.collector = None
+        self.stream_hub = stream_hub
 
         # Control flags
         self.is_running = False
         self.main_thread = None
+        self._stop_event = threading.Event()
 
         # Statistics
         self.start_time = 0
@@ -113,8 +125,11 @@ class LargeOrderMonitor:
             trade: Trade data dictionary
         """
         try:
-            # Add trade to aggregator
-            self.aggregator.add_trade(trade)
+            # Add trade to aggregator and re-check the window of this (symbol, side) only
+            total = self.aggregator.add_trade(trade)
+            self.detector.check_threshold(
+                trade['symbol'], trade['side'], total, trade['trade_time']
+            )
 
             # Save to storage
             self.storage.save_trade(trade)
@@ -125,6 +140,27 @@ class LargeOrderMonitor:
         except Exception as e:
             logger.error(f"Error processing trade: {e}")
 
+    def _on_trade_events(self, trades):
+        """
+        Callback for TradeEvent batches from a shared TradeStreamHub (runs in the hub thread)
+
+        Args:
+            trades: List of TradeEvent
+        """
+        for trade in trades:
+            self._on_trade_received({
+                'exchange': trade.exchange,
+                'symbol': trade.symbol,
+                'side': trade.side,
+                'order_type': trade.order_type,
+                'price': trade.price,
+                'quantity': trade.quantity,
+                'amount': trade.amount,
+                'trade_time': trade.trade_time,
+                'is_taker': trade.is_taker,
+                'trade_id': trade.trade_id,
+            })
+
     def start(self):
         """
         Start the large order monitor
@@ -140,14 +176,23 @@ class LargeOrderMonitor:
         logger.info(f"Cooldown: {self.detector.cooldown_ms / 1000 / 60:.0f} minutes")
 
         try:
-            # Initialize and start the collector
-            self.collector = BinanceOrderBookCollector(
-                symbols=self.symbols,
-                on_trade_callback=self._on_trade_received
-            )
-            self.collector.start()
+            # stop() closed the previous storage for good
+            if self.storage.closed:
+                self.storage = FileStorage(self.storage_path)
+
+            # Share the hub's connection if given, otherwise open a dedicated one
+            if self.stream_hub is not None:
+                self.stream_hub.subscribe('large_order_legacy', self.symbols, self._on_trade_events)
+                self.stream_hub.start()
+            else:
+                self.collector = BinanceOrderBookCollector(
+                    symbols=self.symbols,
+                    on_trade_callback=self._on_trade_received
+                )
+                self.collector.start()
 
             # Set running flag
+            self._stop_event.clear()
             self.is_running = True
             self.start_time = time.time()
 
@@ -163,29 +208,18 @@ class LargeOrderMonitor:
 
     def _run(self):
         """
-        Main monitoring loop
-        Runs in a separate thread
+        Background maintenance loop
+        Runs in a separate thread at low frequency: threshold checks happen in _on_trade_received
         """
         logger.info("Monitor main loop started")
 
         last_cleanup = time.time()
         last_stats_log = time.time()
 
-        while self.is_running:
+        while not self._stop_event.wait(self.MAINTENANCE_INTERVAL_SECONDS):
             try:
-                current_time_ms = int(time.time() * 1000)
-
-                # Check each symbol for threshold violations
-                for symbol in self.symbols:
-                    # Check BUY direction
-                    buy_total = self.aggregator.get_5min_total(symbol, 'BUY', current_time_ms)
-                    if buy_total > 0:
-                        self.detector.check_threshold(symbol, 'BUY', buy_total, current_time_ms)
-
-                    # Check SELL direction
-                    sell_total = self.aggregator.get_5min_total(symbol, 'SELL', current_time_ms)
-                    if sell_total > 0:
-                        self.detector.check_threshold(symbol, 'SELL', sell_total, current_time_ms)
+                # Release trades of symbols that stopped trading (totals only decrease, no check needed)
+                self.aggregator.prune_all(int(time.time() * 1000))
 
                 # Periodic cleanup (every 5 minutes)
                 if time.time() - last_cleanup > 300:
@@ -198,12 +232,8 @@ class LargeOrderMonitor:
                     self._log_stats()
                     last_stats_log = time.time()
 
-                # Sleep for 100ms before next check
-                time.sleep(0.1)
-
             except Exception as e:
                 logger.error(f"Error in monitor loop: {e}")
-                time.sleep(1)
 
         logger.info("Monitor main loop stopped")
 
@@ -214,8 +244,11 @@ class LargeOrderMonitor:
         logger.info("Stopping large order monitor...")
 
         self.is_running = False
+        self._stop_event.set()
 
         # Stop the collector
+        if self.stream_hub is not None:
+            self.stream_hub.unsubscribe('large_order_legacy')
         if self.collector:
             self.collector.stop()
             self.collector = None
@@ -224,6 +257,9 @@ class LargeOrderMonitor:
         if self.main_thread and self.main_thread.is_alive():
             self.main_thread.join(timeout=5)
 
+        # Write trades still buffered in storage
+        self.storage.close()
+
         # Log final statistics
         self._log_stats()
 
@@ -4,7 +4,7 @@ Base Exchange Collector - 抽象基类设计
 """
 from abc import ABC, abstractmethod
 from typing import Dict, List, Optional, Callable
-from dataclasses import dataclass
+from dataclasses import dataclass, fields
 from enum import Enum
 import logging
 
@@ -21,9 +21,25 @@ class ConnectionState(Enum):
     CLOSED = "closed"
 
 
+def _with_slots(cls):
+    """
+    按数据类字段重建带__slots__的类（等同Python 3.10的dataclass(slots=True)，兼容3.9）
+
+    字段默认值已绑定在生成的__init__上，重建时去掉同名类属性，避免与__slots__冲突
+    """
+    names = tuple(f.name for f in fields(cls))
+    namespace = {
+        key: value for key, value in cls.__dict__.items()
+        if key not in names and key not in ("__dict__", "__weakref__")
+    }
+    namespace["__slots__"] = names
+    return type(cls)(cls.__name__, cls.__bases__, namespace)
+
+
+@_with_slots
 @dataclass
 class TradeEvent:
-    """交易事件数据模型"""
+    """交易事件数据模型（slots：无实例__dict__，每笔交易少一次字典分配）"""
     exchange: str
     symbol: str  # e.g., "BTCUSDT"
     side: str  # "BUY" or "SELL"
@@ -33,8 +49,10 @@ class TradeEvent:
     amount: float  # total value in quote currency
     trade_time: int  # millisecond timestamp
     is_taker: bool  # True if taker (market order)
-    trade_id: str
-    raw_data: Dict  # 原始数据，用于调试
+    trade_id: str  # @trade为成交ID，@aggTrade为归集成交ID
+    raw_data: Optional[Dict] = None  # 原始数据，仅调试时保留
+    first_trade_id: Optional[int] = None  # @aggTrade归集的首笔成交ID
+    last_trade_id: Optional[int] = None  # @aggTrade归集的末笔成交ID
 
 
 class BaseExchangeCollector(ABC):
@@ -53,6 +71,7 @@ class BaseExchangeCollector(ABC):
         self.symbols = symbols
         self.state = ConnectionState.DISCONNECTED
         self.trade_callback: Optional[Callable[[TradeEvent], None]] = None
+        self.trade_batch_callback: Optional[Callable[[List[TradeEvent]], None]] = None
         self.state_callback: Optional[Callable[[ConnectionState], None]] = None
         self.error_callback: Optional[Callable[[Exception], None]] = None
         
@@ -110,6 +129,10 @@ class BaseExchangeCollector(ABC):
         """设置交易事件回调函数"""
         self.trade_callback = callback
     
+    def set_trade_batch_callback(self, callback: Callable[[List[TradeEvent]], None]) -> None:
+        """设置批量交易事件回调函数（设置后采集器按批次发射交易）"""
+        self.trade_batch_callback = callback
+    
     def set_state_callback(self, callback: Callable[[ConnectionState], None]) -> None:
         """设置状态变更回调函数"""
         self.state_callback = callback
@@ -136,6 +159,19 @@ class BaseExchangeCollector(ABC):
         if self.trade_callback:
             self.trade_callback(trade)
     
+    def _emit_trades(self, trades: List[TradeEvent]) -> None:
+        """批量发射交易事件（未设置批量回调时逐笔回调）"""
+        if not trades:
+            return
+        self.stats["trades_received"] += len(trades)
+        self.stats["last_trade_time"] = trades[-1].trade_time
+        
+        if self.trade_batch_callback:
+            self.trade_batch_callback(trades)
+        elif self.trade_callback:
+            for trade in trades:
+                self.trade_callback(trade)
+    
     def _emit_error(self, error: Exception) -> None:
         """发射错误事件"""
         logger.error(f"{self.exchange_name}: {error}", exc_info=True)
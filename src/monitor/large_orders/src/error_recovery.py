@@ -57,6 +57,9 @@ class ErrorRecoveryManager:
     5. 指数退避重连
     """
     
+    # 保留的重连尝试记录条数（长时间运行时内存不随断线次数增长）
+    MAX_ATTEMPT_HISTORY = 100
+    
     def __init__(
         self,
         exchange_name: str,
@@ -222,25 +225,35 @@ class ErrorRecoveryManager:
                 severity
             )
     
+    def get_backoff(self, attempt: int) -> float:
+        """
+        计算第attempt次连续重连前的退避时间
+        
+        Args:
+            attempt: 连续重连次数（从1开始，连接成功后重新计数）
+        
+        Returns:
+            float: 退避秒数 min(base_backoff * 2^(attempt-1), max_backoff)
+        """
+        return min(self.base_backoff * (2 ** (max(attempt, 1) - 1)), self.max_backoff)
+    
     def start_reconnect_attempt(self) -> int:
-        """开始重连尝试"""
-        attempt_number = len(self.reconnect_attempts) + 1
+        """开始重连尝试（编号全局递增，退避时间按连续失败次数计算）"""
+        attempt_number = self.stats["reconnects_attempted"] + 1
+        backoff = self.get_backoff(self.consecutive_failures + 1)
         
         # 创建重连记录
         attempt = ReconnectAttempt(
             attempt_number=attempt_number,
-            start_time=datetime.now()
+            start_time=datetime.now(),
+            backoff_seconds=backoff
         )
         
         self.reconnect_attempts.append(attempt)
+        if len(self.reconnect_attempts) > self.MAX_ATTEMPT_HISTORY:
+            del self.reconnect_attempts[:-self.MAX_ATTEMPT_HISTORY]
         self.stats["reconnects_attempted"] += 1
         
-        # 计算退避时间
-        backoff = min(
-            self.base_backoff * (2 ** (attempt_number - 1)),
-            self.max_backoff
-        )
-        
         logger.info(
             f"{self.exchange_name}: 开始第 {attempt_number} 次重连，"
             f"退避时间 {backoff:.1f}秒"
@@ -255,15 +268,16 @@ class ErrorRecoveryManager:
         error: Optional[Exception] = None
     ) -> None:
         """完成重连尝试"""
-        if attempt_number > len(self.reconnect_attempts):
+        # 只保留最近的记录：按编号换算在列表中的位置
+        index = attempt_number - 1 - (self.stats["reconnects_attempted"] - len(self.reconnect_attempts))
+        if not 0 <= index < len(self.reconnect_attempts):
             logger.error(f"无效的重连尝试编号: {attempt_number}")
             return
         
-        attempt = self.reconnect_attempts[attempt_number - 1]
+        attempt = self.reconnect_attempts[index]
         attempt.end_time = datetime.now()
         attempt.success = success
         attempt.error = error
-        attempt.backoff_seconds = 0  # 将在reconnect方法中设置
         
         if success:
             self._on_successful_reconnect(attempt)
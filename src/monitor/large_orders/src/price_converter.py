@@ -3,13 +3,23 @@ USD转换策略实现
 支持多种稳定币和计价货币的USD转换
 """
 import asyncio
+import json
 import logging
-from typing import Dict, Optional, Tuple
-from dataclasses import dataclass
+from typing import Dict, Optional, Set, Tuple
+from dataclasses import dataclass, field, replace
+
 import aiohttp
 
+from ....http_client import AsyncHTTPClient, get_async_http_client
+
 logger = logging.getLogger(__name__)
 
+# 币安最新价格接口（symbols参数一次查询多个交易对，symbol参数查询单个）
+TICKER_PRICE_URL = "https://api.binance.com/api/v3/ticker/price"
+
+# 首次遇到某货币时等待汇率刷新的最长时间（秒）
+FIRST_REFRESH_TIMEOUT = 5.0
+
 
 @dataclass
 class ExchangeRate:
@@ -19,6 +29,28 @@ class ExchangeRate:
     source: str  # 数据来源：binance, coingecko, etc.
     timestamp: int  # 毫秒时间戳
     ttl: int  # 缓存时间（秒）
+    stale: bool = False  # 最近一次刷新失败，当前为旧值
+
+
+@dataclass(frozen=True)
+class RateSnapshot:
+    """汇率快照：发布后不再修改，读取无需加锁，刷新时整体替换"""
+    rates: Dict[str, ExchangeRate] = field(default_factory=dict)
+    refreshed_at: int = 0  # 最近一次成功刷新的时间（毫秒）
+    stale: bool = False  # 最近一次刷新是否失败
+    
+
+# 交易对换算策略
+STRATEGY_STABLE = "stable"  # 稳定币计价（含USDT）：价格 * 数量，同步计算
+STRATEGY_CROSS = "cross"  # 其他计价货币：通过基础货币/USDT汇率中转
+
+
+@dataclass(frozen=True)
+class SymbolStrategy:
+    """交易对换算策略（每个交易对只解析一次）"""
+    strategy: str  # STRATEGY_STABLE / STRATEGY_CROSS
+    base_coin: str  # 基础货币，如"BTC"
+    quote_coin: str  # 计价货币，如"USDT"
 
 
 class PriceConverter:
@@ -29,14 +61,42 @@ class PriceConverter:
     1. 稳定币：USDT, BUSD, USDC -> 1:1转换
     2. USDT交易对：XXXUSDT -> 直接使用价格
     3. 跨币种转换：BTC/ETH -> 通过USDT转换
-    4. 实时汇率：API获取最新汇率
+    4. 实时汇率：后台任务定期批量刷新汇率快照，转换时只读快照；
+       某计价货币首次出现时等待一次刷新（最长FIRST_REFRESH_TIMEOUT秒），之后不再等待网络
     """
     
-    def __init__(self, cache_ttl: int = 60):
+    def __init__(
+        self,
+        cache_ttl: int = 60,
+        http_client: Optional[AsyncHTTPClient] = None,
+        refresh_interval: Optional[float] = None
+    ):
+        """
+        初始化价格转换器
+        
+        Args:
+            cache_ttl: 汇率缓存时间（秒）
+            http_client: 共享的keep-alive HTTP客户端，默认使用进程级实例
+            refresh_interval: 后台刷新间隔（秒），默认为缓存时间的一半，在过期前完成刷新
+        """
         self.cache_ttl = cache_ttl
-        self._rate_cache: Dict[str, ExchangeRate] = {}
-        self._cache_lock = asyncio.Lock()
-        self._session: Optional[aiohttp.ClientSession] = None
+        self.refresh_interval = refresh_interval or cache_ttl / 2
+        self._snapshot = RateSnapshot()
+        self._strategies: Dict[str, SymbolStrategy] = {}
+        self.http_client = http_client or get_async_http_client()
+        self._session = None
+        
+        # 需要汇率的货币（"USDT"表示USDT/USD汇率），由后台任务批量刷新
+        self._tracked_coins: Set[str] = set()
+        self._refresh_wakeup = asyncio.Event()
+        self._refresh_task: Optional[asyncio.Task] = None
+        # 首次出现的货币等待中的一次刷新；已等待过（或已有汇率）的货币不再等待
+        self._first_refresh: Dict[str, asyncio.Task] = {}
+        self._first_refresh_done: Set[str] = set()
+        # 币安不存在的交易对（批量请求会因此整体失败，之后不再请求）
+        self._unlisted_tickers: Set[str] = set()
+        # 已提示过汇率缺失的货币（每种货币只提示一次）
+        self._missing_rate_warned: Set[str] = set()
         
         # 稳定币列表（1:1兑换USD）
         self._stable_coins = {
@@ -44,25 +104,28 @@ class PriceConverter:
         }
     
     async def __aenter__(self):
-        """异步上下文管理器入口"""
-        self._session = aiohttp.ClientSession(
-            timeout=aiohttp.ClientTimeout(total=5),
-            headers={'User-Agent': 'Telegram-Crypto-Alerts/1.0'}
-        )
+        """异步上下文管理器入口（复用共享会话，不再单独建立连接池，并启动汇率刷新任务）"""
+        self._session = self.http_client.get_session()
+        self.start_refresh()
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        """异步上下文管理器出口"""
-        if self._session:
-            await self._session.close()
+        """异步上下文管理器出口（停止汇率刷新任务，共享会话由HTTP客户端统一关闭）"""
+        await self.stop_refresh()
+        self._session = None
+    
+    @property
+    def _rate_cache(self) -> Dict[str, ExchangeRate]:
+        """当前快照中的汇率"""
+        return self._snapshot.rates
     
     def _is_stable_coin(self, symbol: str) -> bool:
         """检查是否为稳定币"""
         return symbol.upper() in self._stable_coins
     
     def _normalize_symbol(self, symbol: str) -> str:
-        """标准化交易对符号（移除连字符，转换为大写）"""
-        return symbol.replace("-", "").upper()
+        """标准化交易对符号（移除连字符和斜杠，转换为大写）"""
+        return symbol.replace("-", "").replace("/", "").upper()
     
     async def convert_to_usd(self, symbol: str, price: float, quantity: float) -> float:
         """
@@ -85,8 +148,8 @@ class PriceConverter:
             >>> converter.convert_to_usd("BTC/USDC", 50000, 1)
             50000.0  # BTC/USDC -> $50,000
             
-            >>> converter.convert_to_usd("ETH/BTC", 20, 100)  
-            1000000.0  # ETH/BTC -> 100 ETH * $5,000/ETH
+            >>> converter.convert_to_usd("ETH/BTC", 0.05, 100)  
+            250000.0  # ETH/BTC -> 0.05 BTC * 100 * $50,000/BTC
         """
         try:
             # 类型验证
@@ -97,43 +160,118 @@ class PriceConverter:
             if not isinstance(quantity, (int, float)):
                 raise TypeError(f"quantity must be numeric, got {type(quantity).__name__}: {quantity}")
             
-            # 标准化符号
-            normalized = self._normalize_symbol(symbol)
-            
-            # 提取基础货币和计价货币
-            base_coin, quote_coin = self._extract_currencies(normalized)
-            
-            # 情况1: 稳定币交易对（USDT, BUSD, USDC等）
-            if self._is_stable_coin(quote_coin):
-                # 直接使用价格 * 数量
-                return price * quantity
+            return price * quantity * await self.get_usd_multiplier(symbol)
             
-            # 情况2: USDT作为计价货币（通过API获取USDT/USD汇率）
-            elif quote_coin == "USDT":
-                # USDT通常1:1挂钩美元
-                # 但为精确性，仍获取实时汇率
-                usdt_rate = await self._get_usdt_usd_rate()
-                return price * quantity * usdt_rate
-            
-            # 情况3: 其他交易对（如ETH/BTC）
-            else:
-                # 需要通过中间货币转换
-                # 步骤1: 将基础货币转换为USDT
-                base_to_usdt = await self._get_coin_usdt_rate(base_coin)
-                
-                # 步骤2: 将USDT转换为USD
-                usdt_to_usd = await self._get_usdt_usd_rate()
-                
-                # 步骤3: 计算总价值
-                # base_value_usdt = quantity * price * base_to_usdt
-                # total_value_usd = base_value_usdt * usdt_to_usd
-                return quantity * price * base_to_usdt * usdt_to_usd
-                
         except Exception as e:
             logger.error(f"转换失败: {symbol} @ {price} * {quantity} - {e}")
             # 转换失败时返回0，触发告警
             return 0.0
     
+    def classify_symbol(self, symbol: str) -> SymbolStrategy:
+        """
+        获取交易对的换算策略（首次解析后缓存，之后为一次字典查询）
+        
+        Args:
+            symbol: 交易对符号（支持多种格式）
+            
+        Returns:
+            SymbolStrategy: 换算策略
+            
+        Raises:
+            ValueError: 无法解析交易对符号
+        """
+        strategy = self._strategies.get(symbol)
+        if strategy is not None:
+            return strategy
+        
+        # 标准化符号并提取基础货币和计价货币
+        base_coin, quote_coin = self._extract_currencies(self._normalize_symbol(symbol))
+        
+        kind = STRATEGY_STABLE if self._is_stable_coin(quote_coin) else STRATEGY_CROSS
+        
+        strategy = SymbolStrategy(strategy=kind, base_coin=base_coin, quote_coin=quote_coin)
+        self._strategies[symbol] = strategy
+        
+        # 需要汇率的交易对登记到后台刷新列表
+        if kind == STRATEGY_CROSS:
+            self._track_coin("USDT")
+            self._track_coin(quote_coin)
+        return strategy
+    
+    def convert_to_usd_sync(self, symbol: str, price: float, quantity: float) -> Optional[float]:
+        """
+        同步快速路径：稳定币计价交易对直接返回价格 * 数量
+        
+        不做类型检查、不等待、不加锁，供热路径逐笔调用
+        
+        Args:
+            symbol: 交易对符号
+            price: 交易价格
+            quantity: 交易数量
+            
+        Returns:
+            Optional[float]: USD价值；需要汇率的交易对返回None（改用convert_to_usd）
+            
+        Raises:
+            ValueError: 无法解析交易对符号
+        """
+        strategy = self._strategies.get(symbol) or self.classify_symbol(symbol)
+        if strategy.strategy == STRATEGY_STABLE:
+            return price * quantity
+        return None
+    
+    async def get_usd_multiplier(self, symbol: str) -> float:
+        """
+        获取交易对的USD换算系数：USD价值 = 价格 * 数量 * 系数
+        
+        计价货币首次出现且尚无汇率时等待一次刷新，避免后台首次刷新完成前换算为0
+        
+        Args:
+            symbol: 交易对符号（支持多种格式）
+            
+        Returns:
+            float: 换算系数
+        """
+        strategy = self._strategies.get(symbol) or self.classify_symbol(symbol)
+        if strategy.strategy == STRATEGY_STABLE:
+            return 1.0
+        if strategy.quote_coin not in self._first_refresh_done:
+            await self._wait_first_refresh(strategy.quote_coin)
+        return self._get_strategy_multiplier(strategy)
+    
+    async def _wait_first_refresh(self, coin: str) -> None:
+        """货币首次出现时刷新一次汇率并等待（最长FIRST_REFRESH_TIMEOUT秒），同一货币的并发调用共用一次刷新"""
+        if self.get_rate(f"{coin}USDT") is not None:
+            self._first_refresh_done.add(coin)
+            return
+        
+        task = self._first_refresh.get(coin)
+        if task is None:
+            self._track_coin("USDT")
+            self._track_coin(coin)
+            task = self._first_refresh[coin] = asyncio.ensure_future(self.refresh_rates())
+        try:
+            await asyncio.wait_for(asyncio.shield(task), timeout=FIRST_REFRESH_TIMEOUT)
+        except asyncio.TimeoutError:
+            logger.warning(f"等待{coin}/USDT汇率超时，改由后台刷新")
+        except Exception as e:
+            logger.error(f"首次刷新{coin}/USDT汇率失败: {e}")
+        finally:
+            self._first_refresh_done.add(coin)
+            self._first_refresh.pop(coin, None)
+    
+    def _get_strategy_multiplier(self, strategy: SymbolStrategy) -> float:
+        """按策略从汇率快照获取换算系数（不等待网络）"""
+        # 情况1: 稳定币交易对（USDT, BUSD, USDC等），直接使用价格 * 数量
+        if strategy.strategy == STRATEGY_STABLE:
+            return 1.0
+        
+        # 情况2: 其他交易对（如ETH/BTC），价格以计价货币表示，通过计价货币/USDT中转
+        else:
+            quote_to_usdt = self._get_coin_usdt_rate(strategy.quote_coin)
+            usdt_to_usd = self._get_usdt_usd_rate()
+            return quote_to_usdt * usdt_to_usd
+    
     def _extract_currencies(self, symbol: str) -> Tuple[str, str]:
         """
         提取交易对的基础货币和计价货币
@@ -175,86 +313,160 @@ class PriceConverter:
         else:
             raise ValueError(f"无法解析交易对符号: {symbol}")
     
-    async def _get_usdt_usd_rate(self) -> float:
-        """获取USDT对USD的汇率"""
-        async with self._cache_lock:
-            cache_key = "USDT"
-            
-            if cache_key in self._rate_cache:
-                rate = self._rate_cache[cache_key]
-                if self._is_cache_valid(rate):
-                    return rate.rate
+    def _track_coin(self, coin: str) -> None:
+        """登记需要刷新的货币，新货币立即唤醒后台刷新"""
+        if coin not in self._tracked_coins:
+            self._tracked_coins.add(coin)
+            self._refresh_wakeup.set()
+    
+    def get_rate(self, cache_key: str) -> Optional[ExchangeRate]:
+        """
+        从当前快照读取汇率（无锁、不等待网络）
+        
+        Args:
+            cache_key: "USDT"（USDT/USD汇率）或"{货币}USDT"
             
-            # 从币安API获取USDT价格
-            try:
-                if not self._session:
-                    self._session = aiohttp.ClientSession()
-                
-                url = "https://api.binance.com/api/v3/ticker/price"
-                params = {"symbol": "USDTBUSD"}  # BUSD与USD挂钩
-                
-                async with self._session.get(url, params=params) as resp:
-                    data = await resp.json()
-                    rate = float(data["price"])
-                
-                # 更新缓存
-                self._rate_cache[cache_key] = ExchangeRate(
-                    symbol="USDT",
-                    rate=rate,
+        Returns:
+            Optional[ExchangeRate]: 汇率（stale为True表示刷新失败后的旧值），尚未获取时返回None
+        """
+        return self._snapshot.rates.get(cache_key)
+    
+    def _get_usdt_usd_rate(self) -> float:
+        """获取USDT对USD的汇率（尚未获取时返回保守估计1.0）"""
+        self._track_coin("USDT")
+        rate = self.get_rate("USDT")
+        return rate.rate if rate else 1.0
+    
+    def _get_coin_usdt_rate(self, coin: str) -> float:
+        """获取货币对USDT的汇率（尚未获取时返回0.0）"""
+        # 如果是稳定币，直接返回1.0
+        if self._is_stable_coin(coin):
+            return 1.0
+        
+        self._track_coin(coin)
+        rate = self.get_rate(f"{coin}USDT")
+        if rate is None:
+            if coin not in self._missing_rate_warned:
+                self._missing_rate_warned.add(coin)
+                logger.warning(f"{coin}/USDT汇率尚未获取，换算结果为0")
+            return 0.0
+        return rate.rate
+    
+    async def refresh_rates(self) -> bool:
+        """
+        一次批量请求刷新所有登记货币的汇率（只请求需要的交易对），并整体替换快照
+        
+        刷新失败时保留旧值并标记为过期，未出现在返回结果中的货币同样标记为过期
+        
+        Returns:
+            bool: 是否刷新成功
+        """
+        # 缓存键 -> 币安交易对
+        wanted = {
+            coin if coin == "USDT" else f"{coin}USDT": "USDTBUSD" if coin == "USDT" else f"{coin}USDT"
+            for coin in self._tracked_coins
+        }
+        if not wanted:
+            return True
+        
+        previous = self._snapshot
+        try:
+            prices = await self._fetch_prices(
+                sorted(set(wanted.values()) - self._unlisted_tickers)
+            )
+        except Exception as e:
+            logger.error(f"批量刷新汇率失败，继续使用旧值: {e}")
+            self._snapshot = RateSnapshot(
+                rates={key: replace(rate, stale=True) for key, rate in previous.rates.items()},
+                refreshed_at=previous.refreshed_at,
+                stale=True
+            )
+            return False
+        
+        now = int(asyncio.get_event_loop().time() * 1000)
+        rates = {}
+        for cache_key, ticker in wanted.items():
+            if ticker in prices:
+                rates[cache_key] = ExchangeRate(
+                    symbol=cache_key,
+                    rate=float(prices[ticker]),
                     source="binance",
-                    timestamp=int(asyncio.get_event_loop().time() * 1000),
+                    timestamp=now,
                     ttl=self.cache_ttl
                 )
-                
-                logger.debug(f"获取USDT/USD汇率: {rate}")
-                return rate
-                
-            except Exception as e:
-                logger.error(f"获取USDT/USD汇率失败: {e}")
-                # 如果获取失败，返回保守估计1.0
-                return 1.0
+            elif cache_key in previous.rates:
+                rates[cache_key] = replace(previous.rates[cache_key], stale=True)
+        
+        self._snapshot = RateSnapshot(rates=rates, refreshed_at=now, stale=False)
+        logger.debug(f"刷新汇率: {len(rates)}/{len(wanted)}")
+        return True
     
-    async def _get_coin_usdt_rate(self, coin: str) -> float:
-        """获取货币对USDT的汇率"""
-        async with self._cache_lock:
-            cache_key = f"{coin}USDT"
-            
-            if cache_key in self._rate_cache:
-                rate = self._rate_cache[cache_key]
-                if self._is_cache_valid(rate):
-                    return rate.rate
-            
-            # 如果是稳定币，直接返回1.0
-            if self._is_stable_coin(coin):
-                return 1.0
+    async def _fetch_prices(self, tickers: list) -> Dict[str, str]:
+        """
+        查询指定交易对的最新价格
+        
+        一次批量请求；含币安不存在的交易对时整批返回400，此时逐个查询并记下不存在的交易对
+        
+        Args:
+            tickers: 币安交易对列表
             
-            # 从币安API获取价格
+        Returns:
+            Dict[str, str]: 交易对 -> 价格
+        """
+        if not tickers:
+            return {}
+        try:
+            data = await self.http_client.get_json(
+                TICKER_PRICE_URL,
+                params={"symbols": json.dumps(tickers, separators=(",", ":"))}
+            )
+            return {item["symbol"]: item["price"] for item in data}
+        except aiohttp.ClientResponseError as e:
+            if e.status != 400:
+                raise
+        
+        prices = {}
+        for ticker in tickers:
             try:
-                if not self._session:
-                    self._session = aiohttp.ClientSession()
-                
-                url = "https://api.binance.com/api/v3/ticker/price"
-                params = {"symbol": f"{coin}USDT"}
-                
-                async with self._session.get(url, params=params) as resp:
-                    data = await resp.json()
-                    rate = float(data["price"])
-                
-                # 更新缓存
-                self._rate_cache[cache_key] = ExchangeRate(
-                    symbol=cache_key,
-                    rate=rate,
-                    source="binance",
-                    timestamp=int(asyncio.get_event_loop().time() * 1000),
-                    ttl=self.cache_ttl
-                )
-                
-                logger.debug(f"获取{coin}/USDT汇率: {rate}")
-                return rate
-                
+                item = await self.http_client.get_json(TICKER_PRICE_URL, params={"symbol": ticker})
+                prices[item["symbol"]] = item["price"]
+            except aiohttp.ClientResponseError as e:
+                if e.status != 400:
+                    raise
+                self._unlisted_tickers.add(ticker)
+                logger.warning(f"币安不存在交易对{ticker}，不再请求其汇率")
+        return prices
+    
+    def start_refresh(self) -> None:
+        """启动后台汇率刷新任务（需在事件循环中调用）"""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh_loop())
+    
+    async def stop_refresh(self) -> None:
+        """停止后台汇率刷新任务"""
+        if self._refresh_task:
+            self._refresh_task.cancel()
+            try:
+                await self._refresh_task
+            except asyncio.CancelledError:
+                pass
+            self._refresh_task = None
+    
+    async def _refresh_loop(self) -> None:
+        """后台刷新：按间隔在过期前刷新，出现新货币时立即刷新"""
+        while True:
+            self._refresh_wakeup.clear()
+            try:
+                await self.refresh_rates()
             except Exception as e:
-                logger.error(f"获取{coin}/USDT汇率失败: {e}")
-                return 0.0
+                logger.error(f"汇率刷新任务异常: {e}", exc_info=True)
+            
+            try:
+                await asyncio.wait_for(self._refresh_wakeup.wait(), timeout=self.refresh_interval)
+                # 新货币短时间内集中出现时合并为一次刷新
+                await asyncio.sleep(1)
+            except asyncio.TimeoutError:
+                pass
     
     def _is_cache_valid(self, rate: ExchangeRate) -> bool:
         """检查缓存是否仍然有效"""
@@ -263,7 +475,9 @@ class PriceConverter:
     
     def clear_cache(self) -> None:
         """清除汇率缓存"""
-        self._rate_cache.clear()
+        self._snapshot = RateSnapshot()
+        self._first_refresh_done.clear()
+        self._missing_rate_warned.clear()
         logger.info("清除汇率缓存")
     
     def get_cached_rates(self) -> Dict[str, ExchangeRate]:
@@ -272,26 +486,50 @@ class PriceConverter:
     
     async def batch_convert(self, trades: list) -> list:
         """
-        批量转换交易价值
+        批量转换交易价值：每个交易对只获取一次换算系数，再整组相乘
         
         Args:
             trades: 交易列表，每个元素为(symbol, price, quantity)
             
         Returns:
-            list: 转换后的USD价值列表
+            list: 转换后的USD价值列表（转换失败为0）
         """
-        tasks = [
-            self.convert_to_usd(symbol, price, quantity)
-            for symbol, price, quantity in trades
-        ]
+        return await self._convert_grouped(
+            [symbol for symbol, _, _ in trades],
+            [price * quantity for _, price, quantity in trades]
+        )
+    
+    async def convert_trades_to_usd(self, trades: list) -> list:
+        """
+        批量转换TradeEvent的USD价值
         
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        Args:
+            trades: TradeEvent列表
+            
+        Returns:
+            list: 与trades一一对应的USD价值列表（转换失败为0）
+        """
+        return await self._convert_grouped(
+            [trade.symbol for trade in trades],
+            [trade.price * trade.quantity for trade in trades]
+        )
+    
+    async def _convert_grouped(self, symbols: list, notionals: list) -> list:
+        """按交易对分组，每组一次换算系数查询和一次整组乘法"""
+        groups: Dict[str, list] = {}
+        for index, symbol in enumerate(symbols):
+            groups.setdefault(symbol, []).append(index)
         
-        # 转换失败时返回0
-        return [
-            result if isinstance(result, (int, float)) else 0.0
-            for result in results
-        ]
+        results = [0.0] * len(symbols)
+        for symbol, indexes in groups.items():
+            try:
+                multiplier = await self.get_usd_multiplier(symbol)
+            except Exception as e:
+                logger.error(f"批量转换失败: {symbol} - {e}")
+                continue
+            for index, value in zip(indexes, [notionals[i] * multiplier for i in indexes]):
+                results[index] = value
+        return results
 
 
 # 使用示例
@@ -1,28 +1,59 @@
 import json
 import os
-from datetime import datetime
+from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, List, Optional
 
 from src.logger import logger
+from .storage_writer import StorageWriter
+from .trade_archive import SEGMENT_SUFFIX, TradeArchive, TradeArchiveReader
 
 
 class FileStorage:
     """
     File-based storage for large order data
     Organizes data by date and symbol for easy access and management
+
+    Trades are written as compressed columnar segments (see trade_archive.py) and
+    alerts as JSONL, both by a background writer thread (see storage_writer.py):
+    save_trade() and save_alert() only enqueue, the thread starts on the first one.
+    Call close() on shutdown; it is final, nothing is saved after it (create a new FileStorage).
+    Trades in per-day JSONL files written by earlier versions are still read.
     """
 
-    def __init__(self, base_path: str = "data/large_orders"):
+    def __init__(
+        self,
+        base_path: str = "data/large_orders",
+        segment_size: int = 10_000,
+        flush_interval_seconds: float = 60.0,
+        queue_size: int = 100_000
+    ):
         """
         Initialize the storage
 
         Args:
             base_path: Base directory for storing data
+            segment_size: Trades per archive segment before it is written
+            flush_interval_seconds: Max age of buffered trades before the writer writes them
+            queue_size: Max trades and alerts waiting for the writer thread
         """
         self.base_path = Path(base_path)
         self.base_path.mkdir(parents=True, exist_ok=True)
         self.max_files_per_day = 1000  # Maximum number of files per day
+        self.archive = TradeArchive(base_path, segment_size, flush_interval_seconds)
+        self.reader = TradeArchiveReader(base_path)
+        self.alerts_path = self.base_path / "alerts" / "alerts.jsonl"
+        self.writer = StorageWriter(self.archive, queue_size=queue_size)
+
+    @property
+    def closed(self) -> bool:
+        """Whether close() was called"""
+        return self.writer.stopped
+
+    def _start_writer(self):
+        """Start the writer thread on first use (it is not restarted after close())"""
+        if self.writer.thread is None and not self.writer.stopped:
+            self.writer.start()
 
     def _get_date_path(self, timestamp_ms: int) -> Path:
         """
@@ -38,21 +69,6 @@ class FileStorage:
         date_str = dt.strftime("%Y-%m-%d")
         return self.base_path / date_str
 
-    def _get_symbol_path(self, timestamp_ms: int, symbol: str) -> Path:
-        """
-        Get the file path for a symbol and date
-
-        Args:
-            timestamp_ms: Timestamp in milliseconds
-            symbol: Trading pair (e.g., 'BTCUSDT')
-
-        Returns:
-            Path object for the symbol file
-        """
-        date_path = self._get_date_path(timestamp_ms)
-        date_path.mkdir(parents=True, exist_ok=True)
-        return date_path / f"{symbol}.jsonl"
-
     def save_trade(self, trade: dict):
         """
         Save a trade to storage
@@ -61,18 +77,33 @@ class FileStorage:
             trade: Trade data dictionary
         """
         try:
-            symbol = trade['symbol']
-            timestamp_ms = trade['trade_time']
-            file_path = self._get_symbol_path(timestamp_ms, symbol)
-
-            # Append trade to file (one JSON per line)
-            with open(file_path, 'a', encoding='utf-8') as f:
-                json.dump(trade, f, ensure_ascii=False)
-                f.write('\n')
+            # Written by the writer thread; dropped (and counted) if its queue is full or after close()
+            self._start_writer()
+            self.writer.submit_trade(trade)
 
         except Exception as e:
             logger.error(f"Error saving trade to storage: {e}")
 
+    def flush(self, expired_only: bool = False) -> int:
+        """
+        Wait for the writer thread to catch up, then write buffered trades to the archive
+
+        Args:
+            expired_only: Only write buffers older than the flush interval
+
+        Returns:
+            Number of segments written
+        """
+        self.writer.join()
+        return self.archive.flush(expired_only=expired_only)
+
+    def close(self):
+        """
+        Write everything queued or buffered and stop the writer thread
+        """
+        self.writer.stop()
+        self.archive.close()
+
     def save_alert(self, symbol: str, side: str, total_amount: float, timestamp_ms: int, message: str):
         """
         Save an alert to storage
@@ -85,10 +116,6 @@ class FileStorage:
             message: Alert message
         """
         try:
-            # Create alerts directory
-            alerts_dir = self.base_path / "alerts"
-            alerts_dir.mkdir(parents=True, exist_ok=True)
-
             # Create alert entry
             alert = {
                 'timestamp': timestamp_ms,
@@ -99,10 +126,9 @@ class FileStorage:
                 'datetime': datetime.fromtimestamp(timestamp_ms / 1000).isoformat()
             }
 
-            # Save to file (one JSON per line)
-            with open(alerts_dir / "alerts.jsonl", 'a', encoding='utf-8') as f:
-                json.dump(alert, f, ensure_ascii=False)
-                f.write('\n')
+            # Appended to the alerts file (one JSON per line) by the writer thread
+            self._start_writer()
+            self.writer.submit_record(self.alerts_path, alert)
 
         except Exception as e:
             logger.error(f"Error saving alert to storage: {e}")
@@ -127,7 +153,12 @@ class FileStorage:
         trades = []
 
         try:
-            # Iterate through all days in the range
+            # Make queued and buffered trades visible to the reader
+            self.flush()
+            trades.extend(self.reader.iter_trades(symbol, start_time_ms, end_time_ms))
+
+            # Per-day JSONL files written by earlier versions
+            legacy_trades = []
             start_date = datetime.fromtimestamp(start_time_ms / 1000).date()
             end_date = datetime.fromtimestamp(end_time_ms / 1000).date()
 
@@ -144,11 +175,15 @@ class FileStorage:
                                 trade = json.loads(line.strip())
                                 trade_time = trade.get('trade_time', 0)
                                 if start_time_ms <= trade_time <= end_time_ms:
-                                    trades.append(trade)
+                                    legacy_trades.append(trade)
                             except json.JSONDecodeError:
                                 continue
 
-                current_date = current_date.__class__(current_date.year, current_date.month, current_date.day + 1)
+                current_date += timedelta(days=1)
+
+            if legacy_trades:
+                trades.extend(legacy_trades)
+                trades.sort(key=lambda trade: trade.get('trade_time', 0))
 
         except Exception as e:
             logger.error(f"Error retrieving trades from storage: {e}")
@@ -175,7 +210,8 @@ class FileStorage:
         alerts = []
 
         try:
-            alerts_file = self.base_path / "alerts" / "alerts.jsonl"
+            self.writer.join()
+            alerts_file = self.alerts_path
 
             if not alerts_file.exists():
                 return alerts
@@ -248,13 +284,13 @@ class FileStorage:
             file_count = 0
 
             for item in self.base_path.rglob('*'):
-                if item.is_file() and item.suffix == '.jsonl':
+                if item.is_file() and item.suffix in ('.jsonl', SEGMENT_SUFFIX):
                     file_count += 1
                     total_size += item.stat().st_size
 
-                    # Extract date from path
+                    # Extract date from path (segments live in <date>/<symbol>/)
                     try:
-                        date_str = item.parent.name
+                        date_str = (item.parent.parent if item.suffix == SEGMENT_SUFFIX else item.parent).name
                         date = datetime.strptime(date_str, "%Y-%m-%d").date()
                         dates.append(date)
                     except ValueError:
@@ -263,6 +299,8 @@ class FileStorage:
             stats['total_files'] = file_count
             stats['total_size_bytes'] = total_size
             stats['total_size_mb'] = total_size / (1024 * 1024)
+            stats['archive'] = self.archive.get_stats()
+            stats['writer'] = self.writer.get_stats()
 
             if dates:
                 stats['oldest_data_date'] = min(dates).isoformat()
@@ -295,7 +333,7 @@ class FileStorage:
             # Get all unique symbols
             symbols = set()
             current_date = start.date()
-            while current_date <= end:
+            while current_date <= end.date():
                 date_str = current_date.strftime("%Y-%m-%d")
                 date_path = self.base_path / date_str
 
@@ -303,10 +341,11 @@ class FileStorage:
                     for file in date_path.glob("*.jsonl"):
                         symbol = file.stem
                         symbols.add(symbol)
+                    for symbol_dir in date_path.iterdir():
+                        if symbol_dir.is_dir():
+                            symbols.add(symbol_dir.name)
 
-                current_date = current_date.__class__(
-                    current_date.year, current_date.month, current_date.day + 1
-                )
+                current_date += timedelta(days=1)
 
             # Export data for all symbols
             exported_data = []
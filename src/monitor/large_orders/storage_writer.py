@@ -0,0 +1,345 @@
+import json
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+from pathlib import Path
+from typing import Optional
+
+from src.logger import logger
+from .trade_archive import TradeArchive
+
+_TRADE = 'trade'
+_RECORD = 'record'
+_WAKE = 'wake'
+_BARRIER = 'barrier'
+
+
+class StorageWriter:
+    """
+    Background writer thread for FileStorage
+
+    Callers only enqueue: trades are handed to the TradeArchive (segment compression and writes) and
+    JSONL records are appended through a cache of open file handles, both on this thread.
+    - Bounded queues: trades that do not fit are dropped and counted, so the trade callback never
+      waits on disk; records (alerts) have their own small queue, drained first, so a backlog of
+      trades neither delays nor blocks them (a full record queue drops and counts the record)
+    - Batching: up to batch_size items are written per wakeup, then the open handles are flushed
+    - Durability: open handles are fsynced every fsync_interval_seconds, archive buffers older than
+      the archive flush interval are written on the idle wakeups
+    - Rotation: cached handles are closed when the local date changes, and the least recently used
+      handle is closed beyond max_open_files
+    - Shutdown: after stop(), submissions are rejected until start() is called again; the writer
+      thread writes what was queued and closes its handles before exiting
+    """
+
+    def __init__(
+        self,
+        archive: TradeArchive,
+        queue_size: int = 100_000,
+        record_queue_size: int = 1_000,
+        batch_size: int = 1_000,
+        idle_interval_seconds: float = 1.0,
+        fsync_interval_seconds: float = 5.0,
+        max_open_files: int = 32
+    ):
+        """
+        Initialize the writer
+
+        Args:
+            archive: Trade archive the trades are appended to
+            queue_size: Max trades waiting to be written
+            record_queue_size: Max records waiting to be written
+            batch_size: Max items written per wakeup
+            idle_interval_seconds: Max wait for new items before running periodic work
+            fsync_interval_seconds: Interval between fsyncs of the open handles
+            max_open_files: Max cached append handles
+        """
+        self.archive = archive
+        self.batch_size = batch_size
+        self.idle_interval_seconds = idle_interval_seconds
+        self.fsync_interval_seconds = fsync_interval_seconds
+        self.max_open_files = max_open_files
+
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.record_queue = queue.Queue(maxsize=record_queue_size)
+        # Makes the stopped check and the enqueue atomic with respect to stop()
+        self._submit_lock = threading.Lock()
+        self._handles: "OrderedDict[Path, object]" = OrderedDict()
+        self._handle_date: Optional[date] = None
+        self._last_fsync = time.monotonic()
+        self._stop_event = threading.Event()
+        self._stopped = False
+        self.thread: Optional[threading.Thread] = None
+
+        self.stats = {
+            'trades_queued': 0,
+            'trades_dropped': 0,
+            'records_written': 0,
+            'records_dropped': 0,
+            'batches_written': 0,
+            'max_queue_depth': 0,
+            'write_errors': 0,
+        }
+
+    @property
+    def stopped(self) -> bool:
+        """Whether stop() was called (and start() not called since)"""
+        return self._stopped
+
+    def start(self, timeout: float = 10.0):
+        """
+        Start the writer thread
+
+        Args:
+            timeout: Max seconds to wait for a thread that is still stopping
+
+        Raises:
+            RuntimeError: If a previous writer thread is still stopping after timeout
+        """
+        if self.thread and self.thread.is_alive():
+            if not self._stopped:
+                return
+            self.thread.join(timeout)
+            if self.thread.is_alive():
+                raise RuntimeError("Previous storage writer thread is still stopping")
+        with self._submit_lock:
+            self._stopped = False
+        self._stop_event.clear()
+        self.thread = threading.Thread(target=self._run, name="storage-writer", daemon=True)
+        self.thread.start()
+
+    def stop(self, timeout: float = 10.0):
+        """
+        Write everything queued, close the cached handles and stop the thread
+
+        Args:
+            timeout: Max seconds to wait for the thread
+        """
+        with self._submit_lock:
+            self._stopped = True
+        self._stop_event.set()
+        if self.thread and self.thread.is_alive():
+            self._wake()
+            self.thread.join(timeout)
+            if self.thread.is_alive():
+                # Still writing: it closes the handles itself when done, do not touch them here
+                logger.error(f"Storage writer did not stop within {timeout}s, leaving it to finish")
+                return
+        self.thread = None
+        # Never started, or exited early: write what is queued on this thread
+        self._drain()
+        self._close_handles()
+
+    def submit_trade(self, trade: dict) -> bool:
+        """
+        Enqueue a trade without blocking
+
+        Args:
+            trade: Trade data dictionary
+
+        Returns:
+            False if the trade was dropped (queue full, or the writer was stopped)
+        """
+        with self._submit_lock:
+            if self._stopped:
+                self.stats['trades_dropped'] += 1
+                return False
+            try:
+                self.queue.put_nowait((_TRADE, trade))
+            except queue.Full:
+                self.stats['trades_dropped'] += 1
+                return False
+        self.stats['trades_queued'] += 1
+        depth = self.queue.qsize()
+        if depth > self.stats['max_queue_depth']:
+            self.stats['max_queue_depth'] = depth
+        return True
+
+    def submit_record(self, path: Path, record: dict) -> bool:
+        """
+        Enqueue a JSONL record without blocking (records have their own queue, written first)
+
+        Args:
+            path: JSONL file the record is appended to
+            record: JSON-serializable record
+
+        Returns:
+            False if the record queue was full and the record was dropped
+
+        Raises:
+            RuntimeError: If the writer was stopped
+        """
+        with self._submit_lock:
+            if self._stopped:
+                raise RuntimeError("Storage writer is stopped")
+            try:
+                self.record_queue.put_nowait((_RECORD, (path, record)))
+            except queue.Full:
+                self.stats['records_dropped'] += 1
+                logger.error(f"Storage record queue is full, dropped a record for {path.name}")
+                return False
+        self._wake()
+        return True
+
+    def _wake(self):
+        """Wake the writer thread instead of letting it wait out the idle interval"""
+        try:
+            self.queue.put_nowait((_WAKE, None))
+        except queue.Full:
+            # A full queue keeps the thread busy anyway
+            pass
+
+    def join(self, timeout: float = 10.0) -> bool:
+        """
+        Wait until every item queued before this call has been written and the handles flushed
+
+        Items submitted while waiting are not waited for: a barrier is queued and the writer
+        signals when it reaches it.
+
+        Args:
+            timeout: Max seconds to wait
+
+        Returns:
+            False if the writer did not reach the barrier in time
+        """
+        if not (self.thread and self.thread.is_alive()):
+            self._drain()
+            return True
+
+        deadline = time.monotonic() + timeout
+        barrier = threading.Event()
+        try:
+            self.queue.put((_BARRIER, barrier), timeout=timeout)
+        except queue.Full:
+            logger.warning("Storage writer queue stayed full, not waiting for it")
+            return False
+        if not barrier.wait(max(0.0, deadline - time.monotonic())):
+            logger.warning(f"Storage writer did not catch up within {timeout}s")
+            return False
+        return True
+
+    def _run(self):
+        """Writer loop (closes the handles when stopped and everything queued is written)"""
+        while not self._stop_event.is_set() or not self._empty():
+            batch = self._take_batch(block=True)
+            self._write_batch(batch)
+            if not batch:
+                self.archive.flush(expired_only=True)
+            if time.monotonic() - self._last_fsync >= self.fsync_interval_seconds:
+                self._fsync_handles()
+        self._close_handles()
+
+    def _empty(self) -> bool:
+        """Whether nothing is queued"""
+        return self.queue.empty() and self.record_queue.empty()
+
+    def _drain(self):
+        """Write every queued item on the calling thread (only when the writer thread is not running)"""
+        while not self._empty():
+            self._write_batch(self._take_batch(block=False))
+
+    def _take_batch(self, block: bool) -> list:
+        """
+        Take up to batch_size items, records first, waiting up to idle_interval_seconds for the
+        first one
+        """
+        batch = []
+        try:
+            while len(batch) < self.batch_size:
+                batch.append(self.record_queue.get_nowait())
+        except queue.Empty:
+            pass
+        try:
+            if block and not batch:
+                batch.append(self.queue.get(timeout=self.idle_interval_seconds))
+            while len(batch) < self.batch_size:
+                batch.append(self.queue.get_nowait())
+        except queue.Empty:
+            pass
+        return batch
+
+    def _write_batch(self, batch: list):
+        """Write a batch and release the barriers in it once the handles are flushed"""
+        if not batch:
+            return
+        barriers = []
+        try:
+            today = date.today()
+            if today != self._handle_date:
+                self._close_handles()
+                self._handle_date = today
+
+            for kind, payload in batch:
+                try:
+                    if kind == _TRADE:
+                        self.archive.append(payload)
+                    elif kind == _RECORD:
+                        path, record = payload
+                        f = self._get_handle(path)
+                        f.write(json.dumps(record, ensure_ascii=False))
+                        f.write('\n')
+                        self.stats['records_written'] += 1
+                    elif kind == _BARRIER:
+                        barriers.append(payload)
+                except Exception as e:
+                    self.stats['write_errors'] += 1
+                    logger.error(f"Error writing to storage: {e}")
+
+            for f in self._handles.values():
+                f.flush()
+            self.stats['batches_written'] += 1
+        except Exception as e:
+            self.stats['write_errors'] += 1
+            logger.error(f"Error flushing storage batch: {e}")
+        finally:
+            for barrier in barriers:
+                barrier.set()
+
+    def _get_handle(self, path: Path):
+        """Get a cached append handle, opening it (and its directory) on first use"""
+        f = self._handles.get(path)
+        if f is not None:
+            self._handles.move_to_end(path)
+            return f
+
+        if len(self._handles) >= self.max_open_files:
+            _, oldest = self._handles.popitem(last=False)
+            oldest.close()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        f = self._handles[path] = open(path, 'a', encoding='utf-8')
+        return f
+
+    def _fsync_handles(self):
+        """Force the written records of every open handle to disk"""
+        self._last_fsync = time.monotonic()
+        for path, f in list(self._handles.items()):
+            try:
+                f.flush()
+                os.fsync(f.fileno())
+            except Exception as e:
+                self.stats['write_errors'] += 1
+                logger.error(f"Error syncing {path}: {e}")
+
+    def _close_handles(self):
+        """Sync and close every cached handle"""
+        self._fsync_handles()
+        for f in self._handles.values():
+            f.close()
+        self._handles.clear()
+
+    def get_stats(self) -> dict:
+        """
+        Get writer statistics
+
+        Returns:
+            Dictionary with queue and write counters
+        """
+        return {
+            **self.stats,
+            'queue_depth': self.queue.qsize(),
+            'record_queue_depth': self.record_queue.qsize(),
+            'open_files': len(self._handles),
+        }
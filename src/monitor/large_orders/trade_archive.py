@@ -0,0 +1,413 @@
+import json
+import os
+import struct
+import sys
+import threading
+import time
+import zlib
+from array import array
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from src.logger import logger
+
+SEGMENT_MAGIC = b"TSEG"
+SEGMENT_VERSION = 1
+SEGMENT_SUFFIX = ".tseg"
+
+# Column layout of a segment: (name, encoding)
+#   delta: int64, stored as the first value followed by successive differences
+#   f64:   float64
+#   bool:  one byte per value
+#   dict:  strings replaced by codes into a per-segment dictionary kept in the header
+SEGMENT_SCHEMA = (
+    ('trade_time', 'delta'),
+    ('trade_id', 'delta'),
+    ('price', 'f64'),
+    ('quantity', 'f64'),
+    ('amount', 'f64'),
+    ('side', 'dict'),
+    ('is_taker', 'bool'),
+    ('exchange', 'dict'),
+    ('order_type', 'dict'),
+)
+
+_TYPECODES = {'delta': 'q', 'f64': 'd', 'bool': 'B'}
+_BIG_ENDIAN = sys.byteorder == 'big'
+
+
+def _to_bytes(values: array) -> bytes:
+    """Serialize an array in little-endian byte order"""
+    if _BIG_ENDIAN and values.itemsize > 1:
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _from_bytes(typecode: str, data: bytes) -> array:
+    """Deserialize a little-endian array"""
+    values = array(typecode)
+    values.frombytes(data)
+    if _BIG_ENDIAN and values.itemsize > 1:
+        values.byteswap()
+    return values
+
+
+def _encode_column(encoding: str, values: list):
+    """
+    Encode one column
+
+    Returns:
+        (typecode, raw bytes, dictionary or None)
+    """
+    if encoding == 'delta':
+        deltas = array('q', values)
+        for i in range(len(deltas) - 1, 0, -1):
+            deltas[i] -= deltas[i - 1]
+        return 'q', _to_bytes(deltas), None
+    if encoding == 'dict':
+        dictionary: Dict[str, int] = {}
+        codes = [dictionary.setdefault(value, len(dictionary)) for value in values]
+        typecode = 'B' if len(dictionary) <= 256 else 'I'
+        return typecode, _to_bytes(array(typecode, codes)), list(dictionary)
+    typecode = _TYPECODES[encoding]
+    return typecode, _to_bytes(array(typecode, values)), None
+
+
+def _decode_column(encoding: str, typecode: str, data: bytes, dictionary: Optional[list]) -> list:
+    """Decode one column back into a list of values"""
+    values = _from_bytes(typecode, data)
+    if encoding == 'delta':
+        for i in range(1, len(values)):
+            values[i] += values[i - 1]
+        return values.tolist()
+    if encoding == 'dict':
+        return [dictionary[code] for code in values]
+    if encoding == 'bool':
+        return [bool(value) for value in values]
+    return values.tolist()
+
+
+def write_segment(path: Path, symbol: str, columns: Dict[str, list], compression_level: int = 6):
+    """
+    Write a columnar segment file
+
+    Layout: magic, little-endian uint32 header length, JSON header, then one zlib stream per column.
+    The header carries the symbol, row count, trade_time range and per-column sizes, so a reader can
+    decompress only the columns it needs.
+
+    Args:
+        path: Segment file path (written to a temporary file and renamed into place)
+        symbol: Trading pair of every row in the segment
+        columns: Column name -> list of values, all of the same length
+        compression_level: zlib compression level
+    """
+    trade_times = columns['trade_time']
+    header = {
+        'version': SEGMENT_VERSION,
+        'symbol': symbol,
+        'count': len(trade_times),
+        'start_time': min(trade_times),
+        'end_time': max(trade_times),
+        'columns': [],
+    }
+    blocks = []
+    for name, encoding in SEGMENT_SCHEMA:
+        typecode, raw, dictionary = _encode_column(encoding, columns[name])
+        block = zlib.compress(raw, compression_level)
+        blocks.append(block)
+        header['columns'].append({
+            'name': name,
+            'encoding': encoding,
+            'typecode': typecode,
+            'size': len(block),
+            'dictionary': dictionary,
+        })
+
+    header_bytes = json.dumps(header, separators=(',', ':')).encode('utf-8')
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'wb') as f:
+        f.write(SEGMENT_MAGIC)
+        f.write(struct.pack('<I', len(header_bytes)))
+        f.write(header_bytes)
+        for block in blocks:
+            f.write(block)
+    os.replace(tmp_path, path)
+
+
+def read_segment_header(f) -> dict:
+    """Read and validate the header of an open segment file"""
+    if f.read(len(SEGMENT_MAGIC)) != SEGMENT_MAGIC:
+        raise ValueError("Not a trade segment file")
+    (header_length,) = struct.unpack('<I', f.read(4))
+    header = json.loads(f.read(header_length))
+    if header.get('version') != SEGMENT_VERSION:
+        raise ValueError(f"Unsupported segment version: {header.get('version')}")
+    return header
+
+
+def read_segment(path: Path, columns: Optional[List[str]] = None) -> Dict[str, list]:
+    """
+    Read columns of a segment file
+
+    Args:
+        path: Segment file path
+        columns: Column names to decode (None for all); other columns are skipped without decompressing
+
+    Returns:
+        Column name -> list of values
+    """
+    result = {}
+    with open(path, 'rb') as f:
+        header = read_segment_header(f)
+        for column in header['columns']:
+            if columns is not None and column['name'] not in columns:
+                f.seek(column['size'], os.SEEK_CUR)
+                continue
+            raw = zlib.decompress(f.read(column['size']))
+            result[column['name']] = _decode_column(
+                column['encoding'], column['typecode'], raw, column['dictionary']
+            )
+    return result
+
+
+def segment_time_range(path: Path) -> Optional[tuple]:
+    """Parse the (start_time, end_time) range encoded in a segment file name"""
+    try:
+        start, end = path.stem.split('-')[:2]
+        return int(start), int(end)
+    except ValueError:
+        return None
+
+
+class _SegmentBuffer:
+    """In-memory columns of one (date, symbol) segment that has not been written yet"""
+
+    def __init__(self, symbol: str, date_str: str, day_start_ms: int, day_end_ms: int):
+        self.symbol = symbol
+        self.date_str = date_str
+        self.day_start_ms = day_start_ms
+        self.day_end_ms = day_end_ms
+        self.created = time.monotonic()
+        self.columns = {name: [] for name, _ in SEGMENT_SCHEMA}
+        self.count = 0
+
+
+class TradeArchive:
+    """
+    Buffered writer of compressed columnar trade segments
+
+    Trades are appended to per-symbol column buffers in memory. A buffer is written as one
+    segment file to <base_path>/<date>/<symbol>/<start_ms>-<end_ms>.tseg when it reaches
+    segment_size trades, when the trade date changes, or when flush() finds it older than
+    flush_interval_seconds. Trades still buffered are lost if the process dies before a flush.
+    """
+
+    def __init__(self, base_path: str, segment_size: int = 10_000, flush_interval_seconds: float = 60.0):
+        """
+        Initialize the archive
+
+        Args:
+            base_path: Base directory for the date directories
+            segment_size: Trades per segment before it is written
+            flush_interval_seconds: Max age of a buffer before flush(expired_only=True) writes it
+        """
+        self.base_path = Path(base_path)
+        self.segment_size = segment_size
+        self.flush_interval_seconds = flush_interval_seconds
+        self._buffers: Dict[str, _SegmentBuffer] = {}
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+
+        self.stats = {
+            'trades_appended': 0,
+            'segments_written': 0,
+            'bytes_written': 0,
+            'write_errors': 0,
+        }
+
+    def _new_buffer(self, symbol: str, timestamp_ms: int) -> _SegmentBuffer:
+        """Create the buffer of the local calendar day containing timestamp_ms"""
+        day = datetime.fromtimestamp(timestamp_ms / 1000).replace(hour=0, minute=0, second=0, microsecond=0)
+        day_start_ms = int(day.timestamp() * 1000)
+        day_end_ms = int((day + timedelta(days=1)).timestamp() * 1000)
+        return _SegmentBuffer(symbol, day.strftime("%Y-%m-%d"), day_start_ms, day_end_ms)
+
+    def append(self, trade: dict):
+        """
+        Buffer a trade
+
+        Args:
+            trade: Trade dictionary with the SEGMENT_SCHEMA fields and 'symbol'
+        """
+        symbol = trade['symbol']
+        trade_time = trade['trade_time']
+        full = None
+
+        with self._lock:
+            buffer = self._buffers.get(symbol)
+            if buffer is None or not buffer.day_start_ms <= trade_time < buffer.day_end_ms:
+                if buffer is not None and buffer.count:
+                    full = [buffer]
+                buffer = self._buffers[symbol] = self._new_buffer(symbol, trade_time)
+
+            columns = buffer.columns
+            columns['trade_time'].append(trade_time)
+            columns['trade_id'].append(int(trade.get('trade_id', 0)))
+            columns['price'].append(trade['price'])
+            columns['quantity'].append(trade['quantity'])
+            columns['amount'].append(trade['amount'])
+            columns['side'].append(trade['side'])
+            columns['is_taker'].append(trade.get('is_taker', True))
+            columns['exchange'].append(trade.get('exchange', 'binance'))
+            columns['order_type'].append(trade.get('order_type', 'MARKET'))
+            buffer.count += 1
+            self.stats['trades_appended'] += 1
+
+            if buffer.count >= self.segment_size:
+                full = (full or []) + [self._buffers.pop(symbol)]
+
+        if full:
+            self._write(full)
+
+    def flush(self, expired_only: bool = False) -> int:
+        """
+        Write buffered trades to segment files
+
+        Args:
+            expired_only: Only write buffers older than flush_interval_seconds
+
+        Returns:
+            Number of segments written
+        """
+        now = time.monotonic()
+        with self._lock:
+            symbols = [
+                symbol for symbol, buffer in self._buffers.items()
+                if buffer.count and (not expired_only or now - buffer.created >= self.flush_interval_seconds)
+            ]
+            buffers = [self._buffers.pop(symbol) for symbol in symbols]
+        return self._write(buffers)
+
+    def _write(self, buffers: List[_SegmentBuffer]) -> int:
+        """Write buffers outside the append lock; the write lock keeps file names unique"""
+        written = 0
+        with self._write_lock:
+            for buffer in buffers:
+                try:
+                    symbol_dir = self.base_path / buffer.date_str / buffer.symbol
+                    symbol_dir.mkdir(parents=True, exist_ok=True)
+                    trade_times = buffer.columns['trade_time']
+                    name = f"{min(trade_times)}-{max(trade_times)}"
+                    path = symbol_dir / f"{name}{SEGMENT_SUFFIX}"
+                    sequence = 1
+                    while path.exists():
+                        path = symbol_dir / f"{name}-{sequence}{SEGMENT_SUFFIX}"
+                        sequence += 1
+
+                    write_segment(path, buffer.symbol, buffer.columns)
+                    self.stats['segments_written'] += 1
+                    self.stats['bytes_written'] += path.stat().st_size
+                    written += 1
+                except Exception as e:
+                    self.stats['write_errors'] += 1
+                    logger.error(f"Error writing trade segment for {buffer.symbol}: {e}")
+        return written
+
+    def close(self):
+        """Write all buffered trades"""
+        self.flush()
+
+    def get_stats(self) -> dict:
+        """
+        Get archive statistics
+
+        Returns:
+            Dictionary with write counters and the number of buffered trades
+        """
+        with self._lock:
+            buffered = sum(buffer.count for buffer in self._buffers.values())
+        return {**self.stats, 'trades_buffered': buffered}
+
+
+class TradeArchiveReader:
+    """
+    Replay reader for trade segments
+
+    Segments are selected by the trade_time range in their file names, so only files overlapping the
+    requested range are opened.
+    """
+
+    def __init__(self, base_path: str):
+        """
+        Initialize the reader
+
+        Args:
+            base_path: Base directory of the archive
+        """
+        self.base_path = Path(base_path)
+
+    def segments(self, symbol: str, start_time_ms: int, end_time_ms: int) -> List[Path]:
+        """
+        List the segment files of a symbol that overlap a time range, ordered by start time
+
+        Args:
+            symbol: Trading pair
+            start_time_ms: Start timestamp in milliseconds
+            end_time_ms: End timestamp in milliseconds
+
+        Returns:
+            List of segment paths
+        """
+        selected = []
+        current_date = datetime.fromtimestamp(start_time_ms / 1000).date()
+        end_date = datetime.fromtimestamp(end_time_ms / 1000).date()
+        while current_date <= end_date:
+            symbol_dir = self.base_path / current_date.strftime("%Y-%m-%d") / symbol
+            if symbol_dir.is_dir():
+                for path in symbol_dir.glob(f"*{SEGMENT_SUFFIX}"):
+                    time_range = segment_time_range(path)
+                    if time_range and time_range[0] <= end_time_ms and time_range[1] >= start_time_ms:
+                        selected.append((time_range, path))
+            current_date += timedelta(days=1)
+        return [path for _, path in sorted(selected)]
+
+    def iter_trades(self, symbol: str, start_time_ms: int, end_time_ms: int) -> Iterator[dict]:
+        """
+        Replay trades of a symbol within a time range, segment by segment
+
+        Args:
+            symbol: Trading pair
+            start_time_ms: Start timestamp in milliseconds
+            end_time_ms: End timestamp in milliseconds
+
+        Yields:
+            Trade dictionaries in the same format as FileStorage.save_trade received them
+        """
+        names = [name for name, _ in SEGMENT_SCHEMA]
+        for path in self.segments(symbol, start_time_ms, end_time_ms):
+            try:
+                columns = read_segment(path)
+            except Exception as e:
+                logger.error(f"Error reading trade segment {path}: {e}")
+                continue
+            for row in zip(*(columns[name] for name in names)):
+                trade = dict(zip(names, row))
+                if start_time_ms <= trade['trade_time'] <= end_time_ms:
+                    trade['symbol'] = symbol
+                    yield trade
+
+    def get_trades(self, symbol: str, start_time_ms: int, end_time_ms: int) -> List[dict]:
+        """
+        Retrieve trades of a symbol within a time range
+
+        Args:
+            symbol: Trading pair
+            start_time_ms: Start timestamp in milliseconds
+            end_time_ms: End timestamp in milliseconds
+
+        Returns:
+            List of trade records
+        """
+        return list(self.iter_trades(symbol, start_time_ms, end_time_ms))
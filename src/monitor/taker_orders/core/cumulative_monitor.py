@@ -3,12 +3,12 @@
 监控 1分钟内累积吃单 ≥ $1M USD + ≥5笔订单
 """
 import logging
-from collections import defaultdict
 from typing import Dict, Optional, Tuple, List
 from datetime import datetime
 
 from ..src.models import TakerAlert
 from ...large_orders.src.base import TradeEvent
+from ...common.trade_buffer import make_trade_buffer, side_flag
 
 logger = logging.getLogger(__name__)
 
@@ -34,10 +34,12 @@ class CumulativeMonitor:
                 - threshold_usd: 金额阈值（USD）
                 - min_order_count: 最少订单数
                 - directions: 监控方向列表
+                - bucket_seconds: 可选，分桶预聚合宽度（秒），0为逐笔精确存储；
+                  缺省时读取TAKER_WINDOW_BUCKET_SECONDS
         """
         # 动态加载配置
         if config is None:
-            from ...config import (
+            from ....config import (
                 TAKER_ORDER_CUMULATIVE_CONFIG,
                 TAKER_CUMULATIVE_WINDOW_MINUTES
             )
@@ -49,13 +51,23 @@ class CumulativeMonitor:
                 "directions": TAKER_ORDER_CUMULATIVE_CONFIG["directions"]
             }
 
+        # 配置中未给出分桶宽度时使用全局设置（生产调用方传入的TAKER_ORDER_CUMULATIVE_CONFIG也可显式给出）
+        bucket_seconds = config.get("bucket_seconds")
+        if bucket_seconds is None:
+            try:
+                from ....config import TAKER_WINDOW_BUCKET_SECONDS
+                bucket_seconds = TAKER_WINDOW_BUCKET_SECONDS
+            except ImportError:
+                bucket_seconds = 0
+
         self.window_size = config["window_size"]
         self.threshold_usd = config["threshold_usd"]
         self.min_order_count = config["min_order_count"]
         self.directions = config["directions"]
+        self.bucket_seconds = bucket_seconds
         
-        # 时间窗口：{symbol_direction: [trade_data, ...]}
-        self.time_windows = defaultdict(list)
+        # 时间窗口：{symbol: 列式交易缓冲区（逐笔或分桶）}，买卖方向由缓冲区内的方向标记区分
+        self.time_windows: Dict = {}
         
         self.stats = {
             "cumulative_alerts": 0,
@@ -85,19 +97,41 @@ class CumulativeMonitor:
         
         current_time = int(trade.trade_time / 1000)  # 转换为秒
         
-        # 添加到对应方向的窗口
-        window_key = f"{trade.symbol}_{trade.side}"
-        self.time_windows[window_key].append({
-            "trade": trade,
-            "timestamp": current_time,
-            "amount_usd": trade.amount  # 已经是USD金额
-        })
+        # 添加到交易对窗口（金额已经是USD，时间戳按秒存储）
+        window = self.time_windows.get(trade.symbol)
+        if window is None:
+            window = self.time_windows[trade.symbol] = make_trade_buffer(self.bucket_seconds)
+        window.append(current_time, trade.amount, side_flag(trade.side))
         
         self.stats["total_trades_added"] += 1
         
         # 清理过期数据
         self.cleanup_windows(current_time)
     
+    def add_trades(self, trades: List[TradeEvent]) -> None:
+        """
+        批量添加交易到时间窗口，整批只清理一次过期数据
+        
+        Args:
+            trades: 交易事件列表
+        """
+        latest_time = None
+        for trade in trades:
+            if not trade.is_taker:
+                continue
+            
+            current_time = int(trade.trade_time / 1000)
+            window = self.time_windows.get(trade.symbol)
+            if window is None:
+                window = self.time_windows[trade.symbol] = make_trade_buffer(self.bucket_seconds)
+            window.append(current_time, trade.amount, side_flag(trade.side))
+            self.stats["total_trades_added"] += 1
+            if latest_time is None or current_time > latest_time:
+                latest_time = current_time
+        
+        if latest_time is not None:
+            self.cleanup_windows(latest_time)
+    
     def cleanup_windows(self, current_time: int) -> None:
         """
         清理所有窗口中的过期数据
@@ -107,17 +141,14 @@ class CumulativeMonitor:
         """
         cutoff_time = current_time - self.window_size
         
-        for window_key in list(self.time_windows.keys()):
-            trades = self.time_windows[window_key]
+        for symbol in list(self.time_windows.keys()):
+            window = self.time_windows[symbol]
             # 保留窗口内的交易
-            self.time_windows[window_key] = [
-                t for t in trades
-                if t["timestamp"] > cutoff_time
-            ]
+            window.expire(cutoff_time)
             
             # 删除空窗口
-            if not self.time_windows[window_key]:
-                del self.time_windows[window_key]
+            if not window:
+                del self.time_windows[symbol]
                 self.stats["window_cleanups"] += 1
     
     def check_threshold(
@@ -137,15 +168,18 @@ class CumulativeMonitor:
         Returns:
             Optional[TakerAlert]: 如果达到阈值返回告警对象，否则返回None
         """
-        window_key = f"{symbol}_{direction}"
-        trades = self.time_windows.get(window_key, [])
+        window = self.time_windows.get(symbol)
+        if window is None:
+            return None
+        side = side_flag(direction)
+        order_count = window.count(side)
         
         # 检查订单数量
-        if len(trades) < self.min_order_count:
+        if order_count < self.min_order_count:
             return None
         
         # 计算总金额
-        total_amount_usd = sum(t["amount_usd"] for t in trades)
+        total_amount_usd = window.total(side)
         
         # 检查金额阈值
         if total_amount_usd < self.threshold_usd:
@@ -159,12 +193,12 @@ class CumulativeMonitor:
         else:
             self.stats["sell_alerts"] += 1
         
-        avg_amount = total_amount_usd / len(trades)
+        avg_amount = total_amount_usd / order_count
         start_time = current_time - self.window_size
         
         logger.info(
             f"Cumulative threshold triggered: {symbol} {direction} "
-            f"{len(trades)} orders, ${total_amount_usd:,.2f}"
+            f"{order_count} orders, ${total_amount_usd:,.2f}"
         )
         
         return TakerAlert(
@@ -172,7 +206,7 @@ class CumulativeMonitor:
             symbol=symbol,
             direction=direction,
             timestamp=int(current_time * 1000),  # 转换回毫秒
-            order_count=len(trades),
+            order_count=order_count,
             total_amount_usd=total_amount_usd,
             avg_amount_usd=avg_amount,
             time_range=(start_time, current_time)
@@ -220,13 +254,15 @@ class CumulativeMonitor:
         Returns:
             Dict: 窗口信息，包含订单数和总金额
         """
-        window_key = f"{symbol}_{direction}"
-        trades = self.time_windows.get(window_key, [])
-        
-        total_amount = sum(t["amount_usd"] for t in trades)
+        window = self.time_windows.get(symbol)
+        if window is None:
+            order_count, total_amount = 0, 0.0
+        else:
+            side = side_flag(direction)
+            order_count, total_amount = window.count(side), window.total(side)
         
         return {
-            "order_count": len(trades),
+            "order_count": order_count,
             "total_amount_usd": total_amount,
-            "avg_amount_usd": total_amount / len(trades) if trades else 0
+            "avg_amount_usd": total_amount / order_count if order_count else 0
         }
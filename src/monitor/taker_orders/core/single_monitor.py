@@ -20,6 +20,11 @@ class SingleOrderMonitor:
     1. 检测 BTC 单笔订单 ≥ 50
     2. 检测 ETH 单笔订单 ≥ 2000
     3. 生成单笔订单告警
+
+    "单笔"的含义取决于交易流类型（BINANCE_WS_STREAM_TYPE）：
+    - trade：每个成交一条事件，一笔大额吃单吃掉多个挂单时被拆成多笔小成交，单笔可能达不到阈值
+    - aggTrade：同一吃单在同一价格的成交归集为一条事件，更接近真实订单大小；
+      但吃单跨越多个价位时仍按价位拆成多条事件，各条分别与阈值比较
     """
     
     def __init__(self, thresholds: Dict[str, float]):
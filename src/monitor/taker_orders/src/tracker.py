@@ -116,6 +116,48 @@ class TakerOrderTracker:
             if cumulative_alert:
                 await self._handle_cumulative_alert(cumulative_alert)
     
+    async def process_trades(self, trades: List[TradeEvent]) -> None:
+        """
+        批量处理交易事件：单笔阈值逐笔检查，累积窗口整批写入后
+        每个(交易对, 方向)只检查一次累积阈值
+        
+        Args:
+            trades: 交易事件列表
+        """
+        batch = [
+            trade for trade in trades
+            if trade.symbol in self.symbols and trade.is_taker
+        ]
+        if not batch:
+            return
+        
+        self.stats["trades_processed"] += len(batch)
+        
+        # 1. 检查单笔订单阈值
+        for trade in batch:
+            single_alert = self.single_monitor.check_threshold(trade)
+            if single_alert:
+                await self._handle_single_alert(single_alert)
+        
+        # 2. 整批添加到累积监控
+        self.cumulative_monitor.add_trades(batch)
+        
+        # 3. 按交易对检查累积阈值（使用该交易对本批最新的成交时间）
+        latest_times = {}
+        for trade in batch:
+            latest_times[trade.symbol] = max(
+                latest_times.get(trade.symbol, 0), int(trade.trade_time / 1000)
+            )
+        for symbol, current_time in latest_times.items():
+            for direction in self.cumulative_config["directions"]:
+                cumulative_alert = self.cumulative_monitor.check_threshold(
+                    symbol,
+                    direction,
+                    current_time
+                )
+                if cumulative_alert:
+                    await self._handle_cumulative_alert(cumulative_alert)
+    
     async def _handle_single_alert(self, alert: TakerAlert) -> None:
         """
         处理单笔订单告警
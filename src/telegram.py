@@ -19,18 +19,24 @@ from .utils import (
 from .config import *
 from .indicators import TADatabaseClient, TaapiioProcess
 from .models import TechnicalAlert, CEXAlert
+from .http_client import HTTPClient, get_http_client
 
 from telebot import TeleBot, types
-import requests
 from requests.exceptions import ReadTimeout
 
 BaseConfig = LocalUserConfiguration if not USE_MONGO_DB else MongoDBUserConfiguration
 
 
 class TelegramBot(TeleBot):
-    def __init__(self, bot_token: str, taapiio_process: TaapiioProcess = None):
+    def __init__(
+        self,
+        bot_token: str,
+        taapiio_process: TaapiioProcess = None,
+        http_client: HTTPClient = None,
+    ):
         super().__init__(token=bot_token)
         self.binance_price_endpoint = get_binance_price_url()
+        self.http_client = http_client if http_client is not None else get_http_client()
         self.taapiio_cli = None
         self.indicators_ref_cli = TADatabaseClient()
         self.indicators_db = self.indicators_ref_cli.fetch_ref()
@@ -1095,7 +1101,7 @@ class TelegramBot(TeleBot):
 
         def get_latest_binance_price(self, pair):
             try:
-                response = requests.get(
+                response = self.http_client.get(
                     self.binance_price_endpoint.format(
                         pair.replace("/", ""), BINANCE_TIMEFRAMES[0]
                     )
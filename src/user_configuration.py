@@ -1,4 +1,5 @@
 import json
+import os
 import shutil
 
 from .config import *
@@ -8,6 +9,9 @@ from .mongo import MongoDBConnection
 if USE_MONGO_DB:
     db_connection = MongoDBConnection()
 
+# In-process counter of alert writes per user, complements the file stat for writes within one mtime tick
+_alerts_write_counts = {}
+
 
 class LocalUserConfiguration:
     """Simplifies interaction with the json database system"""
@@ -66,6 +70,23 @@ class LocalUserConfiguration:
     def update_alerts(self, data: dict) -> None:
         with open(self.alerts_path, "w") as outfile:
             outfile.write(json.dumps(data, indent=2))
+        _alerts_write_counts[self.user_id] = _alerts_write_counts.get(self.user_id, 0) + 1
+
+    def alerts_version(self):
+        """
+        Cheap token that changes whenever the user's alerts are rewritten, without reading the alerts.
+
+        :return: A comparable version token, or None if the alerts do not exist
+        """
+        try:
+            stat = os.stat(self.alerts_path)
+        except FileNotFoundError:
+            return None
+        return (
+            stat.st_mtime_ns,
+            stat.st_size,
+            _alerts_write_counts.get(self.user_id, 0),
+        )
 
     def load_config(self) -> dict:
         with open(self.config_path, "r") as infile:
@@ -171,8 +192,17 @@ class MongoDBUserConfiguration(LocalUserConfiguration):
     def update_alerts(self, data: dict) -> None:
         """OVERRIDES SUPER - Update the contents of the 'alerts' section of the user document"""
         db_connection.collection.update_one(
-            self.filter, {"$set": {"alerts": data}}, upsert=True
+            self.filter,
+            {"$set": {"alerts": data}, "$inc": {"alerts_version": 1}},
+            upsert=True,
+        )
+
+    def alerts_version(self):
+        """OVERRIDES SUPER - Read only the alerts version counter of the user document"""
+        document = db_connection.collection.find_one(
+            self.filter, {"alerts_version": 1}
         )
+        return document.get("alerts_version", 0) if document else None
 
     def load_config(self) -> dict:
         """OVERRIDES SUPER - Load the config section of the user document"""
@@ -16,8 +16,8 @@ def get_ratelimits() -> tuple:
 
 
 def get_logfile() -> str:
-    """Get logfile path & create logs dir if it doesn't exist in the current working directory"""
-    log_dir = join(getcwd(), "logs")
+    """Get logfile path & create logs dir if it doesn't exist (LOG_DIR, default: logs/ in the current working directory)"""
+    log_dir = getenv("LOG_DIR") or join(getcwd(), "logs")
     if not isdir(log_dir):
         mkdir(log_dir)
     return join(log_dir, "log.txt")
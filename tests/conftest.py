@@ -0,0 +1,8 @@
+"""
+测试全局配置：日志写入临时目录，运行测试不会改动工作目录下的logs/log.txt
+"""
+import os
+import tempfile
+
+# 在src.logger创建文件处理器之前设置
+os.environ["LOG_DIR"] = tempfile.mkdtemp(prefix="test-logs-")
@@ -0,0 +1,205 @@
+"""
+测试CEX告警的变更跟踪：数据和告警均未变化的用户整轮跳过
+"""
+import pytest
+import inspect
+from unittest.mock import Mock, patch
+from urllib.parse import urlsplit, parse_qs
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../'))
+
+from src.alert_processes.cex import CEXAlertProcess
+
+
+class _FakeConfiguration:
+    """内存中的用户配置，记录加载次数"""
+
+    def __init__(self, alerts):
+        self.alerts = alerts
+        self.version = 0
+        self.alert_loads = 0
+        self.config_loads = 0
+
+    def alerts_version(self):
+        return self.version
+
+    def load_alerts(self):
+        self.alert_loads += 1
+        return self.alerts
+
+    def load_config(self):
+        self.config_loads += 1
+        return {"channels": []}
+
+    def update_alerts(self, alerts):
+        self.alerts = alerts
+        self.version += 1
+
+
+class _FakeHTTPClient:
+    """按交易对返回可修改价格的HTTP客户端"""
+
+    def __init__(self):
+        self.prices = {}
+
+    def get(self, url, **kwargs):
+        symbol = parse_qs(urlsplit(url).query)["symbol"][0]
+        response = Mock()
+        response.json.return_value = {
+            "symbol": symbol,
+            "lastPrice": str(self.prices[symbol]),
+            "priceChangePercent": "0.5",
+        }
+        return response
+
+
+def _price_alert(comparison, target, cooldown=None, last_triggered=0):
+    return {
+        "type": "s",
+        "indicator": "PRICE",
+        "comparison": comparison,
+        "target": target,
+        "trigger": {"cooldown_seconds": cooldown, "last_triggered": last_triggered},
+    }
+
+
+def _run_cycles(process, configurations, cycles=1):
+    """以给定的用户配置运行若干个轮询周期（绕过限速装饰器）"""
+    poll_all_alerts = inspect.unwrap(CEXAlertProcess.poll_all_alerts)
+    with patch("src.alert_processes.cex.get_whitelist", return_value=list(configurations)), \
+            patch("src.alert_processes.cex.LocalUserConfiguration", side_effect=configurations.get), \
+            patch("src.alert_processes.cex.USE_MONGO_DB", False):
+        for _ in range(cycles):
+            poll_all_alerts(process)
+
+
+@pytest.fixture
+def http_client():
+    client = _FakeHTTPClient()
+    client.prices = {"BTCUSDT": 100.0, "ETHUSDT": 10.0}
+    return client
+
+
+@pytest.fixture
+def process(http_client, monkeypatch):
+    """创建使用假HTTP客户端的CEX告警进程"""
+    monkeypatch.setenv("LOCATION", "global")
+    return CEXAlertProcess(telegram_bot=Mock(), http_client=http_client)
+
+
+class TestCEXChangeTracking:
+    """测试按用户跳过未变化的告警评估"""
+
+    def test_quiet_user_is_skipped(self, process):
+        """测试价格和告警都未变化时不加载配置"""
+        configuration = _FakeConfiguration({"BTC/USDT": [_price_alert("ABOVE", 200)]})
+        _run_cycles(process, {"1": configuration}, cycles=5)
+
+        assert configuration.alert_loads == 1
+        assert configuration.config_loads == 0
+        assert process.last_cycle_skipped_users == 1
+
+    def test_price_move_triggers_evaluation(self, process, http_client):
+        """测试相关交易对价格变化后重新评估"""
+        configuration = _FakeConfiguration({"BTC/USDT": [_price_alert("ABOVE", 200)]})
+        users = {"1": configuration}
+        _run_cycles(process, users, cycles=2)
+
+        http_client.prices["BTCUSDT"] = 250.0
+        _run_cycles(process, users)
+
+        assert configuration.alert_loads == 2
+        assert configuration.config_loads == 1
+        assert "BTC/USDT" not in configuration.alerts
+
+    def test_unrelated_price_move_is_ignored(self, process, http_client):
+        """测试无关交易对的价格变化不会触发评估"""
+        quiet = _FakeConfiguration({"BTC/USDT": [_price_alert("ABOVE", 200)]})
+        active = _FakeConfiguration({"ETH/USDT": [_price_alert("BELOW", 5)]})
+        users = {"1": quiet, "2": active}
+        _run_cycles(process, users)
+
+        http_client.prices["ETHUSDT"] = 11.0
+        _run_cycles(process, users)
+
+        assert quiet.alert_loads == 1
+        assert active.alert_loads == 2
+
+    def test_alerts_change_triggers_evaluation(self, process):
+        """测试告警版本变化后重新评估"""
+        configuration = _FakeConfiguration({"BTC/USDT": [_price_alert("ABOVE", 200)]})
+        users = {"1": configuration}
+        _run_cycles(process, users)
+
+        configuration.alerts["BTC/USDT"].append(_price_alert("ABOVE", 50))
+        configuration.version += 1
+        _run_cycles(process, users)
+
+        assert configuration.alert_loads == 2
+        assert configuration.config_loads == 1
+
+    def test_cooldown_expiry_triggers_evaluation(self, process):
+        """测试冷却结束时即使价格不变也重新评估"""
+        configuration = _FakeConfiguration(
+            {"BTC/USDT": [_price_alert("ABOVE", 50, cooldown=60)]}
+        )
+        users = {"1": configuration}
+        _run_cycles(process, users, cycles=3)
+        loads = configuration.alert_loads
+
+        process._user_snapshots["1"]["wake_at"] = 0
+        _run_cycles(process, users)
+
+        assert configuration.alert_loads == loads + 1
+
+
+class TestTriggerState:
+    """测试冷却期间不重写告警触发状态"""
+
+    def test_no_rewrite_during_cooldown(self, process, http_client):
+        """测试条件持续满足时只在触发时写入一次"""
+        configuration = _FakeConfiguration(
+            {"BTC/USDT": [_price_alert("ABOVE", 50, cooldown=60)]}
+        )
+        users = {"1": configuration}
+        for price in (100.0, 101.0, 102.0, 103.0):
+            http_client.prices["BTCUSDT"] = price
+            _run_cycles(process, users)
+
+        # 价格每轮变化都会重新评估，但只有首次触发写入并发送
+        assert configuration.alert_loads == 4
+        assert configuration.version == 1
+        assert configuration.config_loads == 1
+
+    def test_cooldown_runs_from_last_post(self, process, http_client):
+        """测试冷却从上次发送开始计算，到期后再次触发"""
+        last_triggered = 1_000
+        configuration = _FakeConfiguration(
+            {"BTC/USDT": [_price_alert("ABOVE", 50, cooldown=60, last_triggered=last_triggered)]}
+        )
+        users = {"1": configuration}
+
+        with patch("time.time", return_value=last_triggered + 30):
+            _run_cycles(process, users)
+        assert configuration.version == 0
+
+        http_client.prices["BTCUSDT"] = 101.0
+        with patch("time.time", return_value=last_triggered + 61):
+            _run_cycles(process, users)
+        assert configuration.version == 1
+        assert configuration.alerts["BTC/USDT"][0]["trigger"]["last_triggered"] == last_triggered + 61
+
+    def test_fire_trigger(self):
+        """测试触发状态的判定"""
+        from src.alert_processes.base import BaseAlertProcess
+
+        alert = _price_alert("ABOVE", 50, cooldown=60, last_triggered=100)
+        assert BaseAlertProcess.fire_trigger(alert, now=150) == (False, False)
+        assert alert["trigger"]["last_triggered"] == 100
+        assert BaseAlertProcess.fire_trigger(alert, now=161) == (True, False)
+        assert alert["trigger"]["last_triggered"] == 161
+
+        one_shot = _price_alert("ABOVE", 50)
+        assert BaseAlertProcess.fire_trigger(one_shot, now=161) == (True, True)
@@ -0,0 +1,187 @@
+"""
+测试CEX价格请求的退避重试、熔断和故障隔离
+"""
+import pytest
+import inspect
+import json
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import Mock, patch
+from urllib.parse import urlsplit, parse_qs
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../'))
+
+from src.http_client import (
+    HTTPClient,
+    RetryPolicy,
+    CircuitBreaker,
+    CircuitOpenError,
+)
+from src.alert_processes.cex import CEXAlertProcess
+
+
+GOOD_SYMBOLS = ["BTCUSDT", "ETHUSDT", "BNBUSDT", "SOLUSDT", "XRPUSDT"]
+BAD_SYMBOL = "BADUSDT"
+
+
+class _TickerHandler(BaseHTTPRequestHandler):
+    """模拟币安ticker接口，BAD_SYMBOL始终返回500"""
+
+    protocol_version = "HTTP/1.1"
+    hits = Counter()
+
+    def do_GET(self):
+        symbol = parse_qs(urlsplit(self.path).query)["symbol"][0]
+        type(self).hits[symbol] += 1
+        if symbol == BAD_SYMBOL:
+            status, body = 500, b'{"msg": "internal error"}'
+        else:
+            status = 200
+            body = json.dumps(
+                {"symbol": symbol, "lastPrice": "100.0", "priceChangePercent": "1.5"}
+            ).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def stub_url():
+    """启动故障注入的本地服务"""
+    _TickerHandler.hits = Counter()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _TickerHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def process(stub_url, monkeypatch):
+    """创建指向本地服务的CEX告警进程"""
+    monkeypatch.setenv("LOCATION", "global")
+    cex = CEXAlertProcess(telegram_bot=Mock(), http_client=HTTPClient())
+    cex.endpoint = stub_url + "/api/v3/ticker?symbol={}&windowSize={}"
+    return cex
+
+
+class _FakeConfiguration:
+    """内存中的用户配置"""
+
+    def __init__(self, tg_user_id):
+        pairs = GOOD_SYMBOLS + [BAD_SYMBOL]
+        self.alerts = {
+            f"{symbol[:-4]}/USDT": [
+                {
+                    "type": "s",
+                    "indicator": "PRICE",
+                    "comparison": "ABOVE",
+                    "target": 1,
+                    "trigger": {"cooldown_seconds": 3600, "last_triggered": 0},
+                }
+            ]
+            for symbol in pairs
+        }
+        self.version = 0
+
+    def alerts_version(self):
+        return self.version
+
+    def load_alerts(self):
+        return self.alerts
+
+    def load_config(self):
+        return {"channels": []}
+
+    def update_alerts(self, alerts):
+        self.alerts = alerts
+        self.version += 1
+
+
+class TestRetryPolicy:
+    """测试退避策略"""
+
+    def test_delay_grows_and_is_bounded(self):
+        """测试退避时间指数增长并有上限"""
+        policy = RetryPolicy(base_delay=2, max_delay=10)
+        for failures, ceiling in [(1, 2), (2, 4), (3, 8), (4, 10), (10, 10)]:
+            delay = policy.get_delay(failures)
+            assert ceiling / 2 <= delay <= ceiling
+
+
+class TestCircuitBreaker:
+    """测试熔断器"""
+
+    def test_opens_and_half_opens(self):
+        """测试连续失败后熔断，超时后放行一次试探请求"""
+        breaker = CircuitBreaker(failure_threshold=3, reset_timeout=0.1)
+        for _ in range(3):
+            assert breaker.allow_request()
+            breaker.record_failure()
+        assert breaker.state == CircuitBreaker.OPEN
+        assert not breaker.allow_request()
+
+        time.sleep(0.15)
+        assert breaker.allow_request()
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        breaker.record_success()
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_client_rejects_when_open(self, stub_url):
+        """测试熔断打开后请求不再发出"""
+        client = HTTPClient(failure_threshold=2, reset_timeout=60)
+        url = stub_url + f"/api/v3/ticker?symbol={BAD_SYMBOL}"
+        for _ in range(2):
+            assert client.get(url).status_code == 500
+        with pytest.raises(CircuitOpenError):
+            client.get(url)
+        assert _TickerHandler.hits[BAD_SYMBOL] == 2
+
+
+class TestCEXAlertProcessRetry:
+    """测试单个交易对故障不会阻塞轮询"""
+
+    def test_failed_symbol_is_marked_stale(self, process):
+        """测试失败的交易对被标记为过期并在退避期间跳过"""
+        with pytest.raises(ConnectionAbortedError):
+            process.get_latest_price(BAD_SYMBOL)
+        with pytest.raises(ConnectionAbortedError):
+            process.get_latest_price(BAD_SYMBOL)
+
+        assert _TickerHandler.hits[BAD_SYMBOL] == 1
+        assert process.get_stale_symbols() == [BAD_SYMBOL]
+        assert process.get_latest_price("BTCUSDT") == 100.0
+
+    def test_cycle_time_stable_with_failing_symbol(self, process):
+        """测试一个交易对持续返回500时，轮询周期时间保持稳定"""
+        poll_all_alerts = inspect.unwrap(CEXAlertProcess.poll_all_alerts)
+        users = ["1", "2", "3"]
+        configurations = {user: _FakeConfiguration(user) for user in users}
+
+        with patch("src.alert_processes.cex.get_whitelist", return_value=users), \
+                patch("src.alert_processes.cex.LocalUserConfiguration", side_effect=configurations.get), \
+                patch("src.alert_processes.cex.USE_MONGO_DB", False):
+            cycle_times = []
+            for _ in range(5):
+                poll_all_alerts(process)
+                cycle_times.append(process.last_cycle_seconds)
+
+        # 没有内联sleep：每个周期都远小于旧实现的5次×2秒重试
+        assert max(cycle_times) < 1.0
+        # 失败的交易对在退避期间不会被重复请求
+        assert _TickerHandler.hits[BAD_SYMBOL] == 1
+        # 正常的交易对每个周期只请求一次，所有用户共享
+        assert all(_TickerHandler.hits[symbol] == 5 for symbol in GOOD_SYMBOLS)
+        # 正常交易对的告警仍然触发
+        for configuration in configurations.values():
+            assert configuration.alerts["BTC/USDT"][0]["trigger"]["last_triggered"] > 0
+            assert configuration.alerts["BAD/USDT"][0]["trigger"]["last_triggered"] == 0
@@ -0,0 +1,123 @@
+"""
+测试共享HTTP客户端的连接复用和超时
+"""
+import asyncio
+import pytest
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../'))
+
+from src.http_client import HTTPClient, AsyncHTTPClient
+
+
+class _KeepAliveHandler(BaseHTTPRequestHandler):
+    """支持keep-alive的本地测试服务"""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        if self.path.startswith("/slow"):
+            time.sleep(1)
+        body = b'{"price": "1.0"}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server_url():
+    """启动本地HTTP服务"""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _KeepAliveHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+class TestHTTPClient:
+    """测试同步HTTP客户端"""
+
+    def test_connection_reused(self, server_url):
+        """测试同一主机的连续请求复用同一连接"""
+        client = HTTPClient()
+        for _ in range(20):
+            assert client.get(f"{server_url}/price").json() == {"price": "1.0"}
+
+        stats = client.get_stats()[server_url]
+        assert stats["requests"] == 20
+        assert stats["connections_opened"] == 1
+        assert stats["connections_reused"] == 19
+        client.close()
+
+    def test_one_session_per_host(self, server_url):
+        """测试每个主机只创建一个会话"""
+        client = HTTPClient()
+        assert client.session_for(f"{server_url}/a") is client.session_for(f"{server_url}/b?x=1")
+        client.close()
+
+    def test_stats_counted_across_threads(self, server_url):
+        """测试多线程并发请求时统计计数不丢失"""
+        client = HTTPClient()
+        threads = [
+            threading.Thread(target=lambda: [client.get(f"{server_url}/price") for _ in range(10)])
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert client.get_stats()[server_url]["requests"] == 40
+        client.close()
+
+    def test_read_timeout(self, server_url):
+        """测试读取超时会抛出异常并计入错误"""
+        client = HTTPClient(read_timeout=0.2)
+        with pytest.raises(requests.exceptions.ReadTimeout):
+            client.get(f"{server_url}/slow")
+        assert client.get_stats()[server_url]["errors"] == 1
+        client.close()
+
+
+class TestAsyncHTTPClient:
+    """测试异步HTTP客户端"""
+
+    @pytest.mark.asyncio
+    async def test_connection_reused(self, server_url):
+        """测试异步请求复用keep-alive连接"""
+        client = AsyncHTTPClient()
+        for _ in range(10):
+            assert await client.get_json(f"{server_url}/price") == {"price": "1.0"}
+
+        stats = client.get_stats()
+        assert stats["requests"] == 10
+        assert stats["connections_opened"] == 1
+        assert stats["connections_reused"] == 9
+        await client.close()
+
+    def test_closed_loop_sessions_are_pruned(self, server_url):
+        """测试事件循环关闭后其会话在下次创建会话时被释放"""
+        client = AsyncHTTPClient()
+
+        async def fetch():
+            return await client.get_json(f"{server_url}/price")
+
+        for _ in range(3):
+            loop = asyncio.new_event_loop()
+            assert loop.run_until_complete(fetch()) == {"price": "1.0"}
+            loop.close()
+
+        assert len(client._sessions) == 1
+        assert all(loop.is_closed() for loop in client._sessions)
@@ -0,0 +1,229 @@
+"""
+测试告警进程的用户分片与消息转发
+"""
+import pytest
+import queue
+import threading
+import time
+from collections import Counter
+from unittest.mock import Mock
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../'))
+
+from src.alert_processes import cex as cex_module
+from src.alert_processes.base import get_shard
+from src.alert_processes.cex import CEXAlertProcess
+from src.alert_processes.sharding import QueuedMessageSender, ShardedAlertProcess
+
+
+USERS = [str(100_000_000 + i) for i in range(1000)]
+
+
+class TestSharding:
+    """测试按用户ID分片"""
+
+    def test_shard_is_stable(self):
+        """测试同一用户始终分到同一分片"""
+        assert get_shard("123456789", 4) == get_shard("123456789", 4)
+        assert get_shard(123456789, 4) == get_shard("123456789", 4)
+
+    def test_shards_partition_users(self, monkeypatch):
+        """测试所有分片合起来恰好覆盖全部用户一次"""
+        monkeypatch.setenv("LOCATION", "global")
+        processes = [
+            CEXAlertProcess(telegram_bot=Mock(), http_client=Mock(), shard=(i, 4))
+            for i in range(4)
+        ]
+        counts = Counter()
+        for process in processes:
+            counts.update(process.get_shard_users(USERS))
+
+        assert set(counts) == set(USERS)
+        assert all(count == 1 for count in counts.values())
+        # crc32分片应大致均衡
+        sizes = [len(process.get_shard_users(USERS)) for process in processes]
+        assert min(sizes) > 200
+
+    def test_unsharded_process_polls_everyone(self, monkeypatch):
+        """测试未分片时轮询全部用户"""
+        monkeypatch.setenv("LOCATION", "global")
+        process = CEXAlertProcess(telegram_bot=Mock(), http_client=Mock())
+        assert process.get_shard_users(USERS) == USERS
+
+
+class TestMessageFunnel:
+    """测试工作进程的消息汇集到父进程发送"""
+
+    def test_worker_alerts_are_queued(self, monkeypatch):
+        """测试工作进程的告警进入队列而不直接调用Telegram"""
+        monkeypatch.setenv("LOCATION", "global")
+        outbox = queue.Queue()
+        process = CEXAlertProcess(
+            telegram_bot=QueuedMessageSender(outbox), http_client=Mock(), shard=(0, 2)
+        )
+        sent, failed = process.tg_alert("BTC/USDT ABOVE 1", ["1", "2"], pair="BTC/USDT")
+
+        assert sent == ["1", "2"] and failed == []
+        kind, message = outbox.get_nowait()
+        assert kind == "send"
+        assert message["chat_id"] == "1"
+        assert message["parse_mode"] == "HTML"
+
+    def test_parent_delivers_and_collects_keys(self, monkeypatch):
+        """测试父进程发送消息并合并各工作进程需要的行情"""
+        monkeypatch.setenv("LOCATION", "global")
+        telegram_bot = Mock()
+        parent = ShardedAlertProcess(
+            telegram_bot=telegram_bot, num_workers=2, http_client=Mock()
+        )
+        outbox = queue.Queue()
+        parent._outbox = outbox
+        outbox.put(("send", {"chat_id": "1", "text": "hello"}))
+        outbox.put(("keys", 0, {("BTCUSDT", "1m")}))
+        outbox.put(("keys", 1, {("ETHUSDT", "1m"), ("ETHUSDT", "1d")}))
+        outbox.put(("send", {"chat_id": "2", "text": "world"}))
+
+        # 队列取空后结束发送线程
+        outbox_get = outbox.get
+
+        def get():
+            if outbox.empty():
+                raise EOFError
+            return outbox_get()
+
+        outbox.get = get
+        parent._deliver_messages()
+
+        assert telegram_bot.send_message.call_count == 2
+        assert parent.get_required_keys() == {
+            ("BTCUSDT", "1m"), ("ETHUSDT", "1m"), ("ETHUSDT", "1d")
+        }
+
+
+class FakeConfiguration:
+    """模拟用户配置：按用户返回告警和版本，并记录加载次数"""
+
+    alerts = {}
+    versions = {}
+    loads = Counter()
+
+    def __init__(self, tg_user_id):
+        self.tg_user_id = tg_user_id
+
+    def alerts_version(self):
+        return FakeConfiguration.versions[self.tg_user_id]
+
+    def load_alerts(self):
+        FakeConfiguration.loads[self.tg_user_id] += 1
+        return FakeConfiguration.alerts[self.tg_user_id]
+
+
+def _simple_alert(comparison="ABOVE"):
+    return {"type": "s", "comparison": comparison}
+
+
+class TestFeedKeys:
+    """测试父进程拉取行情的键集合"""
+
+    def test_keys_seeded_from_configured_alerts(self, monkeypatch):
+        """测试首个周期前即按用户告警得到键集合，新增告警在版本变化后被纳入"""
+        monkeypatch.setenv("LOCATION", "global")
+        monkeypatch.setattr(cex_module, "get_whitelist", lambda: ["1", "2"])
+        monkeypatch.setattr(cex_module, "LocalUserConfiguration", FakeConfiguration)
+        monkeypatch.setattr(cex_module, "USE_MONGO_DB", False)
+        FakeConfiguration.alerts = {
+            "1": {"BTC/USDT": [_simple_alert()]},
+            "2": {"ETH/USDT": [_simple_alert("24HRCHG")]},
+        }
+        FakeConfiguration.versions = {"1": 1, "2": 1}
+        FakeConfiguration.loads = Counter()
+
+        parent = ShardedAlertProcess(telegram_bot=Mock(), num_workers=2, http_client=Mock())
+        window = cex_module.BINANCE_TIMEFRAMES[0]
+        assert parent.get_feed_keys() == {
+            ("BTCUSDT", window), ("ETHUSDT", window), ("ETHUSDT", "1d")
+        }
+
+        FakeConfiguration.alerts["1"]["SOL/USDT"] = [_simple_alert()]
+        assert ("SOLUSDT", window) not in parent.get_feed_keys()
+        FakeConfiguration.versions["1"] = 2
+        assert ("SOLUSDT", window) in parent.get_feed_keys()
+        assert FakeConfiguration.loads == Counter({"1": 2, "2": 1})
+
+    def test_reported_keys_replace_configuration_scan(self, monkeypatch):
+        """测试所有工作进程上报后，父进程不再逐个读取用户配置"""
+        monkeypatch.setenv("LOCATION", "global")
+        monkeypatch.setattr(cex_module, "get_whitelist", lambda: ["1", "2"])
+        configuration = Mock(side_effect=AssertionError("configuration read by the parent"))
+        monkeypatch.setattr(cex_module, "LocalUserConfiguration", configuration)
+        monkeypatch.setattr(cex_module, "USE_MONGO_DB", False)
+
+        parent = ShardedAlertProcess(telegram_bot=Mock(), num_workers=2, http_client=Mock())
+        parent._required_keys = {0: {("BTCUSDT", "1m")}, 1: {("ETHUSDT", "1d")}}
+        assert parent.get_feed_keys() == {("BTCUSDT", "1m"), ("ETHUSDT", "1d")}
+        configuration.assert_not_called()
+
+    def test_stale_feed_keys_are_not_refetched(self, monkeypatch):
+        """测试父进程已判定失效的行情，工作进程视为失效而不再请求"""
+        monkeypatch.setenv("LOCATION", "global")
+        monkeypatch.setattr(cex_module, "get_whitelist", lambda: ["1"])
+        monkeypatch.setattr(cex_module, "LocalUserConfiguration", FakeConfiguration)
+        monkeypatch.setattr(cex_module, "USE_MONGO_DB", False)
+        FakeConfiguration.alerts = {"1": {"BTC/USDT": [_simple_alert()]}}
+        FakeConfiguration.versions = {"1": 1}
+        FakeConfiguration.loads = Counter()
+
+        http_client = Mock()
+        worker = CEXAlertProcess(telegram_bot=Mock(), http_client=http_client, shard=(0, 1))
+        window = cex_module.BINANCE_TIMEFRAMES[0]
+        worker.poll_cycle(tickers={}, stale={("BTCUSDT", window)})
+
+        http_client.get.assert_not_called()
+        assert FakeConfiguration.loads == Counter({"1": 1})
+
+
+class BlockingConn:
+    """模拟卡住的工作进程管道：send一直阻塞到被释放"""
+
+    def __init__(self):
+        self.release = threading.Event()
+
+    def send(self, message):
+        self.release.wait()
+
+
+class RecordingConn:
+    """记录收到的消息"""
+
+    def __init__(self):
+        self.messages = []
+
+    def send(self, message):
+        self.messages.append(message)
+
+
+class TestBroadcast:
+    """测试行情广播"""
+
+    def test_slow_worker_does_not_stall_others(self, monkeypatch):
+        """测试一个工作进程卡住时广播不阻塞，其他工作进程照常收到，卡住的只保留最新一份"""
+        monkeypatch.setenv("LOCATION", "global")
+        parent = ShardedAlertProcess(telegram_bot=Mock(), num_workers=2, http_client=Mock())
+        slow, fast = BlockingConn(), RecordingConn()
+        parent._feed_conns = [slow, fast]
+        for index in range(2):
+            threading.Thread(target=parent._send_feeds, args=(index,), daemon=True).start()
+
+        for cycle in range(5):
+            parent._broadcast("cex", cycle)
+            deadline = time.monotonic() + 5
+            while len(fast.messages) <= cycle and time.monotonic() < deadline:
+                time.sleep(0.01)
+
+        assert [payload for _, payload in fast.messages] == [0, 1, 2, 3, 4]
+        # 卡住的工作进程：第一份在发送中，其后只排队最新一份
+        assert parent._feed_queues[0].get_nowait() == ("cex", 4)
+        assert parent.feeds_replaced >= 3
+        slow.release.set()
@@ -0,0 +1,81 @@
+"""
+测试SlidingWindowAggregator的滑动窗口累计
+"""
+import pytest
+import threading
+import time
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../'))
+
+from src.monitor.large_orders.aggregator import SlidingWindowAggregator
+
+
+def _trade(amount, side, trade_time, trade_id=0, symbol='BTCUSDT'):
+    return {
+        'symbol': symbol,
+        'amount': amount,
+        'side': side,
+        'trade_time': trade_time,
+        'trade_id': trade_id,
+    }
+
+
+class TestSlidingWindowAggregator:
+    """测试滑动窗口聚合器"""
+
+    def test_totals_per_side(self):
+        """测试按方向累计"""
+        aggregator = SlidingWindowAggregator(window_size_seconds=5)
+        aggregator.add_trade(_trade(100, 'BUY', 1_000))
+        aggregator.add_trade(_trade(50, 'SELL', 2_000))
+        aggregator.add_trade(_trade(25, 'BUY', 3_000))
+
+        assert aggregator.get_5min_total('BTCUSDT', 'BUY', 3_000) == 125
+        assert aggregator.get_5min_total('BTCUSDT', 'SELL', 3_000) == 50
+        assert aggregator.get_5min_total('ETHUSDT', 'BUY', 3_000) == 0.0
+
+    def test_expiry_subtracts_from_total(self):
+        """测试过期交易从累计中扣除"""
+        aggregator = SlidingWindowAggregator(window_size_seconds=5)
+        aggregator.add_trade(_trade(1_000_000, 'BUY', 1_000))
+        aggregator.add_trade(_trade(1_500_000, 'BUY', 4_000))
+
+        assert aggregator.get_5min_total('BTCUSDT', 'BUY', 5_999) == 2_500_000
+        # 窗口左边界为开区间：timestamp > now - window
+        assert aggregator.get_5min_total('BTCUSDT', 'BUY', 6_000) == 1_500_000
+        assert aggregator.get_5min_total('BTCUSDT', 'BUY', 20_000) == 0.0
+        assert aggregator.get_global_stats()['trades_pruned'] == 2
+
+    def test_symbol_stats(self):
+        """测试交易对统计"""
+        aggregator = SlidingWindowAggregator(window_size_seconds=60)
+        now = int(time.time() * 1000)
+        aggregator.add_trade(_trade(10, 'BUY', now - 2_000))
+        aggregator.add_trade(_trade(20, 'SELL', now - 1_000))
+
+        stats = aggregator.get_symbol_stats('BTCUSDT')
+        assert stats['total_trades'] == 2
+        assert stats['buy_amount'] == 10
+        assert stats['sell_amount'] == 20
+        assert stats['oldest_trade_age'] >= stats['newest_trade_age'] >= 0
+
+    def test_cleanup_expired_does_not_deadlock(self):
+        """测试清理过期交易对时不会因重复加锁而死锁"""
+        aggregator = SlidingWindowAggregator(window_size_seconds=5)
+        now = int(time.time() * 1000)
+        aggregator.add_trade(_trade(10, 'BUY', now - 7_200_000, symbol='OLDUSDT'))
+        aggregator.add_trade(_trade(10, 'BUY', now, symbol='BTCUSDT'))
+
+        result = []
+        worker = threading.Thread(
+            target=lambda: result.append(aggregator.cleanup_expired(max_age_seconds=3600)),
+            daemon=True,
+        )
+        worker.start()
+        worker.join(timeout=2)
+
+        assert not worker.is_alive()
+        assert result == [1]
+        assert aggregator.get_all_symbols() == ['BTCUSDT']
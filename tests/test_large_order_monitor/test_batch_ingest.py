@@ -0,0 +1,110 @@
+"""
+测试批量交易接入：批量USD转换、聚合器和吃单追踪器的批量接口
+"""
+import asyncio
+import pytest
+from types import SimpleNamespace
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../'))
+
+from src.monitor.large_orders.core.order_aggregator import OrderAggregator
+from src.monitor.large_orders.src.price_converter import PriceConverter
+from src.monitor.taker_orders.src.tracker import TakerOrderTracker
+
+
+T0 = 1_700_000_000_000
+
+
+def _trade(symbol, side, price, quantity, offset_ms=0):
+    return SimpleNamespace(
+        symbol=symbol, side=side, price=price, quantity=quantity,
+        amount=price * quantity, trade_time=T0 + offset_ms, is_taker=True,
+    )
+
+
+class TestBatchConvert:
+    """测试批量USD转换"""
+
+    def test_one_multiplier_lookup_per_symbol(self):
+        """测试每个交易对只获取一次换算系数"""
+        converter = PriceConverter(http_client=object())
+        lookups = []
+        original = converter.get_usd_multiplier
+
+        async def counting(symbol):
+            lookups.append(symbol)
+            return await original(symbol)
+
+        converter.get_usd_multiplier = counting
+        trades = [
+            _trade("BTCUSDT", "BUY", 50_000, 2),
+            _trade("ETHUSDT", "SELL", 3_000, 1),
+            _trade("BTCUSDT", "SELL", 50_000, 1),
+        ]
+
+        values = asyncio.run(converter.convert_trades_to_usd(trades))
+        assert values == [100_000, 3_000, 50_000]
+        assert sorted(lookups) == ["BTCUSDT", "ETHUSDT"]
+
+    def test_failed_symbol_converts_to_zero(self):
+        """测试无法解析的交易对整组返回0，不影响其他交易对"""
+        converter = PriceConverter(http_client=object())
+        values = asyncio.run(converter.batch_convert([("BTCUSDT", 10, 2), ("BAD", 1, 1)]))
+        assert values == [20, 0.0]
+
+
+class TestAggregatorBatch:
+    """测试聚合器批量接口"""
+
+    def test_batch_matches_sequential(self):
+        """测试批量写入与逐笔写入的窗口结果一致，突破结果每个交易对只返回一次"""
+        trades = [
+            ("BTCUSDT", _trade("BTCUSDT", "BUY", 1, 1, i * 1_000), 400_000)
+            for i in range(4)
+        ] + [("ETHUSDT", _trade("ETHUSDT", "SELL", 1, 1, 500), 10)]
+
+        sequential = OrderAggregator(window_minutes=5, threshold_usd=1_000_000, bucket_seconds=0)
+        batched = OrderAggregator(window_minutes=5, threshold_usd=1_000_000, bucket_seconds=0)
+
+        async def run():
+            for symbol, trade, usd_value in trades:
+                await sequential.add_trade(symbol, trade, usd_value)
+            return await batched.add_trades(trades)
+
+        breaches = asyncio.run(run())
+        assert [breach["symbol"] for breach in breaches] == ["BTCUSDT"]
+        assert breaches[0]["total_volume"] == 1_600_000
+        for symbol in ("BTCUSDT", "ETHUSDT"):
+            expected = sequential.get_window_summary(symbol)
+            actual = batched.get_window_summary(symbol)
+            assert actual["trade_count"] == expected["trade_count"]
+            assert actual["total_volume"] == expected["total_volume"]
+
+
+class TestTrackerBatch:
+    """测试吃单追踪器批量接口"""
+
+    def test_process_trades_raises_cumulative_alert(self):
+        """测试整批写入后累积阈值只检查并告警一次"""
+        tracker = TakerOrderTracker(
+            symbols=["BTCUSDT"],
+            single_thresholds={"BTCUSDT": 1_000},
+            cumulative_config={
+                "window_size": 60,
+                "threshold_usd": 1_000_000,
+                "min_order_count": 3,
+                "directions": ["BUY", "SELL"],
+            },
+            cooldown_config={"single_order": 300, "cumulative": 300},
+        )
+        alerts = []
+        tracker.set_alert_callback(alerts.append)
+
+        trades = [_trade("BTCUSDT", "BUY", 50_000, 10, i * 100) for i in range(5)]
+        trades.append(_trade("ETHUSDT", "BUY", 3_000, 1_000))
+        asyncio.run(tracker.process_trades(trades))
+
+        assert tracker.stats["trades_processed"] == 5
+        assert [(alert.alert_type, alert.order_count) for alert in alerts] == [("CUMULATIVE", 5)]
@@ -0,0 +1,377 @@
+"""
+测试币安组合流分片：按streams_per_connection切分连接、增量订阅、分片独立重连、重连缺口补齐、冗余连接去重
+使用本地WebSocket服务模拟币安组合流端点，本地HTTP服务模拟REST成交接口
+"""
+import asyncio
+import json
+import time
+
+import websockets
+from aiohttp import web
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../'))
+
+from src.http_client import AsyncHTTPClient
+from src.monitor.large_orders.exchanges.backfill import TradeBackfiller
+from src.monitor.large_orders.exchanges.binance import BinanceWebSocketClient
+from src.monitor.large_orders.src.base import ConnectionState, TradeEvent
+
+
+class FakeBinanceServer:
+    """本地组合流服务：记录每条连接的路径和收到的订阅消息"""
+
+    def __init__(self):
+        self.connections = []
+        self.server = None
+
+    async def __aenter__(self):
+        self.server = await websockets.serve(self._handler, "127.0.0.1", 0)
+        return self
+
+    async def __aexit__(self, *args):
+        self.server.close()
+        await self.server.wait_closed()
+
+    @property
+    def base_url(self):
+        host, port = list(self.server.sockets)[0].getsockname()[:2]
+        return f"ws://{host}:{port}"
+
+    async def _handler(self, websocket):
+        connection = {"path": websocket.request.path, "ws": websocket, "received": []}
+        self.connections.append(connection)
+        async for message in websocket:
+            connection["received"].append(json.loads(message))
+
+    async def send_trade(self, connection, symbol, trade_id):
+        await connection["ws"].send(json.dumps({
+            "stream": f"{symbol.lower()}@trade",
+            "data": {
+                "e": "trade", "E": 1700000000001, "s": symbol, "t": trade_id,
+                "p": "100.0", "q": "2.0", "T": 1700000000000, "m": False, "M": True
+            }
+        }))
+
+
+class FakeRestServer:
+    """本地REST服务：/api/v3/historicalTrades按fromId和limit返回成交，记录请求"""
+
+    def __init__(self, trade_ids):
+        self.trade_ids = trade_ids
+        self.requests = []
+        self.runner = None
+
+    async def __aenter__(self):
+        app = web.Application()
+        app.router.add_get("/api/v3/historicalTrades", self._historical_trades)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+        return self
+
+    async def __aexit__(self, *args):
+        await self.runner.cleanup()
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.port}"
+
+    async def _historical_trades(self, request):
+        from_id, limit = int(request.query["fromId"]), int(request.query["limit"])
+        self.requests.append((request.query["symbol"], from_id, limit, time.monotonic()))
+        rows = [
+            {"id": trade_id, "price": "100.0", "qty": "1.0", "quoteQty": "100.0",
+             "time": 1700000000000 + trade_id, "isBuyerMaker": True, "isBestMatch": True}
+            for trade_id in self.trade_ids if trade_id >= from_id
+        ][:limit]
+        return web.json_response(rows)
+
+
+def _rest_trade(symbol, trade_id):
+    return TradeEvent(
+        "binance", symbol, "BUY", "MARKET", 100.0, 1.0, 100.0,
+        1_700_000_000_000 + trade_id, True, str(trade_id)
+    )
+
+
+async def _wait_for(condition, timeout=2.0):
+    for _ in range(int(timeout / 0.01)):
+        if condition():
+            return True
+        await asyncio.sleep(0.01)
+    return condition()
+
+
+def _create_client(server, symbols, received, **kwargs):
+    client = BinanceWebSocketClient(symbols, streams_per_connection=2, base_url=server.base_url, **kwargs)
+    client.recovery.base_backoff = 0.01
+    client.set_trade_callback(received.append)
+    return client
+
+
+class TestBinanceShards:
+    """测试组合流分片"""
+
+    def test_symbols_are_sharded(self):
+        """测试5个交易对、每连接2个交易流时建立3条组合流连接，所有分片的交易都被发射"""
+        symbols = ["BTCUSDT", "ETHUSDT", "BNBUSDT", "SOLUSDT", "XRPUSDT"]
+
+        async def run():
+            received = []
+            async with FakeBinanceServer() as server:
+                client = _create_client(server, symbols, received)
+                await client.start()
+                assert await _wait_for(lambda: len(server.connections) == 3)
+
+                paths = sorted(connection["path"] for connection in server.connections)
+                for i, connection in enumerate(sorted(server.connections, key=lambda c: c["path"])):
+                    await server.send_trade(connection, connection["path"].split("=")[1][:7].upper(), i)
+                assert await _wait_for(lambda: len(received) == 3)
+                state = client.state
+                await client.stop()
+            return paths, received, state
+
+        paths, received, state = asyncio.run(run())
+
+        assert paths == [
+            "/stream?streams=bnbusdt@trade/solusdt@trade",
+            "/stream?streams=btcusdt@trade/ethusdt@trade",
+            "/stream?streams=xrpusdt@trade",
+        ]
+        assert sorted(trade.trade_id for trade in received) == ["0", "1", "2"]
+        assert received[0].amount == 200.0
+        assert state == ConnectionState.CONNECTED
+
+    def test_add_symbols_only_touches_affected_shards(self):
+        """测试追加交易对时先填满最后一个分片，溢出部分新建连接，其他分片不受影响"""
+        async def run():
+            async with FakeBinanceServer() as server:
+                client = _create_client(server, ["BTCUSDT", "ETHUSDT", "BNBUSDT"], [])
+                await client.start()
+                assert await _wait_for(lambda: len(server.connections) == 2)
+                first, second = sorted(server.connections, key=lambda c: c["path"])[::-1]
+
+                await client.add_symbols(["SOLUSDT", "XRPUSDT", "BTCUSDT"])
+                assert await _wait_for(lambda: len(server.connections) == 3 and second["received"])
+                shard_symbols = [shard.symbols for shard in client.shards]
+                await client.remove_symbols(["ETHUSDT"])
+                assert await _wait_for(lambda: len(first["received"]) == 1)
+                await client.stop()
+            return first, second, server.connections[2], shard_symbols
+
+        first, second, third, shard_symbols = asyncio.run(run())
+
+        assert shard_symbols == [["BTCUSDT", "ETHUSDT"], ["BNBUSDT", "SOLUSDT"], ["XRPUSDT"]]
+        assert second["received"][0]["method"] == "SUBSCRIBE"
+        assert second["received"][0]["params"] == ["solusdt@trade"]
+        assert third["path"] == "/stream?streams=xrpusdt@trade"
+        assert first["received"][0]["method"] == "UNSUBSCRIBE"
+        assert first["received"][0]["params"] == ["ethusdt@trade"]
+
+    def test_dropped_shard_reconnects_alone(self):
+        """测试单条连接断开时只有该分片重连，其他分片继续接收交易"""
+        async def run():
+            received, states = [], []
+            async with FakeBinanceServer() as server:
+                client = _create_client(server, ["BTCUSDT", "ETHUSDT", "BNBUSDT"], received)
+                client.set_state_callback(states.append)
+                await client.start()
+                assert await _wait_for(lambda: len(server.connections) == 2)
+                dropped = next(c for c in server.connections if "btcusdt" in c["path"])
+                kept = next(c for c in server.connections if "bnbusdt" in c["path"])
+
+                await dropped["ws"].close()
+                assert await _wait_for(lambda: len(server.connections) == 3)
+                assert await _wait_for(lambda: client.state == ConnectionState.CONNECTED)
+                await server.send_trade(kept, "BNBUSDT", 1)
+                await server.send_trade(server.connections[2], "BTCUSDT", 2)
+                assert await _wait_for(lambda: len(received) == 2)
+                stats = client.get_stats()["shards"]
+                await client.stop()
+            return server.connections, received, states, stats
+
+        connections, received, states, stats = asyncio.run(run())
+
+        assert connections[2]["path"] == "/stream?streams=btcusdt@trade/ethusdt@trade"
+        assert sorted(trade.symbol for trade in received) == ["BNBUSDT", "BTCUSDT"]
+        assert ConnectionState.RECONNECTING in states
+        assert [shard["reconnects"] for shard in stats] == [1, 0]
+
+
+class TestGapBackfill:
+    """测试重连后的成交缺口补齐"""
+
+    def test_gap_is_backfilled_before_live_trades(self):
+        """测试断线期间丢失的成交按页限速补齐，并按ID顺序先于实时成交发射"""
+        async def run():
+            received = []
+            http_client = AsyncHTTPClient()
+            async with FakeBinanceServer() as server, FakeRestServer(range(100, 110)) as rest:
+                client = _create_client(server, ["BTCUSDT", "ETHUSDT"], received)
+                client.backfiller = TradeBackfiller(
+                    rest_url=rest.base_url, page_limit=2, weight_per_minute=30_000, http_client=http_client
+                )
+                await client.start()
+                assert await _wait_for(lambda: len(server.connections) == 1)
+                await server.send_trade(server.connections[0], "BTCUSDT", 100)
+                await server.send_trade(server.connections[0], "ETHUSDT", 500)
+                assert await _wait_for(lambda: len(received) == 2)
+
+                # 模拟断线：101~105在断线期间成交，重连后第一笔实时成交为106
+                await server.connections[0]["ws"].close()
+                assert await _wait_for(lambda: len(server.connections) == 2)
+                await server.send_trade(server.connections[1], "BTCUSDT", 106)
+                await server.send_trade(server.connections[1], "ETHUSDT", 501)
+                await server.send_trade(server.connections[1], "BTCUSDT", 107)
+                assert await _wait_for(lambda: len(received) == 10)
+                stats = client.get_stats()
+                await client.stop()
+            await http_client.close()
+            return received, rest.requests, stats
+
+        received, requests, stats = asyncio.run(run())
+
+        btc = [trade.trade_id for trade in received if trade.symbol == "BTCUSDT"]
+        assert btc == [str(trade_id) for trade_id in range(100, 108)]
+        assert [(symbol, from_id, limit) for symbol, from_id, limit, _ in requests] == [
+            ("BTCUSDT", 101, 2), ("BTCUSDT", 103, 2), ("BTCUSDT", 105, 1)
+        ]
+        assert all(b[3] - a[3] >= 0.03 for a, b in zip(requests, requests[1:]))
+        backfilled = next(trade for trade in received if trade.trade_id == "101")
+        assert backfilled.side == "SELL" and backfilled.amount == 100.0
+        assert stats["gaps_detected"] == 1
+        assert stats["trades_backfilled"] == 5
+
+    def test_backfill_is_capped(self):
+        """测试缺口超过上限时只补齐最近的成交"""
+        async def run():
+            http_client = AsyncHTTPClient()
+            async with FakeRestServer(range(0, 50)) as rest:
+                backfiller = TradeBackfiller(
+                    rest_url=rest.base_url, max_trades=5, weight_per_minute=10**9, http_client=http_client
+                )
+                trades = await backfiller.fetch("BTCUSDT", 10, 29)
+            await http_client.close()
+            return trades, backfiller.get_stats()
+
+        trades, stats = asyncio.run(run())
+
+        assert [trade.trade_id for trade in trades] == ["25", "26", "27", "28", "29"]
+        assert stats["trades_skipped"] == 15
+
+
+    def test_backfill_does_not_block_reader(self):
+        """测试补齐在独立任务中进行：其他交易对照常发射，该交易对的实时成交缓存到补齐完成后按ID顺序发射"""
+        release = asyncio.Event()
+
+        class SlowBackfiller:
+            max_trades = 100
+
+            def __init__(self):
+                self.calls = []
+
+            async def fetch(self, symbol, first_id, last_id):
+                self.calls.append((symbol, first_id, last_id))
+                await release.wait()
+                return [_rest_trade(symbol, trade_id) for trade_id in range(first_id, last_id + 1)]
+
+            def get_stats(self):
+                return {}
+
+        async def run():
+            received = []
+            client = BinanceWebSocketClient(["BTCUSDT", "ETHUSDT"], backfiller=SlowBackfiller())
+            client.set_trade_callback(received.append)
+            await client._process_message(_rest_trade("BTCUSDT", 100))
+            await client._process_message(_rest_trade("ETHUSDT", 500))
+
+            # 模拟重连：BTC的101~105在断线期间成交
+            client._resync_symbols.update(["BTCUSDT", "ETHUSDT"])
+            for symbol, trade_id in [("BTCUSDT", 106), ("ETHUSDT", 501), ("BTCUSDT", 107), ("ETHUSDT", 502)]:
+                await client._process_message(_rest_trade(symbol, trade_id))
+            during = [trade.trade_id for trade in received]
+
+            release.set()
+            await client._backfill_tasks["BTCUSDT"]
+            return client, during, received
+
+        client, during, received = asyncio.run(run())
+
+        assert during == ["100", "500", "501", "502"]
+        assert client.backfiller.calls == [("BTCUSDT", 101, 105)]
+        assert [trade.trade_id for trade in received if trade.symbol == "BTCUSDT"] == [
+            str(trade_id) for trade_id in range(100, 108)
+        ]
+        assert client.stats["trades_backfilled"] == 5
+        assert not client._backfill_buffers
+
+    def test_requests_are_budgeted_by_weight(self):
+        """测试请求间隔按接口权重和每分钟权重预算计算"""
+        assert TradeBackfiller(weight_per_minute=1200, http_client=object()).request_interval == 1.25
+        agg = TradeBackfiller(stream_type="aggTrade", weight_per_minute=1200, http_client=object())
+        assert agg.request_interval == 0.2
+
+
+class TestRedundantConnections:
+    """测试冗余连接模式"""
+
+    def test_lagging_replica_beyond_window(self):
+        """测试副本连接落后数千笔时，其重复成交全部丢弃，只发射更新的成交"""
+        received = []
+        client = BinanceWebSocketClient(["BTCUSDT"], backfiller=None, redundant=True)
+        client.set_trade_callback(received.append)
+
+        def trade(trade_id):
+            return TradeEvent(
+                "binance", "BTCUSDT", "BUY", "MARKET", 100.0, 1.0, 100.0,
+                1_700_000_000_000 + trade_id, True, str(trade_id)
+            )
+
+        async def run():
+            for trade_id in range(1, 5_001):
+                await client._process_message(trade(trade_id))
+            # 落后的副本从头重放
+            for trade_id in range(1, 5_002):
+                await client._process_message(trade(trade_id))
+
+        asyncio.run(run())
+
+        assert [event.trade_id for event in received] == [str(trade_id) for trade_id in range(1, 5_002)]
+        assert client.stats["duplicates_dropped"] == 5_000
+
+    def test_standby_keeps_delivering(self):
+        """测试两条连接订阅相同交易流，成交去重；一条断开时另一条继续发射，状态保持CONNECTED"""
+        async def run():
+            received, states = [], []
+            async with FakeBinanceServer() as server:
+                client = _create_client(server, ["BTCUSDT", "ETHUSDT"], received, redundant=True)
+                client.set_state_callback(states.append)
+                await client.start()
+                assert await _wait_for(lambda: len(server.connections) == 2)
+                primary, standby = server.connections
+
+                for connection in (primary, standby):
+                    await server.send_trade(connection, "BTCUSDT", 1)
+                await primary["ws"].close()
+                await server.send_trade(standby, "BTCUSDT", 2)
+                assert await _wait_for(lambda: len(received) == 2)
+
+                assert await _wait_for(lambda: len(server.connections) == 3)
+                for connection in (server.connections[2], standby):
+                    await server.send_trade(connection, "BTCUSDT", 3)
+                assert await _wait_for(lambda: client.stats["duplicates_dropped"] == 2)
+                stats = client.get_stats()
+                await client.stop()
+            return server.connections, received, states, stats
+
+        connections, received, states, stats = asyncio.run(run())
+
+        assert len({connection["path"] for connection in connections}) == 1
+        assert [trade.trade_id for trade in received] == ["1", "2", "3"]
+        assert ConnectionState.RECONNECTING not in states
+        assert stats["gaps_detected"] == 0
+        assert [(shard["shard_id"], shard["replica"]) for shard in stats["shards"]] == [(0, 0), (0, 1)]
@@ -0,0 +1,59 @@
+"""
+测试客户端统计：速率计按窗口结算，批量模式每笔只计数一次，get_stats()填充速率和连接时长
+"""
+import asyncio
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../'))
+
+from src.monitor.common.rate_meter import RateMeter
+from src.monitor.large_orders.exchanges.binance import BinanceWebSocketClient
+from src.monitor.large_orders.src.base import TradeEvent
+
+
+def _trade(trade_id):
+    return TradeEvent(
+        "binance", "BTCUSDT", "BUY", "MARKET", 100.0, 1.0, 100.0,
+        1_700_000_000_000 + trade_id, True, str(trade_id)
+    )
+
+
+class TestRateMeter:
+    """测试速率计"""
+
+    def test_rate_settles_per_window(self):
+        """测试窗口未满时保持上次速率，满窗口后按计数增量结算"""
+        meter = RateMeter(window=1.0)
+        start = meter._window_start
+
+        assert meter.tick(50, start + 0.5) == 0.0
+        assert meter.tick(100, start + 1.0) == 100.0
+        assert meter.tick(150, start + 1.5) == 100.0
+        assert meter.tick(400, start + 3.0) == 150.0
+
+
+class TestClientStats:
+    """测试币安客户端统计"""
+
+    def test_batch_mode_counts_each_trade_once(self):
+        """测试批量回调模式下每笔交易只计数一次，get_stats()填充速率和最后成交时间"""
+        batches = []
+        client = BinanceWebSocketClient(["BTCUSDT"], backfiller=None, batch_size=10)
+        client.set_trade_batch_callback(batches.append)
+        # 窗口起点前移2秒：第一次刷新即结算一个完整窗口
+        client.trade_meter._window_start -= 2.0
+
+        async def run():
+            for trade_id in range(25):
+                await client._deliver_trade(_trade(trade_id))
+            client._flush_trades()
+
+        asyncio.run(run())
+        stats = client.get_stats()
+
+        assert [len(batch) for batch in batches] == [10, 10, 5]
+        assert stats["trades_received"] == 25
+        assert 0 < stats["trades_per_second"] <= 5.0
+        assert stats["last_trade_time"] == 1_700_000_000_024
+        assert stats["connection_uptime"] == 0.0
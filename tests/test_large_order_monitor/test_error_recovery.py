@@ -199,7 +199,34 @@ class TestErrorRecoveryManager:
         )
         
         assert recovery.should_continue_reconnecting() is False
-    
+
+    def test_backoff_follows_consecutive_failures(self, recovery):
+        """测试退避时间按连续失败次数增长，成功后重新计算"""
+        assert [recovery.get_backoff(n) for n in (1, 2, 3, 10)] == [2.0, 4.0, 8.0, 60.0]
+
+        for i in range(3):
+            recovery.start_reconnect_attempt()
+            recovery.complete_reconnect_attempt(i + 1, False)
+        recovery.start_reconnect_attempt()
+        assert recovery.reconnect_attempts[-1].backoff_seconds == 16.0
+        recovery.complete_reconnect_attempt(4, True)
+
+        recovery.start_reconnect_attempt()
+        assert recovery.reconnect_attempts[-1].backoff_seconds == 2.0
+
+    def test_attempt_history_is_bounded(self, recovery):
+        """测试重连记录只保留最近的部分，编号仍可完成"""
+        total = recovery.MAX_ATTEMPT_HISTORY + 50
+        for i in range(total):
+            attempt_num = recovery.start_reconnect_attempt()
+            recovery.complete_reconnect_attempt(attempt_num, True)
+
+        assert attempt_num == total
+        assert len(recovery.reconnect_attempts) == recovery.MAX_ATTEMPT_HISTORY
+        assert recovery.reconnect_attempts[-1].attempt_number == total
+        assert recovery.reconnect_attempts[-1].success is True
+        assert recovery.stats["reconnects_attempted"] == total
+
     def test_get_recent_errors(self, recovery):
         """测试获取最近的错误"""
         now = datetime.now()
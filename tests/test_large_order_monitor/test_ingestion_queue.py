@@ -0,0 +1,143 @@
+"""
+测试有界交易接入队列及大额订单监控进程的单消费者处理
+"""
+import asyncio
+import pytest
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../'))
+
+from src.monitor.common.ingestion_queue import (
+    IngestionQueue, POLICY_DROP_NEWEST, POLICY_DROP_OLDEST, POLICY_COALESCE
+)
+from src.monitor.large_orders.src.base import TradeEvent
+from src.alert_processes.large_order import LargeOrderMonitorProcess
+
+
+T0 = 1_700_000_000_000
+
+
+def _trade(symbol, side, price, quantity, offset_ms=0, trade_id="0"):
+    return TradeEvent(
+        exchange="binance", symbol=symbol, side=side, order_type="MARKET",
+        price=price, quantity=quantity, amount=price * quantity,
+        trade_time=T0 + offset_ms, is_taker=True, trade_id=trade_id, raw_data={},
+    )
+
+
+class TestIngestionQueue:
+    """测试接入队列的溢出策略和指标"""
+
+    def test_invalid_policy(self):
+        """测试非法溢出策略"""
+        with pytest.raises(ValueError):
+            IngestionQueue(maxsize=10, policy="unbounded")
+
+    def test_drop_oldest(self):
+        """测试队列满时丢弃最旧的一笔"""
+        queue = IngestionQueue(maxsize=2, policy=POLICY_DROP_OLDEST)
+        for i in range(3):
+            assert queue.put_nowait(i)
+
+        batch = asyncio.run(queue.get_batch(10))
+        assert batch == [1, 2]
+        assert queue.stats["dropped"] == 1
+        assert queue.stats["max_depth"] == 2
+
+    def test_coalesce_merges_same_symbol_and_side(self):
+        """测试队列满时并入同交易对同方向的最近一笔，成交量不丢失"""
+        queue = IngestionQueue(maxsize=2, policy=POLICY_COALESCE)
+        queue.put_nowait(_trade("BTCUSDT", "BUY", 100, 1, 0, "1"))
+        queue.put_nowait(_trade("ETHUSDT", "SELL", 10, 1, 0, "2"))
+        assert not queue.put_nowait(_trade("BTCUSDT", "BUY", 200, 1, 5, "3"))
+
+        merged, other = asyncio.run(queue.get_batch(10))
+        assert merged.quantity == 2
+        assert merged.amount == 300
+        assert merged.price == 150
+        assert merged.trade_time == T0 + 5
+        assert merged.trade_id == "3"
+        assert other.symbol == "ETHUSDT"
+        assert queue.stats["coalesced"] == 1
+        assert queue.stats["dropped"] == 0
+
+    def test_coalesce_without_match_drops_oldest(self):
+        """测试没有可合并的条目时退化为丢弃最旧"""
+        queue = IngestionQueue(maxsize=1, policy=POLICY_COALESCE)
+        queue.put_nowait(_trade("BTCUSDT", "BUY", 100, 1))
+        assert queue.put_nowait(_trade("BTCUSDT", "SELL", 100, 1))
+
+        (trade,) = asyncio.run(queue.get_batch(10))
+        assert trade.side == "SELL"
+        assert queue.stats["dropped"] == 1
+
+    def test_drop_newest_rejects_when_full(self):
+        """测试drop_newest策略下队列满时拒绝新写入，已排队的数据保留"""
+        queue = IngestionQueue(maxsize=2, policy=POLICY_DROP_NEWEST)
+        assert queue.put_nowait(1)
+        assert queue.put_nowait(2)
+        assert not queue.put_nowait(3)
+
+        assert asyncio.run(queue.get_batch(10)) == [1, 2]
+        assert queue.stats["dropped"] == 1
+
+    def test_close_drains_then_returns_empty(self):
+        """测试关闭后仍可取完剩余条目，之后返回空批次"""
+        async def run():
+            queue = IngestionQueue(maxsize=10, policy=POLICY_DROP_OLDEST)
+            queue.put_nowait(1)
+            queue.close()
+            assert not queue.put_nowait(2)
+            return await queue.get_batch(10), await queue.get_batch(10)
+
+        assert asyncio.run(run()) == ([1], [])
+
+    def test_depth_and_lag_stats(self):
+        """测试深度和排队延迟指标"""
+        async def run():
+            queue = IngestionQueue(maxsize=10, policy=POLICY_DROP_OLDEST)
+            queue.put_nowait(1)
+            queue.put_nowait(2)
+            await asyncio.sleep(0.01)
+            before = queue.get_stats()
+            await queue.get_batch(10)
+            return before, queue.get_stats()
+
+        before, after = asyncio.run(run())
+        assert before["depth"] == 2
+        assert before["oldest_lag_seconds"] > 0
+        assert after["depth"] == 0
+        assert after["dequeued"] == 2
+        assert after["last_lag_seconds"] >= 0.01
+        assert after["max_lag_seconds"] == after["last_lag_seconds"]
+
+
+class TestProcessConsumer:
+    """测试监控进程通过接入队列处理交易"""
+
+    def test_consumer_processes_in_order(self):
+        """测试交易回调只写队列，单个消费者按顺序批量处理"""
+        process = LargeOrderMonitorProcess(
+            symbols=["BTCUSDT"], threshold_usd=1_000_000, batch_size=2
+        )
+        processed = []
+
+        async def record(trades):
+            processed.extend(trade.trade_id for trade in trades)
+
+        process._on_trades_received_async = record
+
+        async def run():
+            tasks_before = len(asyncio.all_tasks())
+            for i in range(5):
+                process.on_trade_received(_trade("BTCUSDT", "BUY", 1, 1, i, str(i)))
+            assert len(asyncio.all_tasks()) == tasks_before
+
+            consumer = asyncio.create_task(process._consume_trades())
+            process.ingestion_queue.close()
+            await asyncio.wait_for(consumer, timeout=1)
+
+        asyncio.run(run())
+        assert processed == ["0", "1", "2", "3", "4"]
+        assert process.ingestion_queue.stats["dequeued"] == 5
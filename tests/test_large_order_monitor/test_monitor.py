@@ -0,0 +1,80 @@
+"""
+测试LargeOrderMonitor在交易路径上的阈值检查
+"""
+import pytest
+from unittest.mock import Mock
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../'))
+
+from src.monitor.large_orders.monitor import LargeOrderMonitor
+
+
+T0 = 1_700_000_000_000
+
+
+def _trade(amount, side, offset_ms, symbol='BTCUSDT'):
+    trade_time = T0 + offset_ms
+    return {
+        'symbol': symbol,
+        'amount': amount,
+        'side': side,
+        'trade_time': trade_time,
+        'trade_id': trade_time,
+        'price': 50_000.0,
+        'quantity': amount / 50_000.0,
+    }
+
+
+@pytest.fixture
+def monitor(tmp_path):
+    """创建使用临时存储目录的监控器"""
+    monitor = LargeOrderMonitor(
+        telegram_bot=Mock(),
+        symbols=['BTCUSDT', 'ETHUSDT'],
+        threshold_usdt=1_000_000,
+        time_window_minutes=5,
+        cooldown_minutes=10,
+        storage_path=str(tmp_path),
+    )
+    monitor.alerts = []
+    monitor.detector.set_alert_callback(
+        lambda symbol, side, total, ts: monitor.alerts.append((symbol, side, total, ts))
+    )
+    return monitor
+
+
+class TestEventDrivenThreshold:
+    """测试事件驱动的阈值检查"""
+
+    def test_alert_on_crossing_trade(self, monitor):
+        """测试越过阈值的那笔交易立即触发告警"""
+        monitor._on_trade_received(_trade(600_000, 'BUY', 1_000))
+        assert monitor.alerts == []
+
+        monitor._on_trade_received(_trade(500_000, 'BUY', 2_000))
+        assert monitor.alerts == [('BTCUSDT', 'BUY', 1_100_000, T0 + 2_000)]
+
+    def test_only_trade_side_is_checked(self, monitor):
+        """测试只检查该交易对应的(交易对, 方向)"""
+        monitor._on_trade_received(_trade(900_000, 'BUY', 1_000))
+        monitor._on_trade_received(_trade(900_000, 'SELL', 1_500))
+        monitor._on_trade_received(_trade(10, 'BUY', 2_000, symbol='ETHUSDT'))
+
+        assert monitor.alerts == []
+        assert monitor.detector.get_stats()['checks_performed'] == 3
+
+    def test_expired_trades_do_not_count(self, monitor):
+        """测试窗口外的交易不计入"""
+        monitor._on_trade_received(_trade(900_000, 'BUY', 1_000))
+        monitor._on_trade_received(_trade(200_000, 'BUY', 1_000 + 5 * 60 * 1000))
+
+        assert monitor.alerts == []
+
+    def test_cooldown_suppresses_repeat(self, monitor):
+        """测试冷却期内不重复告警"""
+        for i in range(5):
+            monitor._on_trade_received(_trade(600_000, 'SELL', 1_000 + i))
+
+        assert len(monitor.alerts) == 1
@@ -0,0 +1,71 @@
+"""
+测试OrderAggregator按成交时间推进窗口及阈值结果传递
+"""
+import asyncio
+import pytest
+from types import SimpleNamespace
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../'))
+
+from src.monitor.large_orders.core.order_aggregator import OrderAggregator
+from src.monitor.large_orders.core.threshold_engine import ThresholdEngine
+
+
+T0 = 1_700_000_000_000
+MINUTE_MS = 60 * 1000
+
+
+def _trade(side, offset_ms):
+    return SimpleNamespace(side=side, trade_time=T0 + offset_ms)
+
+
+@pytest.fixture
+def aggregator():
+    return OrderAggregator(window_minutes=5, threshold_usd=1_000_000, bucket_seconds=0)
+
+
+class TestOrderAggregator:
+    """测试订单聚合器"""
+
+    def test_window_follows_trade_time(self, aggregator):
+        """测试窗口按成交时间过期，与本地时钟无关"""
+        async def run():
+            await aggregator.add_trade("BTCUSDT", _trade("BUY", 0), 600_000)
+            await aggregator.add_trade("BTCUSDT", _trade("SELL", 4 * MINUTE_MS), 300_000)
+            await aggregator.add_trade("BTCUSDT", _trade("BUY", 5 * MINUTE_MS + 1), 100_000)
+
+        asyncio.run(run())
+        summary = aggregator.get_window_summary("BTCUSDT")
+        assert summary["trade_count"] == 2
+        assert summary["buy_volume"] == 100_000
+        assert summary["sell_volume"] == 300_000
+        assert aggregator.stats["cleanup_count"] == 1
+
+    def test_late_trade_outside_window_is_dropped(self, aggregator):
+        """测试早于窗口左边界的迟到交易被丢弃，窗口内的迟到交易照常计入"""
+        async def run():
+            await aggregator.add_trade("BTCUSDT", _trade("BUY", 10 * MINUTE_MS), 100)
+            await aggregator.add_trade("BTCUSDT", _trade("BUY", 4 * MINUTE_MS), 200)
+            await aggregator.add_trade("BTCUSDT", _trade("BUY", 8 * MINUTE_MS), 300)
+
+        asyncio.run(run())
+        assert aggregator.get_window_summary("BTCUSDT")["buy_volume"] == 400
+        assert aggregator.stats["late_trades_dropped"] == 1
+
+    def test_breach_result_feeds_threshold_engine(self, aggregator):
+        """测试突破结果直接传给阈值引擎"""
+        engine = ThresholdEngine(threshold_usd=1_000_000, cooldown_minutes=5)
+
+        async def run():
+            first = await aggregator.add_trade("BTCUSDT", _trade("BUY", 0), 600_000)
+            breach = await aggregator.add_trade("BTCUSDT", _trade("SELL", 1_000), 500_000)
+            return first, breach, await engine.check_aggregation("BTCUSDT", breach)
+
+        first, breach, event = asyncio.run(run())
+        assert first is None
+        assert breach["threshold_breach"] is True
+        assert breach["total_volume"] == 1_100_000
+        assert event.direction == "买入"
+        assert event.trade_count == 2
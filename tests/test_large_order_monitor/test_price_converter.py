@@ -3,6 +3,7 @@
 """
 import pytest
 import asyncio
+import logging
 from unittest.mock import Mock, AsyncMock, patch
 import aiohttp
 
@@ -10,7 +11,9 @@ import sys
 import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../'))
 
-from src.monitor.large_orders.src.price_converter import PriceConverter, ExchangeRate
+from src.monitor.large_orders.src.price_converter import (
+    PriceConverter, ExchangeRate, STRATEGY_STABLE, STRATEGY_CROSS
+)
 
 
 class TestPriceConverter:
@@ -72,42 +75,14 @@ class TestPriceConverter:
         result = await converter.convert_to_usd("BNBUSDC", 300, 1000)
         assert result == 300000  # 300 * 1000
     
-    @pytest.mark.asyncio
-    @patch('aiohttp.ClientSession.get')
-    async def test_convert_via_api(self, mock_get, converter):
-        """测试通过API转换"""
-        # 模拟API响应
-        mock_response = Mock()
-        mock_response.json = AsyncMock(return_value={"price": "1.0"})
-        mock_get.return_value.__aenter__ = AsyncMock(return_value=mock_response)
-        
-        # 测试USDT/USD转换
-        result = await converter._get_usdt_usd_rate()
-        assert result == 1.0
-        mock_get.assert_called_once()
-    
-    @pytest.mark.asyncio
-    @patch('aiohttp.ClientSession.get')
-    async def test_convert_coin_to_usdt(self, mock_get, converter):
-        """测试货币转换为USDT"""
-        # 模拟API响应
-        mock_response = Mock()
-        mock_response.json = AsyncMock(return_value={"price": "0.05"})
-        mock_get.return_value.__aenter__ = AsyncMock(return_value=mock_response)
-        
-        # 测试ETH/USDT转换
-        result = await converter._get_coin_usdt_rate("ETH")
-        assert result == 0.05
-        mock_get.assert_called_once()
-    
     @pytest.mark.asyncio
     async def test_convert_stable_coin(self, converter):
         """测试稳定币直接转换"""
         # 稳定币应该返回1.0
-        result = await converter._get_coin_usdt_rate("USDT")
+        result = converter._get_coin_usdt_rate("USDT")
         assert result == 1.0
         
-        result = await converter._get_coin_usdt_rate("BUSD")
+        result = converter._get_coin_usdt_rate("BUSD")
         assert result == 1.0
     
     @pytest.mark.asyncio
@@ -164,17 +139,6 @@ class TestPriceConverter:
             result = await converter.convert_to_usd("INVALID", 50000, 10)
             assert result == 0.0
     
-    @pytest.mark.asyncio
-    @patch('aiohttp.ClientSession.get')
-    async def test_api_failure(self, mock_get, converter):
-        """测试API失败处理"""
-        # 模拟API失败
-        mock_get.side_effect = Exception("API error")
-        
-        # 应该返回保守估计1.0
-        result = await converter._get_usdt_usd_rate()
-        assert result == 1.0
-    
     @pytest.mark.asyncio
     async def test_context_manager(self):
         """测试异步上下文管理器"""
@@ -186,6 +150,179 @@ class TestPriceConverter:
         # 但在上下文管理器测试中，通常检查是否没有异常
 
 
+class TestSymbolStrategy:
+    """测试交易对换算策略缓存和同步快速路径"""
+    
+    def test_classify_symbol_is_memoized(self):
+        """测试每个交易对只解析一次"""
+        converter = PriceConverter(http_client=object())
+        with patch.object(converter, '_extract_currencies', wraps=converter._extract_currencies) as extract:
+            first = converter.classify_symbol("BTC/USDT")
+            second = converter.classify_symbol("BTC/USDT")
+        
+        assert first is second
+        assert first.strategy == STRATEGY_STABLE
+        assert (first.base_coin, first.quote_coin) == ("BTC", "USDT")
+        assert extract.call_count == 1
+        assert converter.classify_symbol("ETHBTC").strategy == STRATEGY_CROSS
+    
+    def test_sync_fast_path(self):
+        """测试稳定币计价交易对同步返回，跨币种交易对返回None"""
+        converter = PriceConverter(http_client=object())
+        assert converter.convert_to_usd_sync("BTCUSDT", 50000, 2) == 100000
+        assert converter.convert_to_usd_sync("ADAUSDC", 0.5, 10) == 5
+        assert converter.convert_to_usd_sync("ETHBTC", 0.05, 10) is None
+        with pytest.raises(ValueError):
+            converter.convert_to_usd_sync("XYZ", 1, 1)
+    
+    def test_cross_pair_uses_rate_lookup(self):
+        """测试跨币种交易对仍走异步汇率查询"""
+        converter = PriceConverter(http_client=object())
+        with patch.object(converter, '_get_coin_usdt_rate', return_value=50000.0), \
+                patch.object(converter, '_get_usdt_usd_rate', return_value=1.0):
+            result = asyncio.run(converter.convert_to_usd("ETHBTC", 0.05, 10))
+        assert result == pytest.approx(25000.0)
+
+
+class TestRateSnapshot:
+    """测试后台批量刷新的汇率快照"""
+    
+    @staticmethod
+    def _converter(response):
+        http_client = Mock()
+        http_client.get_json = AsyncMock(side_effect=response)
+        return PriceConverter(cache_ttl=60, http_client=http_client)
+    
+    def test_bulk_refresh_covers_all_tracked_coins(self):
+        """测试一次批量请求刷新所有需要的汇率"""
+        converter = self._converter([[
+            {"symbol": "BTCUSDT", "price": "50000"},
+            {"symbol": "BNBUSDT", "price": "300"},
+            {"symbol": "USDTBUSD", "price": "0.999"},
+            {"symbol": "XRPUSDT", "price": "0.5"},
+        ]])
+        converter.classify_symbol("ETHBTC")
+        converter.classify_symbol("ADABNB")
+        converter.classify_symbol("XRPETH")
+        
+        assert asyncio.run(converter.refresh_rates()) is True
+        converter.http_client.get_json.assert_called_once()
+        assert set(converter.get_cached_rates()) == {"USDT", "BTCUSDT", "BNBUSDT"}
+        assert converter.get_rate("BTCUSDT").rate == 50000
+        assert asyncio.run(converter.convert_to_usd("ETHBTC", 0.05, 10)) == pytest.approx(0.5 * 50000 * 0.999)
+    
+    def test_usdt_rate_refresh(self):
+        """测试刷新USDT/USD汇率"""
+        converter = self._converter([[{"symbol": "USDTBUSD", "price": "1.0"}]])
+        converter._get_usdt_usd_rate()
+        
+        assert asyncio.run(converter.refresh_rates()) is True
+        assert converter._get_usdt_usd_rate() == 1.0
+        converter.http_client.get_json.assert_called_once()
+    
+    def test_coin_rate_refresh(self):
+        """测试刷新货币对USDT的汇率"""
+        converter = self._converter([[{"symbol": "ETHUSDT", "price": "0.05"}]])
+        converter._get_coin_usdt_rate("ETH")
+        
+        assert asyncio.run(converter.refresh_rates()) is True
+        assert converter._get_coin_usdt_rate("ETH") == 0.05
+        converter.http_client.get_json.assert_called_once()
+    
+    def test_api_failure_keeps_conservative_usdt_rate(self):
+        """测试刷新失败时USDT/USD汇率返回保守估计1.0"""
+        converter = self._converter([Exception("API error")])
+        converter._get_usdt_usd_rate()
+        
+        assert asyncio.run(converter.refresh_rates()) is False
+        assert converter._get_usdt_usd_rate() == 1.0
+    
+    def test_requests_only_tracked_symbols(self):
+        """测试刷新只请求需要的交易对，而不是全量价格"""
+        converter = self._converter([[{"symbol": "BTCUSDT", "price": "50000"}]])
+        converter.classify_symbol("ETHBTC")
+        asyncio.run(converter.refresh_rates())
+        
+        _, kwargs = converter.http_client.get_json.call_args
+        assert kwargs["params"] == {"symbols": '["BTCUSDT","USDTBUSD"]'}
+    
+    def test_unlisted_symbol_falls_back_to_single_requests(self):
+        """测试批量请求因不存在的交易对返回400时逐个查询，之后不再请求该交易对"""
+        def bad_request():
+            return aiohttp.ClientResponseError(Mock(), (), status=400)
+        
+        converter = self._converter([
+            bad_request(),
+            {"symbol": "BTCUSDT", "price": "50000"},
+            bad_request(),
+            [{"symbol": "BTCUSDT", "price": "51000"}],
+        ])
+        converter.classify_symbol("ETHBTC")
+        
+        assert asyncio.run(converter.refresh_rates()) is True
+        assert converter.get_rate("BTCUSDT").rate == 50000
+        assert converter._unlisted_tickers == {"USDTBUSD"}
+        
+        asyncio.run(converter.refresh_rates())
+        _, kwargs = converter.http_client.get_json.call_args
+        assert kwargs["params"] == {"symbols": '["BTCUSDT"]'}
+        assert converter.get_rate("BTCUSDT").rate == 51000
+    
+    def test_first_lookup_waits_for_refresh(self):
+        """测试计价货币首次出现时等待一次刷新，不会在后台首次刷新前换算为0"""
+        converter = self._converter([[{"symbol": "BTCUSDT", "price": "50000"}]])
+        
+        async def run():
+            return [await converter.convert_to_usd("ETHBTC", 0.05, 10) for _ in range(3)]
+        
+        assert asyncio.run(run()) == [pytest.approx(25000.0)] * 3
+        converter.http_client.get_json.assert_called_once()
+    
+    def test_first_lookup_waits_only_once(self, caplog):
+        """测试首次刷新失败后不再逐笔等待网络，汇率缺失的提示每种货币只记录一次"""
+        converter = self._converter([Exception("API error")])
+        
+        async def run():
+            return [await converter.convert_to_usd("ETHBTC", 0.05, 10) for _ in range(3)]
+        
+        with caplog.at_level(logging.WARNING):
+            assert asyncio.run(run()) == [0.0] * 3
+        converter.http_client.get_json.assert_called_once()
+        assert sum("BTC/USDT汇率尚未获取" in record.message for record in caplog.records) == 1
+    
+    def test_failed_refresh_serves_stale_values(self):
+        """测试刷新失败时继续使用旧值并标记过期"""
+        converter = self._converter([
+            [{"symbol": "BTCUSDT", "price": "50000"}],
+            Exception("API error"),
+        ])
+        converter.classify_symbol("ETHBTC")
+        asyncio.run(converter.refresh_rates())
+        old_snapshot = converter._snapshot
+        
+        assert asyncio.run(converter.refresh_rates()) is False
+        rate = converter.get_rate("BTCUSDT")
+        assert rate.rate == 50000
+        assert rate.stale is True
+        assert converter._snapshot.stale is True
+        assert old_snapshot.rates["BTCUSDT"].stale is False
+    
+    def test_background_task_refreshes(self):
+        """测试后台任务启动后按间隔刷新"""
+        converter = self._converter(lambda *args, **kwargs: [{"symbol": "BTCUSDT", "price": "50000"}])
+        converter.refresh_interval = 0.01
+        converter.classify_symbol("ETHBTC")
+        
+        async def run():
+            converter.start_refresh()
+            await asyncio.sleep(0.05)
+            await converter.stop_refresh()
+        
+        asyncio.run(run())
+        assert converter.http_client.get_json.call_count >= 2
+        assert converter.get_rate("BTCUSDT").rate == 50000
+
+
 class TestExchangeRate:
     """测试ExchangeRate数据模型"""
     
@@ -0,0 +1,220 @@
+"""
+测试连接监督循环：反复断线重连时任务数、调用栈深度、线程数和内存保持平稳
+"""
+import asyncio
+import json
+import logging
+import sys
+import threading
+import tracemalloc
+
+import pytest
+
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../'))
+
+from src.monitor.large_orders import collector as collector_module
+from src.monitor.large_orders.collector import BinanceOrderBookCollector
+from src.monitor.large_orders.exchanges import binance
+from src.monitor.large_orders.exchanges.binance import BinanceWebSocketClient
+from src.monitor.large_orders.src.base import ConnectionState
+
+DISCONNECTS = 1000
+
+
+def _trade_message(trade_id):
+    return json.dumps({
+        "stream": "btcusdt@trade",
+        "data": {
+            "e": "trade", "E": 1700000000001, "s": "BTCUSDT", "t": trade_id,
+            "p": "100.0", "q": "1.0", "T": 1700000000000, "m": False, "M": True
+        }
+    })
+
+
+def _stack_depth():
+    frame, depth = sys._getframe(1), 0
+    while frame is not None:
+        frame, depth = frame.f_back, depth + 1
+    return depth
+
+
+class FakeSocket:
+    """模拟连接：发送给定消息后断开；hold为True时保持连接"""
+
+    def __init__(self, messages, hold=False):
+        self.messages = messages
+        self.hold = hold
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for message in self.messages:
+            yield message
+        if self.hold:
+            await asyncio.Event().wait()
+
+    async def send(self, message):
+        pass
+
+    async def close(self):
+        pass
+
+
+class TestClientSupervisor:
+    """测试币安客户端分片监督循环"""
+
+    def test_resources_flat_across_disconnects(self, monkeypatch):
+        """测试1000次断线重连后任务数、调用栈深度不变，重连记录和内存有界"""
+        samples = {}
+
+        async def run():
+            done = asyncio.Event()
+            connects = 0
+
+            async def fake_connect(url, **kwargs):
+                nonlocal connects
+                connects += 1
+                if connects in (10, DISCONNECTS):
+                    samples[connects] = (
+                        len(asyncio.all_tasks()), _stack_depth(), tracemalloc.get_traced_memory()[0]
+                    )
+                if connects >= DISCONNECTS:
+                    done.set()
+                    return FakeSocket([], hold=True)
+                return FakeSocket([_trade_message(connects)])
+
+            monkeypatch.setattr(binance.websockets, "connect", fake_connect)
+            received = []
+            client = BinanceWebSocketClient(["BTCUSDT"], base_url="ws://fake", backfiller=None)
+            client.recovery.base_backoff = 0
+            client.set_trade_callback(lambda trade: received.append(trade.trade_id))
+
+            # 日志捕获会保留每条记录，测量期间关闭日志
+            logging.disable(logging.CRITICAL)
+            tracemalloc.start()
+            try:
+                await client.start()
+                await asyncio.wait_for(done.wait(), timeout=60)
+                stats = client.get_stats()
+                state = client.shards[0].state
+                await client.stop()
+            finally:
+                tracemalloc.stop()
+                logging.disable(logging.NOTSET)
+            return client, received, stats, state
+
+        client, received, stats, state = asyncio.run(run())
+
+        tasks_early, depth_early, memory_early = samples[10]
+        tasks_late, depth_late, memory_late = samples[DISCONNECTS]
+        assert tasks_late == tasks_early
+        assert depth_late == depth_early
+        assert memory_late - memory_early < 512 * 1024
+        assert len(client.recovery.reconnect_attempts) <= client.recovery.MAX_ATTEMPT_HISTORY
+        assert stats["shards"][0]["reconnects"] == DISCONNECTS - 1
+        assert state == ConnectionState.CONNECTED
+        assert len(received) == DISCONNECTS - 1
+        assert stats["gaps_detected"] == 0
+
+    def test_shard_fails_after_max_attempts(self, monkeypatch):
+        """测试连续重连失败超过上限后分片进入FAILED并退出监督循环"""
+        async def run():
+            connects = 0
+
+            async def fake_connect(url, **kwargs):
+                nonlocal connects
+                connects += 1
+                if connects == 1:
+                    return FakeSocket([])
+                raise OSError("connection refused")
+
+            monkeypatch.setattr(binance.websockets, "connect", fake_connect)
+            client = BinanceWebSocketClient(["BTCUSDT"], base_url="ws://fake", backfiller=None)
+            client.recovery.base_backoff = 0
+            await client.start()
+            await asyncio.wait_for(client.shards[0].task, timeout=5)
+            state, shard_state = client.state, client.shards[0].state
+            await client.stop()
+            return connects, state, shard_state, client.recovery.max_reconnect_attempts
+
+        connects, state, shard_state, max_attempts = asyncio.run(run())
+
+        assert connects == 1 + max_attempts
+        assert shard_state == ConnectionState.FAILED
+        assert state == ConnectionState.FAILED
+
+
+class FakeWebSocketApp:
+    """模拟websocket-client：run_forever打开连接后立即断开"""
+
+    instances = 0
+    on_connect = None
+
+    def __init__(self, url, on_message=None, on_error=None, on_close=None, on_open=None):
+        self.on_open = on_open
+        self.on_close = on_close
+
+    def run_forever(self, **kwargs):
+        FakeWebSocketApp.instances += 1
+        FakeWebSocketApp.on_connect(self)
+        self.on_close(self, 1006, "dropped")
+
+    def close(self):
+        pass
+
+
+class TestLegacyCollectorSupervisor:
+    """测试旧版采集器的重连循环"""
+
+    @pytest.fixture
+    def fake_app(self, monkeypatch):
+        FakeWebSocketApp.instances = 0
+        monkeypatch.setattr(collector_module.websocket, "WebSocketApp", FakeWebSocketApp)
+        return FakeWebSocketApp
+
+    def test_reconnects_in_one_thread(self, fake_app):
+        """测试1000次断线只由_run循环重连：不重入start()，线程数不增长，重连记录有界"""
+        collector = BinanceOrderBookCollector(["BTCUSDT"], lambda trade: None)
+        collector.recovery.base_backoff = 0
+        threads = []
+
+        def on_connect(app):
+            app.on_open(app)
+            threads.append(threading.active_count())
+            if fake_app.instances >= DISCONNECTS:
+                collector.stop()
+
+        fake_app.on_connect = on_connect
+        collector.start()
+        collector.thread.join(30)
+
+        assert not collector.thread.is_alive()
+        assert fake_app.instances == DISCONNECTS
+        assert max(threads) == threads[0]
+        assert len(collector.recovery.reconnect_attempts) <= collector.recovery.MAX_ATTEMPT_HISTORY
+        assert collector.recovery.consecutive_failures == 0
+
+    def test_gives_up_after_max_attempts(self, fake_app):
+        """测试连接始终打不开时在max_reconnect_attempts次重连后停止"""
+        collector = BinanceOrderBookCollector(["BTCUSDT"], lambda trade: None)
+        collector.recovery.base_backoff = 0
+        fake_app.on_connect = lambda app: None
+
+        collector.start()
+        collector.thread.join(10)
+
+        assert not collector.thread.is_alive()
+        assert fake_app.instances == 1 + collector.max_reconnect_attempts
+        assert not collector.is_running
+        assert collector.recovery.current_state == "closed"
+
+    def test_parses_combined_stream_messages(self):
+        """测试组合流消息被解析并回调"""
+        trades = []
+        collector = BinanceOrderBookCollector(["BTCUSDT"], trades.append)
+        collector._on_message(None, _trade_message(42))
+
+        assert trades[0]["trade_id"] == 42
+        assert trades[0]["symbol"] == "BTCUSDT"
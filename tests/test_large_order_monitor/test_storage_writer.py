@@ -0,0 +1,202 @@
+"""
+测试存储后台写线程：交易只入队、队列满时丢弃并计数、告警复用文件句柄、停止时写完队列、
+join()只等待调用前入队的数据、首次写入时才启动线程、关闭后拒绝写入、告警不被交易积压阻塞、
+停止超时时不与写线程争用句柄、监控器重启后继续保存
+"""
+import threading
+import time
+from unittest.mock import Mock
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../'))
+
+from src.monitor.large_orders.monitor import LargeOrderMonitor
+from src.monitor.large_orders.storage import FileStorage
+from src.monitor.large_orders.storage_writer import StorageWriter
+from src.monitor.large_orders.trade_archive import TradeArchive
+
+
+T0 = 1_700_000_000_000
+
+
+def _trade(i):
+    return {
+        'exchange': 'binance', 'symbol': 'BTCUSDT', 'side': 'BUY', 'order_type': 'MARKET',
+        'price': 50_000.0, 'quantity': 0.1, 'amount': 5_000.0,
+        'trade_time': T0 + i, 'is_taker': True, 'trade_id': i,
+    }
+
+
+def _wait_until(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+class TestStorageWriter:
+    """测试后台写线程"""
+
+    def test_full_queue_drops_trades(self, tmp_path):
+        """测试队列满时交易被丢弃并计数，调用方不阻塞"""
+        writer = StorageWriter(TradeArchive(str(tmp_path)), queue_size=2)
+        results = [writer.submit_trade(_trade(i)) for i in range(5)]
+
+        assert results == [True, True, False, False, False]
+        stats = writer.get_stats()
+        assert stats['trades_dropped'] == 3
+        assert stats['max_queue_depth'] == 2
+
+    def test_records_not_blocked_by_trade_backlog(self, tmp_path):
+        """测试交易队列已满时告警仍立即入队，告警队列满时丢弃并计数而不阻塞"""
+        writer = StorageWriter(TradeArchive(str(tmp_path)), queue_size=2, record_queue_size=1)
+        for i in range(2):
+            writer.submit_trade(_trade(i))
+
+        path = tmp_path / "alerts.jsonl"
+        assert writer.submit_record(path, {'n': 1})
+        assert not writer.submit_record(path, {'n': 2})
+        assert writer.get_stats()['records_dropped'] == 1
+
+        writer.stop()
+        assert path.read_text(encoding='utf-8').splitlines() == ['{"n": 1}']
+        assert writer.get_stats()['trades_dropped'] == 0
+
+    def test_stop_timeout_leaves_handles_to_writer(self, tmp_path):
+        """测试写线程未在超时内退出时stop()不在调用线程写入或关闭句柄，写线程完成后自行关闭"""
+        archive = TradeArchive(str(tmp_path))
+        entered, release = threading.Event(), threading.Event()
+        append = archive.append
+
+        def slow_append(trade):
+            entered.set()
+            release.wait(5)
+            append(trade)
+
+        archive.append = slow_append
+        writer = StorageWriter(archive)
+        writer.start()
+        writer.submit_record(tmp_path / "alerts.jsonl", {'n': 1})
+        assert _wait_until(lambda: writer.get_stats()['records_written'] == 1)
+        writer.submit_trade(_trade(0))
+        assert entered.wait(2)
+
+        writer.stop(timeout=0.1)
+        assert writer.thread is not None and writer.thread.is_alive()
+        assert writer.get_stats()['open_files'] == 1
+
+        release.set()
+        writer.thread.join(5)
+        assert writer.get_stats()['open_files'] == 0
+        assert archive.get_stats()['trades_appended'] == 1
+
+    def test_trades_written_off_the_calling_thread(self, tmp_path):
+        """测试交易由写线程追加到归档"""
+        archive = TradeArchive(str(tmp_path))
+        writer_threads = set()
+        append = archive.append
+
+        def recording_append(trade):
+            writer_threads.add(threading.current_thread().name)
+            append(trade)
+
+        archive.append = recording_append
+        writer = StorageWriter(archive)
+        writer.start()
+        for i in range(10):
+            writer.submit_trade(_trade(i))
+        writer.join()
+        writer.stop()
+
+        assert writer_threads == {"storage-writer"}
+        assert archive.get_stats()['trades_appended'] == 10
+
+    def test_join_returns_while_trades_stream_in(self, tmp_path):
+        """测试持续有交易入队时join()仍在写完调用前的数据后返回"""
+        archive = TradeArchive(str(tmp_path))
+        writer = StorageWriter(archive, batch_size=10)
+        writer.start()
+        for i in range(100):
+            writer.submit_trade(_trade(i))
+
+        streaming = threading.Event()
+        streaming.set()
+
+        def produce():
+            i = 100
+            while streaming.is_set():
+                writer.submit_trade(_trade(i))
+                i += 1
+
+        producer = threading.Thread(target=produce)
+        producer.start()
+        try:
+            started = time.monotonic()
+            assert writer.join(timeout=5)
+            assert time.monotonic() - started < 5
+            assert archive.get_stats()['trades_appended'] >= 100
+        finally:
+            streaming.clear()
+            producer.join()
+            writer.stop()
+
+    def test_alert_handle_is_reused(self, tmp_path):
+        """测试告警追加复用同一个打开的句柄，close()后全部可读"""
+        storage = FileStorage(str(tmp_path))
+        for i in range(3):
+            storage.save_alert('BTCUSDT', 'BUY', 1_000_000 + i, T0 + i, f"alert {i}")
+
+        alerts = storage.get_alerts(T0, T0 + 10)
+        assert [alert['total_amount'] for alert in alerts] == [1_000_000, 1_000_001, 1_000_002]
+        assert storage.writer.get_stats()['open_files'] == 1
+        assert storage.writer.get_stats()['records_written'] == 3
+
+        storage.close()
+        assert storage.writer.get_stats()['open_files'] == 0
+        assert storage.writer.thread is None
+
+    def test_close_writes_queued_trades(self, tmp_path):
+        """测试close()写完队列和缓冲中的交易"""
+        storage = FileStorage(str(tmp_path))
+        for i in range(500):
+            storage.save_trade(_trade(i))
+        storage.close()
+
+        reopened = FileStorage(str(tmp_path))
+        assert len(reopened.get_trades('BTCUSDT', T0, T0 + 1_000)) == 500
+        reopened.close()
+
+    def test_writer_starts_lazily_and_rejects_after_close(self, tmp_path):
+        """测试首次写入时才启动写线程，close()后的写入被拒绝而不是留在无人消费的队列中"""
+        storage = FileStorage(str(tmp_path))
+        assert storage.writer.thread is None
+
+        storage.save_trade(_trade(0))
+        assert storage.writer.thread is not None
+        storage.close()
+
+        storage.save_trade(_trade(1))
+        storage.save_alert('BTCUSDT', 'BUY', 1_000_000, T0, "late alert")
+        assert storage.writer.thread is None
+        assert storage.writer.get_stats()['queue_depth'] == 0
+        assert storage.writer.get_stats()['trades_dropped'] == 1
+        assert not storage.alerts_path.exists()
+
+    def test_monitor_restart_keeps_saving(self, tmp_path):
+        """测试监控器stop()后再start()使用新的存储，之后的交易照常保存"""
+        monitor = LargeOrderMonitor(telegram_bot=Mock(), storage_path=str(tmp_path), stream_hub=Mock())
+        monitor.start()
+        monitor.stop()
+        closed = monitor.storage
+
+        monitor.start()
+        assert monitor.storage is not closed
+        monitor.storage.save_trade(_trade(0))
+        monitor.stop()
+
+        reopened = FileStorage(str(tmp_path))
+        assert len(reopened.get_trades('BTCUSDT', T0, T0 + 1_000)) == 1
+        reopened.close()
@@ -0,0 +1,179 @@
+"""
+测试共享交易流中枢：单连接订阅并集、按消费者过滤分发、跨线程调度
+"""
+import asyncio
+import threading
+import pytest
+from types import SimpleNamespace
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../'))
+
+from src.monitor.large_orders.exchanges.stream_hub import TradeStreamHub
+from src.monitor.large_orders.src.base import ConnectionState
+
+
+class FakeClient:
+    """模拟采集器：记录订阅的交易对，由测试发射交易批次"""
+
+    def __init__(self, symbols):
+        self.symbols = list(symbols)
+        self.started = threading.Event()
+        self.stopped = threading.Event()
+        self.batch_callback = None
+        self.state_callback = None
+
+    def set_trade_batch_callback(self, callback):
+        self.batch_callback = callback
+
+    def set_state_callback(self, callback):
+        self.state_callback = callback
+
+    async def start(self):
+        self.state_callback(ConnectionState.CONNECTED)
+        self.started.set()
+
+    async def add_symbols(self, symbols):
+        self.symbols += [symbol for symbol in symbols if symbol not in self.symbols]
+
+    async def remove_symbols(self, symbols):
+        self.symbols = [symbol for symbol in self.symbols if symbol not in symbols]
+
+    async def stop(self):
+        self.stopped.set()
+
+    def get_stats(self):
+        return {}
+
+
+def _trade(symbol):
+    return SimpleNamespace(symbol=symbol)
+
+
+def _wait_until(condition, timeout=2.0):
+    event = threading.Event()
+    for _ in range(int(timeout / 0.01)):
+        if condition():
+            return True
+        event.wait(0.01)
+    return condition()
+
+
+@pytest.fixture
+def hub():
+    clients = []
+
+    def factory(symbols):
+        clients.append(FakeClient(symbols))
+        return clients[-1]
+
+    hub = TradeStreamHub(client_factory=factory)
+    hub.clients = clients
+    yield hub
+    hub.stop(timeout=2)
+
+
+class TestTradeStreamHub:
+    """测试交易流中枢"""
+
+    def test_filters_per_consumer(self, hub):
+        """测试每个消费者只收到自己订阅的交易对，全量订阅者共享同一批次"""
+        large, taker = [], []
+        hub.subscribe("large_order", ["BTCUSDT", "ETHUSDT", "BNBUSDT"], large.append)
+        hub.subscribe("taker_order", ["btcusdt", "ethusdt"], taker.append)
+        assert hub.symbols == ["BNBUSDT", "BTCUSDT", "ETHUSDT"]
+
+        batch = [_trade("BTCUSDT"), _trade("BNBUSDT"), _trade("ETHUSDT")]
+        hub._dispatch(batch)
+        hub._dispatch([_trade("BNBUSDT")])
+
+        assert large == [batch, [batch[1]]]
+        assert [[trade.symbol for trade in trades] for trades in taker] == [["BTCUSDT", "ETHUSDT"]]
+        assert hub.get_stats()["consumers"]["taker_order"]["trades_delivered"] == 2
+
+    def test_consumer_error_is_isolated(self, hub):
+        """测试单个消费者回调出错不影响其他消费者"""
+        received = []
+
+        def broken(trades):
+            raise RuntimeError("boom")
+
+        hub.subscribe("broken", ["BTCUSDT"], broken)
+        hub.subscribe("ok", ["BTCUSDT"], received.extend)
+        hub._dispatch([_trade("BTCUSDT")])
+
+        assert len(received) == 1
+        assert hub.stats["delivery_errors"] == 1
+
+    def test_single_connection_and_loop_delivery(self, hub):
+        """测试多个消费者共用一个连接，回调调度到消费者自己的事件循环"""
+        async def consume():
+            loop = asyncio.get_running_loop()
+            received = asyncio.Queue()
+            states = []
+            hub.subscribe(
+                "large_order", ["BTCUSDT"], received.put_nowait,
+                loop=loop, state_callback=states.append
+            )
+            hub.subscribe("taker_order", ["BTCUSDT"], lambda trades: None)
+            hub.start()
+            hub.start()
+            assert await loop.run_in_executor(
+                None, _wait_until, lambda: hub.clients and hub.clients[0].started.is_set()
+            )
+
+            # 启动后新增的交易对追加到同一连接
+            hub.subscribe("late", ["SOLUSDT"], lambda trades: None)
+            hub._loop.call_soon_threadsafe(hub._dispatch, [_trade("BTCUSDT")])
+            trades = await asyncio.wait_for(received.get(), timeout=2)
+            return trades, states
+
+        trades, states = asyncio.run(consume())
+
+        assert [trade.symbol for trade in trades] == ["BTCUSDT"]
+        assert states == [ConnectionState.CONNECTED]
+        assert len(hub.clients) == 1
+        assert _wait_until(lambda: "SOLUSDT" in hub.clients[0].symbols)
+        assert hub.clients[0].symbols == ["BTCUSDT", "SOLUSDT"]
+
+    def test_last_unsubscribe_stops_connection(self, hub):
+        """测试注销时取消无人订阅的交易对，最后一个消费者注销后关闭连接"""
+        hub.subscribe("large_order", ["BTCUSDT"], lambda trades: None)
+        hub.subscribe("taker_order", ["BTCUSDT"], lambda trades: None)
+        hub.start()
+        assert _wait_until(lambda: hub.clients and hub.clients[0].started.is_set())
+
+        hub.subscribe("solana", ["SOLUSDT"], lambda trades: None)
+        assert _wait_until(lambda: "SOLUSDT" in hub.clients[0].symbols)
+        hub.unsubscribe("solana")
+        assert _wait_until(lambda: hub.clients[0].symbols == ["BTCUSDT"])
+
+        hub.unsubscribe("large_order")
+        assert hub.running
+        hub.unsubscribe("taker_order")
+        assert hub.clients[0].stopped.wait(2)
+        hub._thread.join(2)
+        assert not hub.running
+
+    def test_restart_while_stopping(self, hub):
+        """测试stop()后旧线程尚未退出时立即start()，等待旧线程结束后启动新连接"""
+        hub.subscribe("large_order", ["BTCUSDT"], lambda trades: None)
+        hub.start()
+        assert _wait_until(lambda: hub.clients and hub.clients[0].started.is_set())
+
+        old_client, old_thread = hub.clients[0], hub._thread
+
+        async def slow_stop():
+            await asyncio.sleep(0.2)
+            old_client.stopped.set()
+
+        old_client.stop = slow_stop
+        hub.stop()
+        assert hub.running
+        hub.start()
+
+        assert old_client.stopped.is_set()
+        assert not old_thread.is_alive()
+        assert hub.running
+        assert _wait_until(lambda: len(hub.clients) == 2 and hub.clients[1].started.is_set())
@@ -0,0 +1,115 @@
+"""
+测试列式交易归档：分段写入、按时间范围回放、跨日切分，以及FileStorage读取旧版JSONL
+"""
+import json
+from datetime import datetime, timedelta
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../'))
+
+from src.monitor.large_orders.storage import FileStorage
+from src.monitor.large_orders.trade_archive import (
+    SEGMENT_SUFFIX, TradeArchive, TradeArchiveReader, read_segment, segment_time_range
+)
+
+
+T0 = 1_700_000_000_000
+
+
+def _trade(i, symbol='BTCUSDT', trade_time=None):
+    price = 50_000.0 + i * 0.5
+    quantity = 0.001 * (i % 7 + 1)
+    return {
+        'exchange': 'binance',
+        'symbol': symbol,
+        'side': 'BUY' if i % 3 else 'SELL',
+        'order_type': 'MARKET',
+        'price': price,
+        'quantity': quantity,
+        'amount': price * quantity,
+        'trade_time': T0 + i * 10 if trade_time is None else trade_time,
+        'is_taker': True,
+        'trade_id': 3_000_000_000 + i,
+    }
+
+
+def _segments(tmp_path):
+    return sorted(tmp_path.rglob(f"*{SEGMENT_SUFFIX}"))
+
+
+class TestTradeArchive:
+    """测试归档写入和回放"""
+
+    def test_round_trip_through_storage(self, tmp_path):
+        """测试FileStorage写入的交易按原样回放，分段文件名记录时间范围"""
+        storage = FileStorage(str(tmp_path), segment_size=100)
+        trades = [_trade(i) for i in range(250)]
+        for trade in trades:
+            storage.save_trade(trade)
+        storage.writer.join()
+
+        # 满100笔写一个分段，剩余50笔仍在内存
+        assert len(_segments(tmp_path)) == 2
+        assert storage.archive.get_stats()['trades_buffered'] == 50
+
+        assert storage.get_trades('BTCUSDT', T0, T0 + 10_000) == trades
+        segments = _segments(tmp_path)
+        assert [segment_time_range(path) for path in segments] == [
+            (T0, T0 + 990), (T0 + 1_000, T0 + 1_990), (T0 + 2_000, T0 + 2_490)
+        ]
+        assert storage.get_storage_stats()['total_files'] == 3
+
+    def test_reader_selects_overlapping_segments(self, tmp_path):
+        """测试读取器只打开时间范围重叠的分段，可只解码部分列"""
+        archive = TradeArchive(str(tmp_path), segment_size=100)
+        for i in range(300):
+            archive.append(_trade(i))
+
+        reader = TradeArchiveReader(str(tmp_path))
+        segments = reader.segments('BTCUSDT', T0 + 1_500, T0 + 1_600)
+        assert [segment_time_range(path) for path in segments] == [(T0 + 1_000, T0 + 1_990)]
+
+        trades = reader.get_trades('BTCUSDT', T0 + 1_500, T0 + 1_600)
+        assert [trade['trade_time'] for trade in trades] == list(range(T0 + 1_500, T0 + 1_610, 10))
+        assert read_segment(segments[0], columns=['price']).keys() == {'price'}
+
+    def test_day_change_starts_new_segment(self, tmp_path):
+        """测试交易日期变化时写出前一天的分段，各日期目录分别存放"""
+        archive = TradeArchive(str(tmp_path), segment_size=1_000)
+        day = datetime.fromtimestamp(T0 / 1000).replace(hour=23, minute=59, second=59, microsecond=0)
+        before = int(day.timestamp() * 1000)
+        after = int((day + timedelta(seconds=2)).timestamp() * 1000)
+
+        archive.append(_trade(0, trade_time=before))
+        archive.append(_trade(1, trade_time=after))
+        archive.close()
+
+        assert [path.parent.parent.name for path in _segments(tmp_path)] == [
+            day.strftime("%Y-%m-%d"), (day + timedelta(days=1)).strftime("%Y-%m-%d")
+        ]
+
+    def test_expired_only_flush(self, tmp_path):
+        """测试expired_only只写出超过刷新间隔的缓冲"""
+        archive = TradeArchive(str(tmp_path), flush_interval_seconds=60)
+        archive.append(_trade(0))
+        assert archive.flush(expired_only=True) == 0
+
+        archive.flush_interval_seconds = 0
+        assert archive.flush(expired_only=True) == 1
+        assert archive.get_stats()['segments_written'] == 1
+
+    def test_legacy_jsonl_is_still_read(self, tmp_path):
+        """测试旧版按日JSONL文件中的交易与归档交易一起按时间返回"""
+        legacy = _trade(5)
+        date_dir = tmp_path / datetime.fromtimestamp(T0 / 1000).strftime("%Y-%m-%d")
+        date_dir.mkdir()
+        with open(date_dir / "BTCUSDT.jsonl", 'w', encoding='utf-8') as f:
+            f.write(json.dumps(legacy) + '\n')
+
+        storage = FileStorage(str(tmp_path))
+        storage.save_trade(_trade(1))
+        storage.save_trade(_trade(9))
+
+        trades = storage.get_trades('BTCUSDT', T0, T0 + 1_000)
+        assert [trade['trade_time'] for trade in trades] == [T0 + 10, T0 + 50, T0 + 90]
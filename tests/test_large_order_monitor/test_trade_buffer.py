@@ -0,0 +1,203 @@
+"""
+测试TradeRingBuffer列式环形缓冲区及使用它的聚合器
+"""
+import pytest
+from unittest.mock import Mock
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../'))
+
+from src.monitor.common.trade_buffer import (
+    TradeRingBuffer, TradeBucketBuffer, make_trade_buffer, SIDE_BUY, SIDE_SELL
+)
+from src.monitor.taker_orders.core.cumulative_monitor import CumulativeMonitor
+
+
+class TestTradeRingBuffer:
+    """测试环形缓冲区"""
+
+    def test_totals_and_counts(self):
+        """测试按方向维护累计金额和笔数"""
+        buffer = TradeRingBuffer()
+        buffer.append(1_000, 100.0, SIDE_BUY)
+        buffer.append(2_000, 50.0, SIDE_SELL)
+        buffer.append(3_000, 25.0, SIDE_BUY)
+
+        assert len(buffer) == 3
+        assert buffer.total(SIDE_BUY) == 125.0
+        assert buffer.total(SIDE_SELL) == 50.0
+        assert buffer.total() == 175.0
+        assert buffer.count(SIDE_BUY) == 2
+        assert buffer.oldest_timestamp() == 1_000
+        assert buffer.newest_timestamp() == 3_000
+
+    def test_expire_subtracts(self):
+        """测试过期交易从累计中扣除，方向为空时归零"""
+        buffer = TradeRingBuffer()
+        buffer.append(1_000, 0.1, SIDE_BUY)
+        buffer.append(2_000, 0.2, SIDE_BUY)
+        buffer.append(3_000, 7.0, SIDE_SELL)
+
+        assert buffer.expire(1_000) == 1
+        assert buffer.total(SIDE_BUY) == pytest.approx(0.2)
+        assert buffer.expire(2_000) == 1
+        assert buffer.total(SIDE_BUY) == 0.0
+        assert buffer.count(SIDE_BUY) == 0
+        assert buffer.total(SIDE_SELL) == 7.0
+        assert buffer.expire(10_000) == 1
+        assert len(buffer) == 0
+        assert buffer.oldest_timestamp() is None
+
+    def test_wraparound_and_grow(self):
+        """测试队首回绕后扩容仍保持时间顺序"""
+        buffer = TradeRingBuffer(initial_capacity=4)
+        for ts in range(4):
+            buffer.append(ts, 1.0, SIDE_BUY)
+        buffer.expire(1)
+        for ts in range(4, 9):
+            buffer.append(ts, 1.0, SIDE_SELL)
+
+        assert buffer.capacity == 8
+        assert [ts for ts, _, _ in buffer] == list(range(2, 9))
+        assert buffer.count(SIDE_BUY) == 2
+        assert buffer.count(SIDE_SELL) == 5
+
+    def test_shrink_after_expiry(self):
+        """测试数据量下降后缩容释放内存"""
+        buffer = TradeRingBuffer(initial_capacity=4)
+        for ts in range(1_000):
+            buffer.append(ts, 1.0, SIDE_BUY)
+        grown = buffer.nbytes
+
+        buffer.expire(995)
+        assert buffer.nbytes < grown
+        assert [ts for ts, _, _ in buffer] == [996, 997, 998, 999]
+        assert buffer.total(SIDE_BUY) == 4.0
+        assert buffer.nbytes == 17 * buffer.capacity
+
+
+class TestTradeBucketBuffer:
+    """测试分桶预聚合缓冲区"""
+
+    def test_trades_share_bucket(self):
+        """测试同一桶内的交易合并，内存与交易笔数无关"""
+        buffer = TradeBucketBuffer(bucket_width=1_000)
+        for ts in range(0, 10_000, 10):
+            buffer.append(ts, 1.0, SIDE_BUY if ts % 20 else SIDE_SELL)
+
+        assert buffer.buckets == 10
+        assert len(buffer) == 1_000
+        assert buffer.total(SIDE_BUY) == 500.0
+        assert buffer.count(SIDE_SELL) == 500
+        assert buffer.oldest_timestamp() == 0
+        assert buffer.newest_timestamp() == 9_990
+
+    def test_error_bound_on_expiry(self):
+        """测试桶内交易全部过期后才移除：只会多算左边界所在的一个桶"""
+        buffer = TradeBucketBuffer(bucket_width=1_000)
+        buffer.append(1_100, 5.0, SIDE_BUY)
+        buffer.append(1_900, 7.0, SIDE_BUY)
+        buffer.append(2_500, 3.0, SIDE_SELL)
+
+        # 1_100 已过期，但同桶的 1_900 仍在窗口内：桶保留，金额多算但不超过一个桶
+        assert buffer.expire(1_500) == 0
+        assert buffer.total(SIDE_BUY) == 12.0
+        assert buffer.expire(2_000) == 2
+        assert buffer.total(SIDE_BUY) == 0.0
+        assert buffer.total(SIDE_SELL) == 3.0
+
+    def test_factory(self):
+        """测试按桶宽度选择实现"""
+        assert isinstance(make_trade_buffer(0), TradeRingBuffer)
+        assert isinstance(make_trade_buffer(1_000), TradeBucketBuffer)
+        with pytest.raises(ValueError):
+            TradeBucketBuffer(bucket_width=0)
+
+
+def _taker_trade(symbol, side, amount, trade_time_ms):
+    trade = Mock()
+    trade.symbol = symbol
+    trade.side = side
+    trade.amount = amount
+    trade.trade_time = trade_time_ms
+    trade.is_taker = True
+    return trade
+
+
+class TestCumulativeMonitorBuffer:
+    """测试累积监控器基于缓冲区的窗口"""
+
+    @pytest.fixture
+    def monitor(self):
+        return CumulativeMonitor({
+            "window_size": 60,
+            "threshold_usd": 1_000_000,
+            "min_order_count": 3,
+            "directions": ["BUY", "SELL"],
+        })
+
+    def test_threshold_per_direction(self, monitor):
+        """测试按方向统计订单数和金额"""
+        for i in range(3):
+            monitor.add_trade(_taker_trade("BTCUSDT", "BUY", 400_000, 1_000_000 + i * 1000))
+        monitor.add_trade(_taker_trade("BTCUSDT", "SELL", 2_000_000, 1_004_000))
+
+        alert = monitor.check_threshold("BTCUSDT", "BUY", 1_004)
+        assert alert.order_count == 3
+        assert alert.total_amount_usd == 1_200_000
+        assert monitor.check_threshold("BTCUSDT", "SELL", 1_004) is None
+        assert monitor.get_window_info("BTCUSDT", "SELL")["order_count"] == 1
+
+    def test_expired_windows_are_dropped(self, monitor):
+        """测试窗口内交易全部过期后删除该交易对"""
+        monitor.add_trade(_taker_trade("BTCUSDT", "BUY", 10, 1_000_000))
+        monitor.add_trade(_taker_trade("ETHUSDT", "BUY", 10, 1_100_000))
+
+        assert list(monitor.time_windows) == ["ETHUSDT"]
+        assert monitor.get_window_info("BTCUSDT", "BUY")["order_count"] == 0
+
+    def test_bucketed_window(self):
+        """测试分桶模式下累计结果与逐笔模式一致（窗口边界对齐桶时）"""
+        monitor = CumulativeMonitor({
+            "window_size": 60,
+            "threshold_usd": 1_000_000,
+            "min_order_count": 3,
+            "directions": ["BUY", "SELL"],
+            "bucket_seconds": 10,
+        })
+        for i in range(30):
+            monitor.add_trade(_taker_trade("BTCUSDT", "BUY", 100_000, 1_000_000 + i * 1000))
+
+        window = monitor.time_windows["BTCUSDT"]
+        assert window.buckets == 3
+        alert = monitor.check_threshold("BTCUSDT", "BUY", 1_029)
+        assert alert.order_count == 30
+        assert alert.total_amount_usd == 3_000_000
+
+    def test_production_config_uses_bucket_setting(self, monkeypatch):
+        """测试按生产方式（TakerOrderTracker + TAKER_ORDER_CUMULATIVE_CONFIG）构建时读取全局分桶设置"""
+        import src.config as config
+        from src.monitor.taker_orders.src.tracker import TakerOrderTracker
+
+        monkeypatch.setattr(config, "TAKER_WINDOW_BUCKET_SECONDS", 10)
+        tracker = TakerOrderTracker(
+            symbols=config.TAKER_ORDER_MONITORED_SYMBOLS,
+            single_thresholds=config.TAKER_ORDER_SINGLE_THRESHOLDS,
+            cumulative_config=config.TAKER_ORDER_CUMULATIVE_CONFIG,
+            cooldown_config=config.TAKER_ORDER_COOLDOWN_CONFIG,
+        )
+        tracker.cumulative_monitor.add_trade(_taker_trade("BTCUSDT", "BUY", 100, 1_000_000))
+
+        assert tracker.cumulative_monitor.bucket_seconds == 10
+        assert isinstance(tracker.cumulative_monitor.time_windows["BTCUSDT"], TradeBucketBuffer)
+
+    def test_default_config_loads(self, monkeypatch):
+        """测试不传配置时从全局配置加载"""
+        import src.config as config
+
+        monkeypatch.setattr(config, "TAKER_WINDOW_BUCKET_SECONDS", 0)
+        monitor = CumulativeMonitor()
+
+        assert monitor.window_size == config.TAKER_CUMULATIVE_WINDOW_MINUTES * 60
+        assert monitor.bucket_seconds == 0
@@ -0,0 +1,138 @@
+"""
+测试币安交易消息解码器
+"""
+import asyncio
+import json
+import pytest
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../'))
+
+from src.monitor.large_orders.exchanges.trade_decoder import (
+    TradeDecoder, DECODE_ERRORS, BACKEND_JSON, BACKEND_ORJSON, BACKEND_MSGSPEC, msgspec, orjson
+)
+from src.monitor.large_orders.exchanges.binance import BinanceWebSocketClient
+from src.monitor.large_orders.src.base import TradeEvent
+
+
+BACKENDS = [BACKEND_JSON]
+if orjson is not None:
+    BACKENDS.append(BACKEND_ORJSON)
+if msgspec is not None:
+    BACKENDS.append(BACKEND_MSGSPEC)
+
+TRADE_MESSAGE = json.dumps({
+    "e": "trade", "E": 1700000000001, "s": "BTCUSDT", "t": 12345,
+    "p": "50000.50", "q": "0.20000000", "T": 1700000000000, "m": True, "M": True
+})
+
+AGG_TRADE_MESSAGE = json.dumps({
+    "e": "aggTrade", "E": 1700000000001, "s": "ETHUSDT", "a": 900, "p": "2000.00",
+    "q": "15.5", "f": 1000, "l": 1004, "T": 1700000000000, "m": False, "M": True
+})
+
+
+class TestTradeDecoder:
+    """测试解码器"""
+
+    @pytest.mark.parametrize("backend", BACKENDS)
+    def test_decode_trade(self, backend):
+        """测试交易消息直接解码为TradeEvent，默认不保留原始数据"""
+        trade = TradeDecoder(backend=backend).decode(TRADE_MESSAGE)
+
+        assert isinstance(trade, TradeEvent)
+        assert trade.symbol == "BTCUSDT"
+        assert trade.side == "SELL"
+        assert trade.price == 50000.5
+        assert trade.quantity == 0.2
+        assert trade.amount == pytest.approx(10000.1)
+        assert trade.trade_time == 1700000000000
+        assert trade.trade_id == "12345"
+        assert trade.raw_data is None
+
+    @pytest.mark.parametrize("backend", BACKENDS)
+    def test_keep_raw(self, backend):
+        """测试开启keep_raw后保留原始消息"""
+        trade = TradeDecoder(backend=backend, keep_raw=True).decode(TRADE_MESSAGE.encode())
+        assert trade.raw_data["E"] == 1700000000001
+
+    @pytest.mark.parametrize("backend", BACKENDS)
+    def test_control_message_and_errors(self, backend):
+        """测试非交易消息返回字典，非法消息抛出解码异常"""
+        decoder = TradeDecoder(backend=backend)
+        response = decoder.decode('{"result": null, "id": 7}')
+        assert response["result"] is None
+        assert response["id"] == 7
+
+        with pytest.raises(DECODE_ERRORS):
+            decoder.decode("{not json")
+
+    @pytest.mark.parametrize("backend", BACKENDS)
+    def test_combined_stream_envelope(self, backend):
+        """测试组合流消息拆开{"stream", "data"}信封"""
+        decoder = TradeDecoder(backend=backend, combined=True)
+        message = '{"stream": "btcusdt@trade", "data": %s}' % TRADE_MESSAGE
+        trade = decoder.decode(message)
+        assert trade.symbol == "BTCUSDT"
+        assert trade.trade_id == "12345"
+        assert decoder.decode('{"result": null, "id": 7}')["id"] == 7
+
+    @pytest.mark.parametrize("backend", BACKENDS)
+    def test_decode_agg_trade(self, backend):
+        """测试@aggTrade消息：trade_id为归集成交ID，带首末成交ID"""
+        for decoder in (TradeDecoder(backend=backend), TradeDecoder(backend=backend, combined=True)):
+            message = AGG_TRADE_MESSAGE
+            if decoder.combined:
+                message = '{"stream": "ethusdt@aggTrade", "data": %s}' % AGG_TRADE_MESSAGE
+            trade = decoder.decode(message)
+
+            assert trade.symbol == "ETHUSDT"
+            assert trade.side == "BUY"
+            assert trade.amount == 31000.0
+            assert trade.trade_time == 1700000000000
+            assert trade.trade_id == "900"
+            assert (trade.first_trade_id, trade.last_trade_id) == (1000, 1004)
+
+        trade = TradeDecoder(backend=backend).trade_from_dict(json.loads(AGG_TRADE_MESSAGE))
+        assert trade.trade_id == "900"
+        assert trade.last_trade_id == 1004
+
+    def test_invalid_backend(self):
+        """测试非法后端"""
+        with pytest.raises(ValueError):
+            TradeDecoder(backend="yaml")
+
+    def test_trade_event_is_slotted(self):
+        """测试TradeEvent没有实例字典"""
+        trade = TradeDecoder(backend=BACKEND_JSON).decode(TRADE_MESSAGE)
+        assert not hasattr(trade, "__dict__")
+
+
+class TestClientDecoding:
+    """测试币安客户端使用解码器处理消息"""
+
+    def test_decoded_trade_is_emitted(self):
+        """测试解码后的交易按原路径发射"""
+        client = BinanceWebSocketClient(["BTCUSDT"])
+        received = []
+        client.set_trade_callback(received.append)
+
+        asyncio.run(client._process_message(client.decoder.decode(TRADE_MESSAGE)))
+        asyncio.run(client._process_message(json.loads(TRADE_MESSAGE)))
+        asyncio.run(client._process_message(client.decoder.decode('{"result": null, "id": 7}')))
+
+        assert [trade.trade_id for trade in received] == ["12345", "12345"]
+
+    def test_stream_type(self):
+        """测试交易流类型决定组合流名称，非法类型报错"""
+        client = BinanceWebSocketClient(["BTCUSDT", "ETHUSDT"], stream_type="aggTrade", base_url="ws://localhost")
+        assert client.shards[0].url == "ws://localhost/stream?streams=btcusdt@aggTrade/ethusdt@aggTrade"
+
+        received = []
+        client.set_trade_callback(received.append)
+        asyncio.run(client._process_message(json.loads(AGG_TRADE_MESSAGE)))
+        assert received[0].trade_id == "900"
+
+        with pytest.raises(ValueError):
+            BinanceWebSocketClient(["BTCUSDT"], stream_type="depth")
@@ -0,0 +1,180 @@
+"""
+测试多窗口共享交易存储及TimeWindowManager的窗口切换
+"""
+import asyncio
+import random
+import pytest
+from types import SimpleNamespace
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../'))
+
+from src.monitor.common.trade_buffer import SIDE_BUY, SIDE_SELL
+from src.monitor.common.window_store import MultiWindowBuffer, SharedTradeStore
+from src.monitor.large_orders.core.time_window_manager import TimeWindowManager
+
+
+class TestMultiWindowBuffer:
+    """测试共享缓冲区上的多窗口累计"""
+
+    def test_matches_brute_force(self):
+        """测试每个窗口的累计与逐笔重新求和一致"""
+        rng = random.Random(7)
+        widths = (5_000, 15_000, 60_000)
+        buffer = MultiWindowBuffer(retention=60_000)
+        cursors = {width: buffer.add_window(width) for width in widths}
+        trades = []
+
+        now = 0
+        for _ in range(3_000):
+            now += rng.randint(0, 100)
+            side = rng.choice((SIDE_BUY, SIDE_SELL))
+            amount = rng.uniform(1, 1_000)
+            buffer.append(now, amount, side)
+            trades.append((now, amount, side))
+            buffer.advance(now)
+
+            if rng.random() < 0.05:
+                for width, cursor in cursors.items():
+                    expected = [t for t in trades if t[0] > now - width and t[2] == SIDE_BUY]
+                    assert cursor.counts[SIDE_BUY] == len(expected)
+                    assert cursor.totals[SIDE_BUY] == pytest.approx(sum(t[1] for t in expected))
+
+        # 只保存最大窗口内的交易
+        assert len(buffer) == len([t for t in trades if t[0] > now - 60_000])
+
+    def test_new_window_uses_history(self):
+        """测试新增窗口立即从已保存历史得到累计"""
+        buffer = MultiWindowBuffer(retention=60_000)
+        for ts in range(0, 60_000, 1_000):
+            buffer.append(ts, 1.0, SIDE_BUY)
+
+        cursor = buffer.add_window(10_000)
+        assert cursor.counts[SIDE_BUY] == 10
+        assert buffer.window_count == 1
+
+    def test_retention_trims_lagging_window(self):
+        """测试超出保留时长的交易移除时，未推进的窗口同步扣减"""
+        buffer = MultiWindowBuffer(retention=10_000)
+        cursor = buffer.add_window(10_000)
+        buffer.append(0, 5.0, SIDE_SELL)
+        buffer.append(20_000, 1.0, SIDE_SELL)
+
+        assert len(buffer) == 1
+        assert cursor.counts[SIDE_SELL] == 1
+        assert cursor.totals[SIDE_SELL] == 1.0
+
+
+class TestSharedTradeStore:
+    """测试共享存储的窗口视图"""
+
+    def test_views_share_one_copy(self):
+        """测试交易写入一次即计入所有窗口"""
+        store = SharedTradeStore(retention=60_000)
+        short = store.view("BTCUSDT", 5_000)
+        long = store.view("BTCUSDT", 60_000)
+
+        short.append(1_000, 100.0, SIDE_BUY)
+        long.append(8_000, 50.0, SIDE_SELL)
+
+        assert long.total() == 150.0
+        assert short.expire(8_000 - 5_000) == 1
+        assert short.total() == 50.0
+        assert long.total() == 150.0
+        assert len(store.buffers["BTCUSDT"]) == 2
+
+    def test_clear_only_resets_one_window(self):
+        """测试重置单个窗口不影响其他窗口"""
+        store = SharedTradeStore(retention=60_000)
+        short = store.view("BTCUSDT", 5_000)
+        long = store.view("BTCUSDT", 60_000)
+        short.append(1_000, 100.0, SIDE_BUY)
+
+        short.clear()
+        assert len(short) == 0
+        assert long.total(SIDE_BUY) == 100.0
+
+
+class TestRetention:
+    """测试共享存储的保留时长跟随最大已注册窗口"""
+
+    def test_retention_follows_widest_window(self):
+        """测试未配置预热时只保留最大窗口内的交易，注销宽窗口后收缩"""
+        store = SharedTradeStore()
+        store.view("BTCUSDT", 5_000)
+        store.view("BTCUSDT", 60_000)
+        buffer = store.buffers["BTCUSDT"]
+        for t in range(0, 120_000, 1_000):
+            buffer.append(t, 1.0, SIDE_BUY)
+
+        assert buffer.retention == 60_000
+        assert len(buffer) == 60
+
+        store.remove_window(60_000)
+        buffer.append(120_000, 1.0, SIDE_BUY)
+        assert buffer.retention == 5_000
+        assert len(buffer) == 5
+
+    def test_warmup_keeps_extra_history(self):
+        """测试预热保留时长大于最大窗口时按预热时长保留"""
+        store = SharedTradeStore(retention=30_000)
+        store.view("BTCUSDT", 5_000)
+        buffer = store.buffers["BTCUSDT"]
+        for t in range(0, 60_000, 1_000):
+            buffer.append(t, 1.0, SIDE_BUY)
+
+        assert len(buffer) == 30
+
+    def test_bucketing_rejected_with_shared_store(self):
+        """测试共享存储与分桶同时指定时报错，而不是静默关闭分桶"""
+        from src.monitor.large_orders.core.order_aggregator import OrderAggregator
+
+        with pytest.raises(ValueError):
+            OrderAggregator(window_minutes=5, bucket_seconds=10, trade_store=SharedTradeStore())
+        assert OrderAggregator(window_minutes=5, trade_store=SharedTradeStore()).bucket_seconds == 0
+
+
+class TestTimeWindowManager:
+    """测试窗口切换无需预热"""
+
+    def test_switch_window_keeps_history(self):
+        """测试切换到新窗口后立即包含已接收的交易"""
+        manager = TimeWindowManager()
+
+        async def feed():
+            for _ in range(20):
+                await manager.add_trade("BTCUSDT", SimpleNamespace(side="BUY"), 1_000.0)
+
+        asyncio.run(feed())
+        assert manager.update_window_size(15)
+
+        summary = manager.get_active_aggregator().get_window_summary("BTCUSDT")
+        assert summary["trade_count"] == 20
+        assert summary["total_volume"] == 20_000.0
+        assert len(manager.trade_store.buffers["BTCUSDT"]) == 20
+
+    def test_manager_memory_bounded_by_active_window(self):
+        """测试默认只保留活跃窗口内的交易"""
+        manager = TimeWindowManager(window_minutes=5, warmup_minutes=0)
+
+        async def feed():
+            for i in range(20):
+                trade = SimpleNamespace(side="BUY", trade_time=i * 60_000)
+                await manager.add_trade("BTCUSDT", trade, 1_000.0)
+
+        asyncio.run(feed())
+        assert len(manager.trade_store.buffers["BTCUSDT"]) == 5
+
+    def test_process_switches_window(self):
+        """测试大额订单监控进程经由TimeWindowManager切换窗口，阈值同步到新窗口"""
+        from src.alert_processes.large_order import LargeOrderMonitorProcess
+
+        process = LargeOrderMonitorProcess(symbols=["BTCUSDT"], threshold_usd=1_000_000, window_minutes=5)
+        assert process.order_aggregator.window_minutes == 5
+
+        process.update_threshold(500_000)
+        assert process.update_window(15)
+        assert process.order_aggregator.window_minutes == 15
+        assert process.order_aggregator.threshold_usd == 500_000
+        assert process.order_aggregator.trade_store is process.window_manager.trade_store